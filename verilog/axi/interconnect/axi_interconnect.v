@@ -36,67 +36,67 @@ module axi_interconnect #(
 
 
   //bus write addr path
-  output      [3:0]                 i_awid,         //Write ID
-  output      [ADDR_WIDTH - 1:0]    i_awaddr,       //Write Addr Path Address
-  output      [3:0]                 i_awlen,        //Write Addr Path Burst Length
-  output      [2:0]                 i_awsize,       //Write Addr Path Burst Size
-  output      [1:0]                 i_awburst,      //Write Addr Path Burst Type
+  input       [3:0]                 i_awid,         //Write ID
+  input       [ADDR_WIDTH - 1:0]    i_awaddr,       //Write Addr Path Address
+  input       [3:0]                 i_awlen,        //Write Addr Path Burst Length
+  input       [2:0]                 i_awsize,       //Write Addr Path Burst Size
+  input       [1:0]                 i_awburst,      //Write Addr Path Burst Type
                                                         //  0 = Fixed
                                                         //  1 = Incrementing
                                                         //  2 = wrap
-  output      [1:0]                 i_awlock,       //Write Addr Path Lock (atomic) information
+  input       [1:0]                 i_awlock,       //Write Addr Path Lock (atomic) information
                                                         //  0 = Normal
                                                         //  1 = Exclusive
                                                         //  2 = Locked
-  output      [3:0]                 i_awcache,      //Write Addr Path Cache Type
-  output      [2:0]                 i_awprot,       //Write Addr Path Protection Type
-  output                            i_awvalid,      //Write Addr Path Address Valid
-  input                             o_awready,      //Write Addr Path Slave Ready
+  input       [3:0]                 i_awcache,      //Write Addr Path Cache Type
+  input       [2:0]                 i_awprot,       //Write Addr Path Protection Type
+  input                             i_awvalid,      //Write Addr Path Address Valid
+  output                            o_awready,      //Write Addr Path Slave Ready
                                                         //  1 = Slave Ready
                                                         //  0 = Slave Not Ready
 
     //bus write data
-  output  reg [3:0]                 i_wid,          //Write ID
-  output  reg [DATA_WIDTH - 1: 0]   i_wdata,        //Write Data (this size is set with the DATA_WIDTH Parameter
+  input       [3:0]                 i_wid,          //Write ID
+  input       [DATA_WIDTH - 1: 0]   i_wdata,        //Write Data (this size is set with the DATA_WIDTH Parameter
                                                       //Valid values are: 8, 16, 32, 64, 128, 256, 512, 1024
-  output  reg [DATA_WIDTH >> 3:0]   i_wstrobe,      //Write Strobe (a 1 in the write is associated with the byte to write)
-  output  reg                       i_wlast,        //Write Last transfer in a write burst
-  output  reg                       i_wvalid,       //Data through this bus is valid
-  input                             o_wready,       //Slave is ready for data
+  input       [(DATA_WIDTH >> 3) - 1:0] i_wstrobe,  //Write Strobe (a 1 in the write is associated with the byte to write)
+  input                             i_wlast,        //Write Last transfer in a write burst
+  input                             i_wvalid,       //Data through this bus is valid
+  output                            o_wready,       //Slave is ready for data
 
     //Write Response Channel
-  input       [3:0]                 o_bid,          //Response ID (this must match awid)
-  input       [1:0]                 o_bresp,        //Write Response
+  output      [3:0]                 o_bid,          //Response ID (this must match awid)
+  output      [1:0]                 o_bresp,        //Write Response
                                                         //  0 = OKAY
                                                         //  1 = EXOKAY
                                                         //  2 = SLVERR
                                                         //  3 = DECERR
-  input                             o_bvalid,       //Write Response is:
+  output                            o_bvalid,       //Write Response is:
                                                         //  1 = Available
                                                         //  0 = Not Available
-  output  reg                       i_bready,       //WBM Ready
+  input                             i_bready,       //WBM Ready
 
     //bus read addr path
-  output  reg  [3:0]                i_arid,         //Read ID
-  output       [ADDR_WIDTH - 1:0]   i_araddr,       //Read Addr Path Address
-  output  reg  [3:0]                i_arlen,        //Read Addr Path Burst Length
-  output  reg  [2:0]                i_arsize,       //Read Addr Path Burst Size
-  output       [1:0]                i_arburst,      //Read Addr Path Burst Type
-  output       [1:0]                i_arlock,       //Read Addr Path Lock (atomic) information
-  output       [3:0]                i_arcache,      //Read Addr Path Cache Type
-  output       [2:0]                i_arprot,       //Read Addr Path Protection Type
-  output  reg                       i_arvalid,      //Read Addr Path Address Valid
-  input                             o_arready,      //Read Addr Path Slave Ready
+  input        [3:0]                i_arid,         //Read ID
+  input        [ADDR_WIDTH - 1:0]   i_araddr,       //Read Addr Path Address
+  input        [3:0]                i_arlen,        //Read Addr Path Burst Length
+  input        [2:0]                i_arsize,       //Read Addr Path Burst Size
+  input        [1:0]                i_arburst,      //Read Addr Path Burst Type
+  input        [1:0]                i_arlock,       //Read Addr Path Lock (atomic) information
+  input        [3:0]                i_arcache,      //Read Addr Path Cache Type
+  input        [2:0]                i_arprot,       //Read Addr Path Protection Type
+  input                             i_arvalid,      //Read Addr Path Address Valid
+  output                            o_arready,      //Read Addr Path Slave Ready
                                                         //  1 = Slave Ready
                                                         //  0 = Slave Not Ready
     //bus read data
-  input       [3:0]                 o_rid,          //Write ID
-  input       [DATA_WIDTH - 1: 0]   o_rdata,        //Write Data (this size is set with the DATA_WIDTH Parameter
+  output      [3:0]                 o_rid,          //Read ID
+  output      [DATA_WIDTH - 1: 0]   o_rdata,        //Read Data (this size is set with the DATA_WIDTH Parameter
                                                     //Valid values are: 8, 16, 32, 64, 128, 256, 512, 1024
-  input       [DATA_WIDTH >> 3:0]   o_rstrobe,      //Write Strobe (a 1 in the write is associated with the byte to write)
-  input                             o_rlast,        //Write Last transfer in a write burst
-  input                             o_rvalid,       //Data through this bus is valid
-  output  reg                       i_rready,       //WBM is ready for data
+  output      [1:0]                 o_rresp,        //Read Response
+  output                            o_rlast,        //Read Last transfer in a read burst
+  output                            o_rvalid,       //Data through this bus is valid
+  input                             i_rready,       //WBM is ready for data
                                                         //  1 = WBM Ready
                                                         //  0 = Slave Ready
 
@@ -109,19 +109,103 @@ ${ADDRESSES}
 
 localparam ADDR_NO_SEL = ((1 << ADDR_WIDTH) - 1);
 
-//state
-
-//axi slave signals
-
-//this should be parameterized
-wire [3:0]slave_select;
-
-assign slave_select =   i_m_adr[31:24];
-
+localparam RESP_DECERR = 2'h3;
+
+//Registers/Wires
+//A write and a read can be in flight at the same time, each one stays
+//routed to the slave selected by its address until the response completes
+reg                       r_w_active;
+reg                       r_aw_done;
+reg                       r_w_done;
+reg   [SEL_WIDTH - 1:0]   r_w_sel;
+reg   [3:0]               r_w_id;
+
+reg                       r_r_active;
+reg                       r_ar_done;
+reg   [SEL_WIDTH - 1:0]   r_r_sel;
+reg   [3:0]               r_r_id;
+reg   [3:0]               r_r_err_count;
+
+wire  [SEL_WIDTH - 1:0]   w_aw_sel;
+wire  [SEL_WIDTH - 1:0]   w_ar_sel;
+wire                      w_w_err;
+wire                      w_r_err;
+
+//Address Decode
 ${DATA}
 
+assign  w_aw_sel  = decode(i_awaddr);
+assign  w_ar_sel  = decode(i_araddr);
+assign  w_w_err   = (r_w_sel == NO_SLAVE);
+assign  w_r_err   = (r_r_sel == NO_SLAVE);
+
+//Transaction state
+always @ (posedge clk) begin
+  if (rst) begin
+    r_w_active            <=  0;
+    r_aw_done             <=  0;
+    r_w_done              <=  0;
+    r_w_sel               <=  NO_SLAVE;
+    r_w_id                <=  0;
+    r_r_active            <=  0;
+    r_ar_done             <=  0;
+    r_r_sel               <=  NO_SLAVE;
+    r_r_id                <=  0;
+    r_r_err_count         <=  0;
+  end
+  else begin
+    //Write
+    if (!r_w_active) begin
+      if (i_awvalid) begin
+        r_w_sel           <=  w_aw_sel;
+        r_w_id            <=  i_awid;
+        r_w_active        <=  1;
+      end
+    end
+    else begin
+      if (i_awvalid && o_awready) begin
+        r_aw_done         <=  1;
+      end
+      if (i_wvalid && o_wready && i_wlast) begin
+        r_w_done          <=  1;
+      end
+      if (o_bvalid && i_bready) begin
+        r_w_active        <=  0;
+        r_aw_done         <=  0;
+        r_w_done          <=  0;
+      end
+    end
+
+    //Read
+    if (!r_r_active) begin
+      if (i_arvalid) begin
+        r_r_sel           <=  w_ar_sel;
+        r_r_id            <=  i_arid;
+        r_r_err_count     <=  i_arlen;
+        r_r_active        <=  1;
+      end
+    end
+    else begin
+      if (i_arvalid && o_arready) begin
+        r_ar_done         <=  1;
+      end
+      if (o_rvalid && i_rready) begin
+        if (w_r_err && (r_r_err_count > 0)) begin
+          r_r_err_count   <=  r_r_err_count - 1;
+        end
+        if (o_rlast) begin
+          r_r_active      <=  0;
+          r_ar_done       <=  0;
+        end
+      end
+    end
+  end
+end
+
+//Responses back to the master
 ${ACK}
 
+//Requests to the slaves
 ${ASSIGN}
 
 endmodule
@@ -20,6 +20,14 @@ import sys
 import os
 import argparse
 import json
+import time
+import random
+import bisect
+import shutil
+import tempfile
+import subprocess
+from string import Template
+from distutils.spawn import find_executable
 
 #sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
 
@@ -36,9 +44,97 @@ DESCRIPTION = "\n" \
 EPILOG = "\n" \
          "\n" \
          "Examples:\n" \
-         "\tSomething\n" \
-         "\n"
+         "\tGenerate an interconnect from a slave map:\n" \
+         "\t\t%s -j interconnect_2port.json -o axi_2port_interconnect.v\n" \
+         "\n" \
+         "\tRun the generator over 100 random 2 to 64 slave maps:\n" \
+         "\t\t%s -r 100\n" \
+         "\n" \
+         "\tCompile every generated interconnect with iverilog or verilator too:\n" \
+         "\t\t%s -r 100 -l\n" \
+         "\n" % (NAME, NAME, NAME)
+
+DECODE_MASK = "mask"
+DECODE_TREE = "tree"
+
+REGRESSION_MIN_SLAVES = 2
+REGRESSION_MAX_SLAVES = 64
+REGRESSION_ADDRESS_CHECKS = 1000
+
+#Lint commands in order of preference, the generated file name is appended
+LINT_COMMANDS = [
+    ("iverilog",    ["iverilog", "-g2005", "-Wall", "-t", "null"]),
+    ("verilator",   ["verilator", "--lint-only", "-Wno-fatal", "--top-module", "axi_interconnect"])
+]
+
+#(direction, name, width) of every AXI signal that goes to a slave, the
+#direction is from the point of view of the interconnect
+SLAVE_SIGNALS = [
+    ("output",  "awid",     "[3:0]"),
+    ("output",  "awaddr",   "[ADDR_WIDTH - 1:0]"),
+    ("output",  "awlen",    "[3:0]"),
+    ("output",  "awsize",   "[2:0]"),
+    ("output",  "awburst",  "[1:0]"),
+    ("output",  "awlock",   "[1:0]"),
+    ("output",  "awcache",  "[3:0]"),
+    ("output",  "awprot",   "[2:0]"),
+    ("output",  "awvalid",  ""),
+    ("input",   "awready",  ""),
+
+    ("output",  "wid",      "[3:0]"),
+    ("output",  "wdata",    "[DATA_WIDTH - 1:0]"),
+    ("output",  "wstrobe",  "[(DATA_WIDTH >> 3) - 1:0]"),
+    ("output",  "wlast",    ""),
+    ("output",  "wvalid",   ""),
+    ("input",   "wready",   ""),
+
+    ("input",   "bid",      "[3:0]"),
+    ("input",   "bresp",    "[1:0]"),
+    ("input",   "bvalid",   ""),
+    ("output",  "bready",   ""),
+
+    ("output",  "arid",     "[3:0]"),
+    ("output",  "araddr",   "[ADDR_WIDTH - 1:0]"),
+    ("output",  "arlen",    "[3:0]"),
+    ("output",  "arsize",   "[2:0]"),
+    ("output",  "arburst",  "[1:0]"),
+    ("output",  "arlock",   "[1:0]"),
+    ("output",  "arcache",  "[3:0]"),
+    ("output",  "arprot",   "[2:0]"),
+    ("output",  "arvalid",  ""),
+    ("input",   "arready",  ""),
+
+    ("input",   "rid",      "[3:0]"),
+    ("input",   "rdata",    "[DATA_WIDTH - 1:0]"),
+    ("input",   "rresp",    "[1:0]"),
+    ("input",   "rlast",    ""),
+    ("input",   "rvalid",   ""),
+    ("output",  "rready",   "")
+]
+
+#Slave outputs that are copied straight from the master
+BROADCAST_SIGNALS = ["awid", "awlen", "awsize", "awburst", "awlock", "awcache", "awprot",
+                     "wid", "wdata", "wstrobe", "wlast",
+                     "arid", "arlen", "arsize", "arburst", "arlock", "arcache", "arprot"]
+
+#Slave inputs gathered into one bus so the response can be selected with
+#an index (name, width in bits or the parameter that sets the width)
+RESPONSE_SIGNALS = [
+    ("awready", "1"),
+    ("wready",  "1"),
+    ("bid",     "4"),
+    ("bresp",   "2"),
+    ("bvalid",  "1"),
+    ("arready", "1"),
+    ("rid",     "4"),
+    ("rdata",   "DATA_WIDTH"),
+    ("rresp",   "2"),
+    ("rlast",   "1"),
+    ("rvalid",  "1")
+]
 
+class InterconnectError(Exception):
+    pass
 
 def parse_json(filepath):
     f = open(filepath, 'r')
@@ -46,21 +142,566 @@ def parse_json(filepath):
     f.close()
     return d
 
+def clog2(value):
+    """
+    Number of bits needed to count to 'value' - 1 (at least 1)
+    """
+    width = 1
+    while (1 << width) < value:
+        width += 1
+    return width
+
+def is_power_of_two(value):
+    return value > 0 and (value & (value - 1)) == 0
+
+class IntervalIndex(object):
+    """
+    Sorted, non overlapping address ranges ([start, end), end is exclusive)
+
+    Ranges are kept sorted by start address so an overlap check or a lookup
+    only looks at the neighbours found with a binary search
+    """
+
+    def __init__(self):
+        object.__init__(self)
+        self.starts = []
+        self.ends = []
+        self.values = []
+
+    def __len__(self):
+        return len(self.starts)
+
+    def add(self, start, end, value):
+        """
+        Add a range
+
+        Raises:
+            InterconnectError: the range is empty or overlaps another range
+        """
+        if end <= start:
+            raise InterconnectError("Slave %s: end address 0x%08X is not above the start address 0x%08X" % (str(value), end, start))
+        pos = bisect.bisect_right(self.starts, start)
+        if pos > 0 and self.ends[pos - 1] > start:
+            raise InterconnectError("Slave %s: 0x%08X - 0x%08X overlaps slave %s: 0x%08X - 0x%08X" %
+                                    (str(value), start, end, str(self.values[pos - 1]), self.starts[pos - 1], self.ends[pos - 1]))
+        if pos < len(self.starts) and self.starts[pos] < end:
+            raise InterconnectError("Slave %s: 0x%08X - 0x%08X overlaps slave %s: 0x%08X - 0x%08X" %
+                                    (str(value), start, end, str(self.values[pos]), self.starts[pos], self.ends[pos]))
+        self.starts.insert(pos, start)
+        self.ends.insert(pos, end)
+        self.values.insert(pos, value)
+
+    def lookup(self, address):
+        """
+        Returns:
+            the value of the range that contains 'address' or None
+        """
+        pos = bisect.bisect_right(self.starts, address) - 1
+        if pos >= 0 and address < self.ends[pos]:
+            return self.values[pos]
+        return None
+
+    def ranges(self):
+        """
+        Returns (list of (start, end, value) tuples):
+            the ranges in address order
+        """
+        return zip(self.starts, self.ends, self.values)
+
+class DecodeLeaf(object):
+    def __init__(self, select):
+        object.__init__(self)
+        self.select = select
+
+    def depth(self):
+        return 0
+
+    def evaluate(self, address):
+        return self.select
+
+class DecodeNode(object):
+    """
+    'address < boundary' selects the left branch, otherwise the right one
+    """
+
+    def __init__(self, boundary, left, right):
+        object.__init__(self)
+        self.boundary = boundary
+        self.left = left
+        self.right = right
+
+    def depth(self):
+        return 1 + max(self.left.depth(), self.right.depth())
+
+    def evaluate(self, address):
+        if address < self.boundary:
+            return self.left.evaluate(address)
+        return self.right.evaluate(address)
+
+def build_decode_tree(segments):
+    """
+    Build a balanced comparator tree over address ordered segments
+
+    Args:
+        segments (list of (start, select) tuples): every segment runs from
+            its start to the start of the next one, the first starts at 0
+
+    Returns (DecodeLeaf or DecodeNode):
+        root of the tree, its depth is ceil(log2(len(segments)))
+    """
+    if len(segments) == 1:
+        return DecodeLeaf(segments[0][1])
+    mid = (len(segments) + 1) // 2
+    return DecodeNode(segments[mid][0],
+                      build_decode_tree(segments[:mid]),
+                      build_decode_tree(segments[mid:]))
+
+class AXIInterconnect(object):
+    """
+    Validated slave map and address decoder for an AXI interconnect
+
+    When every slave is a power of two sized region aligned to its size
+    each slave is found by comparing the address bits above the region
+    size (one compare level, all slaves in parallel) otherwise the address
+    goes through a balanced tree of magnitude compares
+    """
+
+    def __init__(self, d):
+        object.__init__(self)
+        self.address_width = d.get("address_width", 32)
+        self.data_width = d.get("data_width", 32)
+        self.word_bytes = self.data_width // 8
+        self.slaves = []
+        self.index = IntervalIndex()
+
+        if len(d.get("slaves", [])) == 0:
+            raise InterconnectError("No slaves in the interconnect description")
+
+        max_address = 1 << self.address_width
+        for i, s in enumerate(d["slaves"]):
+            start = s["start"]
+            end = s["end"]
+            if not isinstance(start, (int, long)):
+                start = int(start, 0)
+            if not isinstance(end, (int, long)):
+                end = int(end, 0)
+            if end > max_address:
+                raise InterconnectError("Slave %d: end address 0x%X is outside of the %d bit address space" % (i, end, self.address_width))
+            if (start % self.word_bytes) or (end % self.word_bytes):
+                raise InterconnectError("Slave %d: 0x%08X - 0x%08X is not aligned to the %d byte data bus" % (i, start, end, self.word_bytes))
+            self.index.add(start, end, i)
+            self.slaves.append((start, end))
+
+        self.num_slaves = len(self.slaves)
+        self.no_slave = self.num_slaves
+        self.sel_width = clog2(self.num_slaves + 1)
+
+        self.decode_type = DECODE_MASK
+        for start, end in self.slaves:
+            size = end - start
+            if not is_power_of_two(size) or (start % size):
+                self.decode_type = DECODE_TREE
+                break
+
+        self.tree = None
+        if self.decode_type == DECODE_TREE:
+            self.tree = build_decode_tree(self.segments())
+
+    def segments(self):
+        """
+        Split the whole address space into slave regions and the gaps
+        between them
+
+        Returns (list of (start, select) tuples):
+            address ordered segments, gaps select the 'no slave' index
+        """
+        segments = []
+        pos = 0
+        for start, end, i in self.index.ranges():
+            if start > pos:
+                segments.append((pos, self.no_slave))
+            segments.append((start, i))
+            pos = end
+        if pos < (1 << self.address_width):
+            segments.append((pos, self.no_slave))
+        return segments
+
+    def region_bits(self, i):
+        """
+        Returns (integer):
+            log2 of the size of a mask decoded slave region
+        """
+        start, end = self.slaves[i]
+        return (end - start).bit_length() - 1
+
+    def decode_depth(self):
+        """
+        Returns (integer):
+            levels of logic between the address and the slave select,
+            one compare level plus the one-hot encoder for a mask decode,
+            the comparator tree height otherwise
+        """
+        if self.decode_type == DECODE_MASK:
+            return 1 + clog2(self.num_slaves)
+        return self.tree.depth()
+
+    def decode(self, address):
+        """
+        Software model of the generated decoder
+
+        Returns (integer):
+            slave index or 'no_slave'
+        """
+        if self.decode_type == DECODE_MASK:
+            for i in range(self.num_slaves):
+                start, end = self.slaves[i]
+                bits = self.region_bits(i)
+                if (address >> bits) == (start >> bits):
+                    return i
+            return self.no_slave
+        return self.tree.evaluate(address)
+
+    def address_literal(self, address):
+        return "%d'h%0*X" % (self.address_width, (self.address_width + 3) // 4, address)
+
+    def gen_ports(self):
+        ports = []
+        for i in range(self.num_slaves):
+            ports.append("  //Slave %d" % i)
+            for direction, name, width in SLAVE_SIGNALS:
+                prefix = "o" if direction == "output" else "i"
+                ports.append("  %-8s%-28s%s_s%d_%s," % (direction, width, prefix, i, name))
+            ports.append("")
+        #The last port can not have a trailing comma
+        while ports[-1] == "":
+            ports.pop()
+        ports[-1] = ports[-1][:-1]
+        return "\n".join(ports)
+
+    def gen_addresses(self):
+        lines = []
+        lines.append("localparam NUM_SLAVES  = %d;" % self.num_slaves)
+        lines.append("localparam SEL_WIDTH   = %d;" % self.sel_width)
+        lines.append("localparam NO_SLAVE    = %d;" % self.no_slave)
+        lines.append("")
+        for i, (start, end) in enumerate(self.slaves):
+            lines.append("localparam S%d_BASE     = %s;" % (i, self.address_literal(start)))
+            lines.append("localparam S%d_END      = %s;" % (i, self.address_literal(end)))
+        return "\n".join(lines)
+
+    def _gen_tree(self, node, indent, lines):
+        pad = "  " * indent
+        if isinstance(node, DecodeLeaf):
+            lines.append("%sdecode = %d;" % (pad, node.select))
+            return
+        lines.append("%sif (addr < %s) begin" % (pad, self.address_literal(node.boundary)))
+        self._gen_tree(node.left, indent + 1, lines)
+        lines.append("%send" % pad)
+        lines.append("%selse begin" % pad)
+        self._gen_tree(node.right, indent + 1, lines)
+        lines.append("%send" % pad)
+
+    def gen_decode(self):
+        lines = []
+        if self.decode_type == DECODE_MASK:
+            lines.append("//Every slave is a power of two region aligned to its size, compare the")
+            lines.append("//bits above the region size for all slaves in parallel")
+        else:
+            lines.append("//Balanced comparator tree, %d levels deep" % self.tree.depth())
+        lines.append("function [SEL_WIDTH - 1:0] decode;")
+        lines.append("  input [ADDR_WIDTH - 1:0] addr;")
+
+        if self.decode_type == DECODE_MASK:
+            lines.append("  reg   [NUM_SLAVES - 1:0] hit;")
+            lines.append("  begin")
+            top = self.address_width - 1
+            for i, (start, end) in enumerate(self.slaves):
+                bits = self.region_bits(i)
+                if bits >= self.address_width:
+                    lines.append("    hit[%d] = 1'b1;" % i)
+                else:
+                    width = self.address_width - bits
+                    lines.append("    hit[%d] = (addr[%d:%d] == %d'h%X);" % (i, top, bits, width, start >> bits))
+            lines.append("    if (hit == 0) begin")
+            lines.append("      decode = NO_SLAVE;")
+            lines.append("    end")
+            lines.append("    else begin")
+            for b in range(self.sel_width):
+                mask = 0
+                for i in range(self.num_slaves):
+                    if (i >> b) & 1:
+                        mask |= 1 << i
+                lines.append("      decode[%d] = |(hit & %d'h%X);" % (b, self.num_slaves, mask))
+            lines.append("    end")
+            lines.append("  end")
+        else:
+            lines.append("  begin")
+            self._gen_tree(self.tree, 2, lines)
+            lines.append("  end")
+        lines.append("endfunction")
+        return "\n".join(lines)
+
+    def gen_ack(self):
+        n = self.num_slaves
+        lines = []
+        for name, width in RESPONSE_SIGNALS:
+            if width == "1":
+                bus = "[NUM_SLAVES - 1:0]"
+            else:
+                bus = "[(NUM_SLAVES * %s) - 1:0]" % width
+            sources = ", ".join(["i_s%d_%s" % (i, name) for i in reversed(range(n))])
+            lines.append("wire  %-34sw_s_%s = {%s};" % (bus, name, sources))
+        lines.append("")
+
+        def select(name, width, sel):
+            if width == "1":
+                return "w_s_%s[%s]" % (name, sel)
+            return "w_s_%s[%s * %s +: %s]" % (name, sel, width, width)
+
+        lines.append("assign  o_awready = r_w_active & !r_aw_done & (w_w_err ? 1'b1 : %s);" % select("awready", "1", "r_w_sel"))
+        lines.append("assign  o_wready  = r_w_active & !r_w_done  & (w_w_err ? 1'b1 : %s);" % select("wready", "1", "r_w_sel"))
+        lines.append("assign  o_bvalid  = r_w_active & (w_w_err ? r_w_done : %s);" % select("bvalid", "1", "r_w_sel"))
+        lines.append("assign  o_bresp   = w_w_err ? RESP_DECERR : %s;" % select("bresp", "2", "r_w_sel"))
+        lines.append("assign  o_bid     = w_w_err ? r_w_id      : %s;" % select("bid", "4", "r_w_sel"))
+        lines.append("")
+        lines.append("assign  o_arready = r_r_active & !r_ar_done & (w_r_err ? 1'b1 : %s);" % select("arready", "1", "r_r_sel"))
+        lines.append("assign  o_rvalid  = r_r_active & (w_r_err ? r_ar_done : %s);" % select("rvalid", "1", "r_r_sel"))
+        lines.append("assign  o_rlast   = w_r_err ? (r_r_err_count == 0) : %s;" % select("rlast", "1", "r_r_sel"))
+        lines.append("assign  o_rresp   = w_r_err ? RESP_DECERR : %s;" % select("rresp", "2", "r_r_sel"))
+        lines.append("assign  o_rid     = w_r_err ? r_r_id      : %s;" % select("rid", "4", "r_r_sel"))
+        lines.append("assign  o_rdata   = w_r_err ? 0           : %s;" % select("rdata", "DATA_WIDTH", "r_r_sel"))
+        return "\n".join(lines)
+
+    def gen_assign(self):
+        lines = []
+        for i in range(self.num_slaves):
+            lines.append("//Slave %d" % i)
+            for name in BROADCAST_SIGNALS:
+                lines.append("assign  o_s%d_%-9s= i_%s;" % (i, name, name))
+            #Slaves see the offset into their own region
+            if self.decode_type == DECODE_MASK:
+                offset_mask = self.address_literal((1 << self.region_bits(i)) - 1)
+                lines.append("assign  o_s%d_%-9s= i_awaddr & %s;" % (i, "awaddr", offset_mask))
+                lines.append("assign  o_s%d_%-9s= i_araddr & %s;" % (i, "araddr", offset_mask))
+            else:
+                lines.append("assign  o_s%d_%-9s= i_awaddr - S%d_BASE;" % (i, "awaddr", i))
+                lines.append("assign  o_s%d_%-9s= i_araddr - S%d_BASE;" % (i, "araddr", i))
+            lines.append("assign  o_s%d_%-9s= i_awvalid & r_w_active & !r_aw_done & (r_w_sel == %d);" % (i, "awvalid", i))
+            lines.append("assign  o_s%d_%-9s= i_wvalid  & r_w_active & !r_w_done  & (r_w_sel == %d);" % (i, "wvalid", i))
+            lines.append("assign  o_s%d_%-9s= i_bready  & r_w_active & (r_w_sel == %d);" % (i, "bready", i))
+            lines.append("assign  o_s%d_%-9s= i_arvalid & r_r_active & !r_ar_done & (r_r_sel == %d);" % (i, "arvalid", i))
+            lines.append("assign  o_s%d_%-9s= i_rready  & r_r_active & (r_r_sel == %d);" % (i, "rready", i))
+            lines.append("")
+        return "\n".join(lines).rstrip()
+
+    def generate(self, template):
+        """
+        Fill in the interconnect template
+
+        Args:
+            template (string): contents of axi_interconnect.v
+
+        Returns (string):
+            the interconnect verilog
+        """
+        return Template(template).substitute(PORTS = self.gen_ports(),
+                                             ADDRESSES = self.gen_addresses(),
+                                             DATA = self.gen_decode(),
+                                             ACK = self.gen_ack(),
+                                             ASSIGN = self.gen_assign())
+
+def read_template():
+    f = open(AXI_INTERCONNECT_TEMPLATE, 'r')
+    template = f.read()
+    f.close()
+    return template
+
 def generate_interconnect(d, debug):
-    print ("Json: %s" % str(d))
-    print ("Address Width: %d" % d["address_width"])
-    print ("Data Width: %d" % d["data_width"])
-    for s in d["slaves"]:
-        start = int(s["start"], 0)
-        end = int(s["end"], 0)
-        print ("Slave: %d" % d["slaves"].index(s))
-        print ("\tSlave Start Address: 0x%08X" % start)
-        print ("\tSlave End   Address: 0x%08X" % end)
-        print ("")
-
-    #Generate the ports
-    #Generate the addresses
-        
+    """
+    Validate the slave map and generate the interconnect
+
+    Args:
+        d (dictionary): "address_width", "data_width" and a list of
+            "slaves" each with a "start" and an (exclusive) "end" address
+
+    Returns (string):
+        the interconnect verilog
+
+    Raises:
+        InterconnectError: the slave map is invalid
+    """
+    ic = AXIInterconnect(d)
+    if debug:
+        print ("Address Width: %d" % ic.address_width)
+        print ("Data Width: %d" % ic.data_width)
+        for i, (start, end) in enumerate(ic.slaves):
+            print ("Slave: %d" % i)
+            print ("\tSlave Start Address: 0x%08X" % start)
+            print ("\tSlave End   Address: 0x%08X" % end)
+            print ("")
+        print ("Decode: %s, depth: %d" % (ic.decode_type, ic.decode_depth()))
+    return ic.generate(read_template())
+
+def find_lint_tool():
+    """
+    Returns (string or None):
+        name of the first lint tool in LINT_COMMANDS found on the path
+    """
+    for tool, command in LINT_COMMANDS:
+        if find_executable(command[0]) is not None:
+            return tool
+    return None
+
+def lint_interconnect(buf, tool = None):
+    """
+    Compile a generated interconnect with a verilog tool
+
+    Args:
+        buf (string): the interconnect verilog
+        tool (string): name of a tool in LINT_COMMANDS, None uses the first
+            one found
+
+    Returns (tuple of (boolean, string)):
+        True if the tool accepted the module, the output of the tool
+
+    Raises:
+        InterconnectError: no lint tool is installed
+    """
+    if tool is None:
+        tool = find_lint_tool()
+    if tool is None:
+        raise InterconnectError("Neither iverilog nor verilator is installed")
+    command = dict(LINT_COMMANDS)[tool]
+
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, "axi_interconnect.v")
+        f = open(path, 'w')
+        f.write(buf)
+        f.close()
+        p = subprocess.Popen(command + [path],
+                             cwd = directory,
+                             stdout = subprocess.PIPE,
+                             stderr = subprocess.STDOUT)
+        output = p.communicate()[0]
+    finally:
+        shutil.rmtree(directory)
+    return (p.returncode == 0), output
+
+def check_decode(ic, r, count = REGRESSION_ADDRESS_CHECKS):
+    """
+    Check the decoder model against the slave ranges at the region
+    boundaries and at 'count' random addresses
+
+    Returns (tuple or None):
+        (address, decoded slave, expected slave) of the first mismatch
+    """
+    addresses = []
+    for s_start, s_end in ic.slaves:
+        addresses.extend([s_start, s_end - 1, s_end])
+    addresses.extend([r.randint(0, (1 << ic.address_width) - 1) for i in range(count)])
+    for address in addresses:
+        if address >= (1 << ic.address_width):
+            continue
+        expected = ic.index.lookup(address)
+        if expected is None:
+            expected = ic.no_slave
+        if ic.decode(address) != expected:
+            return (address, ic.decode(address), expected)
+    return None
+
+def random_slave_map(r, num_slaves, address_width = 32, data_width = 32):
+    """
+    Create a random valid slave map, about half of the maps only contain
+    power of two regions aligned to their size
+    """
+    word_bytes = data_width // 8
+    slaves = []
+    pos = 0
+    if r.random() < 0.5:
+        #Aligned power of two regions
+        max_bits = address_width - clog2(num_slaves) - 1
+        for i in range(num_slaves):
+            size = 1 << r.randint(clog2(word_bytes), max_bits)
+            start = ((pos + size - 1) // size) * size
+            if r.random() < 0.25:
+                start += size
+            slaves.append({"start":start, "end":start + size})
+            pos = start + size
+    else:
+        span = (1 << address_width) // (num_slaves * 2)
+        for i in range(num_slaves):
+            start = pos + r.randint(0, span // word_bytes - 1) * word_bytes
+            size = r.randint(1, span // word_bytes) * word_bytes
+            slaves.append({"start":start, "end":start + size})
+            pos = start + size
+    r.shuffle(slaves)
+    return {"address_width":address_width, "data_width":data_width, "slaves":slaves}
+
+def run_regression(count, seed, debug, lint = False):
+    """
+    Run the generator over random 2 to 64 slave maps
+
+    Every map is generated, the decoder model is checked against the slave
+    ranges at the region boundaries and random addresses, then an
+    overlapping slave is added and must be rejected
+
+    With 'lint' every generated interconnect is also compiled with iverilog
+    or verilator, the lint pass is skipped when neither is installed
+
+    Returns (boolean):
+        True if every map passed
+    """
+    r = random.Random(seed)
+    template = read_template()
+    passed = True
+    tool = None
+    if lint:
+        tool = find_lint_tool()
+        if tool is None:
+            print ("Neither iverilog nor verilator is installed, skipping the lint pass")
+        else:
+            print ("Lint: %s" % tool)
+    total_time = 0.0
+    print ("%6s %7s %5s %6s %10s" % ("Map", "Slaves", "Type", "Depth", "Time (ms)"))
+    for m in range(count):
+        num_slaves = r.randint(REGRESSION_MIN_SLAVES, REGRESSION_MAX_SLAVES)
+        d = random_slave_map(r, num_slaves)
+
+        start = time.time()
+        ic = AXIInterconnect(d)
+        buf = ic.generate(template)
+        elapsed = time.time() - start
+        total_time += elapsed
+        print ("%6d %7d %5s %6d %10.3f" % (m, num_slaves, ic.decode_type, ic.decode_depth(), elapsed * 1000.0))
+
+        mismatch = check_decode(ic, r)
+        if mismatch is not None:
+            print ("\tMap %d: address 0x%08X decoded to %d, expected %d" % ((m,) + mismatch))
+            passed = False
+
+        if tool is not None:
+            lint_passed, output = lint_interconnect(buf, tool)
+            if not lint_passed:
+                print ("\tMap %d: %s rejected the %s decoder:" % (m, tool, ic.decode_type))
+                print (output)
+                passed = False
+
+        #An overlapping slave must be rejected
+        s_start, s_end = ic.slaves[r.randint(0, num_slaves - 1)]
+        overlap = dict(d)
+        overlap["slaves"] = d["slaves"] + [{"start":s_start, "end":s_start + ic.word_bytes}]
+        try:
+            AXIInterconnect(overlap)
+            print ("\tMap %d: overlapping slave at 0x%08X was not rejected" % (m, s_start))
+            passed = False
+        except InterconnectError as ex:
+            if debug:
+                print ("\t%s" % str(ex))
+
+    print ("")
+    print ("%d maps, total generation time: %0.3f s, %s" % (count, total_time, "PASSED" if passed else "FAILED"))
+    return passed
 
 def main(argv):
     #Parse out the commandline arguments
@@ -70,12 +711,27 @@ def main(argv):
         epilog=EPILOG
     )
 
-    parser.add_argument("-t", "--test",
+    parser.add_argument("-j", "--json",
                         nargs=1,
-                        default=["something"])
+                        help="Interconnect description")
 
-    parser.add_argument("-j", "--json",
-                        nargs=1)
+    parser.add_argument("-o", "--output",
+                        nargs=1,
+                        help="Output file (Default: print to the console)")
+
+    parser.add_argument("-r", "--regression",
+                        type=int,
+                        default=0,
+                        help="Run the generator over this many random slave maps")
+
+    parser.add_argument("-s", "--seed",
+                        type=int,
+                        default=0,
+                        help="Random seed for the regression (Default: 0)")
+
+    parser.add_argument("-l", "--lint",
+                        action="store_true",
+                        help="Compile the generated interconnect with iverilog or verilator")
 
     parser.add_argument("-d", "--debug",
                         action="store_true",
@@ -84,19 +740,38 @@ def main(argv):
     args = parser.parse_args()
     print "Running Script: %s" % NAME
 
-    d = {}
-    if args.json is not None:
-        filepath = args.json[0]
-        d = parse_json(filepath)
+    if args.regression > 0:
+        if not run_regression(args.regression, args.seed, args.debug, args.lint):
+            sys.exit(1)
+        return
+
+    if args.json is None:
+        parser.error("An interconnect description (-j) is required")
 
+    d = parse_json(args.json[0])
+    try:
+        buf = generate_interconnect(d, args.debug)
+    except InterconnectError as ex:
+        print "Error: %s" % str(ex)
+        sys.exit(1)
 
-    if args.debug:
-        print "test: %s" % str(args.test[0])
+    if args.lint:
+        try:
+            lint_passed, output = lint_interconnect(buf)
+        except InterconnectError as ex:
+            print "Error: %s" % str(ex)
+            sys.exit(1)
+        if not lint_passed:
+            print output
+            sys.exit(1)
 
-    generate_interconnect(d, args.debug)
+    if args.output is None:
+        print buf
+    else:
+        f = open(args.output[0], 'w')
+        f.write(buf)
+        f.close()
 
 
 if __name__ == "__main__":
     main(sys.argv)
-
-
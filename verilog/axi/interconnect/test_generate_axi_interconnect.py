@@ -0,0 +1,99 @@
+#! /usr/bin/env python
+
+"""
+Address decoders of the AXI interconnect generator
+
+    python test_generate_axi_interconnect.py
+
+The lint tests compile the generated interconnects with iverilog or
+verilator and are skipped when neither is installed
+"""
+
+import os
+import random
+import unittest
+
+import generate_axi_interconnect as gen
+
+TWO_PORT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "interconnect_2port.json")
+
+#Regions that are not aligned to their size, decoded by the comparator tree
+UNALIGNED = {"address_width":32,
+             "data_width":32,
+             "slaves":[{"start":0x00000000, "end":0x00000100},
+                       {"start":0x00000180, "end":0x00000300},
+                       {"start":0x00001000, "end":0x00001004}]}
+
+RANDOM_MAPS = 8
+
+class TestAXIInterconnect(unittest.TestCase):
+
+    def setUp(self):
+        self.r = random.Random(0)
+        self.tool = gen.find_lint_tool()
+        self.template = gen.read_template()
+
+    def check_decode(self, ic):
+        mismatch = gen.check_decode(ic, self.r)
+        self.assertEqual(mismatch, None,
+                         "address 0x%08X decoded to %d, expected %d" % (mismatch or (0, 0, 0)))
+
+    def lint(self, ic):
+        if self.tool is None:
+            self.skipTest("Neither iverilog nor verilator is installed")
+        passed, output = gen.lint_interconnect(ic.generate(self.template), self.tool)
+        self.assertTrue(passed, "%s rejected the %s decoder:\n%s" % (self.tool, ic.decode_type, output))
+
+    def random_maps(self):
+        """
+        Returns (list of AXIInterconnect):
+            random maps, at least one of each decode type
+        """
+        maps = []
+        types = set()
+        while len(maps) < RANDOM_MAPS or len(types) < 2:
+            num_slaves = self.r.randint(gen.REGRESSION_MIN_SLAVES, gen.REGRESSION_MAX_SLAVES)
+            ic = gen.AXIInterconnect(gen.random_slave_map(self.r, num_slaves))
+            maps.append(ic)
+            types.add(ic.decode_type)
+        return maps
+
+    def test_mask_decode(self):
+        """
+        Aligned power of two slaves use the mask decoder
+        """
+        ic = gen.AXIInterconnect(gen.parse_json(TWO_PORT))
+        self.assertEqual(ic.decode_type, gen.DECODE_MASK)
+        self.check_decode(ic)
+
+    def test_tree_decode(self):
+        """
+        Unaligned slaves use the comparator tree, gaps decode to no slave
+        """
+        ic = gen.AXIInterconnect(UNALIGNED)
+        self.assertEqual(ic.decode_type, gen.DECODE_TREE)
+        self.check_decode(ic)
+        self.assertEqual(ic.decode(0x00000100), ic.no_slave)
+
+    def test_lint_mask(self):
+        """
+        The mask decoded interconnect compiles
+        """
+        self.lint(gen.AXIInterconnect(gen.parse_json(TWO_PORT)))
+
+    def test_lint_tree(self):
+        """
+        The tree decoded interconnect compiles
+        """
+        self.lint(gen.AXIInterconnect(UNALIGNED))
+
+    def test_lint_random_maps(self):
+        """
+        Interconnects generated from random 2 to 64 slave maps compile
+        """
+        for ic in self.random_maps():
+            self.check_decode(ic)
+            self.lint(ic)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,19 +6,34 @@ from cocotb.result import ReturnValue
 from cocotb.clock import Clock
 from cocotb.triggers import Timer
 from cocotb.drivers.amba import AXI4LiteMaster
+from axi_lite_master import AXI4LitePipelinedMaster
+from register_shadow import RegisterShadow
+from register_shadow import modify_value
 
 CLK_PERIOD = 10
 
 class Driver(object):
 
-    def __init__(self, dut, clock, MASTER_NAME="AXIML", debug=False):
-        
+    def __init__(self, dut, clock, MASTER_NAME="AXIML", debug=False, pipelined=True):
+        """
+        Args:
+          pipelined (bool): use the pipelined master, register accesses only
+            wait for the bus handshakes. When false every word is a separate
+            AXI4LiteMaster transaction followed by a 10 clock delay
+        """
+
         self.debug = debug
         self.dut = dut
         self.clock = clock
+        self.pipelined = pipelined
+        #Registers declared with 'declare_non_volatile' are cached here
+        self.shadow = RegisterShadow()
         self.dut.rst <= 1
         self.dut.test_id = 0
-        self.axim = AXI4LiteMaster(dut, MASTER_NAME, self.clock)
+        if pipelined:
+            self.axim = AXI4LitePipelinedMaster(dut, MASTER_NAME, self.clock)
+        else:
+            self.axim = AXI4LiteMaster(dut, MASTER_NAME, self.clock)
         cocotb.fork(Clock(self.clock, CLK_PERIOD).start())
         dut.log.debug ("Started")
 
@@ -46,11 +61,7 @@ class Driver(object):
           AssertionError: This function must be overriden by a board specific
           implementation
         """
-        data = []
-        for i in range(length):
-            d = yield self.axim.read((address + (i << 2)))
-            data.append(int(d))
-            yield Timer(CLK_PERIOD * 10)
+        data = yield self.read_many([address + (i << 2) for i in range(length)])
         raise ReturnValue(data)
 
     @cocotb.coroutine
@@ -75,9 +86,99 @@ class Driver(object):
         if type(data) is not list:
             data = [data]
 
-        for i in range(len(data)):
-            yield self.axim.write(address + (i << 2), data[i])
-            yield Timer(CLK_PERIOD * 10)
+        yield self.write_many([(address + (i << 2), data[i]) for i in range(len(data))])
+
+    @cocotb.coroutine
+    def write_many(self, addr_value_pairs):
+        """write_many
+
+        Write a batch of registers, the pipelined master keeps several writes
+        in flight
+
+        Args:
+          addr_value_pairs (list of tuples): (address, 32-bit value)
+
+        Returns:
+          Nothing
+        """
+        addr_value_pairs = list(addr_value_pairs)
+        if self.pipelined:
+            yield self.axim.write_many(addr_value_pairs)
+        else:
+            for address, value in addr_value_pairs:
+                yield self.axim.write(address, value)
+                yield Timer(CLK_PERIOD * 10)
+
+        #Write-through
+        for address, value in addr_value_pairs:
+            self.shadow.update(address, value)
+
+    @cocotb.coroutine
+    def read_many(self, addrs):
+        """read_many
+
+        Read a batch of registers, the pipelined master keeps several reads
+        in flight
+
+        Args:
+          addrs (list of ints): addresses to read
+
+        Returns:
+          (list of ints): 32-bit values, in the same order as addrs
+        """
+        addrs = list(addrs)
+        if self.pipelined:
+            data = yield self.axim.read_many(addrs)
+        else:
+            data = []
+            for address in addrs:
+                d = yield self.axim.read(address)
+                data.append(int(d))
+                yield Timer(CLK_PERIOD * 10)
+
+        for i in range(len(addrs)):
+            self.shadow.update(addrs[i], data[i])
+        raise ReturnValue(data)
+
+    def declare_non_volatile(self, address, self_clearing = 0):
+        """declare_non_volatile
+
+        Declare a register that only changes when it is written, it is served
+        from the shadow cache after the first read or write. Registers that
+        are not declared (status, interrupts, receive data) always go to the
+        bus
+
+        Args:
+          address (int): Address of the register
+          self_clearing (int): mask of the bits the core clears on its own,
+            they are never cached
+
+        Returns:
+          Nothing
+        """
+        self.shadow.declare(address, self_clearing)
+
+    def invalidate_cache(self, address = None):
+        """invalidate_cache
+
+        Drop a cached register (or all of them when the core is reset)
+
+        Args:
+          address (int): Address of the register, None for every register
+
+        Returns:
+          Nothing
+        """
+        self.shadow.invalidate(address)
+
+    def cache_stats(self):
+        """cache_stats
+
+        Returns:
+          (dict): 'hits', 'misses' and 'hit_rate' of the shadow cache and
+            the number of 'volatile' reads that always go to the bus
+        """
+        return self.shadow.stats()
 
     @cocotb.coroutine
     def read_register(self, address):
@@ -95,6 +196,9 @@ class Driver(object):
         Raises:
           NysaCommError: Error in communication
         """
+        value = self.shadow.lookup(address)
+        if value is not None:
+            raise ReturnValue(value)
         data = yield self.read(address, 1)
         raise ReturnValue(data[0])
 
@@ -116,6 +220,29 @@ class Driver(object):
         """
         yield self.write(address, value)
 
+    @cocotb.coroutine
+    def modify(self, address, set_mask = 0, clear_mask = 0):
+        """modify
+
+        Read-modify-write a register, a single bus write when the register is
+        cached
+
+        Args:
+          address (int): Address of the register/memory to modify
+          set_mask (int): bits to set
+          clear_mask (int): bits to clear
+
+        Returns:
+          (int): value written
+
+        Raises:
+          NysaCommError: Error in communication
+        """
+        register = yield self.read_register(address)
+        register = modify_value(register, set_mask, clear_mask)
+        yield self.write_register(address, register)
+        raise ReturnValue(register)
+
     @cocotb.coroutine
     def enable_register_bit(self, address, bit, enable):
         """enable_register_bit
@@ -154,10 +281,7 @@ class Driver(object):
         Raises:
           NysaCommError: Error in communication
         """
-        register = yield self.read_register(address)
-        bit_mask =  1 << bit
-        register |= bit_mask
-        yield self.write_register(address, register)
+        yield self.modify(address, set_mask = 1 << bit)
 
     @cocotb.coroutine
     def clear_register_bit(self, address, bit):
@@ -175,10 +299,7 @@ class Driver(object):
         Raises:
           NysaCommError: Error in communication
         """
-        register = yield self.read_register(address)
-        bit_mask =  1 << bit
-        register &= ~bit_mask
-        yield self.write_register(address, register)
+        yield self.modify(address, clear_mask = 1 << bit)
 
     @cocotb.coroutine
     def is_register_bit_set(self, address, bit):
@@ -48,57 +48,18 @@ from cocotb.triggers import Timer
 
 COSPAN_DESIGN_I2C_MODULE = 0x01
 
-#Register Constants
-CONTROL               = 0 << 2
-STATUS                = 1 << 2
-INTERRUPT             = 2 << 2
-INTERRUPT_EN          = 3 << 2
-CLOCK_RATE            = 4 << 2
-CLOCK_DIVISOR         = 5 << 2
-COMMAND               = 6 << 2
-TRANSMIT              = 7 << 2
-RECEIVE               = 8 << 2
-VERSION               = 9 << 2
-
-#Control bit values
-CONTROL_EN            = 0
-CONTROL_INTERRUPT_EN  = 1
-CONTROL_SET_100KHZ    = 2
-CONTROL_SET_400KHZ    = 3
-CONTROL_RESET         = 7
-
-#Status
-STATUS_TIP            = 1 << 1
-STATUS_ARB_LOST       = 1 << 5
-STATUS_BUSY           = 1 << 6
-STATUS_READ_ACK_N     = 1 << 7
-
-#Command
-COMMAND_START         = 1 << 0
-COMMAND_STOP          = 1 << 1
-COMMAND_READ          = 1 << 2
-COMMAND_WRITE         = 1 << 3
-COMMAND_NACK          = 1 << 4
-
-#Interrupt Enable Lines
-INT_TRANSFER_FINISHED = 0
-INT_ARBITRATION_LOST  = 1
-INT_RXACK             = 2
-
-
-CLK_PERIOD = 10
-
-class I2CError (Exception):
-    """I2C Error:
-
-    Errors associated with I2C
-        I2C Bus Busy
-        Incorrect Settings
-    """
-    pass
+#Registers and their fields are generated from i2c_regs.json by
+#verilog/sim/register_map.py
+import i2c_regs
+from i2c_regs import *
+
+from i2c_controller import I2CController
+from i2c_controller import I2CError
+from i2c_controller import TRANSFER_TIMEOUT
+
 
 
-class I2C(Driver):
+class I2C(Driver, I2CRegisters):
     """I2C
     """
 
@@ -114,8 +75,14 @@ class I2C(Driver):
     def get_abi_minor():
         return COSPAN_DESIGN_I2C_MODULE
 
-    def __init__(self, dut, debug = False):
-        super(I2C, self).__init__(dut, dut.clk, debug=debug)
+    def __init__(self, dut, debug = False, pipelined = True):
+        super(I2C, self).__init__(dut, dut.clk, debug=debug, pipelined=pipelined)
+        #The speed strobes load the clock divisor so it is left volatile
+        declare_shadow(self.shadow)
+        #Transfers wait on the interrupt line when the testbench exposes it
+        self.controller = I2CController(i2c_regs, self.read_register, self.write_many, dut.clk,
+                                        interrupt_line = getattr(dut, "o_interrupt", None),
+                                        acknowledge = (INTERRUPT, 1 << INT_TRANSFER_FINISHED))
 
     def __del__(self):
         pass
@@ -237,10 +204,7 @@ class I2C(Driver):
 
     @cocotb.coroutine
     def enable_transfer_complete_interrupt(self, enable):
-        register = yield self.read_register(INTERRUPT_EN)
-        if (enable):
-            register = register | (1 << INT_TRANSFER_FINISHED)
-        yield self.write_register(INTERRUPT_EN, register)
+        yield self.update_interrupt_en(transfer_finished = enable)
             
     @cocotb.coroutine
     def acknowledge_interrupt(self, interrupt):
@@ -360,7 +324,7 @@ class I2C(Driver):
         Raises:
             NysaCommError: Error in communication
         """
-        yield self.enable_register_bit(CONTROL, CONTROL_EN, enable)
+        yield self.update_control(en = enable)
 
     @cocotb.coroutine
     def is_i2c_enabled(self):
@@ -399,7 +363,7 @@ class I2C(Driver):
         Raises:
             NysaCommError: Error in communication
         """
-        yield self.enable_register_bit(CONTROL, CONTROL_INTERRUPT_EN, enable)
+        yield self.update_control(interrupt_en = enable)
 
     @cocotb.coroutine
     def is_interrupt_enabled(self):
@@ -417,7 +381,7 @@ class I2C(Driver):
         Raises:
             NysaCommError: Error in communication
         """
-        data = self.is_register_bit_set(CONTROL, CONTROL_INTERRUPT_EN)
+        data = yield self.is_register_bit_set(CONTROL, CONTROL_INTERRUPT_EN)
         raise ReturnValue(data)
 
     def print_control(self, control):
@@ -521,15 +485,17 @@ class I2C(Driver):
             #self.print_status(status)
 
     @cocotb.coroutine
-    def write_to_i2c(self, i2c_id, i2c_data):
+    def write_to_i2c(self, i2c_id, i2c_data, timeout = TRANSFER_TIMEOUT):
         """write_to_i2c_register
 
-        write to a register in the I2C device
+        write to a register in the I2C device, the stop condition is sent with
+        the last byte, the transfer waits on the transfer finished interrupt
 
         Args:
             i2c_id: Identification byte of the I2C (7-bit)
                 this value will be shifted left by 1
             i2c_data: data to write to that register Array of bytes
+            timeout: clock cycles to wait for each byte
 
         Returns:
             Nothing
@@ -538,79 +504,22 @@ class I2C(Driver):
             NysaCommError: Error in communication
             I2CError: Errors associated with the I2C protocol
         """
-        #self.debug = True
-        #set up a write command
-        write_command = i2c_id << 1
-        #set up interrupts
         yield self.enable_interrupt(True)
-
-        #send the write command / i2c identification
-        yield self.write_register(TRANSMIT, write_command)
-        yield self.write_register(COMMAND, COMMAND_WRITE | COMMAND_START)
-
-        #wait 1 second for interrupt
-        if self.debug: print "Wait for interrupts..."
-        yield Timer(CLK_PERIOD * 1000)
-        d = self.is_interrupt_set(INT_TRANSFER_FINISHED)
-        if (d):
-            self.dut.log.info("Interrupt Detected")
-        yield self.acknowledge_interrupt(INT_TRANSFER_FINISHED)
-
-        #send the data
-        count = 0
-        if self.debug:
-            print "total data to write: %d" % len(i2c_data)
-        if len(i2c_data) > 1:
-            while count < len(i2c_data) - 1:
-                if self.debug:
-                    print "Writing %d" % count
-                data = i2c_data[count]
-                yield self.write_register(TRANSMIT, data)
-                yield self.write_register(COMMAND, COMMAND_WRITE)
-
-                yield Timer(CLK_PERIOD * 1000)
-                d = self.is_interrupt_set(INT_TRANSFER_FINISHED)
-                if (d):
-                    self.dut.log.info("Interrupt Detected")
-                yield self.acknowledge_interrupt(INT_TRANSFER_FINISHED)
-
-                count = count + 1
-
-        #send the last peice of data
-        data = None
-        if count < len(i2c_data):
-            data = i2c_data[count]
-            yield self.write_register(TRANSMIT, data)
-            count += 1
-
-
-        yield self.write_register(TRANSMIT, data)
-        yield self.write_register(COMMAND, COMMAND_WRITE)
-
-        yield Timer(CLK_PERIOD * 1000)
-        d = self.is_interrupt_set(INT_TRANSFER_FINISHED)
-        if (d):
-            self.dut.log.info("Interrupt Detected")
-        yield self.acknowledge_interrupt(INT_TRANSFER_FINISHED)
-
-
-        yield Timer(CLK_PERIOD * 1000)
-        #self.debug = True
-        yield self.write_register(COMMAND, COMMAND_STOP)
+        yield self.enable_transfer_complete_interrupt(True)
+        yield self.controller.write_to_i2c(i2c_id, i2c_data, timeout)
 
     @cocotb.coroutine
-    def read_from_i2c(self, i2c_id, read_length):
+    def read_from_i2c(self, i2c_id, read_length, timeout = TRANSFER_TIMEOUT):
         """read_from_i2c_register
 
-        read from a register in the I2C device
+        read from a register in the I2C device, the last byte is not
+        acknowledged and the stop condition is sent with it
 
         Args:
             i2c_id: Identification byte of the I2C (7-bit)
                 this value will be shifted left by 1
-            i2cwrite_register: data to write to that register (Array of bytes)
-                in order to read from an I2C device the user must write some
-                data to set up the device to read
             read_length: Length of bytes to read from the device
+            timeout: clock cycles to wait for each byte
 
         Returns:
             Array of bytes read from the I2C device
@@ -619,66 +528,9 @@ class I2C(Driver):
             NysaCommError: Error in communication
             I2CError: Errors associated with the I2C protocol
         """
-        #self.debug = False
         if self.debug: print "read_from_i2c: ENTERED"
-        #set up a write command
-        read_command = (i2c_id << 1) | 0x01
-        read_data = Array('B')
         yield self.reset_i2c_core()
-        if self.debug:
-            print "\t\tGetting status before a read"
-            status = yield self.read_register(STATUS)
-            #self.print_status(status)
-
-        #set up interrupts
         yield self.enable_interrupt(True)
-
-        #send the write command / i2c identification
-        yield self.write_register(TRANSMIT, (i2c_id << 1) | 0x01)
-        yield self.write_register(COMMAND, COMMAND_WRITE | COMMAND_START)
-
-
-        #wait 1 second for interrupt
-        if self.debug: print "Wait for interrupts..."
-        yield Timer(CLK_PERIOD * 1000)
-        d = self.is_interrupt_set(INT_TRANSFER_FINISHED)
-        if (d):
-            self.dut.log.info("Interrupt Detected")
-        yield self.acknowledge_interrupt(INT_TRANSFER_FINISHED)
- 
-
-        #send the data
-        count = 0
-        if read_length > 1:
-            while count < read_length - 1:
-                status = yield self.get_status()
-                if self.debug:
-                    print "\tReading %d" % count
-                yield self.write_register(COMMAND, COMMAND_READ)
-
-
-                #wait 1 second for interrupt
-                if self.debug: print "Wait for interrupts..."
-                yield Timer(CLK_PERIOD * 1000)
-                d = self.is_interrupt_set(INT_TRANSFER_FINISHED)
-                if (d):
-                    self.dut.log.info("Interrupt Detected")
-                yield self.acknowledge_interrupt(INT_TRANSFER_FINISHED)
-                count = count + 1
-
-        #read the last peice of data
-        yield self.write_register(COMMAND, COMMAND_READ | COMMAND_NACK)
-
-        #wait 1 second for interrupt
-        if self.debug: print "Wait for interrupts..."
-        yield Timer(CLK_PERIOD * 1000)
-        d = self.is_interrupt_set(INT_TRANSFER_FINISHED)
-        if (d):
-            self.dut.log.info("Interrupt Detected")
-        yield self.acknowledge_interrupt(INT_TRANSFER_FINISHED)
-        yield self.write_register(COMMAND, COMMAND_STOP)
-        yield Timer(CLK_PERIOD * 1000)
-
-        #self.debug = False
+        yield self.enable_transfer_complete_interrupt(True)
+        read_data = yield self.controller.read_from_i2c(i2c_id, read_length, timeout)
         raise ReturnValue(read_data)
-
@@ -0,0 +1,227 @@
+#Generated by register_map.py from i2c_regs.json, do not edit
+
+"""
+axi_lite_i2c registers
+
+encode_<register>(**fields) and decode_<register>(value) convert between
+register values and fields (lower case field names), single bit fields
+decode to booleans
+"""
+
+DESCRIPTION_SHA1 = "c4972babc5d715a771be9c6823993464c619e651"
+
+#Registers
+CONTROL                 = 0 << 2
+STATUS                  = 1 << 2
+INTERRUPT               = 2 << 2
+INTERRUPT_EN            = 3 << 2
+CLOCK_RATE              = 4 << 2
+CLOCK_DIVISOR           = 5 << 2
+COMMAND                 = 6 << 2
+TRANSMIT                = 7 << 2
+RECEIVE                 = 8 << 2
+VERSION                 = 9 << 2
+
+#CONTROL
+CONTROL_EN              = 0
+CONTROL_INTERRUPT_EN    = 1
+CONTROL_SET_100KHZ      = 2
+CONTROL_SET_400KHZ      = 3
+CONTROL_RESET           = 7
+
+#STATUS
+STATUS_TIP              = 0x2
+STATUS_ARB_LOST         = 0x20
+STATUS_BUSY             = 0x40
+STATUS_READ_ACK_N       = 0x80
+
+#INTERRUPT
+INT_TRANSFER_FINISHED   = 0
+INT_ARBITRATION_LOST    = 1
+INT_RXACK               = 2
+
+#COMMAND
+COMMAND_START           = 0x1
+COMMAND_STOP            = 0x2
+COMMAND_READ            = 0x4
+COMMAND_WRITE           = 0x8
+COMMAND_NACK            = 0x10
+
+#Registers only the host changes: address -> self clearing bits
+NON_VOLATILE = {
+    CONTROL: 0x8C,
+    INTERRUPT_EN: 0x0,
+    CLOCK_RATE: 0x0,
+    TRANSMIT: 0x0,
+    VERSION: 0x0,
+}
+
+#field -> (mask, shift)
+_CONTROL_FIELDS = {
+    "en": (0x1, 0),
+    "interrupt_en": (0x2, 1),
+    "set_100khz": (0x4, 2),
+    "set_400khz": (0x8, 3),
+    "reset": (0x80, 7),
+}
+_STATUS_FIELDS = {
+    "tip": (0x2, 1),
+    "arb_lost": (0x20, 5),
+    "busy": (0x40, 6),
+    "read_ack_n": (0x80, 7),
+}
+_INTERRUPT_FIELDS = {
+    "transfer_finished": (0x1, 0),
+    "arbitration_lost": (0x2, 1),
+    "rxack": (0x4, 2),
+}
+_INTERRUPT_EN_FIELDS = {
+    "transfer_finished": (0x1, 0),
+    "arbitration_lost": (0x2, 1),
+    "rxack": (0x4, 2),
+}
+_COMMAND_FIELDS = {
+    "start": (0x1, 0),
+    "stop": (0x2, 1),
+    "read": (0x4, 2),
+    "write": (0x8, 3),
+    "nack": (0x10, 4),
+}
+
+def _masks(table, fields):
+    """
+    Returns (tuple):
+        (bits to set, bits to clear) to write 'fields' into a register
+    """
+    set_mask = 0
+    clear_mask = 0
+    for name, value in fields.items():
+        if name not in table:
+            raise KeyError("Unknown field: %s" % name)
+        mask, shift = table[name]
+        value = int(value) << shift
+        if value & ~mask:
+            raise ValueError("%s: 0x%X does not fit in mask 0x%X" % (name, value >> shift, mask))
+        clear_mask |= mask
+        set_mask |= value
+    return set_mask, clear_mask
+
+def _encode(table, fields):
+    return _masks(table, fields)[0]
+
+def declare_shadow(shadow):
+    """
+    Declare the registers only the host changes in a RegisterShadow
+    """
+    for address, self_clearing in NON_VOLATILE.items():
+        shadow.declare(address, self_clearing)
+
+def encode_control(**fields):
+    return _encode(_CONTROL_FIELDS, fields)
+
+def decode_control(value):
+    return {
+        "en": (value & 0x1) != 0,
+        "interrupt_en": (value & 0x2) != 0,
+        "set_100khz": (value & 0x4) != 0,
+        "set_400khz": (value & 0x8) != 0,
+        "reset": (value & 0x80) != 0,
+    }
+
+def encode_status(**fields):
+    return _encode(_STATUS_FIELDS, fields)
+
+def decode_status(value):
+    return {
+        "tip": (value & 0x2) != 0,
+        "arb_lost": (value & 0x20) != 0,
+        "busy": (value & 0x40) != 0,
+        "read_ack_n": (value & 0x80) != 0,
+    }
+
+def encode_interrupt(**fields):
+    return _encode(_INTERRUPT_FIELDS, fields)
+
+def decode_interrupt(value):
+    return {
+        "transfer_finished": (value & 0x1) != 0,
+        "arbitration_lost": (value & 0x2) != 0,
+        "rxack": (value & 0x4) != 0,
+    }
+
+def encode_interrupt_en(**fields):
+    return _encode(_INTERRUPT_EN_FIELDS, fields)
+
+def decode_interrupt_en(value):
+    return {
+        "transfer_finished": (value & 0x1) != 0,
+        "arbitration_lost": (value & 0x2) != 0,
+        "rxack": (value & 0x4) != 0,
+    }
+
+def encode_command(**fields):
+    return _encode(_COMMAND_FIELDS, fields)
+
+def decode_command(value):
+    return {
+        "start": (value & 0x1) != 0,
+        "stop": (value & 0x2) != 0,
+        "read": (value & 0x4) != 0,
+        "write": (value & 0x8) != 0,
+        "nack": (value & 0x10) != 0,
+    }
+
+class I2CRegisters(object):
+    """
+    Field access for a driver with read_register, write_register and
+    modify(address, set_mask, clear_mask), whatever the driver returns is
+    returned (a coroutine for the cocotb drivers)
+    """
+
+    def update_control(self, **fields):
+        """
+        Change some fields with one register write: en, interrupt_en,
+        set_100khz, set_400khz, reset
+        """
+        set_mask, clear_mask = _masks(_CONTROL_FIELDS, fields)
+        return self.modify(CONTROL, set_mask, clear_mask)
+
+    def write_control(self, **fields):
+        """
+        Write the register, fields not given are 0
+        """
+        return self.write_register(CONTROL, _encode(_CONTROL_FIELDS, fields))
+
+    def update_interrupt(self, **fields):
+        """
+        Change some fields with one register write: transfer_finished,
+        arbitration_lost, rxack
+        """
+        set_mask, clear_mask = _masks(_INTERRUPT_FIELDS, fields)
+        return self.modify(INTERRUPT, set_mask, clear_mask)
+
+    def write_interrupt(self, **fields):
+        """
+        Write the register, fields not given are 0
+        """
+        return self.write_register(INTERRUPT, _encode(_INTERRUPT_FIELDS, fields))
+
+    def update_interrupt_en(self, **fields):
+        """
+        Change some fields with one register write: transfer_finished,
+        arbitration_lost, rxack
+        """
+        set_mask, clear_mask = _masks(_INTERRUPT_EN_FIELDS, fields)
+        return self.modify(INTERRUPT_EN, set_mask, clear_mask)
+
+    def write_interrupt_en(self, **fields):
+        """
+        Write the register, fields not given are 0
+        """
+        return self.write_register(INTERRUPT_EN, _encode(_INTERRUPT_EN_FIELDS, fields))
+
+    def write_command(self, **fields):
+        """
+        Write the register, fields not given are 0
+        """
+        return self.write_register(COMMAND, _encode(_COMMAND_FIELDS, fields))
@@ -35,7 +35,9 @@ input       [ADDR_WIDTH - 1: 0]     AXIML_ARADDR,
 output                              AXIML_RVALID,
 input                               AXIML_RREADY,
 output      [1:0]                   AXIML_RRESP,
-output      [DATA_WIDTH - 1: 0]     AXIML_RDATA
+output      [DATA_WIDTH - 1: 0]     AXIML_RDATA,
+
+output                              o_interrupt
 
 );
 
@@ -66,12 +68,26 @@ wire              O_SCL_TRI;
 wire              I_SCL_IN;
 wire              O_SDA_OUT;
 wire              O_SDA_TRI;
-reg               I_SDA_IN;
-
-
-
-
-assign I_SCL_IN = O_SCL_TRI;
+wire              I_SDA_IN;
+reg               r_sda_model;
+
+//Behavioral I2C targets (verilog/sim/i2c_target.py) pull the lines low
+//through these registers, the built in ACK model answers while
+//i2c_target_en is low
+reg               i2c_target_en   = 0;
+reg               eeprom_scl_low  = 0;
+reg               eeprom_sda_low  = 0;
+reg               sensor_scl_low  = 0;
+reg               sensor_sda_low  = 0;
+wire              i2c_scl;
+wire              i2c_sda;
+
+//Wired AND of the open drain lines
+assign i2c_scl  = (O_SCL_TRI ? 1'b1 : O_SCL_OUT) & !eeprom_scl_low & !sensor_scl_low;
+assign i2c_sda  = (O_SDA_TRI ? 1'b1 : O_SDA_OUT) & !eeprom_sda_low & !sensor_sda_low;
+
+assign I_SCL_IN = i2c_scl;
+assign I_SDA_IN = i2c_target_en ? i2c_sda : r_sda_model;
 //assign            io_sda = (sda_tri) ? 1'hZ : 1'b0;
 
 
@@ -113,6 +129,8 @@ axi_lite_i2c #(
   .o_rresp          (AXIML_RRESP    ),
   .o_rdata          (AXIML_RDATA    ),
 
+  .o_interrupt      (o_interrupt    ),
+
   .o_scl_out        (O_SCL_OUT      ),
   .o_scl_tri        (O_SCL_TRI      ),
   .i_scl_in         (I_SCL_IN       ),
@@ -144,7 +162,7 @@ always @ (posedge clk) begin
     start    <= 0;
     prev_dat <= 0;
     count = 0;
-    I_SDA_IN  <=  1;
+    r_sda_model <=  1;
   end
   else begin
 
@@ -166,7 +184,7 @@ always @ (posedge clk) begin
 
     if (i2c_clock_count == 8) begin
       if (count > 2) begin
-        I_SDA_IN  <=  0;
+        r_sda_model <=  0;
         count <= 0;
       end
       else begin
@@ -176,7 +194,7 @@ always @ (posedge clk) begin
 
     else if (i2c_clock_count > 8) begin
       if (count > 2) begin
-        I_SDA_IN  <=  1;
+        r_sda_model <=  1;
         i2c_clock_count <=  0;
         count <= 0;
       end
@@ -185,7 +203,7 @@ always @ (posedge clk) begin
       end
     end
     else begin
-      I_SDA_IN  <=  O_SDA_TRI;
+      r_sda_model <=  O_SDA_TRI;
     end
 
     prev_clk <= O_SCL_TRI;
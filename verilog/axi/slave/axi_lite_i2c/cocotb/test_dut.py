@@ -3,12 +3,24 @@ import sys
 import cocotb
 import logging
 from cocotb.result import TestFailure
+from cocotb.result import ReturnValue
 from cocotb.clock import Clock
 import time
 from array import array as Array
 from cocotb.triggers import Timer
 from cocotb.drivers.amba import AXI4LiteMaster
+from cocotb.utils import get_sim_time
 from i2c import *
+from i2c_target import start_targets
+from i2c_target import eeprom_write
+from i2c_target import eeprom_read
+from i2c_target import log_utilization
+from i2c_target import I2CMonitor
+from i2c_target import EEPROM_ADDRESS
+from i2c_target import SENSOR_ADDRESS
+from i2c_target import EEPROM_PAGE_SIZE
+from i2c_target import EEPROM_WRITE_CYCLES
+from i2c_target import SENSOR_READ_ONLY
 
 MODULE_PATH = os.path.join(os.path.dirname(__file__), os.pardir, "rtl")
 MODULE_PATH = os.path.abspath(MODULE_PATH)
@@ -126,11 +138,345 @@ def read_data(dut):
     yield i2c.read_from_i2c(0x30, 2)
     yield Timer(CLK_PERIOD * 100)
 
-    
+#Bus cycles of the register sequence, filled in by the benchmark tests
+BENCHMARK = {}
+
+@cocotb.coroutine
+def register_sequence(i2c):
+    """
+    The register traffic of send_data without the I2C transfer, followed by
+    a read of every register
+    """
+    yield i2c.enable_transfer_complete_interrupt(True)
+    yield i2c.set_custom_speed(1000000)
+    yield i2c.enable_i2c(True)
+    yield i2c.reset_i2c_core()
+    yield i2c.read(CONTROL, (VERSION >> 2) + 1)
+
+@cocotb.coroutine
+def run_benchmark(dut, test_id, pipelined):
+    dut.rst <= 1
+    dut.test_id <= test_id
+    i2c = I2C(dut, pipelined = pipelined)
+    yield Timer(CLK_PERIOD * 10)
+    dut.rst <= 0
+    yield Timer(CLK_PERIOD * 100)
+
+    start = get_sim_time()
+    yield register_sequence(i2c)
+    cycles = (get_sim_time() - start) / CLK_PERIOD
+    name = "Pipelined" if pipelined else "AXI4LiteMaster"
+    BENCHMARK[name] = cycles
+    dut.log.info("%s: register sequence took %d bus cycles" % (name, cycles))
+
+@cocotb.test(skip = False)
+def register_benchmark_legacy(dut):
+    """
+    Description:
+        Run the register sequence with one AXI4LiteMaster transaction and a
+        10 clock delay per word
+
+    Test ID: 3
+
+    Expected Results:
+        Bus cycles are reported
+    """
+    yield run_benchmark(dut, 3, False)
+
+@cocotb.test(skip = False)
+def register_benchmark_pipelined(dut):
+    """
+    Description:
+        Run the same register sequence with the pipelined master
+
+    Test ID: 4
+
+    Expected Results:
+        The sequence takes fewer bus cycles than with AXI4LiteMaster
+    """
+    yield run_benchmark(dut, 4, True)
+    if "AXI4LiteMaster" in BENCHMARK:
+        legacy = BENCHMARK["AXI4LiteMaster"]
+        pipelined = BENCHMARK["Pipelined"]
+        dut.log.info("Speedup: %0.2fx (%d -> %d cycles)" % (float(legacy) / pipelined, legacy, pipelined))
+        if pipelined >= legacy:
+            raise TestFailure("Pipelined master is not faster: %d >= %d cycles" % (pipelined, legacy))
+
+@cocotb.test(skip = False)
+def register_cache_test(dut):
+    """
+    Description:
+        Toggle control and interrupt enable bits through the bit helpers, only
+        the first access of every register should read the bus, the values
+        read back over the bus must match the shadow copy
 
+    Test ID: 5
 
+    Expected Results:
+        Every bit helper after the first one is a cache hit
+        Status reads always go to the bus and are not counted as misses
+    """
+    dut.rst <= 1
+    dut.test_id <= 5
+    i2c = I2C(dut)
+    yield Timer(CLK_PERIOD * 10)
+    dut.rst <= 0
+    yield Timer(CLK_PERIOD * 100)
 
+    yield i2c.enable_i2c(True)
+    yield i2c.enable_interrupt(True)
+    yield i2c.enable_transfer_complete_interrupt(True)
+    yield i2c.enable_interrupt(False)
+    yield i2c.enable_i2c(False)
+    yield i2c.enable_i2c(True)
+
+    stats = i2c.cache_stats()
+    dut.log.info("Register cache: %d hits, %d misses" % (stats["hits"], stats["misses"]))
+    if stats["misses"] != 2:
+        raise TestFailure("Expected 2 cache misses (CONTROL, INTERRUPT_EN), got %d" % stats["misses"])
+
+    volatile = stats["volatile"]
+    yield i2c.get_status()
+    yield i2c.get_status()
+    stats = i2c.cache_stats()
+    if stats["misses"] != 2 or stats["volatile"] != volatile + 2:
+        raise TestFailure("Status reads counted as %d misses, %d volatile reads" %
+                          (stats["misses"] - 2, stats["volatile"] - volatile))
+
+    mask = (1 << CONTROL_EN) | (1 << CONTROL_INTERRUPT_EN)
+    control = yield i2c.read(CONTROL, 1)
+    if (control[0] & mask) != (i2c.shadow.values[CONTROL] & mask):
+        raise TestFailure("Shadow control: 0x%08X != bus: 0x%08X" % (i2c.shadow.values[CONTROL], control[0]))
 
+#Bytes per millisecond of every bus speed, filled in by the throughput tests
+THROUGHPUT = {}
+THROUGHPUT_LENGTH = 8
+CUSTOM_DIVIDER = 4
+
+@cocotb.coroutine
+def run_throughput(dut, test_id, name, set_speed):
+    """
+    Write THROUGHPUT_LENGTH bytes, every byte is queued as soon as the
+    previous one finished. The milliseconds are derived from the clock
+    cycles and the clock rate the core reports
+    """
+    dut.rst <= 1
+    dut.test_id <= test_id
+    i2c = I2C(dut)
+    yield Timer(CLK_PERIOD * 10)
+    dut.rst <= 0
+    yield Timer(CLK_PERIOD * 100)
+
+    yield i2c.enable_i2c(True)
+    yield set_speed(i2c)
+    divider = yield i2c.get_clock_divider()
+    clock_rate = yield i2c.get_clock_rate()
+
+    start = get_sim_time()
+    yield i2c.write_to_i2c(0x30, range(THROUGHPUT_LENGTH))
+    cycles = (get_sim_time() - start) / CLK_PERIOD
+    ms = float(cycles) * 1000 / clock_rate
+    THROUGHPUT[name] = THROUGHPUT_LENGTH / ms
+    dut.log.info("%s (divider %d): %d bytes in %d cycles, %0.2f bytes/ms" %
+                 (name, divider, THROUGHPUT_LENGTH, cycles, THROUGHPUT[name]))
+
+@cocotb.test(skip = False)
+def throughput_100khz(dut):
+    """
+    Description:
+        Write a block of bytes at 100kHz
+
+    Test ID: 6
+
+    Expected Results:
+        Bytes per millisecond are reported
+    """
+    yield run_throughput(dut, 6, "100kHz", lambda i2c: i2c.set_speed_to_100khz())
+
+@cocotb.test(skip = False)
+def throughput_400khz(dut):
+    """
+    Description:
+        Write a block of bytes at 400kHz
+
+    Test ID: 7
+
+    Expected Results:
+        More bytes per millisecond than at 100kHz
+    """
+    yield run_throughput(dut, 7, "400kHz", lambda i2c: i2c.set_speed_to_400khz())
+    if "100kHz" in THROUGHPUT and THROUGHPUT["400kHz"] <= THROUGHPUT["100kHz"]:
+        raise TestFailure("400kHz is not faster than 100kHz: %0.2f <= %0.2f bytes/ms" %
+                          (THROUGHPUT["400kHz"], THROUGHPUT["100kHz"]))
+
+@cocotb.test(skip = False)
+def throughput_custom_divider(dut):
+    """
+    Description:
+        Write a block of bytes with a custom clock divider
+
+    Test ID: 8
+
+    Expected Results:
+        Bytes per millisecond are reported
+    """
+    yield run_throughput(dut, 8, "Divider %d" % CUSTOM_DIVIDER,
+                         lambda i2c: i2c.set_clock_divider(CUSTOM_DIVIDER))
+
+@cocotb.test(skip = False)
+def transfer_timeout(dut):
+    """
+    Description:
+        Start a write at 100kHz but only wait a few clock cycles for the
+        address byte
+
+    Test ID: 9
+
+    Expected Results:
+        The driver raises an I2CError instead of continuing
+    """
+    dut.rst <= 1
+    dut.test_id <= 9
+    i2c = I2C(dut)
+    yield Timer(CLK_PERIOD * 10)
+    dut.rst <= 0
+    yield Timer(CLK_PERIOD * 100)
+
+    yield i2c.enable_i2c(True)
+    yield i2c.set_speed_to_100khz()
+    try:
+        yield i2c.write_to_i2c(0x30, [0x00], timeout = 10)
+    except I2CError as e:
+        dut.log.info("Timeout detected: %s" % str(e))
+    else:
+        raise TestFailure("A 10 cycle timeout did not raise an I2CError")
+
+@cocotb.coroutine
+def setup_targets(dut, test_id, write_cycles = EEPROM_WRITE_CYCLES, stretch = 0):
+    """
+    Reset the core, connect an EEPROM and a register file sensor to the bus
+    and run the bus with CUSTOM_DIVIDER
+    """
+    dut.rst <= 1
+    dut.test_id <= test_id
+    dut.i2c_target_en <= 1
+    i2c = I2C(dut)
+    eeprom, sensor = start_targets(dut, write_cycles, stretch)
+    yield Timer(CLK_PERIOD * 10)
+    dut.rst <= 0
+    yield Timer(CLK_PERIOD * 100)
+    yield i2c.enable_i2c(True)
+    yield i2c.set_clock_divider(CUSTOM_DIVIDER)
+    raise ReturnValue((i2c, eeprom, sensor))
+
+@cocotb.test(skip = False)
+def eeprom_test(dut):
+    """
+    Description:
+        Write two pages to the EEPROM model, ACK poll while it programs them
+        and read them back with a single sequential read
+
+    Test ID: 10
+
+    Expected Results:
+        The data read back matches the data written and the EEPROM memory
+        The EEPROM NACKs its address while it programs a page
+    """
+    i2c, eeprom, sensor = yield setup_targets(dut, 10)
+    address = 0x0100
+    data = [(i * 7 + 3) & 0xFF for i in range(EEPROM_PAGE_SIZE * 2)]
+
+    polls = 0
+    for page in range(0, len(data), EEPROM_PAGE_SIZE):
+        p = yield eeprom_write(i2c, address + page, data[page:page + EEPROM_PAGE_SIZE])
+        polls += p
+    dut.log.info("%d page writes, %d NACKed polls" % (eeprom.page_writes, polls))
+    if eeprom.page_writes != 2:
+        raise TestFailure("Expected 2 page writes, EEPROM programmed %d" % eeprom.page_writes)
+    if polls == 0:
+        raise TestFailure("The EEPROM never NACKed while it was programming")
+    if list(eeprom.dump(address, len(data))) != data:
+        raise TestFailure("EEPROM memory doesn't match the data written")
+
+    read_data = yield eeprom_read(i2c, address, len(data))
+    if list(read_data) != data:
+        for i in range(min(len(read_data), len(data))):
+            if read_data[i] != data[i]:
+                raise TestFailure("Byte %d: 0x%02X != 0x%02X" % (i, read_data[i], data[i]))
+        raise TestFailure("Read %d bytes, expected %d" % (len(read_data), len(data)))
+
+@cocotb.test(skip = False)
+def sensor_test(dut):
+    """
+    Description:
+        Write and read back the registers of the register file sensor while
+        it stretches the clock, then write to a read-only register
+
+    Test ID: 11
+
+    Expected Results:
+        The registers read back match, SCL was stretched
+        The write to the read-only register is NACKed and raises an I2CError
+    """
+    i2c, eeprom, sensor = yield setup_targets(dut, 11, stretch = 20)
+    sensor.set_register(0, 0xA5)
+    sensor.set_register(1, 0x5A)
+
+    values = [0x11, 0x22, 0x33, 0x44]
+    yield i2c.write_to_i2c(SENSOR_ADDRESS, [4] + values)
+    yield i2c.write_to_i2c(SENSOR_ADDRESS, [0])
+    registers = yield i2c.read_from_i2c(SENSOR_ADDRESS, 8)
+    expected = [0xA5, 0x5A, 0x00, 0x00] + values
+    dut.log.info("Registers: %s, %d clocks stretched" %
+                 (" ".join(["%02X" % r for r in registers]), sensor.stretch_cycles))
+    if list(registers) != expected:
+        raise TestFailure("Registers %s != %s" % (list(registers), expected))
+    if sensor.stretch_cycles == 0:
+        raise TestFailure("The sensor never stretched the clock")
+
+    try:
+        yield i2c.write_to_i2c(SENSOR_ADDRESS, [SENSOR_READ_ONLY[0], 0xFF])
+    except I2CError as e:
+        dut.log.info("Read-only register: %s" % str(e))
+    else:
+        raise TestFailure("Write to a read-only register was not NACKed")
+    if sensor.get_register(SENSOR_READ_ONLY[0]) != 0xA5:
+        raise TestFailure("Read-only register was modified")
+
+#Bytes moved by the SCL utilization benchmark in each direction
+UTILIZATION_LENGTH = 256
+
+@cocotb.test(skip = False)
+def scl_utilization_benchmark(dut):
+    """
+    Description:
+        Long sequential EEPROM writes (back to back page writes) and a long
+        sequential read, measure how much of the time SCL was clocking at
+        the rate of the clock divider
+
+    Test ID: 12
+
+    Expected Results:
+        SCL utilization and bytes per millisecond are reported for both
+        directions
+    """
+    i2c, eeprom, sensor = yield setup_targets(dut, 12, write_cycles = 0)
+    clock_rate = yield i2c.get_clock_rate()
+    monitor = I2CMonitor(dut.clk, dut.i2c_scl, dut.i2c_sda)
+    data = [(i * 13) & 0xFF for i in range(UTILIZATION_LENGTH)]
 
+    monitor.start()
+    start = get_sim_time()
+    for page in range(0, len(data), EEPROM_PAGE_SIZE):
+        yield i2c.write_to_i2c(EEPROM_ADDRESS, [page >> 8, page & 0xFF] + data[page:page + EEPROM_PAGE_SIZE])
+    log_utilization(dut.log, "Write", UTILIZATION_LENGTH, monitor, (get_sim_time() - start) / CLK_PERIOD, clock_rate)
 
+    yield i2c.write_to_i2c(EEPROM_ADDRESS, [0, 0])
+    monitor.start()
+    start = get_sim_time()
+    read_data = yield i2c.read_from_i2c(EEPROM_ADDRESS, len(data))
+    log_utilization(dut.log, "Read", UTILIZATION_LENGTH, monitor, (get_sim_time() - start) / CLK_PERIOD, clock_rate)
+    monitor.stop()
 
+    if list(read_data) != data:
+        raise TestFailure("Data read back doesn't match the data written")
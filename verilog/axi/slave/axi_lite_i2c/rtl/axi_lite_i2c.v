@@ -104,17 +104,8 @@ module axi_lite_i2c #(
 localparam CLK_DIVIDE_100KHZ        = (CLOCK_RATE/(5 * 100000) - 1);
 localparam CLK_DIVIDE_400KHZ        = (CLOCK_RATE/(5 * 400000) - 1);
 
-//Address Map
-localparam    REG_CONTROL           = 0;
-localparam    REG_STATUS            = 1;
-localparam    REG_INTERRUPT         = 2;
-localparam    REG_INTERRUPT_EN      = 3;
-localparam    REG_CLOCK_RATE        = 4;
-localparam    REG_CLOCK_DIVIDER     = 5;
-localparam    REG_COMMAND           = 6;
-localparam    REG_TRANSMIT          = 7;
-localparam    REG_RECEIVE           = 8;
-localparam    REG_VERSION           = 9;
+//Address Map, generated from cocotb/i2c_regs.json
+`include "axi_lite_i2c_regs.vh"
 
 localparam    INT_TRANSFER_FINISHED = 0;
 localparam    INT_ARBITRATION_LOST  = 1;
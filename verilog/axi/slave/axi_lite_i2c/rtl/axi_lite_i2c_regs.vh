@@ -0,0 +1,14 @@
+//Generated by register_map.py from i2c_regs.json, do not edit
+//DESCRIPTION_SHA1: c4972babc5d715a771be9c6823993464c619e651
+
+//Registers
+localparam          REG_CONTROL             = 0;
+localparam          REG_STATUS              = 1;
+localparam          REG_INTERRUPT           = 2;
+localparam          REG_INTERRUPT_EN        = 3;
+localparam          REG_CLOCK_RATE          = 4;
+localparam          REG_CLOCK_DIVIDER       = 5;
+localparam          REG_COMMAND             = 6;
+localparam          REG_TRANSMIT            = 7;
+localparam          REG_RECEIVE             = 8;
+localparam          REG_VERSION             = 9;
@@ -4,110 +4,111 @@ import time
 import cocotb
 from cocotb.result import ReturnValue
 from cocotb.drivers.amba import AXI4LiteMaster
+from axi_lite_master import AXI4LitePipelinedMaster
+from register_shadow import RegisterShadow
+from register_shadow import modify_value
 from cocotb.triggers import Timer
+from cocotb.utils import get_sim_time
 from array import array as Array
+from ines import load_ines
+from ines import crc32
 
-#SIM = True
-SIM = False
-
-#Registers
-REG_CONTROL                   =  0
-REG_STATUS                    =  1
-REG_USER_INPUT                =  2
-REG_HCI_OPCODE_COUNT          =  3
-REG_HCI_OPCODE_ADDR           =  4
-REG_HCI_OPCODE                =  5
-REG_HCI_OPCODE_DATA           =  6
-REG_HCI_READ_STB              =  7
-REG_IMAGE_WIDTH               =  8
-REG_IMAGE_HEIGHT              =  9
-REG_IMAGE_SIZE                = 10
-REG_VERSION                   = 11
-
-#Control
-CONTROL_HCI_RESET             = 0
-CONTROL_CONSOLE_RESET         = 1
-
-#Status
-STATUS_CLOCK_LOCKED           = 0
-STATUS_HCI_READY              = 1
-STATUS_HCI_NEW_STATUS         = 2
-STATUS_HCI_S_BOT              = 16
-STATUS_HCI_S_TOP              = STATUS_HCI_S_BOT + 15
-
-# HCI Interface
-
-# Debug packet opcodes.
-OP_NOP                  = 0x00
-OP_DBG_BRK              = 0x01
-OP_DBG_RUN              = 0x02
-OP_QUERY_DBG_BRK        = 0x03
-OP_CPU_MEM_RD           = 0x04
-OP_CPU_MEM_WR           = 0x05
-OP_CPU_REG_RD           = 0x06
-OP_CPU_REG_WR           = 0x07
-OP_PPU_MEM_RD           = 0x08
-OP_PPU_MEM_WR           = 0x09
-OP_PPU_DISABLE          = 0x0A
-OP_CART_SET_CFG         = 0x0B
-
-# Opcode Status
-OS_OK                   = 1
-OS_ERROR                = 2
-OS_UNKNOWN_OPCODE       = 4
-OS_COUNT_IS_ZERO        = 8
-
-# CPU Registers
-CPU_REG_PCL             = 0x00  # PCL:  Program Counter Low
-CPU_REG_PCH             = 0x01  # PCH:  Program Counter High
-CPU_REG_AC              = 0x02  # AC:   Accumulator
-CPU_REG_X               = 0x03  # X:    X index reg
-CPU_REG_Y               = 0x04  # Y:    Y index reg
-CPU_REG_P               = 0x05  # P:    Processor Status Reg
-CPU_REG_S               = 0x06  # S:    Stack Pointer Reg
+#ROMs are streamed through the HCI in blocks of this many bytes
+TRANSFER_BLOCK_SIZE = 0x400
+PRG_ROM_ADDRESS = 0x8000
+CHR_ROM_ADDRESS = 0x0000
+
+#Registers, their fields, the HCI opcodes and opcode status are generated
+#from nes_hci_regs.json by verilog/sim/register_map.py
+from nes_hci_regs import *
 
 class NESError(Exception):
     pass
 
-class NESHCI (object):
+class NESHCI (NESHCIRegisters):
 
-    def __init__(self, dut, BUS_NAME, clock_period = 10):
+    def __init__(self, dut, BUS_NAME, clock_period = 10, backdoor = None, pipelined = True,
+                 backdoor_load = True):
+        """
+        Args:
+            backdoor (NESBackdoor): when set 'load_rom' writes PRG and CHR
+                ROM directly into the cartridge memories instead of through
+                the HCI, see verilog/sim/backdoor.py
+            pipelined (boolean): use the pipelined AXI Lite master, register
+                accesses only wait for the bus handshakes
+            backdoor_load (boolean): load ROMs through the backdoor, when
+                false the ROMs are streamed through the HCI and the backdoor
+                is only used to verify them
+        """
         self.dut = dut
-        self.axim = AXI4LiteMaster(dut, BUS_NAME, dut.clk)
+        self.pipelined = pipelined
+        if pipelined:
+            self.axim = AXI4LitePipelinedMaster(dut, BUS_NAME, dut.clk)
+        else:
+            self.axim = AXI4LiteMaster(dut, BUS_NAME, dut.clk)
         self.clk_period = clock_period
+        self.backdoor = backdoor
+        self.backdoor_load = backdoor_load
+        #Statistics of the last 'load_rom'
+        self.load_stats = {}
+        #Only the host changes the control register
+        self.shadow = RegisterShadow()
+        declare_shadow(self.shadow)
 
     @cocotb.coroutine
     def _write_data(self, address, data):
         yield self.axim.write((address << 2), data)
-        yield Timer(self.clk_period * 1)
+        self.shadow.update(address, int(data))
+        if not self.pipelined:
+            yield Timer(self.clk_period * 1)
 
     @cocotb.coroutine
     def _read_data(self, address, len = 1):
+        data = self.shadow.lookup(address)
+        if data is not None:
+            raise ReturnValue(data)
         data = yield self.axim.read(address << 2)
-        yield Timer(self.clk_period * 1)
+        self.shadow.update(address, int(data))
+        if not self.pipelined:
+            yield Timer(self.clk_period * 1)
         raise ReturnValue(data)
 
+    @cocotb.coroutine
+    def _write_many(self, address, data):
+        """
+        Write every value in data to the same register
+        """
+        if self.pipelined:
+            yield self.axim.write_many([((address << 2), d) for d in data])
+            return
+        for d in data:
+            yield self._write_data(address, d)
+
+    @cocotb.coroutine
+    def modify(self, address, set_mask = 0, clear_mask = 0):
+        """
+        Read-modify-write a register, a single write when the register is in
+        the shadow cache
+
+        Returns (integer):
+            value written
+        """
+        data = yield self._read_data(address)
+        data = modify_value(int(data), set_mask, clear_mask)
+        yield self._write_data(address, data)
+        raise ReturnValue(data)
+
+    #Register access used by the generated update_/write_ field helpers
+    read_register = _read_data
+    write_register = _write_data
+
     @cocotb.coroutine
     def enable_console_reset(self, enable):
-        data = yield self._read_data(REG_CONTROL)
-        data = int(data)
-        yield Timer(self.clk_period * 1)
-        if enable:
-            data |= 1 << CONTROL_CONSOLE_RESET
-        else:
-            data &= ~(1 << CONTROL_CONSOLE_RESET)
-        self._write_data(REG_CONTROL, data)
+        yield self.update_control(console_reset = enable)
 
     @cocotb.coroutine
     def enable_hci_reset(self, enable):
-        data = yield self._read_data(REG_CONTROL)
-        data = int(data)
-        yield Timer(self.clk_period * 1)
-        if enable:
-            data |= 1 << CONTROL_HCI_RESET
-        else:
-            data &= ~(1 << CONTROL_HCI_RESET)
-        yield self._write_data(REG_CONTROL, data)
+        yield self.update_control(hci_reset = enable)
 
     @cocotb.coroutine
     def reset_hci(self):
@@ -169,17 +170,33 @@ class NESHCI (object):
         raise ReturnValue(int(data))
 
 
+    @cocotb.coroutine
+    def _write_mem(self, opcode, addr, data):
+        """
+        Issue a memory write opcode and its data as one batch of writes, the
+        pipelined master keeps them back to back on the bus
+        """
+        if isinstance(data, str):
+            data = bytearray(data)
+        writes = [(REG_HCI_OPCODE_COUNT, len(data)),
+                  (REG_HCI_OPCODE_ADDR, addr),
+                  (REG_HCI_OPCODE, opcode)]
+        writes.extend([(REG_HCI_OPCODE_DATA, d) for d in data])
+        if self.pipelined:
+            yield self.axim.write_many([((a << 2), d) for a, d in writes])
+            for a, d in writes[0:3]:
+                self.shadow.update(a, d)
+            return
+        for a, d in writes:
+            yield self._write_data(a, d)
+
     @cocotb.coroutine
     def write_cpu_mem(self, addr, data):
-        if data is int:
+        if isinstance(data, int):
             data = [data]
 
         yield self.enter_debug()
-        yield self._write_data(REG_HCI_OPCODE_COUNT, len(data))
-        yield self._write_data(REG_HCI_OPCODE_ADDR, addr)
-        yield self._write_data(REG_HCI_OPCODE, OP_CPU_MEM_WR)
-        for d in data:
-            yield self._write_data(REG_HCI_OPCODE_DATA, d)
+        yield self._write_mem(OP_CPU_MEM_WR, addr, data)
 
     @cocotb.coroutine
     def read_cpu_mem(self, addr, length = 1):
@@ -197,15 +214,11 @@ class NESHCI (object):
 
     @cocotb.coroutine
     def write_ppu_mem(self, addr, data):
-        if data is int:
+        if isinstance(data, int):
             data = [data]
 
         yield self.enter_debug()
-        yield self._write_data(REG_HCI_OPCODE_COUNT, len(data))
-        yield self._write_data(REG_HCI_OPCODE_ADDR, addr)
-        yield self._write_data(REG_HCI_OPCODE, OP_PPU_MEM_WR)
-        for d in data:
-            yield self._write_data(REG_HCI_OPCODE_DATA, d)
+        yield self._write_mem(OP_PPU_MEM_WR, addr, data)
 
     @cocotb.coroutine
     def read_ppu_mem(self, addr, length = 1):
@@ -229,8 +242,7 @@ class NESHCI (object):
         yield self.enter_debug()
         yield self._write_data(REG_HCI_OPCODE_COUNT, len(data))
         yield self._write_data(REG_HCI_OPCODE, OP_CART_SET_CFG)
-        for d in data:
-            yield self._write_data(REG_HCI_OPCODE_DATA, d)
+        yield self._write_many(REG_HCI_OPCODE_DATA, data)
 
     @cocotb.coroutine
     def disable_ppu(self):
@@ -238,26 +250,50 @@ class NESHCI (object):
         yield self._write_data(REG_HCI_OPCODE, OP_PPU_DISABLE)
 
     @cocotb.coroutine
-    def load_rom(self, filename):
-        f = open(filename, 'r')
-        #data = f.read()
-        data = Array('B')
-        data.fromstring(f.read())
-        print "Length of data: %d" % len(data)
-        print "Type: %s" % str(type(data))
-        f.close()
-        #if ((data[0] != 'N') or (data[1] != 'E') or (data[2] != 'S') or (data[3] != 0x1A)):
-        if ((data[0] != 0x4E) or (data[1] != 0x45) or (data[2] != 0x53) or (data[3] != 0x1A)):
-            raise NESError("Invalid ROM header")
-
-
-        prg_rom_banks = data[4]
-        chr_rom_banks = data[5]
-        if (prg_rom_banks > 2) or (chr_rom_banks > 1):
-            raise NESError("Too many ROM banks: PRG_ROM: %d CHR ROM: %d" % (prg_rom_banks, chr_rom_banks))
-
-        mapper = (((data[6] & 0xF0) >> 4) | ((data[7] & 0xF0)) != 0)
-        if mapper != 0:
+    def _verify_chunk(self, name, address, length, crc):
+        """
+        Compare the CRC32 of a block of ROM with the memory, the memory is
+        read through the backdoor when there is one (no simulation time),
+        otherwise through the HCI
+        """
+        if self.backdoor is not None:
+            if name == "prg":
+                data = self.backdoor.read_prg(address, length)
+            else:
+                data = self.backdoor.read_chr(address, length)
+        elif name == "prg":
+            data = yield self.read_cpu_mem(address, length)
+        else:
+            data = yield self.read_ppu_mem(address, length)
+
+        if crc32(data) != crc:
+            raise NESError("%s ROM block at 0x%04X: CRC 0x%08X != 0x%08X" %
+                           (name.upper(), address, crc32(data), crc))
+
+    @cocotb.coroutine
+    def load_rom(self, filename, verify = False, transfer_block_size = TRANSFER_BLOCK_SIZE):
+        """
+        Load an iNES image
+
+        PRG and CHR ROM are streamed through the HCI in transfer_block_size
+        blocks (or written through the backdoor, see __init__), then the PC
+        is pointed at the reset vector
+
+        Args:
+            filename (string): path to the .nes file, see verilog/sim/ines.py
+            verify (boolean): check the CRC32 of every block after it is
+                written
+            transfer_block_size (integer): bytes per memory write opcode
+
+        Raises:
+            NESError: unsupported image or a block failed verification
+        """
+        image = load_ines(filename)
+        header = image.header
+        if (header.prg_rom_banks > 2) or (header.chr_rom_banks > 1):
+            raise NESError("Too many ROM banks: PRG_ROM: %d CHR ROM: %d" % (header.prg_rom_banks, header.chr_rom_banks))
+
+        if header.mapper != 0:
             raise NESError("Only mapper 0 is supported")
 
         # Issue a debug break
@@ -267,52 +303,42 @@ class NESHCI (object):
         yield self.disable_ppu()
 
         #Set header info to config mapper
-        config = [0] * 5
-        config[0] = data[4]
-        config[1] = data[5]
-        config[2] = data[6]
-        config[3] = data[7]
-        config[4] = data[8]
-        yield self.set_cart_config(config)
-
-        #Calculate all the sizes
-        prg_rom_size = prg_rom_banks * 0x4000
-        chr_rom_size = chr_rom_banks * 0x2000
-        total_size = prg_rom_size + chr_rom_size
-        transfer_block_size = 0x400
-
-        prg_rom = data[16:16 + prg_rom_size]
-        chr_rom = data[16 + prg_rom_size: 16 + prg_rom_size + chr_rom_size]
-        
-        #XXX: SIMULATION Don't write too much data
-        if SIM:
-            load_prg_rom = prg_rom[0:256]
-            load_chr_rom = prg_rom[0:256]
-
-        prg_offset = 0x8000
-        #Copy PRG ROM data
-        if SIM:
-            yield self.write_cpu_mem(prg_offset, load_prg_rom)
+        yield self.set_cart_config(header.cart_config())
+
+        start = get_sim_time()
+        chunks = 0
+        if self.backdoor is not None and self.backdoor_load:
+            #Full size ROMs take no simulation time through the backdoor
+            self.backdoor.load_prg(image.prg_rom)
+            self.backdoor.load_chr(image.chr_rom)
         else:
-            yield self.write_cpu_mem(prg_offset, prg_rom)
-
-        #Copy CHR ROM data
-        #chr_offset = prg_offset + len(prg_rom)
-        chr_offset = 0x00
-        #yield self.write_cpu_mem(chr_offset, chr_rom)
-        if SIM:
-            yield self.write_ppu_mem(chr_offset, load_chr_rom)
-        else:
-            yield self.write_ppu_mem(chr_offset, chr_rom)
+            regions = [("prg", PRG_ROM_ADDRESS, OP_CPU_MEM_WR),
+                       ("chr", CHR_ROM_ADDRESS, OP_PPU_MEM_WR)]
+            for name, base, opcode in regions:
+                for address, chunk, crc in image.chunks(name, transfer_block_size):
+                    yield self._write_mem(opcode, base + address, chunk)
+                    #The status read also keeps the next opcode from landing
+                    #before the HCI finished this block
+                    status = yield self._read_data(REG_STATUS)
+                    if ((int(status) >> STATUS_HCI_S_BOT) & OS_ERROR) > 0:
+                        raise NESError("%s ROM block at 0x%04X: HCI status 0x%04X" %
+                                       (name.upper(), base + address, int(status) >> STATUS_HCI_S_BOT))
+                    if verify:
+                        yield self._verify_chunk(name, base + address, len(chunk), crc)
+                    chunks += 1
+
+        self.load_stats = {"bytes": header.prg_rom_size + header.chr_rom_size,
+                           "chunks": chunks,
+                           "time": get_sim_time() - start}
 
         #Update PC to point to the reset interrupt vector location
-        pcl_val = data[16 + prg_rom_size - 4]
-        pch_val = data[16 + prg_rom_size - 3]
+        vector = image.reset_vector()
+        pcl_val = vector & 0xFF
+        pch_val = (vector >> 8) & 0xFF
         print "PCH:PCL: %02X:%02X" % (pch_val, pcl_val)
 
-        yield self.write_cpu_register(CPU_REG_PCL, pcl_val) 
+        yield self.write_cpu_register(CPU_REG_PCL, pcl_val)
         yield self.write_cpu_register(CPU_REG_PCH, pch_val)
 
         #Issue a debug run command
         yield self.exit_debug()
-
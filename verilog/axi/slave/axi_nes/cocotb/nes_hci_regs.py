@@ -0,0 +1,152 @@
+#Generated by register_map.py from nes_hci_regs.json, do not edit
+
+"""
+axi_nes registers
+
+encode_<register>(**fields) and decode_<register>(value) convert between
+register values and fields (lower case field names), single bit fields
+decode to booleans
+"""
+
+DESCRIPTION_SHA1 = "929ae8ef421387130d705713133fc6d40f7249ad"
+
+#Registers
+REG_CONTROL             = 0
+REG_STATUS              = 1
+REG_USER_INPUT          = 2
+REG_HCI_OPCODE_COUNT    = 3
+REG_HCI_OPCODE_ADDR     = 4
+REG_HCI_OPCODE          = 5
+REG_HCI_OPCODE_DATA     = 6
+REG_HCI_READ_STB        = 7
+REG_IMAGE_WIDTH         = 8
+REG_IMAGE_HEIGHT        = 9
+REG_IMAGE_SIZE          = 10
+REG_VERSION             = 11
+
+#CONTROL
+CONTROL_HCI_RESET       = 0
+CONTROL_CONSOLE_RESET   = 1
+
+#STATUS
+STATUS_CLOCK_LOCKED     = 0
+STATUS_HCI_READY        = 1
+STATUS_HCI_NEW_STATUS   = 2
+STATUS_HCI_S            = 16
+STATUS_HCI_S_TOP        = 31
+STATUS_HCI_S_BOT        = 16
+STATUS_HCI_S_BITMASK    = 0xFFFF
+
+#Constants
+OP_NOP                  = 0x00
+OP_DBG_BRK              = 0x01
+OP_DBG_RUN              = 0x02
+OP_QUERY_DBG_BRK        = 0x03
+OP_CPU_MEM_RD           = 0x04
+OP_CPU_MEM_WR           = 0x05
+OP_CPU_REG_RD           = 0x06
+OP_CPU_REG_WR           = 0x07
+OP_PPU_MEM_RD           = 0x08
+OP_PPU_MEM_WR           = 0x09
+OP_PPU_DISABLE          = 0x0A
+OP_CART_SET_CFG         = 0x0B
+OS_OK                   = 1
+OS_ERROR                = 2
+OS_UNKNOWN_OPCODE       = 4
+OS_COUNT_IS_ZERO        = 8
+CPU_REG_PCL             = 0x00
+CPU_REG_PCH             = 0x01
+CPU_REG_AC              = 0x02
+CPU_REG_X               = 0x03
+CPU_REG_Y               = 0x04
+CPU_REG_P               = 0x05
+CPU_REG_S               = 0x06
+
+#Registers only the host changes: address -> self clearing bits
+NON_VOLATILE = {
+    REG_CONTROL: 0x0,
+    REG_IMAGE_WIDTH: 0x0,
+    REG_IMAGE_HEIGHT: 0x0,
+    REG_IMAGE_SIZE: 0x0,
+    REG_VERSION: 0x0,
+}
+
+#field -> (mask, shift)
+_CONTROL_FIELDS = {
+    "hci_reset": (0x1, 0),
+    "console_reset": (0x2, 1),
+}
+_STATUS_FIELDS = {
+    "clock_locked": (0x1, 0),
+    "hci_ready": (0x2, 1),
+    "hci_new_status": (0x4, 2),
+    "hci_s": (0xFFFF0000, 16),
+}
+
+def _masks(table, fields):
+    """
+    Returns (tuple):
+        (bits to set, bits to clear) to write 'fields' into a register
+    """
+    set_mask = 0
+    clear_mask = 0
+    for name, value in fields.items():
+        if name not in table:
+            raise KeyError("Unknown field: %s" % name)
+        mask, shift = table[name]
+        value = int(value) << shift
+        if value & ~mask:
+            raise ValueError("%s: 0x%X does not fit in mask 0x%X" % (name, value >> shift, mask))
+        clear_mask |= mask
+        set_mask |= value
+    return set_mask, clear_mask
+
+def _encode(table, fields):
+    return _masks(table, fields)[0]
+
+def declare_shadow(shadow):
+    """
+    Declare the registers only the host changes in a RegisterShadow
+    """
+    for address, self_clearing in NON_VOLATILE.items():
+        shadow.declare(address, self_clearing)
+
+def encode_control(**fields):
+    return _encode(_CONTROL_FIELDS, fields)
+
+def decode_control(value):
+    return {
+        "hci_reset": (value & 0x1) != 0,
+        "console_reset": (value & 0x2) != 0,
+    }
+
+def encode_status(**fields):
+    return _encode(_STATUS_FIELDS, fields)
+
+def decode_status(value):
+    return {
+        "clock_locked": (value & 0x1) != 0,
+        "hci_ready": (value & 0x2) != 0,
+        "hci_new_status": (value & 0x4) != 0,
+        "hci_s": (value >> 16) & 0xFFFF,
+    }
+
+class NESHCIRegisters(object):
+    """
+    Field access for a driver with read_register, write_register and
+    modify(address, set_mask, clear_mask), whatever the driver returns is
+    returned (a coroutine for the cocotb drivers)
+    """
+
+    def update_control(self, **fields):
+        """
+        Change some fields with one register write: hci_reset, console_reset
+        """
+        set_mask, clear_mask = _masks(_CONTROL_FIELDS, fields)
+        return self.modify(REG_CONTROL, set_mask, clear_mask)
+
+    def write_control(self, **fields):
+        """
+        Write the register, fields not given are 0
+        """
+        return self.write_register(REG_CONTROL, _encode(_CONTROL_FIELDS, fields))
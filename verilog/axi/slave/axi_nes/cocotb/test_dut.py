@@ -7,10 +7,15 @@ from cocotb.clock import Clock
 import time
 from array import array as Array
 from cocotb.triggers import Timer, FallingEdge
+from cocotb.utils import get_sim_time
 
 from cocotb.drivers.amba import AXI4StreamSlave
 
 from nes_hci_driver import NESHCI
+from nes_hci_driver import TRANSFER_BLOCK_SIZE
+from backdoor import NESBackdoor
+from ines import load_ines
+from ines import write_test_rom
 
 CLK_PERIOD = 10
 
@@ -108,7 +113,7 @@ def run_nestest(dut):
     dut.rst <= 1
     dut.test_id <= 0
     #axim = AXI4LiteMaster(dut, "AXIML", dut.clk)
-    nes = NESHCI(dut, "AXIML")
+    nes = NESHCI(dut, "AXIML", backdoor = NESBackdoor(dut.dut.nes.cart_blk))
     video_in = AXI4StreamSlave(dut, "AXISS", dut.clk, width=24)
     dut.log.info("Video in start...")
 
@@ -134,3 +139,154 @@ def run_nestest(dut):
     yield Timer(CLK_PERIOD * 200000)
 
 
+
+
+@cocotb.test(skip = False)
+def rom_backdoor_test(dut):
+    """
+    Description:
+        Load PRG and CHR ROM through the backdoor and read it back through
+        the HCI, write through the HCI and read it back through the backdoor
+
+    Test ID: 1
+
+    Expected Results:
+        The HCI and the backdoor see the same data in both directions
+    """
+    dut.rst <= 1
+    dut.test_id <= 1
+    nes = NESHCI(dut, "AXIML")
+    rom = NESBackdoor(dut.dut.nes.cart_blk)
+
+    setup_dut(dut)
+    yield Timer(CLK_PERIOD * 10)
+    dut.rst <= 0
+    yield Timer(CLK_PERIOD * 10)
+
+    yield nes.reset_hci()
+    yield nes.reset_console()
+    yield Timer(CLK_PERIOD * 10)
+
+    image = load_ines("./nestest.nes")
+    prg_rom_size = image.header.prg_rom_size
+    prg_rom = Array('B', image.prg_rom)
+    chr_rom = Array('B', image.chr_rom)
+
+    #Full images go in through the backdoor
+    rom.load_prg(prg_rom)
+    rom.load_chr(chr_rom)
+
+    #Spot check both ends of each ROM through the HCI
+    prg_tail = 0x8000 + prg_rom_size - 0x10
+    yield rom.prg.verify(0x8000, prg_rom[0:0x10], frontdoor_read = nes.read_cpu_mem)
+    yield rom.prg.verify(prg_tail, prg_rom[-0x10:], frontdoor_read = nes.read_cpu_mem)
+    yield rom.chr.verify(0x0000, chr_rom[0:0x10], frontdoor_read = nes.read_ppu_mem)
+
+    #Frontdoor writes land where the backdoor expects them
+    pattern = [(i * 7 + 3) & 0xFF for i in range(0x10)]
+    yield rom.prg.verify(0x8100, pattern, frontdoor_write = nes.write_cpu_mem)
+    yield rom.chr.verify(0x0100, pattern, frontdoor_write = nes.write_ppu_mem)
+    dut.log.info("Frontdoor and backdoor agree")
+
+#Bus cycles of the HCI sequence, filled in by the benchmark tests
+BENCHMARK = {}
+
+@cocotb.coroutine
+def run_hci_benchmark(dut, test_id, pipelined):
+    dut.rst <= 1
+    dut.test_id <= test_id
+    nes = NESHCI(dut, "AXIML", pipelined = pipelined)
+
+    setup_dut(dut)
+    yield Timer(CLK_PERIOD * 10)
+    dut.rst <= 0
+    yield Timer(CLK_PERIOD * 10)
+
+    data_out = [(i * 3) & 0xFF for i in range(1024)]
+    start = get_sim_time()
+    yield nes.reset_hci()
+    yield nes.reset_console()
+    yield nes.enter_debug()
+    yield nes.write_cpu_mem(0x0000, data_out)
+    data = yield nes.read_cpu_mem(0x0000, 16)
+    cycles = (get_sim_time() - start) / CLK_PERIOD
+    if data != data_out[0:16]:
+        raise TestFailure("CPU memory read back does not match: %s" % str(data))
+
+    name = "Pipelined" if pipelined else "AXI4LiteMaster"
+    BENCHMARK[name] = cycles
+    dut.log.info("%s: HCI sequence (1KB CPU memory write) took %d bus cycles" % (name, cycles))
+
+@cocotb.test(skip = False)
+def hci_benchmark_legacy(dut):
+    """
+    Description:
+        Reset, enter debug and write 1KB of CPU memory through the HCI using
+        AXI4LiteMaster with a delay after every word
+
+    Test ID: 2
+
+    Expected Results:
+        Bus cycles are reported
+    """
+    yield run_hci_benchmark(dut, 2, False)
+
+@cocotb.test(skip = False)
+def hci_benchmark_pipelined(dut):
+    """
+    Description:
+        Run the same HCI sequence with the pipelined master
+
+    Test ID: 3
+
+    Expected Results:
+        The sequence takes fewer bus cycles than with AXI4LiteMaster
+    """
+    yield run_hci_benchmark(dut, 3, True)
+    if "AXI4LiteMaster" in BENCHMARK:
+        legacy = BENCHMARK["AXI4LiteMaster"]
+        pipelined = BENCHMARK["Pipelined"]
+        dut.log.info("Speedup: %0.2fx (%d -> %d cycles)" % (float(legacy) / pipelined, legacy, pipelined))
+        if pipelined >= legacy:
+            raise TestFailure("Pipelined master is not faster: %d >= %d cycles" % (pipelined, legacy))
+
+@cocotb.test(skip = False)
+def rom_load_test(dut):
+    """
+    Description:
+        Stream a full size image (32KB PRG ROM, 8KB CHR ROM) through the HCI
+        in TRANSFER_BLOCK_SIZE blocks, check the CRC of every block through
+        the backdoor
+
+    Test ID: 4
+
+    Expected Results:
+        Every block passes its CRC check, load time is reported
+    """
+    dut.rst <= 1
+    dut.test_id <= 4
+    nes = NESHCI(dut, "AXIML", backdoor = NESBackdoor(dut.dut.nes.cart_blk), backdoor_load = False)
+
+    setup_dut(dut)
+    yield Timer(CLK_PERIOD * 10)
+    dut.rst <= 0
+    yield Timer(CLK_PERIOD * 10)
+
+    yield nes.reset_hci()
+    yield nes.reset_console()
+    yield Timer(CLK_PERIOD * 10)
+
+    path = os.path.abspath("./full_rom.nes")
+    write_test_rom(path, 2, 1)
+    try:
+        yield nes.load_rom(path, verify = True)
+    finally:
+        os.remove(path)
+
+    stats = nes.load_stats
+    cycles = stats["time"] / CLK_PERIOD
+    dut.log.info("Loaded %d bytes in %d blocks of %d bytes: %d cycles, %0.2f bytes/cycle" %
+                 (stats["bytes"], stats["chunks"], TRANSFER_BLOCK_SIZE, cycles,
+                  float(stats["bytes"]) / cycles))
+    if stats["chunks"] != (0x8000 + 0x2000) / TRANSFER_BLOCK_SIZE:
+        raise TestFailure("Expected %d blocks, loaded %d" % ((0x8000 + 0x2000) / TRANSFER_BLOCK_SIZE, stats["chunks"]))
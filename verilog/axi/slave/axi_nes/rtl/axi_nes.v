@@ -99,31 +99,8 @@ module axi_nes #(
 );
 //local parameters
 
-//Address Map
-localparam      REG_CONTROL                   =  0;
-localparam      REG_STATUS                    =  1;
-localparam      REG_USER_INPUT                =  2;
-localparam      REG_HCI_OPCODE_COUNT          =  3;
-localparam      REG_HCI_OPCODE_ADDR           =  4;
-localparam      REG_HCI_OPCODE                =  5;
-localparam      REG_HCI_OPCODE_DATA           =  6;
-localparam      REG_HCI_READ_STB              =  7;
-localparam      REG_IMAGE_WIDTH               =  8;
-localparam      REG_IMAGE_HEIGHT              =  9;
-localparam      REG_IMAGE_SIZE                = 10;
-localparam      REG_VERSION                   = 11;
-
-
-//Control
-localparam      CONTROL_HCI_RESET             = 0;
-localparam      CONTROL_CONSOLE_RESET         = 1;
-
-//Status
-localparam      STATUS_CLOCK_LOCKED           = 0;
-localparam      STATUS_HCI_READY              = 1;
-localparam      STATUS_HCI_NEW_STATUS         = 2;
-localparam      STATUS_HCI_S_BOT              = 16;
-localparam      STATUS_HCI_S_TOP              = STATUS_HCI_S_BOT + 15;
+//Address Map, generated from cocotb/nes_hci_regs.json
+`include "axi_nes_regs.vh"
 
 
 //Register/Wire
@@ -0,0 +1,29 @@
+//Generated by register_map.py from nes_hci_regs.json, do not edit
+//DESCRIPTION_SHA1: 929ae8ef421387130d705713133fc6d40f7249ad
+
+//Registers
+localparam          REG_CONTROL             = 0;
+localparam          REG_STATUS              = 1;
+localparam          REG_USER_INPUT          = 2;
+localparam          REG_HCI_OPCODE_COUNT    = 3;
+localparam          REG_HCI_OPCODE_ADDR     = 4;
+localparam          REG_HCI_OPCODE          = 5;
+localparam          REG_HCI_OPCODE_DATA     = 6;
+localparam          REG_HCI_READ_STB        = 7;
+localparam          REG_IMAGE_WIDTH         = 8;
+localparam          REG_IMAGE_HEIGHT        = 9;
+localparam          REG_IMAGE_SIZE          = 10;
+localparam          REG_VERSION             = 11;
+
+//CONTROL
+localparam          CONTROL_HCI_RESET       = 0;
+localparam          CONTROL_CONSOLE_RESET   = 1;
+
+//STATUS
+localparam          STATUS_CLOCK_LOCKED     = 0;
+localparam          STATUS_HCI_READY        = 1;
+localparam          STATUS_HCI_NEW_STATUS   = 2;
+localparam          STATUS_HCI_S            = 16;
+localparam          STATUS_HCI_S_TOP        = 31;
+localparam          STATUS_HCI_S_BOT        = 16;
+localparam          STATUS_HCI_S_BITMASK    = 32'h0000FFFF;
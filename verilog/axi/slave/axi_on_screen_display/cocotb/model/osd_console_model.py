@@ -0,0 +1,300 @@
+"""
+Reference model of the on screen display console
+
+The console follows the character buffer: characters are written into a
+circular buffer of 2 ^ CONSOLE_DEPTH characters, lines are CHAR_IMAGE_WIDTH
+characters long and the frame shows the last CHAR_IMAGE_HEIGHT lines once
+the console scrolled. Frames are rendered by looking up every character of
+the visible page in a glyph table at once:
+
+    glyphs = load_font("fontdata.mem")
+    console = OSDConsole(image_width = 30, image_height = 24, console_depth = 5)
+    console.write_string("AB\\n")
+    expected = console.render(glyphs)
+    error = compare_frames(expected, received)
+"""
+
+import numpy as np
+
+FONT_WIDTH              = 5
+FONT_HEIGHT             = 8
+#Glyphs are padded with a blank column between characters
+FONT_WIDTH_ADJ          = FONT_WIDTH + 1
+FONT_HEIGHT_ADJ         = FONT_HEIGHT
+
+PIXEL_MASK              = 0xFFFFFF
+
+CHAR_ALT_ENABLE         = 0x100
+
+BS                      = 0x08
+HT                      = 0x09
+LF                      = 0x0A
+CR                      = 0x0D
+#Control characters the console ignores, every other character is printed
+IGNORED_CHARS           = set(range(0x00, 0x20) + [0x7F]) - set([BS, HT, LF, CR])
+
+def load_font(path):
+    """
+    Read a $readmemh font, one glyph per line, byte 'x' of a line is column
+    'x' of the glyph, bit 'y' of the byte is row 'y'
+
+    Returns (numpy bool array):
+        256 x FONT_HEIGHT x FONT_WIDTH_ADJ glyph table, the last column is
+        the blank gap between characters
+    """
+    with open(path) as f:
+        lines = [l.strip() for l in f if len(l.strip()) > 0]
+    columns = np.array([[int(l[i:i + 2], 16) for i in range(0, FONT_WIDTH * 2, 2)]
+                        for l in lines], dtype = np.uint8)
+    rows = np.unpackbits(columns[:, :, np.newaxis], axis = 2)[:, :, ::-1]
+    glyphs = np.zeros((256, FONT_HEIGHT, FONT_WIDTH_ADJ), dtype = np.bool_)
+    glyphs[0:len(lines), :, 0:FONT_WIDTH] = rows.transpose(0, 2, 1)
+    return glyphs
+
+class OSDConsole(object):
+    """
+    Console state of the character buffer
+
+    Args:
+        image_width (integer): pixels in a line of the frame
+        image_height (integer): lines in the frame
+        console_depth (integer): CONSOLE_DEPTH, address bits of the buffer
+        tab_count (integer): REG_TAB_COUNT, blanks inserted by a tab
+    """
+
+    def __init__(self, image_width, image_height, console_depth = 12, tab_count = 2):
+        object.__init__(self)
+        self.image_width = image_width
+        self.image_height = image_height
+        self.char_width = image_width / FONT_WIDTH_ADJ
+        self.char_height = image_height / FONT_HEIGHT_ADJ
+        self.char_size = self.char_width * self.char_height
+        self.console_size = 1 << console_depth
+        self.max_lines = self.console_size / self.char_width
+        self.tab_count = tab_count
+        self.memory = np.zeros(self.console_size, dtype = np.uint8)
+        self.clear_screen()
+
+    def clear_screen(self):
+        """
+        Blank the buffer and move the cursor to the top left of the frame
+        """
+        self.memory[:] = 0
+        self.pos = 0
+        self.end = self.console_size - 1
+        self.curr_line = 0
+        self.next_line = self.char_width
+        self.line_count = 0
+        self.start = 0
+
+    @property
+    def cursor(self):
+        """
+        Returns (tuple of integers):
+            column and line of the cursor within the page
+        """
+        line = (self.pos - self.start) % self.console_size
+        return line % self.char_width, line / self.char_width
+
+    def _store(self, c):
+        self.memory[self.pos % self.console_size] = c
+
+    def _advance(self):
+        if (self.pos % self.console_size) == self.end:
+            self.end = (self.end + 1) % self.console_size
+        self.pos += 1
+
+    def _wrap(self):
+        """
+        The cursor moved past the end of the line, move the line pointers
+        down and scroll once the page is full
+        """
+        if self.pos < self.next_line:
+            return
+        if self.line_count < self.max_lines:
+            self.line_count += 1
+        self.curr_line += self.char_width
+        self.next_line += self.char_width
+        if self.curr_line > self.console_size + self.char_width:
+            self.curr_line -= self.console_size
+            self.next_line -= self.console_size
+            self.pos -= self.console_size
+        if self.line_count >= self.char_height:
+            self.start = (self.next_line - self.char_size) % self.console_size
+
+    def _unwrap(self):
+        """
+        Backspace moved the cursor before the start of the line
+        """
+        if self.line_count > 0:
+            self.line_count -= 1
+        #The first lines move to the top of the buffer so the cursor doesn't
+        #underflow
+        if self.curr_line < (2 * self.char_width):
+            self.curr_line += self.console_size - self.char_width
+            self.pos += self.console_size
+        else:
+            self.curr_line -= self.char_width
+        if self.next_line < (3 * self.char_width):
+            self.next_line += self.console_size - self.char_width
+        else:
+            self.next_line -= self.char_width
+        if self.line_count >= self.char_height:
+            self.start = (self.next_line - self.char_size) % self.console_size
+
+    def _backspace(self):
+        """
+        Step back over blanks (tabs and the end of lines) and erase the first
+        character found, a backspace crosses at most one line
+        """
+        crossed = False
+        while self.memory[self.pos % self.console_size] == 0:
+            if crossed and self.pos == self.curr_line:
+                return
+            if self.pos == ((self.end + 1) % self.console_size):
+                return
+            self.pos -= 1
+            if self.pos < self.curr_line:
+                self._unwrap()
+                crossed = True
+        self._store(0)
+
+    def _newline(self):
+        """
+        Blank the rest of the line and the whole next line, the cursor goes
+        to the start of the next line
+        """
+        while self.pos < self.next_line:
+            self._store(0)
+            self.pos += 1
+        self._wrap()
+        while self.pos < self.next_line:
+            self._store(0)
+            self._advance()
+        self.pos = self.curr_line
+
+    def write(self, c):
+        """
+        Write a value to REG_CONSOLE_CHAR
+
+        Args:
+            c (integer): character, with CHAR_ALT_ENABLE set control
+                characters are printed instead of interpreted
+        """
+        if c & CHAR_ALT_ENABLE:
+            self._print(c & 0xFF)
+            return
+        c &= 0xFF
+        if c == BS:
+            self._backspace()
+        elif c == HT:
+            self._store(0)
+            for i in range(self.tab_count):
+                self._advance()
+                self._wrap()
+                self._store(0)
+        elif c in (LF, CR):
+            self._newline()
+        elif c not in IGNORED_CHARS:
+            self._print(c)
+
+    def write_string(self, s):
+        for c in s:
+            self.write(ord(c))
+
+    def _print(self, c):
+        self._store(c)
+        self._advance()
+        self._wrap()
+
+    def page(self):
+        """
+        Returns (numpy uint8 array):
+            char_height x char_width characters shown in the frame
+        """
+        addresses = (self.start + np.arange(self.char_size)) % self.console_size
+        return self.memory[addresses].reshape(self.char_height, self.char_width)
+
+    def render(self, glyphs, fg_color = 0xFFFFFF, bg_color = 0x000000,
+               x_start = 0, x_end = None, y_start = 0, y_end = None):
+        """
+        Expected frame of the core
+
+        Args:
+            glyphs (numpy array): glyph table from load_font
+            fg_color (integer): REG_FG_COLOR
+            bg_color (integer): REG_BG_COLOR
+            x_start, x_end, y_start, y_end (integer): REG_X_START ...
+                REG_Y_END, pixels outside of the window are the background
+                color, the defaults are the whole image
+
+        Returns (numpy uint32 array):
+            image_height x image_width frame
+        """
+        if x_end is None:
+            x_end = self.image_width
+        if y_end is None:
+            y_end = self.image_height
+        #(lines, columns, font height, font width) -> (pixel rows, pixel columns)
+        text = glyphs[self.page()].transpose(0, 2, 1, 3)
+        text = text.reshape(self.char_height * FONT_HEIGHT_ADJ, self.char_width * FONT_WIDTH_ADJ)
+        mask = np.zeros((self.image_height, self.image_width), dtype = np.bool_)
+        mask[0:text.shape[0], 0:text.shape[1]] = text
+        y = np.arange(self.image_height)[:, np.newaxis]
+        x = np.arange(self.image_width)[np.newaxis, :]
+        mask &= (x >= x_start) & (x <= x_end) & (y >= y_start) & (y <= y_end)
+        return np.where(mask, np.uint32(fg_color & PIXEL_MASK),
+                        np.uint32(bg_color & PIXEL_MASK)).astype(np.uint32)
+
+def compare_frames(expected, received):
+    """
+    Compare a received frame with the expected one
+
+    Args:
+        expected (numpy array): height x width frame from OSDConsole.render
+        received (numpy array): pixels in the order they were received
+
+    Returns (string or None):
+        description of the first mismatch, None if the frames match
+    """
+    received = np.asarray(received, dtype = np.uint32)
+    if received.size != expected.size:
+        return "Received %d pixels, expected %d" % (received.size, expected.size)
+    received = received.reshape(expected.shape)
+    if np.array_equal(received, expected):
+        return None
+    errors = np.argwhere(received != expected)
+    y, x = errors[0]
+    return "%d pixels differ, first at (%d, %d): 0x%06X != 0x%06X" % \
+            (len(errors), x, y, received[y, x], expected[y, x])
+
+def compare_frame_updates(expected, received):
+    """
+    Compare a frame that was read while the console changed, the core reads
+    the character buffer again for every line of pixels so each line can
+    come from a later state of the console than the line above it
+
+    Args:
+        expected (list of numpy arrays): frames rendered after every write
+            made while the frame was read, oldest first
+        received (numpy array): pixels in the order they were received
+
+    Returns (string or None):
+        description of the first line that matches none of the frames, None
+        if the frame matches
+    """
+    frames = np.array(expected, dtype = np.uint32)
+    received = np.asarray(received, dtype = np.uint32)
+    if received.size != frames[0].size:
+        return "Received %d pixels, expected %d" % (received.size, frames[0].size)
+    received = received.reshape(frames[0].shape)
+    #(frames, lines): line 'y' of the received frame matches frame 'n'
+    matches = (frames == received[np.newaxis]).all(axis = 2)
+    n = 0
+    for y in range(received.shape[0]):
+        while n < len(frames) and not matches[n, y]:
+            n += 1
+        if n == len(frames):
+            return "Line %d matches none of the %d console states: %s" % \
+                    (y, len(frames), compare_frames(expected[-1][y], received[y]))
+    return None
@@ -7,15 +7,32 @@ from cocotb.clock import Clock
 import time
 from array import array as Array
 from cocotb.triggers import Timer, FallingEdge
+from cocotb.result import ReturnValue
+import numpy as np
 
 from cocotb.drivers.amba import AXI4LiteMaster
 from cocotb.drivers.amba import AXI4StreamSlave
 
+from backdoor import BRAMBackdoor
+
+from osd_console_model import OSDConsole
+from osd_console_model import load_font
+from osd_console_model import compare_frames
+from osd_console_model import compare_frame_updates
+
 CLK_PERIOD = 10
 
 MODULE_PATH = os.path.join(os.path.dirname(__file__), os.pardir, "rtl")
 MODULE_PATH = os.path.abspath(MODULE_PATH)
 
+FONT_PATH = os.path.join(os.path.dirname(__file__), "fontdata.mem")
+
+#Parameters of tb_cocotb.v
+CONSOLE_DEPTH                   = 5
+IMAGE_WIDTH                     = 30
+IMAGE_HEIGHT                    = 24
+TAB_COUNT                       = 2
+
 
 
 BIT_CTRL_EN                     = 0
@@ -40,20 +57,149 @@ REG_TAB_COUNT                   = 9
 REG_X_START                     = 10
 REG_X_END                       = 11
 REG_Y_START                     = 12
-REG_X_END                       = 13
-REG_VERSION                     = 14
+REG_Y_END                       = 13
+REG_ADAPTER_DEBUG               = 14
+REG_VERSION                     = 15
+
+def load_font_mem(font_buffer, font_mem_path):
+    """
+    Write the font straight into the font buffer (no simulation time)
+
+    Args:
+        font_buffer: simulator handle of the font bram instance
+        font_mem_path (string): $readmemh style file, one glyph per line
+    """
+    font = BRAMBackdoor(font_buffer)
+    font.load(font_mem_path)
+    return font
+
+@cocotb.coroutine
+def collect_frame(axis_slave, pixels):
+    """
+    Read lines until 'pixels' pixels arrived
+
+    Returns (numpy uint32 array):
+        pixels in the order they were received
+    """
+    frame = np.zeros(pixels, dtype = np.uint32)
+    count = 0
+    while count < pixels:
+        data = yield axis_slave.read()
+        if count + len(data) > pixels:
+            raise TestFailure("Received %d pixels, expected %d" % (count + len(data), pixels))
+        frame[count:count + len(data)] = [int(d) for d in data]
+        count += len(data)
+    raise ReturnValue(frame)
+
+class ConsoleChecker(object):
+    """
+    Write characters to the core and to the console model, every frame the
+    core sends is compared with the console
+
+    The console can change while a frame is read so a frame is compared
+    with every console state since the write before the frame started
+    """
 
-def load_font_mem(font_mem, font_mem_path):
-    f = open(font_mem_path)
-    lines = f.readlines()
-    f.close()
-    for i in range(len(lines)):
-        data = int(lines[i], '16')
-        font_mem_path[i] = data
+    def __init__(self, dut, axim, video_in):
+        object.__init__(self)
+        self.dut = dut
+        self.axim = axim
+        self.video_in = video_in
+        self.console = OSDConsole(IMAGE_WIDTH, IMAGE_HEIGHT, CONSOLE_DEPTH, TAB_COUNT)
+        self.glyphs = load_font(FONT_PATH)
+        self.states = [self.console.render(self.glyphs)]
+        self.frames = 0
+        self.last_frame = None
+        self.errors = []
+
+    def start(self):
+        cocotb.fork(self._monitor())
+
+    def _update(self):
+        self.states.append(self.console.render(self.glyphs))
+
+    @cocotb.coroutine
+    def write(self, c):
+        yield self.axim.write(REG_CONSOLE_CHAR, c)
+        self.console.write(c)
+        self._update()
+
+    @cocotb.coroutine
+    def clear_screen(self, control):
+        yield self.axim.write(REG_CONTROL, control | (1 << BIT_CTRL_CLEAR_SCREEN_STB))
+        self.console.clear_screen()
+        self._update()
+
+    @cocotb.coroutine
+    def _monitor(self):
+        while True:
+            first = max(0, len(self.states) - 2)
+            frame = yield collect_frame(self.video_in, IMAGE_WIDTH * IMAGE_HEIGHT)
+            error = compare_frame_updates(self.states[first:], frame)
+            if error is not None:
+                self.dut.log.error("Frame %d: %s" % (self.frames, error))
+                self.errors.append(error)
+            self.frames += 1
+            self.last_frame = frame
+
+    @cocotb.coroutine
+    def wait_frames(self, count):
+        """
+        Wait until the core sent 'count' more frames
+        """
+        frames = self.frames + count
+        while self.frames < frames:
+            yield Timer(CLK_PERIOD * 100)
+
+    def check(self):
+        """
+        Raises:
+            TestFailure: a frame didn't match the console or the last frame
+                doesn't show the final state of the console
+        """
+        self.dut.log.info("Checked %d frames, cursor at %s" % (self.frames, str(self.console.cursor)))
+        if len(self.errors) > 0:
+            raise TestFailure("%d of %d frames didn't match the console, first: %s" %
+                              (len(self.errors), self.frames, self.errors[0]))
+        if self.last_frame is None:
+            raise TestFailure("No frames received")
+        error = compare_frames(self.states[-1], self.last_frame)
+        if error is not None:
+            raise TestFailure("Last frame: %s" % error)
 
 def setup_dut(dut):
     cocotb.fork(Clock(dut.clk, CLK_PERIOD).start())
 
+@cocotb.coroutine
+def setup_console(dut, test_id, enable = True):
+    """
+    Load the font, reset the core and start checking frames
+
+    Returns (tuple):
+        AXI4LiteMaster, ConsoleChecker and the control register value
+    """
+    load_font_mem(dut.dut.cosd.font_buffer, FONT_PATH)
+    dut.rst <= 1
+    dut.test_id <= test_id
+    axim = AXI4LiteMaster(dut, "AXIML", dut.clk)
+    video_in = AXI4StreamSlave(dut, "AXISS", dut.clk, width=24)
+    checker = ConsoleChecker(dut, axim, video_in)
+
+    setup_dut(dut)
+    yield Timer(CLK_PERIOD * 10)
+    dut.rst <= 0
+    yield Timer(CLK_PERIOD * 10)
+    dut.log.info("Ready")
+    yield Timer(CLK_PERIOD * 300)
+
+    control = 0x00
+    if enable:
+        control |= 1 << BIT_CTRL_EN
+        yield axim.write(REG_CONTROL, control)
+        yield Timer(CLK_PERIOD * 10)
+        checker.start()
+    raise ReturnValue((axim, checker, control))
+
 @cocotb.test(skip = True)
 def first_test(dut):
     """
@@ -78,7 +224,7 @@ def first_test(dut):
     yield Timer(CLK_PERIOD * 300)
 
 
-@cocotb.test(skip = True)
+@cocotb.test(skip = False)
 def write_char_test(dut):
     """
     Description:
@@ -88,37 +234,23 @@ def write_char_test(dut):
     Test ID: 1
 
     Expected Results:
-        **
+        Every frame matches the console model
     """
-    dut.rst <= 1
-    dut.test_id <= 1
-    axim = AXI4LiteMaster(dut, "AXIML", dut.clk)
-    video_in = AXI4StreamSlave(dut, "AXISS", dut.clk, width=24)
-
-    setup_dut(dut)
-    yield Timer(CLK_PERIOD * 10)
-    dut.rst <= 0
-    yield Timer(CLK_PERIOD * 10)
-    dut.log.info("Ready")
-    yield Timer(CLK_PERIOD * 300)
-
-    control = 0x00
-    control |= 1 << BIT_CTRL_EN
-    yield axim.write(REG_CONTROL, control)
-    yield Timer(CLK_PERIOD * 10)
+    axim, checker, control = yield setup_console(dut, 1)
 
     #Write a characer down
-    char_val = 0x41
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
+    yield checker.write(0x41)
     yield Timer(CLK_PERIOD * 10)
 
     #Write a characer down
-    char_val = 0x42
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
+    yield checker.write(0x42)
     yield Timer(CLK_PERIOD * 100)
 
+    yield checker.wait_frames(2)
+    checker.check()
 
-@cocotb.test(skip = True)
+
+@cocotb.test(skip = False)
 def write_carriage_return(dut):
     """
     Description:
@@ -128,42 +260,26 @@ def write_carriage_return(dut):
     Test ID: 2
 
     Expected Results:
-        **
+        Every frame matches the console model, the cursor is at the start
+        of the second line
     """
-    dut.rst <= 1
-    dut.test_id <= 2
-    axim = AXI4LiteMaster(dut, "AXIML", dut.clk)
-    video_in = AXI4StreamSlave(dut, "AXISS", dut.clk, width=24)
+    axim, checker, control = yield setup_console(dut, 2)
 
-    setup_dut(dut)
-    yield Timer(CLK_PERIOD * 10)
-    dut.rst <= 0
+    yield checker.write(0x41)
     yield Timer(CLK_PERIOD * 10)
-    dut.log.info("Ready")
-    yield Timer(CLK_PERIOD * 300)
 
-    control = 0x00
-    control |= 1 << BIT_CTRL_EN
-    yield axim.write(REG_CONTROL, control)
-    yield Timer(CLK_PERIOD * 10)
-
-    #Write a characer down
-    char_val = 0x41
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 10)
-
-    #Write a characer down
-    char_val = 0x42
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
+    yield checker.write(0x42)
     yield Timer(CLK_PERIOD * 10)
 
     #Write a carriage return
-    char_val = 0x0D
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
+    yield checker.write(0x0D)
     yield Timer(CLK_PERIOD * 100)
 
+    yield checker.wait_frames(2)
+    checker.check()
 
-@cocotb.test(skip = True)
+
+@cocotb.test(skip = False)
 def write_tab(dut):
     """
     Description:
@@ -172,457 +288,157 @@ def write_tab(dut):
     Test ID: 3
 
     Expected Results:
-        **
+        Every frame matches the console model, the character after the tab
+        is TAB_COUNT characters to the right
     """
-    dut.rst <= 1
-    dut.test_id <= 3
-    axim = AXI4LiteMaster(dut, "AXIML", dut.clk)
-    video_in = AXI4StreamSlave(dut, "AXISS", dut.clk, width=24)
-
-    setup_dut(dut)
-    yield Timer(CLK_PERIOD * 10)
-    dut.rst <= 0
-    yield Timer(CLK_PERIOD * 10)
-    dut.log.info("Ready")
-    yield Timer(CLK_PERIOD * 300)
+    axim, checker, control = yield setup_console(dut, 3)
 
-    control = 0x00
-    control |= 1 << BIT_CTRL_EN
-    yield axim.write(REG_CONTROL, control)
+    yield checker.write(0x41)
     yield Timer(CLK_PERIOD * 10)
 
-    #Write a characer down
-    char_val = 0x41
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
+    #Write a tab
+    yield checker.write(0x09)
     yield Timer(CLK_PERIOD * 10)
 
-    #Write a carriage return
-    char_val = 0x09
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
+    yield checker.write(0x42)
     yield Timer(CLK_PERIOD * 100)
 
-@cocotb.test(skip = True)
+    yield checker.wait_frames(2)
+    checker.check()
+
+@cocotb.test(skip = False)
 def test_backspace(dut):
     """
     Description:
-        Write a tab down
+        Write three characters down and remove them with backspaces
 
     Test ID: 4
 
     Expected Results:
-        **
+        Every frame matches the console model, the page is blank at the end
     """
-    dut.rst <= 1
-    dut.test_id <= 4
-    axim = AXI4LiteMaster(dut, "AXIML", dut.clk)
-    video_in = AXI4StreamSlave(dut, "AXISS", dut.clk, width=24)
-
-    setup_dut(dut)
-    yield Timer(CLK_PERIOD * 10)
-    dut.rst <= 0
-    yield Timer(CLK_PERIOD * 10)
-    dut.log.info("Ready")
-    yield Timer(CLK_PERIOD * 300)
-
-    control = 0x00
-    control |= 1 << BIT_CTRL_EN
-    yield axim.write(REG_CONTROL, control)
-    yield Timer(CLK_PERIOD * 10)
-
-    #Write a characer down
-    char_val = 0x41
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 10)
-
-    #Write a characer down
-    char_val = 0x42
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 10)
-
-    #Write a characer down
-    char_val = 0x43
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 10)
-
-
-    #Write a backspace
-    char_val = 0x08
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 10)
-
-
-    #Write a backspace
-    char_val = 0x08
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 10)
+    axim, checker, control = yield setup_console(dut, 4)
 
+    for c in [0x41, 0x42, 0x43]:
+        yield checker.write(c)
+        yield Timer(CLK_PERIOD * 10)
 
-    #Write a backspace
-    char_val = 0x08
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 10)
+    #Write backspaces
+    for i in range(3):
+        yield checker.write(0x08)
+        yield Timer(CLK_PERIOD * 10)
 
+    yield checker.wait_frames(2)
+    checker.check()
 
 
-@cocotb.test(skip = True)
+@cocotb.test(skip = False)
 def write_full_page_char_test(dut):
     """
     Description:
+        Write characters before the core is enabled, clear the screen and
+        fill the page with characters and line feeds until it scrolls
 
     Test ID: 5
 
     Expected Results:
-        **
+        Every frame matches the console model
     """
-    #load_font_mem(dut.dut.cosd.font_buffer.mem, "../rtl/fontdata.mem")
-    dut.rst <= 1
-    dut.test_id <= 5
-    axim = AXI4LiteMaster(dut, "AXIML", dut.clk)
-    video_in = AXI4StreamSlave(dut, "AXISS", dut.clk, width=24)
-
-    setup_dut(dut)
-    yield Timer(CLK_PERIOD * 10)
-    dut.rst <= 0
-    yield Timer(CLK_PERIOD * 10)
-    dut.log.info("Ready")
-    yield Timer(CLK_PERIOD * 300)
-
-    #Write a characer down
-    char_val = 0x41
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 5)
-
-    #Write a characer down
-    char_val = 0x102
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 5)
-
-    char_val = 0x0A
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 5)
+    axim, checker, control = yield setup_console(dut, 5, enable = False)
 
+    #Write a character, an alternate character and a line feed
+    for c in [0x41, 0x102, 0x0A]:
+        yield checker.write(c)
+        yield Timer(CLK_PERIOD * 5)
 
-
-    control = 0x00
     control |= 1 << BIT_CTRL_EN
     yield axim.write(REG_CONTROL, control)
     yield Timer(CLK_PERIOD * 10)
-    #control = 0x00
-    #control &= ~(1 << BIT_CTRL_EN)
-    #yield axim.write(REG_CONTROL, control)
+    checker.start()
 
-    yield video_in.read()
+    yield checker.wait_frames(1)
     yield Timer(CLK_PERIOD * 2000)
-    control |= (1 << BIT_CTRL_CLEAR_SCREEN_STB)
-    yield axim.write(REG_CONTROL, control)
+    yield checker.clear_screen(control)
 
     yield Timer(CLK_PERIOD * 4000)
 
-    #Write a characer down
-    char_val = 0x41
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 1)
-    #Write a characer down
-    char_val = 0x0A
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 1)
-
-    char_val = 0x0A
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 1)
-
-    char_val = 0x41
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 1)
-
-    char_val = 0x41
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 1)
-
-    char_val = 0x41
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 1)
-
-    char_val = 0x41
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 1)
-
-    char_val = 0x0A
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 1)
-
-    char_val = 0x0A
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 1)
-
-    char_val = 0x0A
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 1)
-
-    char_val = 0x41
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 1)
-
-    char_val = 0x0A
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 1)
-
-    char_val = 0x41
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 1)
-
-    char_val = 0x0A
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 1)
-
-    char_val = 0x41
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 1)
-
-    char_val = 0x0A
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 1)
-
-    char_val = 0x41
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 1)
+    for c in [0x41, 0x0A, 0x0A, 0x41, 0x41, 0x41, 0x41, 0x0A, 0x0A, 0x0A,
+              0x41, 0x0A, 0x41, 0x0A, 0x41, 0x0A, 0x41]:
+        yield checker.write(c)
+        yield Timer(CLK_PERIOD * 1)
 
     yield Timer(CLK_PERIOD * 6000)
+    yield checker.wait_frames(2)
+    checker.check()
 
 
-@cocotb.test(skip = True)
+@cocotb.test(skip = False)
 def write_full_page_char_backspace_test(dut):
     """
     Description:
         Test backspaces
 
+        Write more lines than fit on the page, then remove the last lines
+        with backspaces
+
     Test ID: 6
 
     Expected Results:
-        **
+        Every frame matches the console model
     """
-    #load_font_mem(dut.dut.cosd.font_buffer.mem, "../rtl/fontdata.mem")
-    dut.rst <= 1
-    dut.test_id <= 6
-    axim = AXI4LiteMaster(dut, "AXIML", dut.clk)
-    video_in = AXI4StreamSlave(dut, "AXISS", dut.clk, width=24)
+    axim, checker, control = yield setup_console(dut, 6, enable = False)
 
-    setup_dut(dut)
-    yield Timer(CLK_PERIOD * 10)
-    dut.rst <= 0
-    yield Timer(CLK_PERIOD * 10)
-    dut.log.info("Ready")
-    yield Timer(CLK_PERIOD * 300)
-
-    #Write a characer down
-    char_val = 0x41
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 5)
+    for c in [0x41, 0x102, 0x0A]:
+        yield checker.write(c)
+        yield Timer(CLK_PERIOD * 5)
 
-    #Write a characer down
-    char_val = 0x102
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 5)
-
-    char_val = 0x0A
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 5)
-
-
-
-    control = 0x00
     control |= 1 << BIT_CTRL_EN
     yield axim.write(REG_CONTROL, control)
     yield Timer(CLK_PERIOD * 10)
-    #control = 0x00
-    #control &= ~(1 << BIT_CTRL_EN)
-    #yield axim.write(REG_CONTROL, control)
+    checker.start()
 
-    yield video_in.read()
+    yield checker.wait_frames(1)
     yield Timer(CLK_PERIOD * 100)
 
-    #Write a characer down
-    char_val = 0x41
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 1)
-    #Write a characer down
-    char_val = 0x0A
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 1)
-
-    char_val = 0x42
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 1)
-
-    char_val = 0x0A
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 1)
-
-    char_val = 0x43
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 1)
-
-    char_val = 0x0A
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 1)
-
-    char_val = 0x44
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 1)
-
-    char_val = 0x0A
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 1)
- 
-    char_val = 0x45
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 1)
-
-    char_val = 0x0A
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 1)
-
-    char_val = 0x46
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 1)
-
-    char_val = 0x0A
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 1)
-
-    char_val = 0x47
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 1)
-
-    char_val = 0x0A
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 1)
-
-    char_val = 0x48
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 1)
-
-    char_val = 0x0A
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 1)
-
-    char_val = 0x49
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 1)
-
-    char_val = 0x0A
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 1)
-
-    char_val = 0x4A
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 1)
-
-    char_val = 0x0A
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 1)
-
-    char_val = 0x0A
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 1)
-
-
-
-    '''
-    char_val = 0x0A
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 1)
-
-    char_val = 0x4B
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 1)
-
-    char_val = 0x0A
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 1)
-
-    char_val = 0x4C
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 1)
-
-    char_val = 0x0A
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 1)
-
-    char_val = 0x4D
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 1)
-    '''
-
-
+    #'A' to 'J', each on its own line
+    for c in range(0x41, 0x4B):
+        yield checker.write(c)
+        yield Timer(CLK_PERIOD * 1)
+        yield checker.write(0x0A)
+        yield Timer(CLK_PERIOD * 1)
 
+    yield checker.write(0x0A)
     yield Timer(CLK_PERIOD * 100)
 
-    #Insert a backspace
-    char_val = 0x08
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
+    #Insert backspaces
+    yield checker.write(0x08)
     yield Timer(CLK_PERIOD * 50)
 
-    char_val = 0x08
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 100)
-
-    char_val = 0x08
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 100)
-
-    char_val = 0x08
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 100)
-
-    char_val = 0x08
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 100)
-
-    '''
-    char_val = 0x08
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 100)
-
-    char_val = 0x08
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
-    yield Timer(CLK_PERIOD * 100)
-
-    '''
-
-
+    for i in range(4):
+        yield checker.write(0x08)
+        yield Timer(CLK_PERIOD * 100)
 
     yield Timer(CLK_PERIOD * 4000)
+    yield checker.wait_frames(2)
+    checker.check()
 
 @cocotb.test(skip = False)
-def write_char_test(dut):
+def write_alt_char_test(dut):
     """
     Description:
+        Write a control character with the alternate character bit set
 
     Test ID: 7
 
     Expected Results:
-        **
+        The glyph of the control character is shown instead of the control
+        character being interpreted
     """
-    dut.rst <= 1
-    dut.test_id <= 7
-    axim = AXI4LiteMaster(dut, "AXIML", dut.clk)
-    video_in = AXI4StreamSlave(dut, "AXISS", dut.clk, width=24)
-
-    setup_dut(dut)
-    yield Timer(CLK_PERIOD * 10)
-    dut.rst <= 0
-    yield Timer(CLK_PERIOD * 10)
-    dut.log.info("Ready")
-    yield Timer(CLK_PERIOD * 300)
-
-    control = 0x00
-    control |= 1 << BIT_CTRL_EN
-    yield axim.write(REG_CONTROL, control)
-    yield Timer(CLK_PERIOD * 10)
+    axim, checker, control = yield setup_console(dut, 7)
 
     #Write a characer down
-    char_val = 0x0101
-    yield axim.write(REG_CONSOLE_CHAR, char_val)
+    yield checker.write(0x0101)
     yield Timer(CLK_PERIOD * 10)
 
+    yield checker.wait_frames(2)
+    checker.check()
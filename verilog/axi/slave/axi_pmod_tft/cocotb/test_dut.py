@@ -7,10 +7,15 @@ from cocotb.clock import Clock
 import time
 from array import array as Array
 from cocotb.triggers import Timer, FallingEdge
+from cocotb.result import ReturnValue
+from cocotb.utils import get_sim_time
+import numpy as np
 
 from cocotb.drivers.amba import AXI4LiteMaster
 from cocotb.drivers.amba import AXI4StreamMaster
 
+from tft_monitor import TFTMonitor
+
 CLK_PERIOD = 10
 
 MODULE_PATH = os.path.join(os.path.dirname(__file__), os.pardir, "rtl")
@@ -60,11 +65,160 @@ HEIGHT               = 4
 H_BLANK              = 40
 V_BLANK              = 200
 
+#Size of the panel
+PANEL_WIDTH          = 320
+PANEL_HEIGHT         = 240
+
+PIXEL_MASK           = 0xFFFFFF
+
+#Clocks to wait for a frame after the last line was sent
+FRAME_TIMEOUT        = 10000
 
 
 def setup_dut(dut):
     cocotb.fork(Clock(dut.clk, CLK_PERIOD).start())
 
+def test_frame(width, height, index = 0):
+    """
+    Returns (numpy uint32 array):
+        height x width frame, every pixel is its position in the frame and
+        the frame index so misplaced pixels and stale frames point at
+        where they came from
+    """
+    pixels = np.arange(width * height, dtype = np.uint32) + (index * width * height)
+    return (pixels & PIXEL_MASK).reshape(height, width)
+
+def compare_frames(expected, received):
+    """
+    Returns (string or None):
+        description of the first mismatch, None if the frames match
+    """
+    if np.array_equal(received, expected):
+        return None
+    errors = np.argwhere(received != expected)
+    y, x = errors[0]
+    return "%d pixels differ, first at (%d, %d): 0x%06X != 0x%06X" % \
+            (len(errors), x, y, received[y, x], expected[y, x])
+
+@cocotb.coroutine
+def setup_video(dut, test_id, width, height):
+    """
+    Reset the core and the LCD, set up the image size and enable writing
+    images, the frames written to the LCD are monitored from the start
+
+    Returns (tuple):
+        AXI4StreamMaster, TFTMonitor
+    """
+    dut.rst <= 1
+    dut.i_fsync <= 0
+    dut.test_id <= test_id
+    axim = AXI4LiteMaster(dut, "AXIML", dut.clk)
+    video_out = AXI4StreamMaster(dut, "AXIMS", dut.clk, width=24)
+    monitor = TFTMonitor(dut.w_cs_n, dut.w_write_n, dut.w_register_data_sel,
+                         dut.w_out_data, dut.r_tearing_effect, width, height)
+
+    setup_dut(dut)
+    yield Timer(CLK_PERIOD * 10)
+    dut.rst <= 0
+
+    dut.log.info("Ready")
+    yield Timer(CLK_PERIOD * 10)
+    monitor.start()
+
+    control = 0x00
+    control |= 1 << BIT_CONTROL_CHIP_SELECT
+    control |= 1 << BIT_CONTROL_RESET_DISPLAY
+    control |= 1 << BIT_CONTROL_ENABLE
+    control |= 1 << BIT_CONTROL_BACKLIGHT_ENABLE
+    control |= 1 << BIT_CONTROL_WRITE_OVERRIDE
+
+    #Reset the LCD
+    yield axim.write(REG_CONTROL, control)
+    yield Timer(CLK_PERIOD * 10)
+
+    control &= ~(1 << BIT_CONTROL_RESET_DISPLAY)
+    control &= ~(1 << BIT_CONTROL_WRITE_OVERRIDE)
+
+    yield axim.write(REG_CONTROL, control)
+    yield Timer(CLK_PERIOD * 10)
+
+    #Set the pixel count
+    yield axim.write(REG_IMAGE_WIDTH, width)
+    yield Timer(CLK_PERIOD * 10)
+
+    yield axim.write(REG_IMAGE_HEIGHT, height)
+    yield Timer(CLK_PERIOD * 10)
+
+    yield axim.write(REG_IMAGE_SIZE, width * height)
+    yield Timer(CLK_PERIOD * 10)
+
+    #Enable image write, the chip stays selected so the monitor sees the
+    #pixels
+    control = 0x00
+    control |= 1 << BIT_CONTROL_ENABLE
+    control |= 1 << BIT_CONTROL_BACKLIGHT_ENABLE
+    control |= 1 << BIT_CONTROL_CHIP_SELECT
+    yield axim.write(REG_CONTROL, control)
+    yield Timer(CLK_PERIOD * 10)
+    raise ReturnValue((video_out, monitor))
+
+@cocotb.coroutine
+def write_frame(dut, video_out, frame):
+    """
+    Stream a frame to the core one line at a time, the frame sync (TUSER)
+    is high while the frame is sent
+    """
+    dut.i_fsync <= 1
+    for line in frame:
+        yield video_out.write(line.tolist())
+
+    yield Timer(CLK_PERIOD * 10)
+    dut.i_fsync <= 0
+    yield Timer(CLK_PERIOD * 10)
+
+@cocotb.coroutine
+def write_and_check_frames(dut, video_out, monitor, frames):
+    """
+    Stream frames to the core and compare the frames written to the LCD
+    with them
+
+    Raises:
+        TestFailure: a frame was missing or doesn't match
+    """
+    for frame in frames:
+        yield write_frame(dut, video_out, frame)
+
+    timeout = get_sim_time() + FRAME_TIMEOUT * CLK_PERIOD
+    while len(monitor.frames) < len(frames) and get_sim_time() < timeout:
+        yield Timer(CLK_PERIOD * 100)
+
+    if len(monitor.errors) > 0:
+        raise TestFailure(monitor.errors[0])
+    if len(monitor.frames) != len(frames):
+        raise TestFailure("Sent %d frames, the LCD received %d" % (len(frames), len(monitor.frames)))
+    for i in range(len(frames)):
+        error = compare_frames(frames[i], monitor.frames[i][0])
+        if error is not None:
+            raise TestFailure("Frame %d: %s" % (i, error))
+
+def log_frame_rate(dut, monitor):
+    """
+    Report the frames per second at CLK_PERIOD against the rate of the
+    tearing effect (frame sync) of the panel
+    """
+    clock_rate = 1000000000.0 / CLK_PERIOD
+    frame_clocks = monitor.frame_period() / CLK_PERIOD
+    frame, start, end = monitor.frames[0]
+    write_clocks = float(end - start) / CLK_PERIOD
+    dut.log.info("%dx%d: %d clocks to write a frame (%0.2f clocks/pixel), %d clocks between frames, %0.1f FPS" %
+                 (monitor.width, monitor.height, write_clocks, write_clocks / frame.size,
+                  frame_clocks, clock_rate / frame_clocks))
+    tear_period = monitor.tear_period()
+    if tear_period is not None:
+        tear_clocks = tear_period / CLK_PERIOD
+        dut.log.info("Tearing effect every %d clocks (%0.1f Hz), a frame every %0.2f tearing effects" %
+                     (tear_clocks, clock_rate / tear_clocks, frame_clocks / tear_clocks))
+
 @cocotb.test(skip = True)
 def write_to_controller(dut):
     """
@@ -311,93 +465,14 @@ def write_single_frame(dut):
     Test ID: 2
 
     Expected Results:
-        Should read images out of the controller
-        *** NEED SOMETHING TO VERIFY THE IMAGES ARE CORRECT!!!***
+        The image rebuilt from the LCD pins matches the image sent
     """
-    dut.rst <= 1
-    dut.i_fsync <= 0;
-    dut.test_id <= 2
-    axim = AXI4LiteMaster(dut, "AXIML", dut.clk)
-
-    video_out = AXI4StreamMaster(dut, "AXIMS", dut.clk, width=24)
+    video_out, monitor = yield setup_video(dut, 2, WIDTH, HEIGHT)
+    frames = [test_frame(WIDTH, HEIGHT)]
+    yield write_and_check_frames(dut, video_out, monitor, frames)
 
 
-    NUM_FRAMES          = 1
-    HEIGHT              = 4
-    WIDTH               = 4
-
-    video = []
-    for y in range (HEIGHT):
-        line = []
-        for x in range (WIDTH):
-            if x == 0:
-                value  =  0xFFFFFF
-                line.append(value)
-            elif x == (WIDTH) - 1:
-                value  =  0xFFFFFF
-                line.append(value)
-            else:
-                value  = x
-                line.append(value)
-        video.append(line)
-
-
-    setup_dut(dut)
-    yield Timer(CLK_PERIOD * 10)
-    dut.rst <= 0
-
-    dut.log.info("Ready")
-    yield Timer(CLK_PERIOD * 10)
-
-    control = 0x00
-    control |= 1 << BIT_CONTROL_CHIP_SELECT
-    control |= 1 << BIT_CONTROL_RESET_DISPLAY
-    control |= 1 << BIT_CONTROL_ENABLE
-    control |= 1 << BIT_CONTROL_BACKLIGHT_ENABLE
-    control |= 1 << BIT_CONTROL_WRITE_OVERRIDE
-
-    #Reset the LCD
-    yield axim.write(REG_CONTROL, control)
-    yield Timer(CLK_PERIOD * 10)
-
-
-    control &= ~(1 << BIT_CONTROL_RESET_DISPLAY)
-    control &= ~(1 << BIT_CONTROL_WRITE_OVERRIDE)
-
-    dut.i_fsync <= 1
-    yield axim.write(REG_CONTROL, control)
-    yield Timer(CLK_PERIOD * 10)
-
-    #Set the pixel count
-    yield axim.write(REG_IMAGE_WIDTH, WIDTH)
-    yield Timer(CLK_PERIOD * 10)
-
-    yield axim.write(REG_IMAGE_HEIGHT, HEIGHT)
-    yield Timer(CLK_PERIOD * 10)
-
-    yield axim.write(REG_IMAGE_SIZE, WIDTH * HEIGHT)
-    yield Timer(CLK_PERIOD * 10)
-    dut.i_fsync <= 0
-    yield Timer(CLK_PERIOD * 10)
-    dut.i_fsync <= 1
-
-
-    #Enable image write
-    control = 0x00
-    control |= 1 << BIT_CONTROL_ENABLE
-    control |= 1 << BIT_CONTROL_BACKLIGHT_ENABLE
-    yield axim.write(REG_CONTROL, control)
-    yield Timer(CLK_PERIOD * 10)
-
-
-    #Write Video to the video controller
-    for line in video:
-        yield video_out.write(line)
-
-    yield Timer(CLK_PERIOD * 400)
-
-
-@cocotb.test(skip = True)
+@cocotb.test(skip = False)
 def write_multiple_frames(dut):
     """
     Description:
@@ -409,122 +484,36 @@ def write_multiple_frames(dut):
     Test ID: 3
 
     Expected Results:
-        Should read images out of the controller
-        *** NEED SOMETHING TO VERIFY THE IMAGES ARE CORRECT!!!***
+        Every image rebuilt from the LCD pins matches the image sent, in
+        order
     """
-
-
-    dut.rst             <= 1
-    dut.i_fsync         <= 0;
-    dut.test_id         <= 3
-    axim = AXI4LiteMaster(dut, "AXIML", dut.clk)
-
-    video_out = AXI4StreamMaster(dut, "AXIMS", dut.clk, width=24)
-
-
     NUM_FRAMES          = 4
-    HEIGHT              = 4
-    WIDTH               = 4
-
-    video = []
-    for y in range (HEIGHT):
-        line = []
-        for x in range (WIDTH):
-            if x == 0:
-                value  =  0xFFFFFF
-                line.append(value)
-            elif x == (WIDTH) - 1:
-                value  =  0xFFFFFF
-                line.append(value)
-            else:
-                value  = x
-                line.append(value)
-        video.append(line)
-
-
-    setup_dut(dut)
-    yield Timer(CLK_PERIOD * 10)
-    dut.rst <= 0
-
-    dut.log.info("Ready")
-    yield Timer(CLK_PERIOD * 10)
-
-    control = 0x00
-    control |= 1 << BIT_CONTROL_CHIP_SELECT
-    control |= 1 << BIT_CONTROL_RESET_DISPLAY
-    control |= 1 << BIT_CONTROL_ENABLE
-    control |= 1 << BIT_CONTROL_BACKLIGHT_ENABLE
-    control |= 1 << BIT_CONTROL_WRITE_OVERRIDE
-
-    #Reset the LCD
-    yield axim.write(REG_CONTROL, control)
-    yield Timer(CLK_PERIOD * 10)
-
-
-    control &= ~(1 << BIT_CONTROL_RESET_DISPLAY)
-    control &= ~(1 << BIT_CONTROL_WRITE_OVERRIDE)
 
-    dut.i_fsync <= 1
-    yield axim.write(REG_CONTROL, control)
-    yield Timer(CLK_PERIOD * 10)
-
-    #Set the pixel count
-    yield axim.write(REG_IMAGE_WIDTH, WIDTH)
-    yield Timer(CLK_PERIOD * 10)
+    video_out, monitor = yield setup_video(dut, 3, WIDTH, HEIGHT)
+    frames = [test_frame(WIDTH, HEIGHT, i) for i in range(NUM_FRAMES)]
+    yield write_and_check_frames(dut, video_out, monitor, frames)
+    log_frame_rate(dut, monitor)
 
-    yield axim.write(REG_IMAGE_HEIGHT, HEIGHT)
-    yield Timer(CLK_PERIOD * 10)
 
-    yield axim.write(REG_IMAGE_SIZE, WIDTH * HEIGHT)
-    yield Timer(CLK_PERIOD * 10)
-    dut.i_fsync <= 0
-    yield Timer(CLK_PERIOD * 10)
-    dut.i_fsync <= 1
-
-
-    #Enable image write
-    control = 0x00
-    control |= 1 << BIT_CONTROL_ENABLE
-    control |= 1 << BIT_CONTROL_BACKLIGHT_ENABLE
-    yield axim.write(REG_CONTROL, control)
-    yield Timer(CLK_PERIOD * 10)
-
-
-
-    dut.i_fsync <= 1
-    for line in video:
-        yield video_out.write(line)
-
-    yield Timer(CLK_PERIOD * 10)
-    dut.i_fsync <= 0
-    yield Timer(CLK_PERIOD * 10)
-
-    dut.i_fsync <= 1
-    for line in video:
-        yield video_out.write(line)
-
-
-    yield Timer(CLK_PERIOD * 10)
-    dut.i_fsync <= 0
-    yield Timer(CLK_PERIOD * 10)
-
-
-    dut.i_fsync <= 1
-    for line in video:
-        yield video_out.write(line)
-
-    yield Timer(CLK_PERIOD * 10)
-    dut.i_fsync <= 0
-    yield Timer(CLK_PERIOD * 10)
+@cocotb.test(skip = False)
+def panel_frame_rate_benchmark(dut):
+    """
+    Description:
+        Send full size images (PANEL_WIDTH x PANEL_HEIGHT) to the controller
+        and measure the frame rate on the LCD pins
 
-    dut.i_fsync <= 1
-    for line in video:
-        yield video_out.write(line)
+    Test ID: 4
 
-    yield Timer(CLK_PERIOD * 10)
-    dut.i_fsync <= 0
+    Expected Results:
+        Every image matches, the frames per second and the frames per
+        tearing effect are reported
+    """
+    NUM_FRAMES          = 2
 
-    yield Timer(CLK_PERIOD * 200)
+    video_out, monitor = yield setup_video(dut, 4, PANEL_WIDTH, PANEL_HEIGHT)
+    frames = [test_frame(PANEL_WIDTH, PANEL_HEIGHT, i) for i in range(NUM_FRAMES)]
+    yield write_and_check_frames(dut, video_out, monitor, frames)
+    log_frame_rate(dut, monitor)
 
 
 
@@ -0,0 +1,135 @@
+import cocotb
+from cocotb.triggers import FallingEdge, RisingEdge, ReadOnly, Timer
+from cocotb.utils import get_sim_time
+
+import numpy as np
+
+CMD_START_MEM_WRITE     = 0x2C
+
+class TFTMonitor(object):
+    """
+    Rebuild the frames written to the TFT controller from its parallel pins
+
+    A frame starts with a 'Start Memory Write' command, every three data
+    bytes after it are the red, green and blue bytes of a pixel. A byte is
+    written on the falling edge of write_n while the chip is selected
+
+        monitor = TFTMonitor(dut.w_cs_n, dut.w_write_n, dut.w_register_data_sel,
+                             dut.w_out_data, dut.r_tearing_effect, 320, 240)
+        monitor.start()
+        <stream frames to the core>
+        yield monitor.wait_frames(2)
+        frame, start, end = monitor.frames[0]
+
+    Args:
+        cs_n, write_n, data_sel, data: physical signals, data_sel is low for
+            a command and high for data
+        tearing_effect: frame sync from the panel, None to not measure it
+        width (integer): pixels in a line
+        height (integer): lines in a frame
+    """
+
+    def __init__(self, cs_n, write_n, data_sel, data, tearing_effect, width, height):
+        object.__init__(self)
+        self.cs_n = cs_n
+        self.write_n = write_n
+        self.data_sel = data_sel
+        self.data = data
+        self.tearing_effect = tearing_effect
+        self.width = width
+        self.height = height
+        self.running = False
+        self.reset()
+
+    def reset(self):
+        #(numpy uint32 array height x width, start time, end time)
+        self.frames = []
+        self.commands = []
+        self.tear_edges = []
+        self.errors = []
+        self.buffer = np.zeros(self.width * self.height * 3, dtype = np.uint8)
+        self.count = None
+        self.frame_start = None
+
+    def start(self):
+        """
+        Start monitoring, a running monitor starts over
+        """
+        self.reset()
+        if not self.running:
+            self.running = True
+            cocotb.fork(self._run())
+            if self.tearing_effect is not None:
+                cocotb.fork(self._run_tear())
+
+    def stop(self):
+        self.running = False
+
+    def _frame_done(self, end):
+        pixels = self.buffer.reshape(self.height, self.width, 3).astype(np.uint32)
+        frame = (pixels[:, :, 0] << 16) | (pixels[:, :, 1] << 8) | pixels[:, :, 2]
+        self.frames.append((frame, self.frame_start, end))
+        self.count = None
+
+    @cocotb.coroutine
+    def _run(self):
+        while self.running:
+            yield FallingEdge(self.write_n)
+            yield ReadOnly()
+            if int(self.cs_n) != 0:
+                continue
+            value = int(self.data) & 0xFF
+            if int(self.data_sel) == 0:
+                self.commands.append(value)
+                if self.count is not None and self.count > 0:
+                    self.errors.append("Frame %d: Start Memory Write after %d of %d bytes" %
+                                       (len(self.frames), self.count, len(self.buffer)))
+                self.count = 0 if value == CMD_START_MEM_WRITE else None
+                self.frame_start = get_sim_time()
+                continue
+            if self.count is None:
+                continue
+            self.buffer[self.count] = value
+            self.count += 1
+            if self.count == len(self.buffer):
+                self._frame_done(get_sim_time())
+
+    @cocotb.coroutine
+    def _run_tear(self):
+        while self.running:
+            yield RisingEdge(self.tearing_effect)
+            self.tear_edges.append(get_sim_time())
+
+    @cocotb.coroutine
+    def wait_frames(self, count, poll = 1000):
+        """
+        Wait until 'count' frames were received since the monitor started
+
+        Args:
+            count (integer): frames
+            poll (integer): simulation time between checks
+        """
+        while len(self.frames) < count:
+            yield Timer(poll)
+
+    def tear_period(self):
+        """
+        Returns (float or None):
+            average time between the rising edges of the tearing effect
+        """
+        if len(self.tear_edges) < 2:
+            return None
+        return float(self.tear_edges[-1] - self.tear_edges[0]) / (len(self.tear_edges) - 1)
+
+    def frame_period(self):
+        """
+        Returns (float or None):
+            average time between the starts of frames, the length of the
+            frame when only one was received
+        """
+        if len(self.frames) == 0:
+            return None
+        if len(self.frames) == 1:
+            frame, start, end = self.frames[0]
+            return float(end - start)
+        return float(self.frames[-1][1] - self.frames[0][1]) / (len(self.frames) - 1)
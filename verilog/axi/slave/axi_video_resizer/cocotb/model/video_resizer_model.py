@@ -0,0 +1,69 @@
+"""
+Reference model of the video resizer
+
+Frames are 2D NumPy arrays (height x width) of pixels, the output of the core
+is the window of the input that starts at (start x, start y) and is the size
+of the output image, the part of the window outside of the input is the fill
+pixel:
+
+    frame = test_frame(1280, 720)
+    expected = resize_frame(frame, 640, 360, start_x = 320, start_y = 180)
+    error = compare_frames(expected, received)
+"""
+
+import numpy as np
+
+PIXEL_MASK              = 0xFFFFFF
+
+def test_frame(width, height):
+    """
+    Returns (numpy uint32 array):
+        height x width frame, every pixel is its index in the frame so
+        a misplaced pixel points at where it came from
+    """
+    return (np.arange(width * height, dtype = np.uint32) & PIXEL_MASK).reshape(height, width)
+
+def resize_frame(frame, out_width, out_height, start_x = 0, start_y = 0, fill_pixel = 0):
+    """
+    Expected output of the core
+
+    Args:
+        frame (numpy array): height x width input frame
+        out_width (integer): REG_VIDEO_OUT_WIDTH
+        out_height (integer): REG_VIDEO_OUT_HEIGHT
+        start_x (integer): REG_VIDEO_IN_START_X
+        start_y (integer): REG_VIDEO_IN_START_Y
+        fill_pixel (integer): REG_IN_FILL_PIXEL
+
+    Returns (numpy uint32 array):
+        out_height x out_width frame
+    """
+    in_height, in_width = frame.shape
+    out = np.full((out_height, out_width), fill_pixel & PIXEL_MASK, dtype = np.uint32)
+    width = max(0, min(out_width, in_width - start_x))
+    height = max(0, min(out_height, in_height - start_y))
+    out[0:height, 0:width] = frame[start_y:start_y + height, start_x:start_x + width]
+    return out
+
+def compare_frames(expected, received):
+    """
+    Compare a received frame with the expected one
+
+    Args:
+        expected (numpy array): height x width frame from resize_frame
+        received (numpy array): pixels in the order they were received, any
+            shape with the same number of pixels
+
+    Returns (string or None):
+        description of the first mismatch, None if the frames match
+    """
+    received = np.asarray(received, dtype = np.uint32)
+    if received.size != expected.size:
+        return "Received %d pixels, expected %d" % (received.size, expected.size)
+    received = received.reshape(expected.shape)
+    if np.array_equal(received, expected):
+        return None
+    errors = np.argwhere(received != expected)
+    y, x = errors[0]
+    return "%d pixels differ, first at (%d, %d): 0x%06X != 0x%06X" % \
+            (len(errors), x, y, received[y, x], expected[y, x])
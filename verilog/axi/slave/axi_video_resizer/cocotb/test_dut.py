@@ -7,10 +7,16 @@ from cocotb.clock import Clock
 import time
 from array import array as Array
 from cocotb.triggers import Timer, FallingEdge
+from cocotb.triggers import RisingEdge
+from cocotb.result import ReturnValue
+import numpy as np
 
 from cocotb.drivers.amba import AXI4LiteMaster
 from cocotb.drivers.amba import AXI4StreamMaster
 from cocotb.drivers.amba import AXI4StreamSlave
+from cocotb.utils import get_sim_time
+
+from axi_lite_master import AXI4LitePipelinedMaster
 
 CLK_PERIOD = 10
 
@@ -18,28 +24,13 @@ MODULE_PATH = os.path.join(os.path.dirname(__file__), os.pardir, "rtl")
 MODULE_PATH = os.path.abspath(MODULE_PATH)
 
 
-BIT_CONTROL_ENABLE    = 0
-BIT_CONTROL_RESET     = 1
-
-BIT_STATUS_ACTIVE     = 0
-
-
-
-REG_CONTROL           = 0
-REG_STATUS            = 1
-REG_VERSION           = 2
+#Registers and their fields are generated from video_resizer_regs.json by
+#verilog/sim/register_map.py
+from video_resizer_regs import *
 
-REG_VIDEO_IN_SIZE     = 4
-REG_VIDEO_IN_WIDTH    = 5
-REG_VIDEO_IN_HEIGHT   = 6
-
-REG_VIDEO_OUT_SIZE    = 8
-REG_VIDEO_OUT_WIDTH   = 9
-REG_VIDEO_OUT_HEIGHT  = 10
-
-REG_VIDEO_IN_START_X  = 12
-REG_VIDEO_IN_START_Y  = 13
-REG_IN_FILL_PIXEL     = 14
+from video_resizer_model import test_frame
+from video_resizer_model import resize_frame
+from video_resizer_model import compare_frames
 
 
 
@@ -63,11 +54,37 @@ V_BLANK              = 200
 PIXEL_COUNT          = WIDTH * HEIGHT
 
 
+#Clock cycles allowed per pixel in and out before a frame test gives up
+FRAME_TIMEOUT_CYCLES_PER_PIXEL = 20
+
+#Value of the fill pixel in the padding tests, outside of the test frame
+#pixel values
+FILL_PIXEL           = 0xABCDEF
+
+
 @cocotb.coroutine
-def axis_slave_listener(axis_slave):
-    data = yield axis_slave.read()
-    print ("read data: %s" % str(data))
+def collect_frame(axis_slave, pixels):
+    """
+    Read packets until 'pixels' pixels arrived, the output adapter ends a
+    packet at the end of the frame or at the end of a FIFO block
 
+    Returns (numpy uint32 array):
+        pixels in the order they were received
+    """
+    frame = np.zeros(pixels, dtype = np.uint32)
+    count = 0
+    while count < pixels:
+        data = yield axis_slave.read()
+        if count + len(data) > pixels:
+            raise TestFailure("Received %d pixels, expected %d" % (count + len(data), pixels))
+        frame[count:count + len(data)] = [int(d) for d in data]
+        count += len(data)
+    raise ReturnValue(frame)
+
+@cocotb.coroutine
+def first_pixel_time(dut):
+    yield RisingEdge(dut.AXISS_TVALID)
+    raise ReturnValue(get_sim_time())
 
 def setup_dut(dut):
     cocotb.fork(Clock(dut.clk, CLK_PERIOD).start())
@@ -172,42 +189,38 @@ def read_all_registers(dut):
         raise TestFailure("REG_IN_FILL_PIXEL Register was not correct, should be: 0x%08 but read: 0x%08X" % (0, data))
 
 
-@cocotb.test(skip = False)
-def write_downsamled_top_left_frame(dut):
-    """
-    Description:
-        Write a single frame
 
-    Test ID: 1
-
-    Expected Results:
-        A value is successfully written to the
-        the register of the controller.
-
-        This value should be readable from the test bench
+def configure_registers(in_width, in_height, out_width, out_height, start_x = 0, start_y = 0):
     """
+    The register writes every frame test does before it sends a frame
 
-    IMAGE_IN_WIDTH = 3
-    IMAGE_IN_HEIGHT = 3
-    IMAGE_IN_SIZE = IMAGE_IN_WIDTH * IMAGE_IN_HEIGHT
-
-    IMAGE_OUT_WIDTH = 2
-    IMAGE_OUT_HEIGHT = 2
-    IMAGE_OUT_SIZE = IMAGE_OUT_WIDTH * IMAGE_OUT_HEIGHT
-
-    IMAGE_IN_START_X = 0
-    IMAGE_IN_START_Y = 0
-
-
-    video = []
-    for y in range(IMAGE_IN_HEIGHT):
-        for x in range(IMAGE_IN_WIDTH):
-            video.append((IMAGE_IN_WIDTH * y) + x)
+    Returns (list of tuples):
+        (register, value)
+    """
+    return [(REG_CONTROL,           0x02),
+            (REG_VIDEO_IN_WIDTH,    in_width),
+            (REG_VIDEO_IN_HEIGHT,   in_height),
+            (REG_VIDEO_IN_SIZE,     in_width * in_height),
+            (REG_VIDEO_OUT_WIDTH,   out_width),
+            (REG_VIDEO_OUT_HEIGHT,  out_height),
+            (REG_VIDEO_OUT_SIZE,    out_width * out_height),
+            (REG_VIDEO_IN_START_X,  start_x),
+            (REG_VIDEO_IN_START_Y,  start_y),
+            (REG_CONTROL,           0x01)]
 
+@cocotb.coroutine
+def run_frames(dut, test_id, in_width, in_height, out_width, out_height,
+               start_x = 0, start_y = 0, fill_pixel = 0, frames = 1):
+    """
+    Configure the resizer, send 'frames' test frames through the AXI stream
+    and compare every frame received with the reference model
 
+    Returns (list of tuples):
+        (clock cycles of the frame, clock cycles to the first output pixel)
+    """
     dut.rst <= 1
-    dut.test_id <= 1
-    axim = AXI4LiteMaster(dut, "AXIML", dut.clk)
+    dut.test_id <= test_id
+    axim = AXI4LitePipelinedMaster(dut, "AXIML", dut.clk)
     video_out = AXI4StreamMaster(dut, "AXIMS", dut.clk, width=24)
     video_in = AXI4StreamSlave(dut, "AXISS", dut.clk, width=24)
 
@@ -215,354 +228,221 @@ def write_downsamled_top_left_frame(dut):
     yield Timer(CLK_PERIOD * 10)
     dut.rst <= 0
     yield Timer(CLK_PERIOD * 10)
-    dut.rst <= 1
-    yield Timer(CLK_PERIOD * 10)
-    dut.rst <= 0
-    yield Timer(CLK_PERIOD * 10)
-
-    dut.log.info("Ready")
-
-
-    cocotb.fork(axis_slave_listener(video_in))
-
-    control = 0x02
-
-    #Reset the LCD
-    yield axim.write(REG_CONTROL, control)
-    yield Timer(CLK_PERIOD * 10)
-
-
-
-    yield axim.write(REG_VIDEO_IN_WIDTH, IMAGE_IN_WIDTH)
-    yield Timer(CLK_PERIOD * 10)
-
-    yield axim.write(REG_VIDEO_IN_HEIGHT, IMAGE_IN_HEIGHT)
-    yield Timer(CLK_PERIOD * 10)
-
-    yield axim.write(REG_VIDEO_IN_SIZE,  IMAGE_IN_SIZE)
-    yield Timer(CLK_PERIOD * 10)
-
-
-
-    yield axim.write(REG_VIDEO_OUT_WIDTH, IMAGE_OUT_WIDTH)
-    yield Timer(CLK_PERIOD * 10)
-
-    yield axim.write(REG_VIDEO_OUT_HEIGHT, IMAGE_OUT_HEIGHT)
-    yield Timer(CLK_PERIOD * 10)
-
-    yield axim.write(REG_VIDEO_OUT_SIZE, IMAGE_OUT_SIZE)
-    yield Timer(CLK_PERIOD * 10)
-
-
-    yield axim.write(REG_VIDEO_IN_START_X, IMAGE_IN_START_X)
-    yield Timer(CLK_PERIOD * 10)
-
-    yield axim.write(REG_VIDEO_IN_START_Y, IMAGE_IN_START_Y)
-    yield Timer(CLK_PERIOD * 10)
 
-
-    control = 0x01
-
-    #Reset the LCD
-    yield axim.write(REG_CONTROL, control)
-    yield Timer(CLK_PERIOD * 10)
-
-    yield video_out.write(video)
-    yield Timer(CLK_PERIOD * 500)
+    registers = configure_registers(in_width, in_height, out_width, out_height, start_x, start_y)
+    registers.insert(-1, (REG_IN_FILL_PIXEL, fill_pixel))
+    yield axim.write_many(registers)
+
+    frame = test_frame(in_width, in_height)
+    expected = resize_frame(frame, out_width, out_height, start_x, start_y, fill_pixel)
+    pixels = frame.ravel().tolist()
+    timeout_cycles = FRAME_TIMEOUT_CYCLES_PER_PIXEL * (frame.size + expected.size)
+
+    stats = []
+    for i in range(frames):
+        reader = cocotb.fork(collect_frame(video_in, expected.size))
+        first_pixel = cocotb.fork(first_pixel_time(dut))
+        start = get_sim_time()
+        yield video_out.write(pixels)
+        timeout = Timer(CLK_PERIOD * timeout_cycles)
+        result = yield [reader.join(), timeout]
+        if result is timeout:
+            raise TestFailure("Frame %d: not received within %d clock cycles" % (i, timeout_cycles))
+        end = get_sim_time()
+        first = yield first_pixel.join()
+
+        error = compare_frames(expected, reader.retval)
+        if error is not None:
+            raise TestFailure("Frame %d: %s" % (i, error))
+
+        cycles = (end - start) / CLK_PERIOD
+        latency = (first - start) / CLK_PERIOD
+        stats.append((cycles, latency))
+        dut.log.info("Frame %d: %dx%d -> %dx%d in %d cycles, %0.3f pixels/clock in, %0.3f pixels/clock out, first pixel after %d cycles" %
+                     (i, in_width, in_height, out_width, out_height, cycles,
+                      float(frame.size) / cycles, float(expected.size) / cycles, latency))
+    raise ReturnValue(stats)
 
 @cocotb.test(skip = False)
-def write_one_to_one_frame(dut):
+def write_downsamled_top_left_frame(dut):
     """
     Description:
-        Write a single frame
+        Write a single frame, the output is the top left of the input
 
     Test ID: 1
 
     Expected Results:
-        A value is successfully written to the
-        the register of the controller.
-
-        This value should be readable from the test bench
+        The frame received matches the reference model
     """
+    yield run_frames(dut, 1, 3, 3, 2, 2)
 
-    IMAGE_IN_WIDTH = 3
-    IMAGE_IN_HEIGHT = 3
-    IMAGE_IN_SIZE = IMAGE_IN_WIDTH * IMAGE_IN_HEIGHT
-
-    IMAGE_OUT_WIDTH = 3
-    IMAGE_OUT_HEIGHT = 3
-    IMAGE_OUT_SIZE = IMAGE_OUT_WIDTH * IMAGE_OUT_HEIGHT
-
-    IMAGE_IN_START_X = 0
-    IMAGE_IN_START_Y = 0
-
-
-    video = []
-    for y in range(IMAGE_IN_HEIGHT):
-        for x in range(IMAGE_IN_WIDTH):
-            video.append((IMAGE_IN_WIDTH * y) + x)
-
-
-    dut.rst <= 1
-    dut.test_id <= 2
-    axim = AXI4LiteMaster(dut, "AXIML", dut.clk)
-    video_out = AXI4StreamMaster(dut, "AXIMS", dut.clk, width=24)
-    video_in = AXI4StreamSlave(dut, "AXISS", dut.clk, width=24)
-
-    setup_dut(dut)
-    yield Timer(CLK_PERIOD * 10)
-    dut.rst <= 0
-    yield Timer(CLK_PERIOD * 10)
-    dut.rst <= 1
-    yield Timer(CLK_PERIOD * 10)
-    dut.rst <= 0
-    yield Timer(CLK_PERIOD * 10)
-
-    dut.log.info("Ready")
-
-
-    cocotb.fork(axis_slave_listener(video_in))
-
-    control = 0x02
-
-    #Reset the LCD
-    yield axim.write(REG_CONTROL, control)
-    yield Timer(CLK_PERIOD * 10)
-
-
-
-    yield axim.write(REG_VIDEO_IN_WIDTH, IMAGE_IN_WIDTH)
-    yield Timer(CLK_PERIOD * 10)
-
-    yield axim.write(REG_VIDEO_IN_HEIGHT, IMAGE_IN_HEIGHT)
-    yield Timer(CLK_PERIOD * 10)
-
-    yield axim.write(REG_VIDEO_IN_SIZE,  IMAGE_IN_SIZE)
-    yield Timer(CLK_PERIOD * 10)
-
-
-
-    yield axim.write(REG_VIDEO_OUT_WIDTH, IMAGE_OUT_WIDTH)
-    yield Timer(CLK_PERIOD * 10)
-
-    yield axim.write(REG_VIDEO_OUT_HEIGHT, IMAGE_OUT_HEIGHT)
-    yield Timer(CLK_PERIOD * 10)
-
-    yield axim.write(REG_VIDEO_OUT_SIZE, IMAGE_OUT_SIZE)
-    yield Timer(CLK_PERIOD * 10)
-
-
-    yield axim.write(REG_VIDEO_IN_START_X, IMAGE_IN_START_X)
-    yield Timer(CLK_PERIOD * 10)
-
-    yield axim.write(REG_VIDEO_IN_START_Y, IMAGE_IN_START_Y)
-    yield Timer(CLK_PERIOD * 10)
-
-
-    control = 0x01
-
-    #Reset the LCD
-    yield axim.write(REG_CONTROL, control)
-    yield Timer(CLK_PERIOD * 10)
+@cocotb.test(skip = False)
+def write_one_to_one_frame(dut):
+    """
+    Description:
+        Write a single frame, the output is the same size as the input
 
-    yield video_out.write(video)
-    yield Timer(CLK_PERIOD * 500)
+    Test ID: 2
 
+    Expected Results:
+        The frame received matches the input
+    """
+    yield run_frames(dut, 2, 3, 3, 3, 3)
 
 @cocotb.test(skip = False)
 def write_bottom_right_frame(dut):
     """
     Description:
-        Write a single frame
+        Write a single frame, the output is the bottom right of the input
 
-    Test ID: 1
+    Test ID: 3
 
     Expected Results:
-        A value is successfully written to the
-        the register of the controller.
-
-        This value should be readable from the test bench
+        The frame received matches the reference model
     """
-
-    IMAGE_IN_WIDTH = 3
-    IMAGE_IN_HEIGHT = 3
-    IMAGE_IN_SIZE = IMAGE_IN_WIDTH * IMAGE_IN_HEIGHT
-
-    IMAGE_OUT_WIDTH = 2
-    IMAGE_OUT_HEIGHT = 2
-    IMAGE_OUT_SIZE = IMAGE_OUT_WIDTH * IMAGE_OUT_HEIGHT
-
-    IMAGE_IN_START_X = 1
-    IMAGE_IN_START_Y = 1
-
-
-    video = []
-    for y in range(IMAGE_IN_HEIGHT):
-        for x in range(IMAGE_IN_WIDTH):
-            video.append((IMAGE_IN_WIDTH * y) + x)
-
-
-    dut.rst <= 1
-    dut.test_id <= 3
-    axim = AXI4LiteMaster(dut, "AXIML", dut.clk)
-    video_out = AXI4StreamMaster(dut, "AXIMS", dut.clk, width=24)
-    video_in = AXI4StreamSlave(dut, "AXISS", dut.clk, width=24)
-
-    setup_dut(dut)
-    yield Timer(CLK_PERIOD * 10)
-    dut.rst <= 0
-    yield Timer(CLK_PERIOD * 10)
-    dut.rst <= 1
-    yield Timer(CLK_PERIOD * 10)
-    dut.rst <= 0
-    yield Timer(CLK_PERIOD * 10)
-
-    dut.log.info("Ready")
-
-
-    cocotb.fork(axis_slave_listener(video_in))
-
-    control = 0x02
-
-    #Reset the LCD
-    yield axim.write(REG_CONTROL, control)
-    yield Timer(CLK_PERIOD * 10)
-
-
-
-    yield axim.write(REG_VIDEO_IN_WIDTH, IMAGE_IN_WIDTH)
-    yield Timer(CLK_PERIOD * 10)
-
-    yield axim.write(REG_VIDEO_IN_HEIGHT, IMAGE_IN_HEIGHT)
-    yield Timer(CLK_PERIOD * 10)
-
-    yield axim.write(REG_VIDEO_IN_SIZE,  IMAGE_IN_SIZE)
-    yield Timer(CLK_PERIOD * 10)
-
-
-
-    yield axim.write(REG_VIDEO_OUT_WIDTH, IMAGE_OUT_WIDTH)
-    yield Timer(CLK_PERIOD * 10)
-
-    yield axim.write(REG_VIDEO_OUT_HEIGHT, IMAGE_OUT_HEIGHT)
-    yield Timer(CLK_PERIOD * 10)
-
-    yield axim.write(REG_VIDEO_OUT_SIZE, IMAGE_OUT_SIZE)
-    yield Timer(CLK_PERIOD * 10)
-
-
-    yield axim.write(REG_VIDEO_IN_START_X, IMAGE_IN_START_X)
-    yield Timer(CLK_PERIOD * 10)
-
-    yield axim.write(REG_VIDEO_IN_START_Y, IMAGE_IN_START_Y)
-    yield Timer(CLK_PERIOD * 10)
-
-
-    control = 0x01
-
-    #Reset the LCD
-    yield axim.write(REG_CONTROL, control)
-    yield Timer(CLK_PERIOD * 10)
-
-    yield video_out.write(video)
-    yield Timer(CLK_PERIOD * 500)
-
+    yield run_frames(dut, 3, 3, 3, 2, 2, start_x = 1, start_y = 1)
 
 @cocotb.test(skip = False)
 def write_center_frame(dut):
     """
     Description:
-        Write a single frame
+        Write a single frame, the output is the center of the input
 
     Test ID: 4
 
     Expected Results:
-        A value is successfully written to the
-        the register of the controller.
-
-        This value should be readable from the test bench
+        The frame received matches the reference model
     """
-    dut.test_id <= 4
-
-    IMAGE_IN_WIDTH = 4
-    IMAGE_IN_HEIGHT = 4
-    IMAGE_IN_SIZE = IMAGE_IN_WIDTH * IMAGE_IN_HEIGHT
+    yield run_frames(dut, 4, 4, 4, 2, 2, start_x = 1, start_y = 1)
 
-    IMAGE_OUT_WIDTH = 2
-    IMAGE_OUT_HEIGHT = 2
-    IMAGE_OUT_SIZE = IMAGE_OUT_WIDTH * IMAGE_OUT_HEIGHT
 
-    IMAGE_IN_START_X = 1
-    IMAGE_IN_START_Y = 1
-
-
-    video = []
-    for y in range(IMAGE_IN_HEIGHT):
-        for x in range(IMAGE_IN_WIDTH):
-            video.append((IMAGE_IN_WIDTH * y) + x)
+#Bus cycles of the register sequence, filled in by the benchmark tests
+BENCHMARK = {}
 
+READ_BACK_REGISTERS = [REG_STATUS,
+                       REG_VIDEO_IN_SIZE,
+                       REG_VIDEO_IN_WIDTH,
+                       REG_VIDEO_IN_HEIGHT,
+                       REG_VIDEO_OUT_SIZE,
+                       REG_VIDEO_OUT_WIDTH,
+                       REG_VIDEO_OUT_HEIGHT,
+                       REG_VIDEO_IN_START_X,
+                       REG_VIDEO_IN_START_Y,
+                       REG_IN_FILL_PIXEL]
 
+@cocotb.coroutine
+def run_register_benchmark(dut, test_id, pipelined):
     dut.rst <= 1
-    axim = AXI4LiteMaster(dut, "AXIML", dut.clk)
-    video_out = AXI4StreamMaster(dut, "AXIMS", dut.clk, width=24)
-    video_in = AXI4StreamSlave(dut, "AXISS", dut.clk, width=24)
+    dut.test_id <= test_id
+    if pipelined:
+        axim = AXI4LitePipelinedMaster(dut, "AXIML", dut.clk)
+    else:
+        axim = AXI4LiteMaster(dut, "AXIML", dut.clk)
 
     setup_dut(dut)
     yield Timer(CLK_PERIOD * 10)
     dut.rst <= 0
     yield Timer(CLK_PERIOD * 10)
-    dut.rst <= 1
-    yield Timer(CLK_PERIOD * 10)
-    dut.rst <= 0
-    yield Timer(CLK_PERIOD * 10)
-
-    dut.log.info("Ready")
-
 
-    cocotb.fork(axis_slave_listener(video_in))
+    registers = configure_registers(1280, 720, 640, 360, 320, 180)
+    start = get_sim_time()
+    if pipelined:
+        yield axim.write_many(registers)
+        data = yield axim.read_many(READ_BACK_REGISTERS)
+    else:
+        for address, value in registers:
+            yield axim.write(address, value)
+            yield Timer(CLK_PERIOD * 10)
+        data = []
+        for address in READ_BACK_REGISTERS:
+            value = yield axim.read(address)
+            data.append(int(value))
+            yield Timer(CLK_PERIOD * 10)
+    cycles = (get_sim_time() - start) / CLK_PERIOD
+
+    expected = dict(registers)
+    for i in range(len(READ_BACK_REGISTERS)):
+        address = READ_BACK_REGISTERS[i]
+        if address in expected and data[i] != expected[address]:
+            raise TestFailure("Register %d: wrote 0x%08X but read 0x%08X" % (address, expected[address], data[i]))
+
+    name = "Pipelined" if pipelined else "AXI4LiteMaster"
+    BENCHMARK[name] = cycles
+    dut.log.info("%s: configure and read back took %d bus cycles" % (name, cycles))
 
-    control = 0x02
-
-    #Reset the LCD
-    yield axim.write(REG_CONTROL, control)
-    yield Timer(CLK_PERIOD * 10)
-
-
-
-    yield axim.write(REG_VIDEO_IN_WIDTH, IMAGE_IN_WIDTH)
-    yield Timer(CLK_PERIOD * 10)
-
-    yield axim.write(REG_VIDEO_IN_HEIGHT, IMAGE_IN_HEIGHT)
-    yield Timer(CLK_PERIOD * 10)
+@cocotb.test(skip = False)
+def register_benchmark_legacy(dut):
+    """
+    Description:
+        Configure the resizer and read every register back using
+        AXI4LiteMaster with a 10 clock delay after every word
 
-    yield axim.write(REG_VIDEO_IN_SIZE,  IMAGE_IN_SIZE)
-    yield Timer(CLK_PERIOD * 10)
+    Test ID: 5
 
+    Expected Results:
+        Registers read back what was written, bus cycles are reported
+    """
+    yield run_register_benchmark(dut, 5, False)
 
+@cocotb.test(skip = False)
+def register_benchmark_pipelined(dut):
+    """
+    Description:
+        Run the same register sequence with the pipelined master
 
-    yield axim.write(REG_VIDEO_OUT_WIDTH, IMAGE_OUT_WIDTH)
-    yield Timer(CLK_PERIOD * 10)
+    Test ID: 6
 
-    yield axim.write(REG_VIDEO_OUT_HEIGHT, IMAGE_OUT_HEIGHT)
-    yield Timer(CLK_PERIOD * 10)
+    Expected Results:
+        The sequence takes fewer bus cycles than with AXI4LiteMaster
+    """
+    yield run_register_benchmark(dut, 6, True)
+    if "AXI4LiteMaster" in BENCHMARK:
+        legacy = BENCHMARK["AXI4LiteMaster"]
+        pipelined = BENCHMARK["Pipelined"]
+        dut.log.info("Speedup: %0.2fx (%d -> %d cycles)" % (float(legacy) / pipelined, legacy, pipelined))
+        if pipelined >= legacy:
+            raise TestFailure("Pipelined master is not faster: %d >= %d cycles" % (pipelined, legacy))
 
-    yield axim.write(REG_VIDEO_OUT_SIZE, IMAGE_OUT_SIZE)
-    yield Timer(CLK_PERIOD * 10)
+@cocotb.test(skip = False)
+def write_padded_frames(dut):
+    """
+    Description:
+        The output window runs past the right and the bottom of the input,
+        write two frames back to back
 
+    Test ID: 7
 
-    yield axim.write(REG_VIDEO_IN_START_X, IMAGE_IN_START_X)
-    yield Timer(CLK_PERIOD * 10)
+    Expected Results:
+        Both frames match the reference model, the part of the window
+        outside of the input is the fill pixel
+    """
+    yield run_frames(dut, 7, 4, 3, 4, 4, start_x = 2, start_y = 1,
+                     fill_pixel = FILL_PIXEL, frames = 2)
 
-    yield axim.write(REG_VIDEO_IN_START_Y, IMAGE_IN_START_Y)
-    yield Timer(CLK_PERIOD * 10)
+@cocotb.test(skip = False)
+def write_full_frame(dut):
+    """
+    Description:
+        Pass a full 1280x720 frame through the resizer
 
+    Test ID: 8
 
-    control = 0x01
+    Expected Results:
+        The frame received matches the input, pixels per clock and the
+        latency to the first output pixel are reported
+    """
+    yield run_frames(dut, 8, 1280, 720, 1280, 720)
 
-    #Reset the LCD
-    yield axim.write(REG_CONTROL, control)
-    yield Timer(CLK_PERIOD * 10)
+@cocotb.test(skip = False)
+def write_full_frame_center(dut):
+    """
+    Description:
+        Crop the center 640x360 of a full 1280x720 frame
 
-    yield video_out.write(video)
-    yield Timer(CLK_PERIOD * 500)
+    Test ID: 9
 
+    Expected Results:
+        The frame received matches the reference model, pixels per clock
+        and the latency to the first output pixel are reported
+    """
+    yield run_frames(dut, 9, 1280, 720, 640, 360, start_x = 320, start_y = 180)
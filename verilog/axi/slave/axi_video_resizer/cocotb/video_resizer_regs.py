@@ -0,0 +1,130 @@
+#Generated by register_map.py from video_resizer_regs.json, do not edit
+
+"""
+axi_video_resizer registers
+
+encode_<register>(**fields) and decode_<register>(value) convert between
+register values and fields (lower case field names), single bit fields
+decode to booleans
+"""
+
+DESCRIPTION_SHA1 = "ed53c97ad01ecb6c990676f91bef27a1281c7700"
+
+#Registers
+REG_CONTROL              = 0
+REG_STATUS               = 1
+REG_VERSION              = 2
+REG_VIDEO_IN_SIZE        = 4
+REG_VIDEO_IN_WIDTH       = 5
+REG_VIDEO_IN_HEIGHT      = 6
+REG_VIDEO_OUT_SIZE       = 8
+REG_VIDEO_OUT_WIDTH      = 9
+REG_VIDEO_OUT_HEIGHT     = 10
+REG_VIDEO_IN_START_X     = 12
+REG_VIDEO_IN_START_Y     = 13
+REG_IN_FILL_PIXEL        = 14
+
+#CONTROL
+BIT_CONTROL_ENABLE       = 0
+BIT_CONTROL_RESET        = 1
+
+#STATUS
+BIT_STATUS_ACTIVE        = 0
+
+#VERSION
+VERSION_MAJOR            = 28
+VERSION_MAJOR_HIGH       = 31
+VERSION_MAJOR_LOW        = 28
+VERSION_MAJOR_BITMASK    = 0xF
+VERSION_MINOR            = 20
+VERSION_MINOR_HIGH       = 27
+VERSION_MINOR_LOW        = 20
+VERSION_MINOR_BITMASK    = 0xFF
+VERSION_REVISION         = 16
+VERSION_REVISION_HIGH    = 19
+VERSION_REVISION_LOW     = 16
+VERSION_REVISION_BITMASK = 0xF
+
+#Registers only the host changes: address -> self clearing bits
+NON_VOLATILE = {
+    REG_CONTROL: 0x0,
+    REG_VERSION: 0x0,
+    REG_VIDEO_IN_SIZE: 0x0,
+    REG_VIDEO_IN_WIDTH: 0x0,
+    REG_VIDEO_IN_HEIGHT: 0x0,
+    REG_VIDEO_OUT_SIZE: 0x0,
+    REG_VIDEO_OUT_WIDTH: 0x0,
+    REG_VIDEO_OUT_HEIGHT: 0x0,
+    REG_VIDEO_IN_START_X: 0x0,
+    REG_VIDEO_IN_START_Y: 0x0,
+    REG_IN_FILL_PIXEL: 0x0,
+}
+
+#field -> (mask, shift)
+_CONTROL_FIELDS = {
+    "enable": (0x1, 0),
+    "reset": (0x2, 1),
+}
+_STATUS_FIELDS = {
+    "active": (0x1, 0),
+}
+_VERSION_FIELDS = {
+    "major": (0xF0000000, 28),
+    "minor": (0xFF00000, 20),
+    "revision": (0xF0000, 16),
+}
+
+def _masks(table, fields):
+    """
+    Returns (tuple):
+        (bits to set, bits to clear) to write 'fields' into a register
+    """
+    set_mask = 0
+    clear_mask = 0
+    for name, value in fields.items():
+        if name not in table:
+            raise KeyError("Unknown field: %s" % name)
+        mask, shift = table[name]
+        value = int(value) << shift
+        if value & ~mask:
+            raise ValueError("%s: 0x%X does not fit in mask 0x%X" % (name, value >> shift, mask))
+        clear_mask |= mask
+        set_mask |= value
+    return set_mask, clear_mask
+
+def _encode(table, fields):
+    return _masks(table, fields)[0]
+
+def declare_shadow(shadow):
+    """
+    Declare the registers only the host changes in a RegisterShadow
+    """
+    for address, self_clearing in NON_VOLATILE.items():
+        shadow.declare(address, self_clearing)
+
+def encode_control(**fields):
+    return _encode(_CONTROL_FIELDS, fields)
+
+def decode_control(value):
+    return {
+        "enable": (value & 0x1) != 0,
+        "reset": (value & 0x2) != 0,
+    }
+
+def encode_status(**fields):
+    return _encode(_STATUS_FIELDS, fields)
+
+def decode_status(value):
+    return {
+        "active": (value & 0x1) != 0,
+    }
+
+def encode_version(**fields):
+    return _encode(_VERSION_FIELDS, fields)
+
+def decode_version(value):
+    return {
+        "major": (value >> 28) & 0xF,
+        "minor": (value >> 20) & 0xFF,
+        "revision": (value >> 16) & 0xF,
+    }
@@ -114,22 +114,8 @@ module axi_video_resizer #(
 //local parameters
 
 
-//Address Map
-localparam                      REG_CONTROL           = 0;
-localparam                      REG_STATUS            = 1;
-localparam                      REG_VERSION           = 2;
-
-localparam                      REG_VIDEO_IN_SIZE     = 4;
-localparam                      REG_VIDEO_IN_WIDTH    = 5;
-localparam                      REG_VIDEO_IN_HEIGHT   = 6;
-
-localparam                      REG_VIDEO_OUT_SIZE    = 8;
-localparam                      REG_VIDEO_OUT_WIDTH   = 9;
-localparam                      REG_VIDEO_OUT_HEIGHT  = 10;
-
-localparam                      REG_VIDEO_IN_START_X  = 12;
-localparam                      REG_VIDEO_IN_START_Y  = 13;
-localparam                      REG_IN_FILL_PIXEL     = 14;
+//Address Map, generated from cocotb/video_resizer_regs.json
+`include "axi_video_resizer_regs.vh"
 
 localparam                      REG_LAST_REG = REG_IN_FILL_PIXEL;
 
@@ -274,7 +260,7 @@ adapter_ppfifo_2_axi_stream #(
 
 
 video_resizer #(
-  .AXIS_WIDTH        (AXIS_WIDTH           ),
+  .DATAS_WIDTH        (AXIS_WIDTH           ),
   .PPFIFO_WIDTH       (BUFFER_SIZE          )
 ) vr (
   .clk                (i_axis_clk           ),
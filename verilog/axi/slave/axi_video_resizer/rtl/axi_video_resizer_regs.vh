@@ -0,0 +1,16 @@
+//Generated by register_map.py from video_resizer_regs.json, do not edit
+//DESCRIPTION_SHA1: ed53c97ad01ecb6c990676f91bef27a1281c7700
+
+//Registers
+localparam          REG_CONTROL              = 0;
+localparam          REG_STATUS               = 1;
+localparam          REG_VERSION              = 2;
+localparam          REG_VIDEO_IN_SIZE        = 4;
+localparam          REG_VIDEO_IN_WIDTH       = 5;
+localparam          REG_VIDEO_IN_HEIGHT      = 6;
+localparam          REG_VIDEO_OUT_SIZE       = 8;
+localparam          REG_VIDEO_OUT_WIDTH      = 9;
+localparam          REG_VIDEO_OUT_HEIGHT     = 10;
+localparam          REG_VIDEO_IN_START_X     = 12;
+localparam          REG_VIDEO_IN_START_Y     = 13;
+localparam          REG_IN_FILL_PIXEL        = 14;
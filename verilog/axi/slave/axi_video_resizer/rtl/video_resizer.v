@@ -26,6 +26,9 @@ SOFTWARE.
  * Description:
  *  Translate one image size to another image size
  *  Only downsampling is supported
+ *  The output is the window of the input that starts at (start x, start y),
+ *  the part of the window outside of the input is filled with the fill
+ *  pixel value
  *  TODO:
  *    Support Up Sampling
  *
@@ -87,6 +90,7 @@ reg   [31:0]                      r_read_width_pos;
 reg   [31:0]                      r_read_height_pos;
 reg   [31:0]                      r_pixel_in_count;
 reg   [31:0]                      r_pixel_out_count;
+reg   [31:0]                      r_line_fill_count;
 
 reg                               r_read_stb;
 wire                              w_read_rdy;
@@ -98,10 +102,12 @@ reg                               r_write_stb;
 wire  [1:0]                       w_write_rdy;
 reg   [1:0]                       r_write_act;
 wire  [23:0]                      w_write_size;
-//reg   [DATAS_WIDTH - 1: 0]        r_write_data;
-//wire  [DATAS_WIDTH - 1: 0]        w_write_data;
+reg                               r_write_fill;
+wire  [DATAS_WIDTH - 1: 0]        w_write_data;
 
 wire                              w_trans_valid;
+wire                              w_window_line;
+wire  [31:0]                      w_line_fill_count;
 
 //submodules
 ppfifo #(
@@ -141,8 +147,7 @@ ppfifo #(
   .write_activate  (r_write_act       ),
   .write_fifo_size (w_write_size      ),
   .write_strobe    (r_write_stb       ),
-  //.write_data      (r_write_data      ),
-  .write_data      (w_read_data       ),
+  .write_data      (w_write_data      ),
 
   //read
   .read_clock      (clk               ),
@@ -153,13 +158,23 @@ ppfifo #(
   .read_data       (o_fifo_out_data   )
 );
 
-//assign  w_write_data  =   (w_trans_valid) ?  w_read_data : i_fill_pixel_value;
+//The fill flag is registered with the write strobe, w_trans_valid has
+//already moved on to the next pixel when the strobe reaches the FIFO
+assign  w_write_data  =   (r_write_fill) ?  i_fill_pixel_value : w_read_data;
 
 //asynchronous logic
 assign  w_trans_valid =   (r_read_width_pos  >=  i_video_in_start_x)                      &&
                           (r_read_width_pos  <  (i_video_in_start_x + i_video_out_width))&&
                           (r_read_height_pos >=  i_video_in_start_y)                      &&
                           (r_read_height_pos <  (i_video_in_start_y + i_video_out_height));
+
+//The line being read is one of the rows of the window, the rows that are
+//wider than the input are padded with w_line_fill_count pixels
+assign  w_window_line =   (r_read_height_pos >=  i_video_in_start_y)                      &&
+                          (r_read_height_pos <  (i_video_in_start_y + i_video_out_height));
+assign  w_line_fill_count = ((i_video_in_start_x + i_video_out_width) <= i_video_in_width) ? 0 :
+                            (i_video_in_start_x >= i_video_in_width) ? i_video_out_width :
+                            (i_video_in_start_x + i_video_out_width - i_video_in_width);
 //synchronous logic
 always @ (posedge clk) begin
   r_write_stb           <=  0;
@@ -168,10 +183,11 @@ always @ (posedge clk) begin
     r_read_width_pos    <=  0;
     r_read_height_pos   <=  0;
     r_pixel_out_count   <=  0;
+    r_line_fill_count   <=  0;
 
     r_read_act          <=  0;
     r_write_act         <=  0;
-//    r_write_data        <=  0;
+    r_write_fill        <=  0;
     state               <=  INACTIVE;
 
     r_read_count        <=  0;
@@ -185,6 +201,8 @@ always @ (posedge clk) begin
         r_read_width_pos    <=  0;
         r_read_height_pos   <=  0;
         r_pixel_in_count    <=  0;
+        r_pixel_out_count   <=  0;
+        r_line_fill_count   <=  0;
         if (i_enable) begin
           state             <=  ACITVE;
         end
@@ -206,7 +224,20 @@ always @ (posedge clk) begin
           r_read_act        <=  1;
         end
 
-        if (r_read_act && (r_write_act > 0)) begin
+        if ((r_line_fill_count > 0) && (r_write_act > 0)) begin
+          //The window is wider than the input, pad the end of the line
+          if (r_write_count < w_write_size) begin
+            r_write_stb           <=  1;
+            r_write_fill          <=  1;
+            r_write_count         <=  r_write_count + 1;
+            r_pixel_out_count     <=  r_pixel_out_count + 1;
+            r_line_fill_count     <=  r_line_fill_count - 1;
+          end
+          else begin
+            r_write_act           <=  0;
+          end
+        end
+        else if (r_read_act && (r_write_act > 0)) begin
           //Both sides are open
           if ((r_write_count < w_write_size) && (r_read_count < w_read_size)) begin
             //Get data from the input
@@ -222,10 +253,13 @@ always @ (posedge clk) begin
               //Reached the end of a line, go to the next line
               r_read_width_pos    <=  0;
               r_read_height_pos   <= r_read_height_pos + 1;
+              if (w_window_line) begin
+                r_line_fill_count <=  w_line_fill_count;
+              end
             end
             if (w_trans_valid) begin
               r_write_stb         <=  1;
-//              r_write_data        <=  w_read_data;
+              r_write_fill        <=  0;
               r_pixel_out_count   <=  r_pixel_out_count + 1;
             end
           end
@@ -239,7 +273,10 @@ always @ (posedge clk) begin
             end
           end
         end
-        if (r_pixel_out_count >= i_video_out_size) begin
+        //Go to flush when the window is complete or when the input ran out,
+        //the rows of the window below the input are filled in flush
+        if ((r_pixel_out_count >= i_video_out_size) ||
+            ((r_pixel_in_count >= i_video_in_size) && (r_line_fill_count == 0))) begin
           state                   <=  FLUSH;
         end
       end
@@ -262,7 +299,7 @@ always @ (posedge clk) begin
           end
         end
         if (r_pixel_out_count < i_video_out_size) begin
-          if ((w_write_rdy > 0) && (r_read_act == 0)) begin
+          if ((w_write_rdy > 0) && (r_write_act == 0)) begin
             r_write_count         <=  0;
             if (w_write_rdy[0]) begin
               r_write_act[0]      <=  1;
@@ -274,9 +311,12 @@ always @ (posedge clk) begin
           else if (r_write_act > 0) begin
             if (r_write_count < w_write_size) begin
               r_write_stb         <=  1;
+              r_write_fill        <=  1;
               r_write_count       <=  r_write_count + 1;
               r_pixel_out_count   <=  r_pixel_out_count + 1;
-//              r_write_data        <=  i_fill_pixel_value;
+            end
+            else begin
+              r_write_act         <=  0;
             end
           end
         end
@@ -138,12 +138,16 @@ always @ (posedge clk) begin
         if (i_awvalid && o_awready) begin
           o_reg_address <=  i_awaddr;
           o_wready      <=  1;
+          //Drop ready right away, a pipelined master would see a second
+          //address handshake while we are busy with this one
+          o_awready     <=  0;
           o_arready     <=  0;
           state         <=  RECEIVE_WRITE_DATA;
         end
         else if (i_arvalid && o_arready) begin
           o_reg_address <=  i_araddr;
           o_awready     <=  0;
+          o_arready     <=  0;
           o_reg_out_req <=  1;
           state         <=  READ_WAIT_FOR_USER;
         end
@@ -155,6 +159,7 @@ always @ (posedge clk) begin
           //Assume everything is okay unless the o_reg_address is wrong,
           //We don't want to clutter our states with this statement over and over again
           o_reg_in_data   <=  i_wdata;
+          o_wready        <=  0;
           state           <=  WRITE_WAIT_FOR_USER;
           o_reg_in_rdy    <=  1;
         end
@@ -176,6 +181,9 @@ always @ (posedge clk) begin
       SEND_WRITE_RESP: begin
         if (i_bready && o_bvalid) begin
           o_bvalid      <=  0;
+          //Ready for the next address as soon as we are back in IDLE
+          o_awready     <=  1;
+          o_arready     <=  1;
           state         <=  IDLE;
         end
       end
@@ -200,6 +208,8 @@ always @ (posedge clk) begin
         //If more time is needed for a response another state should be added here
         if (i_rready && o_rvalid) begin
           o_rvalid      <=  0;
+          o_awready     <=  1;
+          o_arready     <=  1;
           state         <=  IDLE;
         end
       end
@@ -173,4 +173,43 @@ def write_758_word_test(dut):
     #    print "0x%08X" % d
 
 
+@cocotb.test(skip = False)
+def read_stream_test(dut):
+    """
+    Description:
+        Check the data one block at a time while the writer is still
+        running, the reader holds off ACT to emulate a slow consumer
+
+    Test ID: 3
+
+    Expected Results:
+        Every block matches the data written in order
+    """
+    CLK_WR_PERIOD = 10
+    CLK_RD_PERIOD = 10
+    COUNT = 0x300
+    ACT_DELAY = 50
+
+    dut.rst <= 1
+    dut.test_id <= 3
+    cocotb.fork(Clock(dut.WR_CLK, CLK_WR_PERIOD).start())
+    cocotb.fork(Clock(dut.RD_CLK, CLK_RD_PERIOD).start())
+    writer = BlockFIFOWritePath(dut, "WR", dut.WR_CLK)
+    reader = BlockFIFOReadPath(dut, "RD", dut.RD_CLK)
+    yield Timer(CLK_WR_PERIOD * 10)
+    dut.rst <= 1
+    yield Timer(CLK_WR_PERIOD * 10)
+    dut.rst <= 0
+    yield Timer(CLK_WR_PERIOD * 10)
 
+    stream = reader.stream(act_delay = ACT_DELAY)
+    write_thread = cocotb.fork(writer.write(range(COUNT)))
+    pos = 0
+    while pos < COUNT:
+        block = yield stream.next_block()
+        if block.tolist() != range(pos, pos + len(block)):
+            raise TestFailure("Block %d does not match, starting at word %d" % (stream.block_count, pos))
+        pos += len(block)
+    stream.stop()
+    yield write_thread.join()
+    dut.log.info("Streamed %d words in %d blocks" % (pos, stream.block_count))
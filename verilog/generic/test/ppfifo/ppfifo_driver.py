@@ -6,6 +6,94 @@ from cocotb.binary import BinaryValue
 
 import binascii
 import array
+import itertools
+
+from fifo_block_stream import FIFOBlockStream
+
+def _word_blocks(data, size):
+    """
+    Split data into lists of at most 'size' words
+
+    NumPy arrays and array.array are sliced and converted with 'tolist', which
+    hands back plain integers the simulator can assign directly, anything
+    else (lists, iterators, generators) is consumed lazily so the whole
+    payload never has to be in memory
+    """
+    if hasattr(data, "tolist") and hasattr(data, "__getitem__"):
+        for pos in range(0, len(data), size):
+            yield data[pos:pos + size].tolist()
+        return
+
+    it = iter(data)
+    while True:
+        block = list(itertools.islice(it, size))
+        if len(block) == 0:
+            return
+        yield block
+
+class PPFIFOBlockStats(object):
+    """
+    Per block statistics, all values are in clock cycles
+
+    wait:   from requesting a block until one of the FIFOs was ready
+    block:  from requesting a block until it was released
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.blocks = 0
+        self.words = 0
+        self.total_wait = 0
+        self.min_wait = None
+        self.max_wait = 0
+        self.total_cycles = 0
+        self.min_cycles = None
+        self.max_cycles = 0
+
+    def add(self, words, wait, cycles):
+        self.blocks += 1
+        self.words += words
+        self.total_wait += wait
+        self.total_cycles += cycles
+        if self.min_wait is None or wait < self.min_wait:
+            self.min_wait = wait
+        if self.min_cycles is None or cycles < self.min_cycles:
+            self.min_cycles = cycles
+        self.max_wait = max(self.max_wait, wait)
+        self.max_cycles = max(self.max_cycles, cycles)
+
+    def average_wait(self):
+        if self.blocks == 0:
+            return 0.0
+        return float(self.total_wait) / self.blocks
+
+    def average_cycles(self):
+        if self.blocks == 0:
+            return 0.0
+        return float(self.total_cycles) / self.blocks
+
+    def words_per_cycle(self):
+        if self.total_cycles == 0:
+            return 0.0
+        return float(self.words) / self.total_cycles
+
+    def __str__(self):
+        if self.blocks == 0:
+            return "No blocks"
+        return  "Blocks: %d, Words: %d, " \
+                "Wait (min/avg/max): %d/%0.1f/%d, " \
+                "Block (min/avg/max): %d/%0.1f/%d, " \
+                "Words/Cycle: %0.3f" % (self.blocks,
+                                        self.words,
+                                        self.min_wait,
+                                        self.average_wait(),
+                                        self.max_wait,
+                                        self.min_cycles,
+                                        self.average_cycles(),
+                                        self.max_cycles,
+                                        self.words_per_cycle())
 
 class PPFIFOError(Exception):
     pass
@@ -14,70 +102,234 @@ class PPFIFOWritePath(BusDriver):
     _signals = ["RDY", "ACT", "STB", "SIZE", "DATA"]
     _optional_signals = ["STARVED"]
 
-    def __init__(self, entity, name, clock):
+    def __init__(self, entity, name, clock, fast = False):
+        """
+        Args:
+            fast (boolean): high throughput mode, the handshakes are the same
+                but the ready poll only waits on the clock and nothing is
+                printed
+        """
         BusDriver.__init__(self, entity, name, clock)
         self.bus.ACT.setimmediatevalue(0)
         self.bus.DATA.setimmediatevalue(0)
         self.bus.STB.setimmediatevalue(0)
         self.busy = Lock("%s_busy" % name)
+        self.fast = fast
+        self.edge = RisingEdge(self.clock)
+        self.next_side = 0
+        self.stats = PPFIFOBlockStats()
 
     @cocotb.coroutine
-    def write(self, data):
-        yield self.busy.acquire()
-        pos = 0
-        count = 0
-        total_length = len(data)
-        rdy = 0
+    def _wait_ready(self):
+        """
+        Wait for one of the ping pong FIFOs to be ready
+
+        In fast mode the ready bits are sampled on the clock edge, which is
+        the value they had for the previous cycle, so only one trigger is
+        needed per cycle instead of a ReadOnly and a RisingEdge
 
-        while pos < total_length:
+        Returns (tuple):
+            ready bits, clock cycles waited
+        """
+        cycles = 0
+        if self.fast:
+            edge = self.edge
+            rdy_signal = self.bus.RDY
+            while True:
+                yield edge
+                cycles += 1
+                rdy = int(rdy_signal)
+                if rdy != 0:
+                    break
+        else:
             while True:
                 yield ReadOnly()
                 rdy = int(self.bus.RDY)
+                yield RisingEdge(self.clock)
+                cycles += 1
                 if rdy != 0:
-                    yield RisingEdge(self.clock)
                     break
-                yield RisingEdge(self.clock)
+        raise ReturnValue((rdy, cycles))
 
-            if (rdy & 0x01) > 0:
-                self.bus.ACT <= 0x01
-            else:
-                self.bus.ACT <= 0x02
+    @cocotb.coroutine
+    def _write_block(self, block):
+        """
+        Fill one of the ping pong FIFOs with 'block'
 
-            yield RisingEdge(self.clock)
-            length  = total_length
-            if length > int(self.bus.SIZE):
-                length = self.bus.SIZE
+        When both FIFOs are ready they are used alternately, the same way the
+        read side breaks the tie, so the blocks come out in order
+        """
+        rdy, wait = yield self._wait_ready()
+        if (rdy & 0x03) == 0x03:
+            side = self.next_side
+        elif (rdy & 0x01) > 0:
+            side = 0
+        else:
+            side = 1
+        self.next_side = 1 - side
+        self.bus.ACT <= (1 << side)
 
-            print "Length: %d" % length
+        edge = self.edge
+        yield edge
+        if not self.fast:
+            print "Length: %d" % len(block)
 
-            for d in data[pos:length]:
-                self.bus.STB    <=  1
-                self.bus.DATA   <=  d
-                yield RisingEdge(self.clock)
+        stb = self.bus.STB
+        data = self.bus.DATA
+        stb <= 1
+        for d in block:
+            data <= d
+            yield edge
 
-            self.bus.STB        <=  0
-            pos += length
-            yield RisingEdge(self.clock)
-            self.bus.ACT        <=  0
-            yield RisingEdge(self.clock)
+        stb <= 0
+        yield edge
+        self.bus.ACT <= 0
+        yield edge
+        self.stats.add(len(block), wait, wait + len(block) + 3)
+
+    @cocotb.coroutine
+    def write(self, data):
+        """
+        Stream words through the ping pong FIFO
+
+        Args:
+            data (list, iterator, generator, array.array or NumPy array):
+                words to write, iterators and generators are consumed one
+                block at a time
 
+        Returns:
+            Nothing
+
+        Per block latency is accumulated in 'stats'
+        """
+        yield self.busy.acquire()
+        size = int(self.bus.SIZE)
+        for block in _word_blocks(data, size):
+            yield self._write_block(block)
         self.busy.release()
 
+    @cocotb.coroutine
+    def write_burst(self, data):
+        """
+        Write a buffer of words using as many ping pong blocks as needed
+
+        Args:
+            data (list, array.array or NumPy array): words to write
+
+        Returns:
+            Nothing
+        """
+        yield self.write(data)
+
 class PPFIFOReadPath(BusDriver):
     _signals = ["RDY", "ACT", "STB", "SIZE", "DATA"]
     _optional_signals = ["INACTIVE"]
 
-    def __init__(self, entity, name, clock):
+    def __init__(self, entity, name, clock, fast = False):
+        """
+        Args:
+            fast (boolean): high throughput mode, data is sampled on the
+                clock edge instead of waiting for ReadOnly after every word
+        """
         BusDriver.__init__(self, entity, name, clock)
         self.bus.ACT.setimmediatevalue(0)
         self.bus.STB.setimmediatevalue(0)
         self.busy = Lock("%s_busy" % name)
+        self.fast = fast
+        self.edge = RisingEdge(self.clock)
+
+    @cocotb.coroutine
+    def _read_block(self, data, act_delay = 0):
+        """
+        Wait for a ready block, activate it and append every word to 'data'
+
+        'act_delay' holds off ACT for that many cycles after the block is
+        ready
+
+        In fast mode DATA is sampled on the rising edge, which reads the
+        value it held for the previous cycle. This is the same value the
+        ReadOnly phase of that cycle would see, so the strobe timing is
+        identical to the default path with half the triggers
+
+        Returns (integer):
+            number of words read
+        """
+        edge = self.edge
+        rdy = self.bus.RDY
+        yield ReadOnly()
+        if int(rdy):
+            yield edge
+        else:
+            while True:
+                yield edge
+                if int(rdy):
+                    break
+        for i in range(act_delay):
+            yield edge
+        self.bus.ACT    <=  1
+        yield edge
+        yield edge
+        yield ReadOnly()
+        fifo_size = int(self.bus.SIZE)
+
+        bus_data = self.bus.DATA
+        append = data.append
+        if self.fast:
+            yield edge
+            self.bus.STB    <=  1
+            for i in range(fifo_size):
+                yield edge
+                append(int(bus_data))
+        else:
+            for i in range(fifo_size):
+                yield RisingEdge(self.clock)
+                self.bus.STB    <=  1
+                yield ReadOnly()
+                append(int(bus_data))
+            yield RisingEdge(self.clock)
+
+        self.bus.STB    <=  0
+        self.bus.ACT    <=  0
+        yield edge
+        raise ReturnValue(fifo_size)
+
+    @cocotb.coroutine
+    def read_burst(self, size):
+        """
+        Read at least 'size' words, whole blocks are always read
+
+        Returns (array.array('I')):
+            words read, wrap it with numpy.frombuffer(data, dtype = numpy.uint32)
+            for a NumPy view without copying
+        """
+        data = array.array('I')
+        yield self.busy.acquire()
+        while len(data) < size:
+            yield self._read_block(data)
+        self.busy.release()
+        raise ReturnValue(data)
+
+    def stream(self, count = None, depth = 2, act_delay = 0, as_numpy = False):
+        """
+        Start reading blocks in the background, see FIFOBlockStream
+
+        Returns (FIFOBlockStream):
+            call 'next_block' to get each block as it completes
+        """
+        return FIFOBlockStream(self, count, depth, act_delay, as_numpy)
 
     @cocotb.coroutine
     def read(self, size=None):
         """
-        If set to None just keep reading
+        Read at least 'size' words
+
+        If set to None blocks are read and thrown away forever, use 'stream'
+        to check the data of an unbounded read
         """
+        if self.fast and size is not None:
+            data = yield self.read_burst(size)
+            raise ReturnValue(data.tolist())
+
         fifo_size = 0
         data = []
         yield self.busy.acquire()
@@ -51,3 +51,122 @@ def write_1_word_test(dut):
 
 
 
+@cocotb.test(skip = False)
+def throughput_benchmark_test(dut):
+    """
+    Description:
+        Stream a large buffer through the ping pong FIFO with the default
+        and the high throughput drivers
+
+    Test ID: 1
+
+    Expected Results:
+        Data read matches data written, report words per wall clock second
+    """
+    CLK_WR_PERIOD = 10
+    CLK_RD_PERIOD = 10
+    WORD_COUNT = 0x10000
+
+    dut.rst <= 1
+    dut.test_id <= 1
+    cocotb.fork(Clock(dut.WR_CLK, CLK_WR_PERIOD).start())
+    cocotb.fork(Clock(dut.RD_CLK, CLK_RD_PERIOD).start())
+
+    data_out = Array('I', range(WORD_COUNT))
+    for fast in [False, True]:
+        writer = PPFIFOWritePath(dut, "WR", dut.WR_CLK, fast = fast)
+        reader = PPFIFOReadPath(dut, "RD", dut.RD_CLK, fast = fast)
+        dut.rst <= 1
+        yield Timer(CLK_WR_PERIOD * 10)
+        dut.rst <= 0
+        yield Timer(CLK_WR_PERIOD * 10)
+
+        start = time.time()
+        read_thread = cocotb.fork(reader.read_burst(WORD_COUNT))
+        yield writer.write_burst(data_out)
+        data_in = yield read_thread.join()
+        elapsed = time.time() - start
+
+        mode = "Fast" if fast else "Default"
+        dut.log.info("%s Mode: %d words in %0.3f s: %0.0f words/s" % (mode, WORD_COUNT, elapsed, WORD_COUNT / elapsed))
+        dut.log.info("%s Mode: Write %s" % (mode, str(writer.stats)))
+        if data_in[:WORD_COUNT] != data_out:
+            raise TestFailure("%s Mode: Data read does not match data written" % mode)
+
+@cocotb.test(skip = False)
+def write_stream_test(dut):
+    """
+    Description:
+        Stream words from a generator, the length is not a multiple of the
+        FIFO size so both ping pong halves and a partial block are used
+
+    Test ID: 2
+
+    Expected Results:
+        Data read matches data written, report per block latency
+    """
+    CLK_WR_PERIOD = 10
+    CLK_RD_PERIOD = 10
+    WORD_COUNT = 0x1000 + 0x10
+
+    dut.rst <= 1
+    dut.test_id <= 2
+    cocotb.fork(Clock(dut.WR_CLK, CLK_WR_PERIOD).start())
+    cocotb.fork(Clock(dut.RD_CLK, CLK_RD_PERIOD).start())
+    writer = PPFIFOWritePath(dut, "WR", dut.WR_CLK, fast = True)
+    reader = PPFIFOReadPath(dut, "RD", dut.RD_CLK, fast = True)
+    yield Timer(CLK_WR_PERIOD * 10)
+    dut.rst <= 0
+    yield Timer(CLK_WR_PERIOD * 10)
+
+    def word_generator(count):
+        for i in range(count):
+            yield (i * 0x01010101) & 0xFFFFFFFF
+
+    read_thread = cocotb.fork(reader.read_burst(WORD_COUNT))
+    yield writer.write(word_generator(WORD_COUNT))
+    data_in = yield read_thread.join()
+
+    dut.log.info("Write %s" % str(writer.stats))
+    if data_in.tolist() != list(word_generator(WORD_COUNT)):
+        raise TestFailure("Data read does not match data written")
+
+@cocotb.test(skip = False)
+def read_stream_test(dut):
+    """
+    Description:
+        Check the data one block at a time with a slow consumer that holds
+        off ACT for a few cycles on every block
+
+    Test ID: 3
+
+    Expected Results:
+        Every block matches the data written in order
+    """
+    CLK_WR_PERIOD = 10
+    CLK_RD_PERIOD = 10
+    WORD_COUNT = 0x2000
+    ACT_DELAY = 20
+
+    dut.rst <= 1
+    dut.test_id <= 3
+    cocotb.fork(Clock(dut.WR_CLK, CLK_WR_PERIOD).start())
+    cocotb.fork(Clock(dut.RD_CLK, CLK_RD_PERIOD).start())
+    writer = PPFIFOWritePath(dut, "WR", dut.WR_CLK, fast = True)
+    reader = PPFIFOReadPath(dut, "RD", dut.RD_CLK, fast = True)
+    yield Timer(CLK_WR_PERIOD * 10)
+    dut.rst <= 0
+    yield Timer(CLK_WR_PERIOD * 10)
+
+    stream = reader.stream(act_delay = ACT_DELAY)
+    write_thread = cocotb.fork(writer.write(xrange(WORD_COUNT)))
+    pos = 0
+    while pos < WORD_COUNT:
+        block = yield stream.next_block()
+        if block.tolist() != range(pos, pos + len(block)):
+            raise TestFailure("Block %d does not match, starting at word %d" % (stream.block_count, pos))
+        pos += len(block)
+    stream.stop()
+    yield write_thread.join()
+    dut.log.info("Streamed %d words in %d blocks" % (pos, stream.block_count))
+    dut.log.info("Write %s" % str(writer.stats))
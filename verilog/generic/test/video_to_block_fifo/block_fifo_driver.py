@@ -7,6 +7,8 @@ from cocotb.binary import BinaryValue
 import binascii
 import array
 
+from fifo_block_stream import FIFOBlockStream
+
 class BlockError(Exception):
     pass
 
@@ -70,10 +72,56 @@ class BlockFIFOReadPath(BusDriver):
         self.bus.STB.setimmediatevalue(0)
         self.busy = Lock("%s_busy" % name)
 
+    @cocotb.coroutine
+    def _read_block(self, data, act_delay = 0):
+        """
+        Wait for a ready block, activate it and append every word to 'data'
+
+        'act_delay' holds off ACT for that many cycles after the block is
+        ready
+
+        Returns (integer):
+            number of words read
+        """
+        yield ReadOnly()
+        while not int(self.bus.RDY):
+            yield RisingEdge(self.clock)
+            yield ReadOnly()
+        yield RisingEdge(self.clock)
+        for i in range(act_delay):
+            yield RisingEdge(self.clock)
+        self.bus.ACT    <=  1
+        yield RisingEdge(self.clock)
+        yield RisingEdge(self.clock)
+        yield ReadOnly()
+        fifo_size = int(self.bus.SIZE)
+        for i in range(fifo_size):
+            yield RisingEdge(self.clock)
+            self.bus.STB    <=  1
+            yield ReadOnly()
+            data.append(int(self.bus.DATA))
+        yield RisingEdge(self.clock)
+        self.bus.STB    <=  0
+        self.bus.ACT    <=  0
+        yield RisingEdge(self.clock)
+        raise ReturnValue(fifo_size)
+
+    def stream(self, count = None, depth = 2, act_delay = 0, as_numpy = False):
+        """
+        Start reading blocks in the background, see FIFOBlockStream
+
+        Returns (FIFOBlockStream):
+            call 'next_block' to get each block as it completes
+        """
+        return FIFOBlockStream(self, count, depth, act_delay, as_numpy)
+
     @cocotb.coroutine
     def read(self, size=None):
         """
-        If set to None just keep reading
+        Read at least 'size' words
+
+        If set to None blocks are read and thrown away forever, use 'stream'
+        to check the data of an unbounded read
         """
         fifo_size = 0
         data = []
@@ -0,0 +1,196 @@
+"""
+Pipelined AXI4 Lite master
+
+The cocotb AXI4LiteMaster finishes one transaction before it starts the next
+one and the tests add a Timer after every word on top of that. This master
+drives the address, data and response channels independently: a new address
+goes out on the clock after the last one was accepted, write data does not
+wait for the address and the responses are collected as they come back. Up
+to 'max_outstanding' transactions can be in flight, nothing waits longer
+than the handshakes require.
+
+    axim = AXI4LitePipelinedMaster(dut, "AXIML", dut.clk)
+    yield axim.write_many([(0x00, 0x01), (0x04, 0x1234)])
+    data = yield axim.read_many([0x00, 0x04])
+
+Reads and writes are never mixed on the bus, axi_lite_slave only handles one
+direction at a time: a batch owns the bus until all of its responses are
+back.
+"""
+
+import logging
+
+import cocotb
+from cocotb.drivers import BusDriver
+from cocotb.drivers.amba import AXIProtocolError
+from cocotb.result import ReturnValue
+from cocotb.triggers import RisingEdge
+from cocotb.triggers import ReadOnly
+from cocotb.triggers import Lock
+
+AXI_RESP_OKAY           = 0x0
+
+class AXI4LitePipelinedMaster(BusDriver):
+
+    _signals = ["AWVALID", "AWADDR", "AWREADY",
+                "WVALID", "WDATA", "WREADY",
+                "BVALID", "BREADY", "BRESP",
+                "ARVALID", "ARADDR", "ARREADY",
+                "RVALID", "RREADY", "RRESP", "RDATA"]
+    _optional_signals = ["WSTRB"]
+
+    def __init__(self, entity, name, clock, max_outstanding = 4, debug = False):
+        BusDriver.__init__(self, entity, name, clock)
+        if debug:
+            self.log.setLevel(logging.DEBUG)
+        self.max_outstanding = max_outstanding
+        self.bus_lock = Lock("%s_busy" % name)
+
+        self.bus.AWVALID    <=  0
+        self.bus.AWADDR     <=  0
+        self.bus.WVALID     <=  0
+        self.bus.WDATA      <=  0
+        self.bus.ARVALID    <=  0
+        self.bus.ARADDR     <=  0
+        #Responses are always accepted
+        self.bus.BREADY     <=  1
+        self.bus.RREADY     <=  1
+        if hasattr(self.bus, "WSTRB"):
+            self.bus.WSTRB  <=  (1 << (len(self.bus.WDATA) / 8)) - 1
+
+    @cocotb.coroutine
+    def _send(self, valid, ready, fields, values, issued, completed):
+        """
+        Send every value on one channel, each one is held until it is
+        accepted, the channel stalls when 'max_outstanding' transactions are
+        waiting for a response
+
+        Args:
+            valid, ready: channel handshake signals
+            fields (list of signals): driven with each value
+            values (list of tuples): one tuple per transaction
+            issued (list with one integer): count of accepted values
+            completed (list with one integer): count of responses
+        """
+        for value in values:
+            if (issued[0] - completed[0]) >= self.max_outstanding:
+                #The last value was accepted, don't offer it again while
+                #waiting for a response
+                valid       <=  0
+                while (issued[0] - completed[0]) >= self.max_outstanding:
+                    yield RisingEdge(self.clock)
+            for signal, v in zip(fields, value):
+                signal      <=  v
+            valid           <=  1
+            while True:
+                #Ready is sampled by the same edge that samples valid
+                yield ReadOnly()
+                accepted = bool(ready.value)
+                yield RisingEdge(self.clock)
+                if accepted:
+                    break
+            issued[0] += 1
+        valid               <=  0
+
+    @cocotb.coroutine
+    def write_many(self, addr_value_pairs):
+        """
+        Write a batch of registers
+
+        Args:
+            addr_value_pairs (list of tuples): (byte address, 32-bit value)
+
+        Returns (list of integers):
+            write responses, in order
+
+        Raises:
+            AXIProtocolError: a response was not OKAY
+        """
+        pairs = list(addr_value_pairs)
+        if len(pairs) == 0:
+            raise ReturnValue([])
+
+        yield self.bus_lock.acquire()
+        yield RisingEdge(self.clock)
+        completed = [0]
+        aw = cocotb.fork(self._send(self.bus.AWVALID, self.bus.AWREADY, [self.bus.AWADDR],
+                                    [(a,) for a, v in pairs], [0], completed))
+        w = cocotb.fork(self._send(self.bus.WVALID, self.bus.WREADY, [self.bus.WDATA],
+                                   [(v,) for a, v in pairs], [0], completed))
+
+        responses = []
+        while len(responses) < len(pairs):
+            yield ReadOnly()
+            if self.bus.BVALID.value:
+                responses.append(int(self.bus.BRESP.value))
+            yield RisingEdge(self.clock)
+            completed[0] = len(responses)
+
+        yield aw.join()
+        yield w.join()
+        self.bus_lock.release()
+
+        for i in range(len(pairs)):
+            if responses[i] != AXI_RESP_OKAY:
+                raise AXIProtocolError("Write to address 0x%08X failed with BRESP: %d" %
+                                       (pairs[i][0], responses[i]))
+        raise ReturnValue(responses)
+
+    @cocotb.coroutine
+    def read_many(self, addrs):
+        """
+        Read a batch of registers
+
+        Args:
+            addrs (list of integers): byte addresses
+
+        Returns (list of integers):
+            values read, in order
+
+        Raises:
+            AXIProtocolError: a response was not OKAY
+        """
+        addrs = list(addrs)
+        if len(addrs) == 0:
+            raise ReturnValue([])
+
+        yield self.bus_lock.acquire()
+        yield RisingEdge(self.clock)
+        completed = [0]
+        ar = cocotb.fork(self._send(self.bus.ARVALID, self.bus.ARREADY, [self.bus.ARADDR],
+                                    [(a,) for a in addrs], [0], completed))
+
+        data = []
+        responses = []
+        while len(data) < len(addrs):
+            yield ReadOnly()
+            if self.bus.RVALID.value:
+                data.append(int(self.bus.RDATA.value))
+                responses.append(int(self.bus.RRESP.value))
+            yield RisingEdge(self.clock)
+            completed[0] = len(data)
+
+        yield ar.join()
+        self.bus_lock.release()
+
+        for i in range(len(addrs)):
+            if responses[i] != AXI_RESP_OKAY:
+                raise AXIProtocolError("Read from address 0x%08X failed with RRESP: %d" %
+                                       (addrs[i], responses[i]))
+        raise ReturnValue(data)
+
+    @cocotb.coroutine
+    def write(self, address, value):
+        """
+        Write a single register, same interface as AXI4LiteMaster.write
+        """
+        responses = yield self.write_many([(address, value)])
+        raise ReturnValue(responses[0])
+
+    @cocotb.coroutine
+    def read(self, address):
+        """
+        Read a single register, same interface as AXI4LiteMaster.read
+        """
+        data = yield self.read_many([address])
+        raise ReturnValue(data[0])
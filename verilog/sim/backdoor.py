@@ -0,0 +1,490 @@
+"""
+Backdoor access to the memories inside a simulation
+
+Large memories (ROMs, frame buffers, fonts) are written and read directly
+through the simulator handles instead of through the bus, a full size image
+takes no simulation time at all.
+
+Data can be given as a string of bytes, Array, a list of integers, a NumPy
+array or a path to a file: '.mem', '.hex' and '.mif' files are read the same
+way $readmemh reads them, anything else is treated as raw bytes.
+
+    font = BRAMBackdoor(dut.dut.cosd.font_buffer)
+    font.load("fontdata.mem")
+
+    rom = NESBackdoor(dut.dut.nes.cart_blk)
+    rom.load_prg(prg_rom)
+
+'verify' checks that the frontdoor (the bus) and the backdoor agree, every
+test that preloads memory can use it once to prove the preload is the same
+as the slow path.
+"""
+
+import os
+import re
+
+import cocotb
+from cocotb.result import ReturnValue
+from cocotb.result import TestFailure
+from array import array as Array
+
+MEM_FILE_EXTENSIONS = [".mem", ".hex", ".mif"]
+
+#Number of mismatches reported by 'verify' before it gives up listing them
+MAX_REPORTED_ERRORS = 8
+
+def read_mem_file(path):
+    """
+    Read a $readmemh style file
+
+    Values are separated by white space, '@<hex address>' moves the load
+    address, '//' and '/* */' comments and '_' separators are ignored,
+    values with 'x' or 'z' in them read as 0
+
+    Args:
+        path (string): path to the file
+
+    Returns (dictionary):
+        address -> value
+    """
+    f = open(path, "r")
+    text = f.read()
+    f.close()
+    text = re.sub(r"/\*.*?\*/", " ", text, flags = re.DOTALL)
+    text = re.sub(r"//[^\n]*", " ", text)
+
+    words = {}
+    address = 0
+    for token in text.split():
+        token = token.replace("_", "")
+        if token.startswith("@"):
+            address = int(token[1:], 16)
+            continue
+        if re.search(r"[xXzZ?]", token):
+            value = 0
+        else:
+            value = int(token, 16)
+        words[address] = value
+        address += 1
+    return words
+
+def write_mem_file(path, words, width, address = 0):
+    """
+    Write words as a $readmemh style file
+
+    Args:
+        path (string): path to the file
+        words (list of integers): data
+        width (integer): bits per word (sets the number of hex digits)
+        address (integer): address of the first word, an '@' line is added
+            when this is not 0
+    """
+    digits = (width + 3) / 4
+    fmt = "%%0%dX\n" % digits
+    f = open(path, "w")
+    if address != 0:
+        f.write("@%X\n" % address)
+    for w in words:
+        f.write(fmt % w)
+    f.close()
+
+def bytes_to_words(data, word_bytes, big_endian = False):
+    """
+    Pack bytes into words
+
+    Args:
+        data (string, Array('B') or list of integers): bytes
+        word_bytes (integer): bytes per word
+        big_endian (boolean): the first byte is the most significant
+
+    Returns (list of integers):
+        words, a partial last word is padded with 0
+    """
+    if isinstance(data, str):
+        data = Array('B', data)
+    if word_bytes == 1:
+        return list(data)
+    words = []
+    for i in range(0, len(data), word_bytes):
+        chunk = list(data[i:i + word_bytes])
+        chunk += [0] * (word_bytes - len(chunk))
+        if not big_endian:
+            chunk.reverse()
+        value = 0
+        for b in chunk:
+            value = (value << 8) | b
+        words.append(value)
+    return words
+
+def to_words(data, width, big_endian = False):
+    """
+    Convert anything the backdoor accepts into a list of words
+
+    Args:
+        data: path, string of bytes, Array, list or NumPy array
+        width (integer): bits per word, used to pack strings of bytes and
+            raw binary files
+        big_endian (boolean): byte order when packing bytes
+
+    Returns (dictionary or list of integers):
+        a dictionary (address -> value) for mem files, a list otherwise
+    """
+    word_bytes = (width + 7) / 8
+    if isinstance(data, str) and os.path.isfile(data):
+        if os.path.splitext(data)[1].lower() in MEM_FILE_EXTENSIONS:
+            return read_mem_file(data)
+        f = open(data, "rb")
+        data = f.read()
+        f.close()
+        return bytes_to_words(data, word_bytes, big_endian)
+    if isinstance(data, str) or isinstance(data, bytearray):
+        return bytes_to_words(Array('B', str(data)), word_bytes, big_endian)
+    if isinstance(data, Array) and data.itemsize == 1 and word_bytes > 1:
+        return bytes_to_words(data, word_bytes, big_endian)
+    if hasattr(data, "ravel"):
+        #NumPy array
+        data = data.ravel().tolist()
+    if isinstance(data, int) or isinstance(data, long):
+        return [data]
+    return [int(d) for d in data]
+
+class BackdoorError(Exception):
+    pass
+
+class BackdoorMemory(object):
+    """
+    A flat array of words inside the simulation
+
+    Subclasses only have to supply '_set' and '_get', everything else
+    (loading, dumping, verifying) is shared
+    """
+
+    def __init__(self, width, depth, name = "memory"):
+        object.__init__(self)
+        self.width = width
+        self.depth = depth
+        self.name = name
+        self.mask = (1 << width) - 1
+
+    def _set(self, address, value):
+        raise NotImplementedError
+
+    def _get(self, address):
+        raise NotImplementedError
+
+    def _check_range(self, address, length):
+        if address < 0 or (address + length) > self.depth:
+            raise BackdoorError("%s: 0x%X - 0x%X is outside of the memory (depth: 0x%X)" %
+                                (self.name, address, address + length, self.depth))
+
+    def write(self, address, data, big_endian = False):
+        """
+        Write words directly into the memory, takes no simulation time
+
+        Args:
+            address (integer): first word
+            data: path, string of bytes, Array, list or NumPy array
+
+        Returns (integer):
+            number of words written
+        """
+        words = to_words(data, self.width, big_endian)
+        if isinstance(words, dict):
+            if len(words) > 0:
+                self._check_range(address + min(words), 0)
+                self._check_range(address + max(words), 1)
+            for a in sorted(words):
+                self._set(address + a, words[a] & self.mask)
+            return len(words)
+
+        self._check_range(address, len(words))
+        for i in range(len(words)):
+            self._set(address + i, words[i] & self.mask)
+        return len(words)
+
+    def load(self, data, address = 0, big_endian = False):
+        """
+        Preload the memory, same as 'write' starting at address 0 by default
+        """
+        return self.write(address, data, big_endian)
+
+    def read(self, address, length):
+        """
+        Read words directly out of the memory
+
+        Returns (list of integers):
+            words, anything that is not a 0 or a 1 reads as 0
+        """
+        self._check_range(address, length)
+        return [self._get(address + i) for i in range(length)]
+
+    def dump(self, path, address = 0, length = None):
+        """
+        Write the contents of the memory to a $readmemh style file
+
+        Args:
+            path (string): destination
+            address (integer): first word
+            length (integer): number of words, None for everything after
+                'address'
+        """
+        if length is None:
+            length = self.depth - address
+        write_mem_file(path, self.read(address, length), self.width, address)
+
+    def compare(self, address, data, big_endian = False):
+        """
+        Compare the memory with expected data
+
+        Returns (list of tuples):
+            (address, expected, actual) of every word that is different
+        """
+        expected = to_words(data, self.width, big_endian)
+        if isinstance(expected, dict):
+            items = [(address + a, expected[a]) for a in sorted(expected)]
+        else:
+            items = [(address + i, expected[i]) for i in range(len(expected))]
+        errors = []
+        for a, e in items:
+            actual = self._get(a)
+            if actual != (e & self.mask):
+                errors.append((a, e & self.mask, actual))
+        return errors
+
+    def _report(self, title, errors):
+        if len(errors) == 0:
+            return
+        lines = ["%s: %s, %d mismatches" % (self.name, title, len(errors))]
+        for a, e, actual in errors[:MAX_REPORTED_ERRORS]:
+            lines.append("  0x%06X: expected: 0x%X actual: 0x%X" % (a, e, actual))
+        raise TestFailure("\n".join(lines))
+
+    @cocotb.coroutine
+    def verify(self, address, data, frontdoor_write = None, frontdoor_read = None):
+        """
+        Check that the frontdoor and the backdoor are equivalent
+
+        If 'frontdoor_write' is given the data is written through the bus and
+        read back through the backdoor. If 'frontdoor_read' is given the data
+        is loaded through the backdoor and read back through the bus.
+
+        Args:
+            address (integer): first word (in the address space of the
+                frontdoor functions)
+            data: path, string of bytes, Array, list or NumPy array
+            frontdoor_write (coroutine function): f(address, words)
+            frontdoor_read (coroutine function): f(address, length) -> words
+
+        Raises:
+            TestFailure: the two paths do not agree
+        """
+        words = to_words(data, self.width)
+        if isinstance(words, dict):
+            raise BackdoorError("verify needs contiguous data, not a sparse mem file")
+        words = [w & self.mask for w in words]
+        address = self.frontdoor_to_backdoor(address)
+
+        if frontdoor_write is not None:
+            yield frontdoor_write(self.backdoor_to_frontdoor(address), words)
+            self._report("Frontdoor write, backdoor read", self.compare(address, words))
+
+        if frontdoor_read is not None:
+            self.write(address, words)
+            actual = yield frontdoor_read(self.backdoor_to_frontdoor(address), len(words))
+            errors = []
+            for i in range(len(words)):
+                if (int(actual[i]) & self.mask) != words[i]:
+                    errors.append((address + i, words[i], int(actual[i]) & self.mask))
+            self._report("Backdoor write, frontdoor read", errors)
+        raise ReturnValue(True)
+
+    def frontdoor_to_backdoor(self, address):
+        """
+        Convert a bus address to a word in the memory, the default is the
+        same address
+        """
+        return address
+
+    def backdoor_to_frontdoor(self, address):
+        return address
+
+class ArrayBackdoor(BackdoorMemory):
+    """
+    A verilog memory array, 'reg [W - 1:0] mem [0:D - 1]'
+
+    Args:
+        handle: simulator handle of the array itself
+        width (integer): bits per word, None to read it from the simulator
+        offset (integer): frontdoor address of the first word
+    """
+
+    def __init__(self, handle, width = None, offset = 0, name = None):
+        if width is None:
+            width = len(handle[0])
+        if name is None:
+            name = handle._name
+        self.handle = handle
+        self.offset = offset
+        BackdoorMemory.__init__(self, width, len(handle), name)
+
+    def _set(self, address, value):
+        self.handle[address].setimmediatevalue(value)
+
+    def _get(self, address):
+        value = self.handle[address].value
+        if not value.is_resolvable:
+            return 0
+        return value.integer
+
+    def frontdoor_to_backdoor(self, address):
+        return address - self.offset
+
+    def backdoor_to_frontdoor(self, address):
+        return address + self.offset
+
+class BRAMBackdoor(ArrayBackdoor):
+    """
+    Backdoor for an instance of one of the generic block RAMs: bram,
+    dual_port_bram, blk_mem or dpb (the array is called 'mem') or the NES
+    single_port_ram_sync and dual_port_ram_sync (the array is called 'ram')
+
+    Args:
+        instance: simulator handle of the module instance
+        width (integer): bits per word, None to read it from the simulator
+        offset (integer): frontdoor address of the first word
+    """
+
+    def __init__(self, instance, width = None, offset = 0):
+        handle = None
+        for array_name in ["mem", "ram"]:
+            if hasattr(instance, array_name):
+                handle = getattr(instance, array_name)
+                break
+        if handle is None:
+            raise BackdoorError("%s does not have a 'mem' or 'ram' array" % instance._name)
+        ArrayBackdoor.__init__(self, handle, width, offset, instance._name)
+
+#mt48lc4m16 geometry
+SDRAM_BANKS                 = 4
+SDRAM_ROWS                  = 4096
+SDRAM_COLUMNS               = 256
+SDRAM_BANK_DEPTH            = SDRAM_ROWS * SDRAM_COLUMNS
+
+class SDRAMBackdoor(BackdoorMemory):
+    """
+    Backdoor for the mt48lc4m16 SDRAM model
+
+    The model keeps bytes in an integer array ('Mem'), -1 is a byte that was
+    never written. The words of this memory are the 32-bit words wb_sdram
+    puts on the wishbone bus: the upper 16-bits are in the column of the
+    address, the lower 16-bits are in the next column.
+
+    Args:
+        instance: simulator handle of the mt48lc4m16 instance
+        bank_interleave (boolean): match the BANK_INTERLEAVE parameter of
+            the controller, the bank comes from the bits above the column
+            instead of the top of the address
+    """
+
+    def __init__(self, instance, bank_interleave = True):
+        self.handle = instance.Mem
+        self.bank_interleave = bank_interleave
+        BackdoorMemory.__init__(self,
+                                32,
+                                SDRAM_BANKS * SDRAM_BANK_DEPTH / 2,
+                                instance._name)
+
+    def location(self, bank, row, column):
+        """
+        Index of the low byte of a 16-bit word in the model's array
+        """
+        return (bank * SDRAM_BANK_DEPTH + row * SDRAM_COLUMNS + column) * 2
+
+    def split_address(self, address):
+        """
+        Convert a wishbone word address to the location of its upper 16-bits
+
+        Returns (tuple of integers):
+            bank, row, column
+        """
+        #The controller shifts the word address up by one (two columns per word)
+        app_address = (address << 1) & 0x3FFFFF
+        column = app_address & 0xFF
+        if self.bank_interleave:
+            bank = (app_address >> 8) & 0x3
+            row = (app_address >> 10) & 0xFFF
+        else:
+            row = (app_address >> 8) & 0xFFF
+            bank = (app_address >> 20) & 0x3
+        return bank, row, column
+
+    def _set_byte(self, location, value):
+        self.handle[location].setimmediatevalue(value)
+
+    def _get_byte(self, location):
+        value = self.handle[location].value
+        if not value.is_resolvable:
+            return 0
+        value = value.signed_integer
+        #Never written
+        if value < 0:
+            return 0
+        return value & 0xFF
+
+    def _set(self, address, value):
+        bank, row, column = self.split_address(address)
+        top = self.location(bank, row, column)
+        bottom = self.location(bank, row, column + 1)
+        self._set_byte(top,         (value >> 16) & 0xFF)
+        self._set_byte(top + 1,     (value >> 24) & 0xFF)
+        self._set_byte(bottom,      (value >>  0) & 0xFF)
+        self._set_byte(bottom + 1,  (value >>  8) & 0xFF)
+
+    def _get(self, address):
+        bank, row, column = self.split_address(address)
+        top = self.location(bank, row, column)
+        bottom = self.location(bank, row, column + 1)
+        return ((self._get_byte(top + 1)    << 24) |
+                (self._get_byte(top)        << 16) |
+                (self._get_byte(bottom + 1) <<  8) |
+                (self._get_byte(bottom)))
+
+#CPU address of the start of PRG ROM
+NES_PRG_OFFSET              = 0x8000
+#PPU address of the start of CHR ROM (pattern tables)
+NES_CHR_OFFSET              = 0x0000
+
+class NESBackdoor(object):
+    """
+    Backdoor for the PRG and CHR ROMs of the NES cartridge
+
+    The addresses used by 'verify' are the ones NESHCI uses: CPU addresses
+    (starting at 0x8000) for PRG ROM and PPU addresses for CHR ROM
+
+    Args:
+        cart: simulator handle of the cart instance (dut.dut.nes.cart_blk)
+    """
+
+    def __init__(self, cart):
+        object.__init__(self)
+        self.prg = BRAMBackdoor(cart.prgrom_bram, 8, NES_PRG_OFFSET)
+        self.chr = BRAMBackdoor(cart.chrrom_pat_bram, 8, NES_CHR_OFFSET)
+
+    def load_prg(self, data):
+        """
+        Write PRG ROM, a single 16KB bank is mirrored by the cartridge so it
+        only fills the bottom of the memory
+        """
+        return self.prg.load(data)
+
+    def load_chr(self, data):
+        return self.chr.load(data)
+
+    def read_prg(self, address, length):
+        """
+        Read PRG ROM using a CPU address (0x8000 is the first byte)
+        """
+        return self.prg.read(self.prg.frontdoor_to_backdoor(address), length)
+
+    def read_chr(self, address, length):
+        return self.chr.read(self.chr.frontdoor_to_backdoor(address), length)
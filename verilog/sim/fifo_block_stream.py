@@ -0,0 +1,108 @@
+"""
+Streaming block reads from the FIFO read path drivers
+
+The PPFIFO and block FIFO read path drivers hand out a FIFOBlockStream from
+their 'stream' call, the reader only has to provide a '_read_block'
+coroutine, a 'busy' lock and a 'name'.
+"""
+
+import cocotb
+from cocotb.triggers import Event
+from cocotb.result import ReturnValue
+
+import array
+import collections
+
+class FIFOBlockStream(object):
+    """
+    Blocks read from a FIFO read path, handed out as soon as ACT drops
+
+    A forked coroutine reads blocks into a queue of at most 'depth' entries,
+    when the queue is full the next block is not activated until the
+    consumer takes one (back pressure), so memory use stays constant no
+    matter how long the stream runs.
+
+    Usage:
+        stream = reader.stream()
+        while True:
+            block = yield stream.next_block()
+            if block is None:
+                break
+            check(block)
+    """
+
+    def __init__(self, reader, count = None, depth = 2, act_delay = 0, as_numpy = False):
+        """
+        Args:
+            reader: read path driver with a '_read_block' coroutine
+            count (integer): number of blocks to read, None reads until 'stop'
+            depth (integer): number of completed blocks to hold before
+                holding off the next ACT
+            act_delay (integer or function): clock cycles to wait between
+                ready and ACT, a function is called with the block number and
+                returns the delay, emulates a slow consumer
+            as_numpy (boolean): hand out NumPy uint32 views instead of
+                array('I') blocks
+        """
+        object.__init__(self)
+        self.reader = reader
+        self.count = count
+        self.depth = depth
+        self.act_delay = act_delay
+        self.as_numpy = as_numpy
+        self.blocks = collections.deque()
+        self.block_ready = Event("%s_block_ready" % reader.name)
+        self.space_ready = Event("%s_space_ready" % reader.name)
+        self.block_count = 0
+        self.word_count = 0
+        self.stopped = False
+        self.finished = False
+        self.thread = cocotb.fork(self._run())
+
+    def _delay(self, index):
+        if callable(self.act_delay):
+            return self.act_delay(index)
+        return self.act_delay
+
+    @cocotb.coroutine
+    def _run(self):
+        yield self.reader.busy.acquire()
+        while not self.stopped and ((self.count is None) or (self.block_count < self.count)):
+            while len(self.blocks) >= self.depth:
+                self.space_ready.clear()
+                yield self.space_ready.wait()
+            block = array.array('I')
+            yield self.reader._read_block(block, self._delay(self.block_count))
+            if self.as_numpy:
+                import numpy
+                block = numpy.frombuffer(block, dtype = numpy.uint32)
+            self.blocks.append(block)
+            self.block_count += 1
+            self.word_count += len(block)
+            self.block_ready.set()
+        self.finished = True
+        self.block_ready.set()
+        self.reader.busy.release()
+
+    @cocotb.coroutine
+    def next_block(self):
+        """
+        Wait for the next completed block
+
+        Returns (array('I'), NumPy array or None):
+            the block, None when the stream has finished
+        """
+        while (len(self.blocks) == 0) and not self.finished:
+            self.block_ready.clear()
+            yield self.block_ready.wait()
+        if len(self.blocks) == 0:
+            raise ReturnValue(None)
+        block = self.blocks.popleft()
+        self.space_ready.set()
+        raise ReturnValue(block)
+
+    def stop(self):
+        """
+        Stop after the block that is currently being read
+        """
+        self.stopped = True
@@ -0,0 +1,219 @@
+"""
+Byte command sequencing for the I2C master cores
+
+wb_i2c and axi_lite_i2c wrap the same byte controller: a transfer is a list
+of byte commands and each one is issued as soon as the status register (or
+the interrupt line) shows the previous one finished. The bus drivers only
+differ in how they reach the registers, they hand the controller their
+register map and register access coroutines:
+
+    controller = I2CController(i2c_regs, self.read_register, self.write_registers, dut.clk)
+    yield controller.write_to_i2c(0x50, [0x00, 0x10, 0xAA])
+    data = yield controller.read_from_i2c(0x50, 4)
+
+'regs' is the module register_map.py generated for the core, it has to
+define STATUS, COMMAND, TRANSMIT and RECEIVE and the STATUS_ and COMMAND_
+masks. 'write_registers' writes a list of (address, value) pairs in order,
+a pipelined driver sends them as one batch.
+
+A core with a transfer finished interrupt can be waited on without any bus
+traffic: give the controller the interrupt line and the (address, value)
+write that acknowledges the interrupt.
+"""
+
+import cocotb
+from cocotb.result import ReturnValue
+from cocotb.triggers import RisingEdge
+from cocotb.utils import get_sim_time
+from array import array as Array
+
+CLK_PERIOD = 10
+
+#Clock cycles to wait for a single byte command, a byte at the slowest clock
+#divider takes less than 12000 cycles
+TRANSFER_TIMEOUT = 100000
+
+class I2CError (Exception):
+    """I2C Error:
+
+    Errors associated with I2C
+        Timeout
+        Arbitration lost
+        No ack from slave
+    """
+    pass
+
+class I2CController(object):
+    """
+    Args:
+        regs (module): generated register map of the core
+        read_register (coroutine function): read_register(address)
+        write_registers (coroutine function): write_registers(list of
+            (address, value))
+        clock: clock of the core
+        clk_period (integer): simulator steps in a clock
+        interrupt_line: transfer finished interrupt, None to poll the status
+            register
+        acknowledge (tuple): (address, value) write that clears the transfer
+            finished interrupt
+    """
+
+    def __init__(self, regs, read_register, write_registers, clock,
+                 clk_period = CLK_PERIOD, interrupt_line = None, acknowledge = None):
+        object.__init__(self)
+        self.regs = regs
+        self.read_register = read_register
+        self.write_registers = write_registers
+        self.clock = clock
+        self.clk_period = clk_period
+        self.interrupt_line = interrupt_line
+        self.acknowledge = acknowledge
+
+    @cocotb.coroutine
+    def wait_for_transfer(self, timeout = TRANSFER_TIMEOUT, mask = None):
+        """wait_for_transfer
+
+        Wait for the byte controller to finish the current command
+
+        Args:
+            timeout: clock cycles to wait before giving up
+            mask: status bits to poll on, defaults to STATUS_TIP, a stop on
+                its own doesn't set STATUS_TIP, wait for STATUS_BUSY instead
+
+        Returns:
+            status register at the end of the transfer
+
+        Raises:
+            I2CError: The transfer did not finish or arbitration was lost
+        """
+        regs = self.regs
+        if mask is None:
+            mask = regs.STATUS_TIP
+
+        finished = False
+        if self.interrupt_line is not None:
+            for i in range(timeout):
+                if int(self.interrupt_line.value):
+                    finished = True
+                    break
+                yield RisingEdge(self.clock)
+            if finished:
+                status = yield self.read_register(regs.STATUS)
+        else:
+            start = get_sim_time()
+            while (get_sim_time() - start) < (timeout * self.clk_period):
+                status = yield self.read_register(regs.STATUS)
+                if (status & mask) == 0:
+                    finished = True
+                    break
+
+        if not finished:
+            raise I2CError("Transfer did not finish within %d clock cycles" % timeout)
+        if (status & regs.STATUS_ARB_LOST) > 0:
+            raise I2CError("Arbitration lost")
+        raise ReturnValue(status)
+
+    @cocotb.coroutine
+    def _acknowledge(self):
+        if self.acknowledge is not None:
+            yield self.write_registers([self.acknowledge])
+
+    @cocotb.coroutine
+    def transfer(self, commands, timeout = TRANSFER_TIMEOUT, read = False):
+        """transfer
+
+        Issue a series of byte commands, the interrupt acknowledge, the next
+        transmit byte and the command go out in a single write batch
+
+        Args:
+            commands: list of (transmit byte or None, command)
+            timeout: clock cycles to wait for each byte
+            read: read the receive register after every command except the
+                first (address) one
+
+        Returns:
+            Array of bytes read
+
+        Raises:
+            I2CError: Errors associated with the I2C protocol
+        """
+        regs = self.regs
+        read_data = Array('B')
+        for i in range(len(commands)):
+            data, command = commands[i]
+            writes = [(regs.COMMAND, command)]
+            if data is not None:
+                writes.insert(0, (regs.TRANSMIT, data))
+            if i > 0 and self.acknowledge is not None:
+                writes.insert(0, self.acknowledge)
+            yield self.write_registers(writes)
+            status = yield self.wait_for_transfer(timeout)
+
+            if read and i > 0:
+                #The receive register is the shift register of the byte
+                #controller, it has to be read before the next command
+                data = yield self.read_register(regs.RECEIVE)
+                read_data.append(data & 0xFF)
+            elif (status & regs.STATUS_READ_ACK_N) > 0:
+                yield self._acknowledge()
+                if (command & regs.COMMAND_STOP) == 0:
+                    yield self.write_registers([(regs.COMMAND, regs.COMMAND_STOP)])
+                    yield self.wait_for_transfer(timeout, regs.STATUS_BUSY)
+                    yield self._acknowledge()
+                raise I2CError("No ack from slave for byte %d" % i)
+
+        yield self._acknowledge()
+        raise ReturnValue(read_data)
+
+    @cocotb.coroutine
+    def write_to_i2c(self, i2c_id, i2c_data, timeout = TRANSFER_TIMEOUT):
+        """write_to_i2c
+
+        Write to an I2C device, the stop condition is sent with the last byte
+
+        Args:
+            i2c_id: 7-bit address of the I2C device
+            i2c_data: list of bytes to write
+            timeout: clock cycles to wait for each byte
+
+        Raises:
+            I2CError: Errors associated with the I2C protocol
+        """
+        regs = self.regs
+        commands = [(i2c_id << 1, regs.COMMAND_WRITE | regs.COMMAND_START)]
+        for data in i2c_data:
+            commands.append((data, regs.COMMAND_WRITE))
+
+        data, command = commands[-1]
+        commands[-1] = (data, command | regs.COMMAND_STOP)
+        yield self.transfer(commands, timeout)
+
+    @cocotb.coroutine
+    def read_from_i2c(self, i2c_id, read_length, timeout = TRANSFER_TIMEOUT):
+        """read_from_i2c
+
+        Read from an I2C device, the last byte is not acknowledged and the
+        stop condition is sent with it
+
+        Args:
+            i2c_id: 7-bit address of the I2C device
+            read_length: number of bytes to read
+            timeout: clock cycles to wait for each byte
+
+        Returns:
+            Array of bytes read from the I2C device
+
+        Raises:
+            I2CError: Errors associated with the I2C protocol
+        """
+        regs = self.regs
+        commands = [((i2c_id << 1) | 0x01, regs.COMMAND_WRITE | regs.COMMAND_START)]
+        for i in range(read_length):
+            commands.append((None, regs.COMMAND_READ))
+
+        data, command = commands[-1]
+        if read_length > 0:
+            command |= regs.COMMAND_NACK
+        commands[-1] = (data, command | regs.COMMAND_STOP)
+        read_data = yield self.transfer(commands, timeout, read = True)
+        raise ReturnValue(read_data)
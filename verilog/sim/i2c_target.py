@@ -0,0 +1,569 @@
+"""
+Behavioral I2C targets for the I2C master testbenches
+
+The testbench resolves the open drain lines. Every model samples the
+resolved SCL and SDA lines and owns a pair of registers it sets to pull the
+lines low:
+
+    eeprom = EEPROM24Cxx(dut.clk, dut.i2c_scl, dut.i2c_sda,
+                         dut.eeprom_scl_low, dut.eeprom_sda_low,
+                         address = 0x50, size = 4096, page_size = 32)
+    eeprom.start()
+
+The lines are sampled on every clock of the master, the clock divider of
+the master has to leave a few clocks between SCL edges.
+
+A target ACKs the address and every byte it accepts. 'ack_policy' can NACK
+on top of that, it is called with the phase ('address' or 'write') and the
+number of data bytes of the transfer so far and returns False to NACK:
+
+    eeprom.ack_policy = lambda phase, count: count < 16
+
+'stretch' holds SCL low for that many clocks before every data byte (the
+time a real device takes to fetch or store a byte).
+
+I2CMonitor counts SCL periods to measure how much of the time the master
+keeps the bus clocking at full speed.
+
+The testbenches of both I2C masters put an EEPROM and a register file
+sensor on the bus, the helpers at the end only use the write_to_i2c and
+read_from_i2c calls both drivers have:
+
+    eeprom, sensor = start_targets(dut)
+    polls = yield eeprom_write(i2c, 0x0100, data)
+    data = yield eeprom_read(i2c, 0x0100, len(data))
+"""
+
+import cocotb
+from cocotb.triggers import RisingEdge
+from cocotb.result import ReturnValue
+from cocotb.result import TestFailure
+
+from i2c_controller import I2CError
+
+#Target states
+IDLE            = 0
+ADDRESS         = 1
+WRITE           = 2
+READ            = 3
+ACK             = 4
+READ_ACK        = 5
+
+def _level(handle):
+    value = handle.value
+    if not value.is_resolvable:
+        #Undriven open drain lines are pulled up
+        return 1
+    return int(value)
+
+class I2CTarget(object):
+    """
+    Bit level I2C target, subclasses implement the device behind it:
+
+        on_start(read): the target was addressed, return False to NACK
+        on_write(byte, index): a data byte was received, return False to NACK
+        on_read(index): return the next byte to send
+        on_stop(): the transfer addressed to the target ended
+        tick(): called every clock
+    """
+
+    def __init__(self, clock, scl, sda, scl_low, sda_low, address,
+                 stretch = 0, ack_policy = None):
+        """
+        Args:
+            clock (handle): clock the lines are sampled on
+            scl (handle): resolved SCL line
+            sda (handle): resolved SDA line
+            scl_low (handle): set to pull SCL low
+            sda_low (handle): set to pull SDA low
+            address (integer): 7-bit target address
+            stretch (integer): clocks SCL is held low before every data byte
+            ack_policy (function): phase, count -> False to NACK
+        """
+        object.__init__(self)
+        self.clock = clock
+        self.scl = scl
+        self.sda = sda
+        self.scl_low = scl_low
+        self.sda_low = sda_low
+        self.address = address
+        self.stretch = stretch
+        self.ack_policy = ack_policy
+
+        self.state = IDLE
+        self.selected = False
+        self.read_mode = False
+        self.master_ack = False
+        self.bits = 0
+        self.shift = 0
+        self.count = 0
+        self.stretch_count = 0
+        self.running = False
+
+        #Statistics
+        self.stretch_cycles = 0
+        self.nacks = 0
+        self.bytes_written = 0
+        self.bytes_read = 0
+
+        self.scl_low <= 0
+        self.sda_low <= 0
+
+    def start(self):
+        if not self.running:
+            self.running = True
+            cocotb.fork(self._run())
+
+    def stop(self):
+        self.running = False
+
+    def on_start(self, read):
+        return True
+
+    def on_write(self, byte, index):
+        return True
+
+    def on_read(self, index):
+        return 0xFF
+
+    def on_stop(self):
+        pass
+
+    def tick(self):
+        pass
+
+    @cocotb.coroutine
+    def _run(self):
+        prev_scl = 1
+        prev_sda = 1
+        while self.running:
+            yield RisingEdge(self.clock)
+            self.tick()
+            if self.stretch_count > 0:
+                #SCL is held low, nothing moves on the bus
+                self.stretch_count -= 1
+                self.stretch_cycles += 1
+                if self.stretch_count == 0:
+                    self.scl_low <= 0
+                continue
+
+            scl = _level(self.scl)
+            sda = _level(self.sda)
+            if prev_scl and scl:
+                if prev_sda and not sda:
+                    self._start_condition()
+                elif not prev_sda and sda:
+                    self._stop_condition()
+            elif scl and not prev_scl:
+                self._scl_rise(sda)
+            elif prev_scl and not scl:
+                self._scl_fall()
+            prev_scl = scl
+            prev_sda = sda
+
+        self.scl_low <= 0
+        self.sda_low <= 0
+
+    def _start_condition(self):
+        self.sda_low <= 0
+        self.state = ADDRESS
+        self.bits = 0
+        self.shift = 0
+
+    def _stop_condition(self):
+        self.sda_low <= 0
+        self.state = IDLE
+        if self.selected:
+            self.selected = False
+            self.on_stop()
+
+    def _scl_rise(self, sda):
+        if self.state in (ADDRESS, WRITE):
+            self.shift = ((self.shift << 1) | sda) & 0xFF
+            self.bits += 1
+        elif self.state == READ_ACK:
+            self.master_ack = (sda == 0)
+
+    def _scl_fall(self):
+        if self.state == ADDRESS and self.bits == 8:
+            if (self.shift >> 1) != self.address:
+                self.state = IDLE
+                return
+            self.selected = True
+            self.read_mode = (self.shift & 0x01) > 0
+            self.count = 0
+            self._ack(self.on_start(self.read_mode), "address")
+
+        elif self.state == WRITE and self.bits == 8:
+            self._ack(self.on_write(self.shift, self.count), "write")
+            self.count += 1
+            self.bytes_written += 1
+
+        elif self.state == ACK:
+            #End of the ACK bit
+            self.sda_low <= 0
+            if self.read_mode:
+                self._load()
+            else:
+                self.state = WRITE
+                self.bits = 0
+                self.shift = 0
+            self._stretch()
+
+        elif self.state == READ:
+            self.bits += 1
+            if self.bits < 8:
+                self._drive_bit()
+            else:
+                #Let the master ACK
+                self.sda_low <= 0
+                self.state = READ_ACK
+
+        elif self.state == READ_ACK:
+            if self.master_ack:
+                self._load()
+                self._stretch()
+            else:
+                self.state = IDLE
+
+    def _ack(self, accept, phase):
+        if accept and self.ack_policy is not None:
+            accept = self.ack_policy(phase, self.count)
+        if accept:
+            self.sda_low <= 1
+            self.state = ACK
+        else:
+            self.nacks += 1
+            self.state = IDLE
+
+    def _load(self):
+        self.shift = self.on_read(self.count) & 0xFF
+        self.count += 1
+        self.bytes_read += 1
+        self.bits = 0
+        self.state = READ
+        self._drive_bit()
+
+    def _drive_bit(self):
+        bit = (self.shift >> (7 - self.bits)) & 0x01
+        self.sda_low <= (0 if bit else 1)
+
+    def _stretch(self):
+        if self.stretch > 0:
+            self.scl_low <= 1
+            self.stretch_count = self.stretch
+
+class EEPROM24Cxx(I2CTarget):
+    """
+    24Cxx style serial EEPROM
+
+    A write starts with the word address (one byte up to 256 bytes, two
+    bytes above), the data bytes that follow go into the page buffer and
+    wrap around within the page. The page is programmed on STOP, for
+    'write_cycles' clocks after that the device NACKs its address (ACK
+    polling). Reads start at the current address and roll over at the end
+    of the memory, a random read is a word address write followed by a read.
+
+    The block select bits the 24C04 - 24C16 take from the device address are
+    not modelled.
+    """
+
+    def __init__(self, clock, scl, sda, scl_low, sda_low, address = 0x50,
+                 size = 4096, page_size = 32, address_bytes = None,
+                 write_cycles = 0, **kwargs):
+        """
+        Args:
+            size (integer): bytes of memory, power of 2
+            page_size (integer): bytes of the page buffer, power of 2
+            address_bytes (integer): bytes of the word address, None to
+                select from the size
+            write_cycles (integer): clocks the page takes to program
+        """
+        I2CTarget.__init__(self, clock, scl, sda, scl_low, sda_low, address, **kwargs)
+        if address_bytes is None:
+            address_bytes = 1 if size <= 256 else 2
+        self.size = size
+        self.page_size = page_size
+        self.address_bytes = address_bytes
+        self.write_cycles = write_cycles
+        self.memory = bytearray([0xFF] * size)
+        self.pointer = 0
+        self.word_address = 0
+        self.pending = []
+        self.busy = 0
+        self.page_writes = 0
+
+    def load(self, data, offset = 0):
+        """
+        Preload the memory
+
+        Args:
+            data (bytearray, Array or list of integers): bytes to load
+            offset (integer): address of the first byte
+        """
+        for i in range(len(data)):
+            self.memory[(offset + i) % self.size] = data[i] & 0xFF
+
+    def dump(self, offset = 0, length = None):
+        if length is None:
+            length = self.size - offset
+        return self.memory[offset:offset + length]
+
+    def tick(self):
+        if self.busy > 0:
+            self.busy -= 1
+
+    def on_start(self, read):
+        if self.busy > 0:
+            return False
+        #A repeated start drops a page that was not programmed
+        self.pending = []
+        self.word_address = 0
+        return True
+
+    def on_write(self, byte, index):
+        if index < self.address_bytes:
+            self.word_address = (self.word_address << 8) | byte
+            if index == self.address_bytes - 1:
+                self.pointer = self.word_address % self.size
+            return True
+
+        self.pending.append((self.pointer, byte))
+        page = self.pointer - (self.pointer % self.page_size)
+        self.pointer = page + ((self.pointer + 1) % self.page_size)
+        return True
+
+    def on_read(self, index):
+        byte = self.memory[self.pointer]
+        self.pointer = (self.pointer + 1) % self.size
+        return byte
+
+    def on_stop(self):
+        if len(self.pending) == 0:
+            return
+        for address, byte in self.pending:
+            self.memory[address] = byte
+        self.pending = []
+        self.page_writes += 1
+        self.busy = self.write_cycles
+
+class RegisterFileTarget(I2CTarget):
+    """
+    Generic register file device (sensors, PMICs, clock generators)
+
+    The first byte of a write selects the register, the bytes after it are
+    written to consecutive registers, writes to read-only registers are
+    NACKed. Reads start at the selected register, the pointer wraps at the
+    end of the register file.
+    """
+
+    def __init__(self, clock, scl, sda, scl_low, sda_low, address = 0x48,
+                 registers = 256, read_only = (), auto_increment = True,
+                 **kwargs):
+        """
+        Args:
+            registers (integer or list of integers): number of registers or
+                their reset values
+            read_only (list of integers): registers the host can't write
+            auto_increment (boolean): move the pointer after every byte
+        """
+        I2CTarget.__init__(self, clock, scl, sda, scl_low, sda_low, address, **kwargs)
+        if isinstance(registers, int):
+            registers = [0] * registers
+        self.registers = bytearray(registers)
+        self.read_only = set(read_only)
+        self.auto_increment = auto_increment
+        self.pointer = 0
+
+    def set_register(self, register, value):
+        """
+        Update a register from the device side (a new sensor reading)
+        """
+        self.registers[register] = value & 0xFF
+
+    def get_register(self, register):
+        return self.registers[register]
+
+    def _advance(self):
+        if self.auto_increment:
+            self.pointer = (self.pointer + 1) % len(self.registers)
+
+    def on_write(self, byte, index):
+        if index == 0:
+            self.pointer = byte % len(self.registers)
+            return True
+        if self.pointer in self.read_only:
+            return False
+        self.registers[self.pointer] = byte
+        self._advance()
+        return True
+
+    def on_read(self, index):
+        byte = self.registers[self.pointer]
+        self._advance()
+        return byte
+
+class I2CMonitor(object):
+    """
+    Count SCL periods on the bus
+
+        monitor = I2CMonitor(dut.clk, dut.i2c_scl, dut.i2c_sda)
+        monitor.start()
+        yield <transfer>
+        monitor.stop()
+        dut.log.info("SCL utilization: %0.1f%%" % (monitor.utilization() * 100))
+    """
+
+    def __init__(self, clock, scl, sda):
+        object.__init__(self)
+        self.clock = clock
+        self.scl = scl
+        self.sda = sda
+        self.running = False
+        self.reset()
+
+    def reset(self):
+        self.cycles = 0
+        self.edges = 0
+        self.starts = 0
+        self.stops = 0
+        self.min_period = None
+        self.last_edge = None
+
+    def start(self):
+        """
+        Start counting, a running monitor starts over
+        """
+        self.reset()
+        if not self.running:
+            self.running = True
+            cocotb.fork(self._run())
+
+    def stop(self):
+        self.running = False
+
+    @cocotb.coroutine
+    def _run(self):
+        prev_scl = 1
+        prev_sda = 1
+        while self.running:
+            yield RisingEdge(self.clock)
+            scl = _level(self.scl)
+            sda = _level(self.sda)
+            if scl and not prev_scl:
+                if self.last_edge is not None:
+                    period = self.cycles - self.last_edge
+                    if self.min_period is None or period < self.min_period:
+                        self.min_period = period
+                self.last_edge = self.cycles
+                self.edges += 1
+            elif prev_scl and scl:
+                if prev_sda and not sda:
+                    self.starts += 1
+                elif not prev_sda and sda:
+                    self.stops += 1
+            prev_scl = scl
+            prev_sda = sda
+            self.cycles += 1
+
+    def utilization(self, period = None):
+        """
+        Fraction of the monitored time SCL was clocking at full rate
+
+        Args:
+            period (integer): clocks of an SCL period at the programmed clock
+                divider, the shortest period seen by default
+
+        Returns (float):
+            0.0 - 1.0
+        """
+        if period is None:
+            period = self.min_period
+        if period is None or self.cycles == 0:
+            return 0.0
+        return min(1.0, float(self.edges * period) / self.cycles)
+
+#Targets of the I2C master testbenches
+EEPROM_ADDRESS          = 0x50
+SENSOR_ADDRESS          = 0x48
+EEPROM_SIZE             = 4096
+EEPROM_PAGE_SIZE        = 32
+#Clocks the EEPROM takes to program a page
+EEPROM_WRITE_CYCLES     = 2000
+SENSOR_REGISTERS        = 16
+SENSOR_READ_ONLY        = [0, 1]
+#Maximum ACK polls while the EEPROM programs a page
+MAX_POLLS               = 64
+
+def start_targets(dut, write_cycles = EEPROM_WRITE_CYCLES, stretch = 0):
+    """
+    Connect an EEPROM and a register file sensor to the bus of the
+    testbench (i2c_scl, i2c_sda and the eeprom_* / sensor_* pull downs)
+
+    Returns (tuple):
+        EEPROM24Cxx, RegisterFileTarget
+    """
+    eeprom = EEPROM24Cxx(dut.clk, dut.i2c_scl, dut.i2c_sda,
+                         dut.eeprom_scl_low, dut.eeprom_sda_low,
+                         address = EEPROM_ADDRESS,
+                         size = EEPROM_SIZE,
+                         page_size = EEPROM_PAGE_SIZE,
+                         write_cycles = write_cycles,
+                         stretch = stretch)
+    sensor = RegisterFileTarget(dut.clk, dut.i2c_scl, dut.i2c_sda,
+                                dut.sensor_scl_low, dut.sensor_sda_low,
+                                address = SENSOR_ADDRESS,
+                                registers = SENSOR_REGISTERS,
+                                read_only = SENSOR_READ_ONLY,
+                                stretch = stretch)
+    eeprom.start()
+    sensor.start()
+    return eeprom, sensor
+
+@cocotb.coroutine
+def eeprom_write(i2c, address, data):
+    """
+    Page write, then ACK poll until the EEPROM finished programming
+
+    Args:
+        i2c: I2C master driver
+        address (integer): EEPROM word address
+        data (list of integers): bytes, at most a page
+
+    Returns (integer):
+        number of NACKed polls
+    """
+    yield i2c.write_to_i2c(EEPROM_ADDRESS, [address >> 8, address & 0xFF] + list(data))
+    for polls in range(MAX_POLLS):
+        try:
+            yield i2c.write_to_i2c(EEPROM_ADDRESS, [])
+        except I2CError:
+            continue
+        raise ReturnValue(polls)
+    raise TestFailure("EEPROM still busy after %d polls" % MAX_POLLS)
+
+@cocotb.coroutine
+def eeprom_read(i2c, address, length):
+    """
+    Random read: set the word address then read sequentially
+    """
+    yield i2c.write_to_i2c(EEPROM_ADDRESS, [address >> 8, address & 0xFF])
+    data = yield i2c.read_from_i2c(EEPROM_ADDRESS, length)
+    raise ReturnValue(data)
+
+def log_utilization(log, name, length, monitor, cycles, clock_rate):
+    """
+    Report the throughput of a transfer and how much of it SCL was clocking
+
+    Args:
+        log: logger (dut.log)
+        name (string): transfer name
+        length (integer): bytes transferred
+        monitor (I2CMonitor): monitor that ran during the transfer
+        cycles (integer): clocks the transfer took
+        clock_rate (integer): clock frequency of the master
+    """
+    ms = float(cycles) * 1000 / clock_rate
+    log.info("%s: %d bytes in %d cycles, %0.2f bytes/ms, SCL utilization %0.1f%% (%d clock SCL period)" %
+             (name, length, cycles, length / ms,
+              monitor.utilization() * 100, monitor.min_period or 0))
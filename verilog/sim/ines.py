@@ -0,0 +1,200 @@
+"""
+iNES ROM images
+
+The file is memory mapped and the 16 byte header is parsed once, images
+are cached by path so loading the same ROM in every test only parses it the
+first time:
+
+    image = load_ines("nestest.nes")
+    for address, chunk, crc in image.chunks("prg", 0x400):
+        <write chunk to 0x8000 + address>
+
+Chunks are strings of bytes, their CRC32 is computed once per block size.
+"""
+
+import os
+import mmap
+import zlib
+
+HEADER_SIZE             = 16
+TRAINER_SIZE            = 512
+PRG_ROM_BANK_SIZE       = 0x4000
+CHR_ROM_BANK_SIZE       = 0x2000
+
+#Flags 6
+FLAG_VERTICAL_MIRRORING = 0x01
+FLAG_BATTERY            = 0x02
+FLAG_TRAINER            = 0x04
+FLAG_FOUR_SCREEN        = 0x08
+
+class INESError(Exception):
+    pass
+
+class INESHeader(object):
+    """
+    Parsed iNES header
+
+    Args:
+        header (string or Array('B')): the first 16 bytes of the image
+
+    Raises:
+        INESError: not an iNES header
+    """
+
+    def __init__(self, header):
+        object.__init__(self)
+        header = bytearray(header[0:HEADER_SIZE])
+        if len(header) < HEADER_SIZE or header[0:4] != bytearray("NES\x1a"):
+            raise INESError("Invalid ROM header")
+        self.raw = header
+        self.prg_rom_banks = header[4]
+        self.chr_rom_banks = header[5]
+        self.flags6 = header[6]
+        self.flags7 = header[7]
+        self.prg_ram_banks = header[8]
+        self.mapper = ((header[6] & 0xF0) >> 4) | (header[7] & 0xF0)
+        self.vertical_mirroring = (header[6] & FLAG_VERTICAL_MIRRORING) > 0
+        self.battery = (header[6] & FLAG_BATTERY) > 0
+        self.trainer = (header[6] & FLAG_TRAINER) > 0
+        self.four_screen = (header[6] & FLAG_FOUR_SCREEN) > 0
+
+        self.prg_rom_size = self.prg_rom_banks * PRG_ROM_BANK_SIZE
+        self.chr_rom_size = self.chr_rom_banks * CHR_ROM_BANK_SIZE
+        self.prg_rom_offset = HEADER_SIZE
+        if self.trainer:
+            self.prg_rom_offset += TRAINER_SIZE
+        self.chr_rom_offset = self.prg_rom_offset + self.prg_rom_size
+        self.size = self.chr_rom_offset + self.chr_rom_size
+
+    def cart_config(self):
+        """
+        Returns (list of integers):
+            header bytes 4 - 8, the cartridge configuration the NES cores
+            take with the 'set cartridge config' opcode
+        """
+        return list(self.raw[4:9])
+
+    def __str__(self):
+        return "PRG ROM: %d x 16KB, CHR ROM: %d x 8KB, Mapper: %d" % \
+                (self.prg_rom_banks, self.chr_rom_banks, self.mapper)
+
+class INESImage(object):
+    """
+    Memory mapped iNES image
+
+    Args:
+        path (string): path to the .nes file
+
+    Raises:
+        INESError: not an iNES image or the file is too short
+    """
+
+    def __init__(self, path):
+        object.__init__(self)
+        self.path = path
+        f = open(path, "rb")
+        try:
+            self.data = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+        finally:
+            f.close()
+        self.header = INESHeader(self.data[0:HEADER_SIZE])
+        if len(self.data) < self.header.size:
+            raise INESError("%s: %d bytes, the header describes %d" % (path, len(self.data), self.header.size))
+        self.crcs = {}
+
+    def close(self):
+        self.data.close()
+
+    def region(self, name):
+        """
+        Returns (tuple of integers):
+            file offset and size of the 'prg' or 'chr' ROM
+        """
+        if name == "prg":
+            return self.header.prg_rom_offset, self.header.prg_rom_size
+        if name == "chr":
+            return self.header.chr_rom_offset, self.header.chr_rom_size
+        raise INESError("Unknown ROM region: %s" % name)
+
+    @property
+    def prg_rom(self):
+        offset, size = self.region("prg")
+        return self.data[offset:offset + size]
+
+    @property
+    def chr_rom(self):
+        offset, size = self.region("chr")
+        return self.data[offset:offset + size]
+
+    def reset_vector(self):
+        """
+        Returns (integer):
+            the 16-bit reset vector, the last PRG ROM bank is mapped at the
+            top of the CPU address space
+        """
+        offset, size = self.region("prg")
+        vector = offset + size - 4
+        return ord(self.data[vector]) | (ord(self.data[vector + 1]) << 8)
+
+    def chunks(self, name, block_size):
+        """
+        Split a ROM into blocks
+
+        Args:
+            name (string): 'prg' or 'chr'
+            block_size (integer): bytes in a block, the last one can be shorter
+
+        Returns (list of tuples):
+            address within the ROM, string of bytes, CRC32 of the bytes
+        """
+        offset, size = self.region(name)
+        key = (name, block_size)
+        if key not in self.crcs:
+            self.crcs[key] = [crc32(self.data[offset + a:offset + min(a + block_size, size)])
+                              for a in range(0, size, block_size)]
+        crcs = self.crcs[key]
+        return [(a,
+                 self.data[offset + a:offset + min(a + block_size, size)],
+                 crcs[a / block_size])
+                for a in range(0, size, block_size)]
+
+def write_test_rom(path, prg_rom_banks, chr_rom_banks):
+    """
+    Write a mapper 0 iNES image with a pattern in every byte, the reset
+    vector points at the start of PRG ROM
+    """
+    prg_rom = bytearray([(i * 7 + (i >> 8)) & 0xFF for i in range(prg_rom_banks * PRG_ROM_BANK_SIZE)])
+    chr_rom = bytearray([(i * 13 + (i >> 8)) & 0xFF for i in range(chr_rom_banks * CHR_ROM_BANK_SIZE)])
+    prg_rom[-4] = 0x00
+    prg_rom[-3] = 0x80
+    header = bytearray("NES\x1a") + bytearray([prg_rom_banks, chr_rom_banks]) + bytearray(10)
+    f = open(path, "wb")
+    f.write(header + prg_rom + chr_rom)
+    f.close()
+
+def crc32(data):
+    """
+    Returns (integer):
+        unsigned CRC32 of a string of bytes, Array('B') or list of integers
+    """
+    if not isinstance(data, str):
+        data = str(bytearray(data))
+    return zlib.crc32(data) & 0xFFFFFFFF
+
+#(path, size, modification time) -> INESImage
+_IMAGES = {}
+
+def load_ines(path):
+    """
+    Open an iNES image, the image is cached until the file changes
+
+    Returns (INESImage)
+    """
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    key = (path, st.st_size, st.st_mtime)
+    if key not in _IMAGES:
+        for k in [k for k in _IMAGES if k[0] == path]:
+            _IMAGES.pop(k).close()
+        _IMAGES[key] = INESImage(path)
+    return _IMAGES[key]
@@ -0,0 +1,567 @@
+#! /usr/bin/env python
+"""
+Register map compiler
+
+The registers of a core and the fields inside them are described once in a
+JSON file, the compiler writes:
+
+    - a Python module with the register and field constants the drivers
+      use, encode/decode functions with the masks and shifts worked out and a
+      mixin class with an update_<register> method for every writable
+      register: all the fields given to one call go out in a single register
+      write
+    - a Verilog include with the matching localparams
+
+The generated module does not read the description, importing it costs the
+same as importing the hand written constants did. It records a hash of the
+description and the compiler, the outputs are only rewritten when that hash
+changes.
+
+    register_map.py sd_host_regs.json
+
+Description:
+
+    {
+        "name":             "wb_sd_host",
+        "class":            "SDHostRegisters",
+        "python":           "sd_host_regs.py",
+        "verilog":          "../rtl/sd_host_regs.vh",
+        "register_prefix":  "",
+        "address_shift":    0,
+        "address_format":   "hex32",
+        "verilog_fields":   true,
+        "range_names":      ["HIGH", "LOW"],
+        "registers": [
+            {
+                "name":         "CONTROL",
+                "address":      0,
+                "access":       "rw",
+                "cache":        true,
+                "self_clearing":["DATA_BIT_ACTIVATE"],
+                "field_prefix": "CONTROL",
+                "field_values": "bit",
+                "fields": [
+                    ["ENABLE_SD", 0],
+                    ["FUNCTION_ADDRESS", 10, 8]
+                ]
+            }
+        ],
+        "formats": [
+            {"name": "R5", "fields": [["CURRENT_STATE", 13, 12]]}
+        ],
+        "constants": [
+            ["CMD_PHY_MODE", 0],
+            ["DATA_ADDR_BITMASK", "0x1FFFF"]
+        ]
+    }
+
+    python, verilog:    outputs, relative to the description
+    register_prefix:    put in front of every register name, use
+                        "python_register_prefix" and "verilog_register_prefix"
+                        when the two differ
+    address_shift:      Python addresses are the register index shifted by
+                        this (2 for byte addressed AXI cores)
+    address_format:     "hex32" (32'h00000000) or "decimal"
+    verilog_fields:     emit the field localparams as well as the addresses
+    range_names:        suffixes of the two ends of a multi-bit field
+    access:             "rw", "ro" or "wo"
+    verilog_name:       name of the register in the RTL when it is not the
+                        same as in the drivers
+    cache:              only the host changes the register, it can be kept in
+                        a register shadow (see register_shadow.py)
+    self_clearing:      fields the core clears on its own
+    field_prefix:       defaults to the register name
+    field_values:       the field constants are bit positions ("bit") or
+                        masks ("mask")
+    fields:             [name, bit] or [name, high bit, low bit]
+    formats:            words that are not registers (command arguments,
+                        responses), they get encode/decode functions
+    constants:          copied as they are, strings are written verbatim
+
+A field constant is <field_prefix>_<field>, a multi-bit field also gets
+_<high>, _<low> and _BITMASK (the unshifted mask).
+"""
+
+import sys
+import os
+import imp
+import json
+import hashlib
+import textwrap
+import argparse
+from collections import OrderedDict
+
+NAME = os.path.basename(os.path.realpath(__file__))
+
+#Bump when the generated code changes so every map is regenerated
+COMPILER_VERSION = 1
+
+ACCESS_TYPES = ["rw", "ro", "wo"]
+FIELD_VALUES = ["bit", "mask"]
+ADDRESS_FORMATS = ["hex32", "decimal"]
+
+DESCRIPTION = "\n" \
+              "\n" \
+              "Generate the Python register driver and the Verilog localparam\n" \
+              "include of a register map description\n" \
+              "\n" \
+              "usage: %s [options]\n" % NAME
+
+EPILOG = "\n" \
+         "\n" \
+         "Examples:\n" \
+         "\tRegenerate the outputs of a description if it changed:\n" \
+         "\t\t%s sd_host_regs.json\n" \
+         "\n" \
+         "\tRegenerate even if nothing changed:\n" \
+         "\t\t%s sd_host_regs.json --force\n" \
+         "\n" % (NAME, NAME)
+
+HASH_TAG = "DESCRIPTION_SHA1"
+
+class RegisterMapError(Exception):
+    pass
+
+def read_file(filepath):
+    f = open(filepath, 'r')
+    buf = f.read()
+    f.close()
+    return buf
+
+def description_hash(buf):
+    h = hashlib.sha1()
+    h.update("%d\n" % COMPILER_VERSION)
+    h.update(buf)
+    return h.hexdigest()
+
+class Field(object):
+
+    def __init__(self, desc, prefix, range_names, register):
+        object.__init__(self)
+        if len(desc) == 2:
+            self.name, self.low = desc[0], int(desc[1])
+            self.high = self.low
+        elif len(desc) == 3:
+            self.name, self.high, self.low = desc[0], int(desc[1]), int(desc[2])
+        else:
+            raise RegisterMapError("%s: field must be [name, bit] or [name, high, low]: %s" %
+                                    (register, str(desc)))
+        if self.high < self.low:
+            raise RegisterMapError("%s_%s: high bit %d is below low bit %d" %
+                                    (register, self.name, self.high, self.low))
+        self.constant = "%s_%s" % (prefix, self.name) if len(prefix) > 0 else self.name
+        self.range_names = range_names
+        self.width = self.high - self.low + 1
+        self.bitmask = (1 << self.width) - 1
+        self.mask = self.bitmask << self.low
+        self.key = self.name.lower()
+
+    def is_bit(self):
+        return self.width == 1
+
+class Word(object):
+    """
+    Fields of a register or a format
+    """
+
+    def __init__(self, d, m, register = True):
+        object.__init__(self)
+        self.name = d["name"]
+        self.access = d.get("access", "rw")
+        if self.access not in ACCESS_TYPES:
+            raise RegisterMapError("%s: unknown access: %s" % (self.name, self.access))
+        self.field_values = d.get("field_values", "bit")
+        if self.field_values not in FIELD_VALUES:
+            raise RegisterMapError("%s: unknown field values: %s" % (self.name, self.field_values))
+        self.width = int(d.get("width", 32))
+        prefix = d.get("field_prefix", self.name)
+        range_names = d.get("range_names", m.range_names)
+        self.fields = [Field(f, prefix, range_names, self.name) for f in d.get("fields", [])]
+
+        used = 0
+        for f in self.fields:
+            if f.high >= self.width:
+                raise RegisterMapError("%s: bit %d is outside of a %d bit word" %
+                                        (f.constant, f.high, self.width))
+            if used & f.mask:
+                raise RegisterMapError("%s overlaps another field" % f.constant)
+            used |= f.mask
+
+        self.self_clearing = 0
+        for name in d.get("self_clearing", []):
+            fields = [f for f in self.fields if f.name == name]
+            if len(fields) == 0:
+                raise RegisterMapError("%s: unknown self clearing field: %s" % (self.name, name))
+            self.self_clearing |= fields[0].mask
+
+        self.cache = d.get("cache", False)
+        if register:
+            self.address = int(d["address"])
+            self.python_name = m.python_register_prefix + self.name
+            self.verilog_name = m.verilog_register_prefix + d.get("verilog_name", self.name)
+            self.python_address = self.address << m.address_shift
+        self.table = "_%s_FIELDS" % self.name
+
+    def writable(self):
+        return self.access != "ro" and len(self.fields) > 0
+
+class RegisterMap(object):
+
+    def __init__(self, d):
+        object.__init__(self)
+        self.name = d["name"]
+        self.class_name = d.get("class", None)
+        prefix = d.get("register_prefix", "")
+        self.python_register_prefix = d.get("python_register_prefix", prefix)
+        self.verilog_register_prefix = d.get("verilog_register_prefix", prefix)
+        self.address_shift = int(d.get("address_shift", 0))
+        self.address_format = d.get("address_format", "decimal")
+        if self.address_format not in ADDRESS_FORMATS:
+            raise RegisterMapError("Unknown address format: %s" % self.address_format)
+        self.verilog_fields = d.get("verilog_fields", True)
+        self.range_names = d.get("range_names", ["HIGH", "LOW"])
+        self.registers = [Word(r, self) for r in d.get("registers", [])]
+        self.formats = [Word(f, self, register = False) for f in d.get("formats", [])]
+        self.constants = [(c[0], c[1]) for c in d.get("constants", [])]
+
+        addresses = {}
+        for r in self.registers:
+            if r.address in addresses:
+                raise RegisterMapError("%s and %s are both at address %d" %
+                                        (addresses[r.address], r.name, r.address))
+            addresses[r.address] = r.name
+
+        #The same field can be in more than one register (interrupt and
+        #interrupt enable), a name can not have two values
+        seen = dict([(r.python_name, "address") for r in self.registers])
+        for w in self.registers + self.formats:
+            field_constants(w, seen)
+        for n, v in self.constants:
+            if n in seen:
+                raise RegisterMapError("%s is defined twice" % n)
+
+    def python_address(self, r):
+        if self.address_shift > 0:
+            return "%d << %d" % (r.address, self.address_shift)
+        if self.address_format == "hex32":
+            return "0x%03X" % r.address
+        return "%d" % r.address
+
+    def verilog_address(self, r):
+        if self.address_format == "hex32":
+            return "32'h%08X" % r.address
+        return "%d" % r.address
+
+def field_constants(w, seen = None):
+    """
+    Args:
+        seen (dictionary): name -> value of the constants already written,
+            constants in it are left out
+
+    Returns (list of tuples):
+        (name, python value, verilog value) of every field constant
+    """
+    constants = []
+    for f in w.fields:
+        if w.field_values == "mask":
+            constants.append((f.constant, "0x%X" % f.mask, "32'h%08X" % f.mask))
+        else:
+            constants.append((f.constant, "%d" % f.low, "%d" % f.low))
+        if not f.is_bit():
+            constants.append(("%s_%s" % (f.constant, f.range_names[0]), "%d" % f.high, "%d" % f.high))
+            constants.append(("%s_%s" % (f.constant, f.range_names[1]), "%d" % f.low, "%d" % f.low))
+            constants.append(("%s_BITMASK" % f.constant, "0x%X" % f.bitmask, "32'h%08X" % f.bitmask))
+    if seen is None:
+        return constants
+
+    unique = []
+    for n, p, v in constants:
+        if n in seen:
+            if seen[n] != p:
+                raise RegisterMapError("%s is defined twice: %s and %s" % (n, seen[n], p))
+            continue
+        seen[n] = p
+        unique.append((n, p, v))
+    return unique
+
+def name_width(m):
+    """
+    Column of the '=' of every constant in the generated files
+    """
+    names = [r.python_name for r in m.registers] + [r.verilog_name for r in m.registers]
+    names += [n for n, v in m.constants]
+    for w in m.registers + m.formats:
+        names += [n for n, p, v in field_constants(w)]
+    return max([len(n) for n in names] + [23]) + 1
+
+def aligned(pairs, fmt, width):
+    return [fmt % (n.ljust(width), v) for n, v in pairs]
+
+PYTHON_HELPERS = '''
+def _masks(table, fields):
+    """
+    Returns (tuple):
+        (bits to set, bits to clear) to write 'fields' into a register
+    """
+    set_mask = 0
+    clear_mask = 0
+    for name, value in fields.items():
+        if name not in table:
+            raise KeyError("Unknown field: %s" % name)
+        mask, shift = table[name]
+        value = int(value) << shift
+        if value & ~mask:
+            raise ValueError("%s: 0x%X does not fit in mask 0x%X" % (name, value >> shift, mask))
+        clear_mask |= mask
+        set_mask |= value
+    return set_mask, clear_mask
+
+def _encode(table, fields):
+    return _masks(table, fields)[0]
+
+def declare_shadow(shadow):
+    """
+    Declare the registers only the host changes in a RegisterShadow
+    """
+    for address, self_clearing in NON_VOLATILE.items():
+        shadow.declare(address, self_clearing)
+'''
+
+def render_decode(w, name):
+    lines = []
+    lines.append("def decode_%s(value):" % name)
+    lines.append("    return {")
+    for f in w.fields:
+        if f.is_bit():
+            expr = "(value & 0x%X) != 0" % f.mask
+        elif f.low == 0:
+            expr = "value & 0x%X" % f.bitmask
+        else:
+            expr = "(value >> %d) & 0x%X" % (f.low, f.bitmask)
+        lines.append("        \"%s\": %s," % (f.key, expr))
+    lines.append("    }")
+    return lines
+
+def render_python(m, source, sha1):
+    lines = []
+    lines.append("#Generated by %s from %s, do not edit" % (NAME, source))
+    lines.append("")
+    lines.append("\"\"\"")
+    lines.append("%s registers" % m.name)
+    lines.append("")
+    lines.append("encode_<register>(**fields) and decode_<register>(value) convert between")
+    lines.append("register values and fields (lower case field names), single bit fields")
+    lines.append("decode to booleans")
+    lines.append("\"\"\"")
+    lines.append("")
+    lines.append("%s = \"%s\"" % (HASH_TAG, sha1))
+    lines.append("")
+
+    width = name_width(m)
+    lines.append("#Registers")
+    lines.extend(aligned([(r.python_name, m.python_address(r)) for r in m.registers], "%s= %s", width))
+    seen = {}
+    for w in m.registers + m.formats:
+        constants = field_constants(w, seen)
+        if len(constants) == 0:
+            continue
+        lines.append("")
+        lines.append("#%s" % w.name)
+        lines.extend(aligned([(n, p) for n, p, v in constants], "%s= %s", width))
+
+    if len(m.constants) > 0:
+        lines.append("")
+        lines.append("#Constants")
+        lines.extend(aligned([(n, v if isinstance(v, basestring) else "%d" % v)
+                              for n, v in m.constants], "%s= %s", width))
+
+    lines.append("")
+    lines.append("#Registers only the host changes: address -> self clearing bits")
+    lines.append("NON_VOLATILE = {")
+    for r in m.registers:
+        if r.cache:
+            lines.append("    %s: 0x%X," % (r.python_name, r.self_clearing))
+    lines.append("}")
+    lines.append("")
+    lines.append("#field -> (mask, shift)")
+    for w in m.registers + m.formats:
+        if len(w.fields) == 0:
+            continue
+        lines.append("%s = {" % w.table)
+        for f in w.fields:
+            lines.append("    \"%s\": (0x%X, %d)," % (f.key, f.mask, f.low))
+        lines.append("}")
+    lines.extend(PYTHON_HELPERS.split("\n"))
+
+    for w in m.registers + m.formats:
+        if len(w.fields) == 0:
+            continue
+        name = w.name.lower()
+        lines.append("def encode_%s(**fields):" % name)
+        lines.append("    return _encode(%s, fields)" % w.table)
+        lines.append("")
+        lines.extend(render_decode(w, name))
+        lines.append("")
+
+    if m.class_name is not None:
+        lines.append("class %s(object):" % m.class_name)
+        lines.append("    \"\"\"")
+        lines.append("    Field access for a driver with read_register, write_register and")
+        lines.append("    modify(address, set_mask, clear_mask), whatever the driver returns is")
+        lines.append("    returned (a coroutine for the cocotb drivers)")
+        lines.append("    \"\"\"")
+        for r in m.registers:
+            if not r.writable():
+                continue
+            name = r.name.lower()
+            keys = textwrap.wrap("Change some fields with one register write: %s" %
+                                 ", ".join([f.key for f in r.fields]), 70)
+            if r.access == "rw":
+                lines.append("")
+                lines.append("    def update_%s(self, **fields):" % name)
+                lines.append("        \"\"\"")
+                lines.extend(["        %s" % k for k in keys])
+                lines.append("        \"\"\"")
+                lines.append("        set_mask, clear_mask = _masks(%s, fields)" % r.table)
+                lines.append("        return self.modify(%s, set_mask, clear_mask)" % r.python_name)
+            lines.append("")
+            lines.append("    def write_%s(self, **fields):" % name)
+            lines.append("        \"\"\"")
+            lines.append("        Write the register, fields not given are 0")
+            lines.append("        \"\"\"")
+            lines.append("        return self.write_register(%s, _encode(%s, fields))" % (r.python_name, r.table))
+        lines.append("")
+
+    while lines[-1] == "":
+        lines.pop()
+    return "\n".join(lines) + "\n"
+
+def render_verilog(m, source, sha1):
+    lines = []
+    lines.append("//Generated by %s from %s, do not edit" % (NAME, source))
+    lines.append("//%s: %s" % (HASH_TAG, sha1))
+    lines.append("")
+    width = name_width(m)
+    lines.append("//Registers")
+    lines.extend(aligned([(r.verilog_name, m.verilog_address(r)) for r in m.registers],
+                         "localparam          %s= %s;", width))
+    if m.verilog_fields:
+        seen = {}
+        for r in m.registers:
+            constants = field_constants(r, seen)
+            if len(constants) == 0:
+                continue
+            lines.append("")
+            lines.append("//%s" % r.name)
+            lines.extend(aligned([(n, v) for n, p, v in constants],
+                                 "localparam          %s= %s;", width))
+    return "\n".join(lines) + "\n"
+
+def output_hash(filepath):
+    """
+    Hash recorded in a generated file, None if there is none
+    """
+    if not os.path.exists(filepath):
+        return None
+    f = open(filepath, 'r')
+    for i in range(16):
+        line = f.readline()
+        if HASH_TAG in line:
+            f.close()
+            return line.split()[-1].strip("\"")
+    f.close()
+    return None
+
+def write_file(filepath, buf):
+    temp_path = "%s.%d" % (filepath, os.getpid())
+    f = open(temp_path, 'w')
+    f.write(buf)
+    f.close()
+    os.rename(temp_path, filepath)
+
+def compile_map(filepath, force = False, debug = False):
+    """
+    Generate the outputs of a register map description, outputs that were
+    generated from the same description are left alone
+
+    Args:
+        filepath (string): path to the description
+        force (boolean): regenerate even if the description did not change
+
+    Returns (list of strings):
+        paths of the files that were written
+    """
+    buf = read_file(filepath)
+    sha1 = description_hash(buf)
+    d = json.loads(buf, object_pairs_hook = OrderedDict)
+    base = os.path.dirname(os.path.abspath(filepath))
+    source = os.path.basename(filepath)
+
+    outputs = []
+    if "python" in d:
+        outputs.append((os.path.normpath(os.path.join(base, d["python"])), render_python))
+    if "verilog" in d:
+        outputs.append((os.path.normpath(os.path.join(base, d["verilog"])), render_verilog))
+
+    m = None
+    written = []
+    for path, render in outputs:
+        if not force and output_hash(path) == sha1:
+            if debug:
+                print "%s: unchanged" % path
+            continue
+        if m is None:
+            m = RegisterMap(d)
+        write_file(path, render(m, source, sha1))
+        written.append(path)
+        if debug:
+            print "%s: written" % path
+    return written
+
+def load_register_map(filepath):
+    """
+    Import the Python module of a description, it is regenerated first if
+    the description changed
+
+    Returns (module):
+        generated module
+    """
+    compile_map(filepath)
+    d = json.loads(read_file(filepath))
+    path = os.path.join(os.path.dirname(os.path.abspath(filepath)), d["python"])
+    name = os.path.splitext(os.path.basename(path))[0]
+    return imp.load_source(name, path)
+
+def main(argv):
+    #Parse out the commandline arguments
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        description=DESCRIPTION,
+        epilog=EPILOG
+    )
+
+    parser.add_argument("descriptions",
+                        nargs="+",
+                        help="Register map descriptions")
+
+    parser.add_argument("-f", "--force",
+                        action="store_true",
+                        help="Regenerate even if the description did not change")
+
+    parser.add_argument("-d", "--debug",
+                        action="store_true",
+                        help="Enable Debug Messages")
+
+    args = parser.parse_args()
+
+    try:
+        for filepath in args.descriptions:
+            for path in compile_map(filepath, args.force, args.debug):
+                print "Generated: %s" % path
+    except (RegisterMapError, KeyError, ValueError) as ex:
+        print "Error: %s" % str(ex)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,121 @@
+"""
+Write-through shadow copy of the registers of a core
+
+Read-modify-write helpers (set a bit, clear a bit, update a field) read the
+register over the bus before every write. Registers that only change when
+the host writes them (control, configuration, interrupt enables, constants)
+can be served from a shadow copy instead, the bus read only happens the
+first time.
+
+Only registers declared non-volatile are cached, everything else (status,
+interrupt, receive data) always goes to the bus. Bits the core clears on its
+own (reset and start strobes) are declared as self-clearing, they are never
+kept in the shadow copy.
+
+    shadow = RegisterShadow()
+    shadow.declare(CONTROL, self_clearing = 1 << CONTROL_RESET)
+    shadow.declare(VERSION)
+
+The shadow is only book keeping, the drivers own the bus accesses:
+
+    value = shadow.lookup(address)
+    if value is None:
+        value = <bus read>
+        shadow.update(address, value)
+"""
+
+class RegisterShadow(object):
+
+    def __init__(self):
+        object.__init__(self)
+        #address -> self-clearing mask of every non-volatile register
+        self.registers = {}
+        #address -> cached value
+        self.values = {}
+        self.hits = 0
+        self.misses = 0
+        #reads of registers that are never cached
+        self.volatile = 0
+
+    def declare(self, address, self_clearing = 0):
+        """
+        Declare a non-volatile register
+
+        Args:
+            address (integer): register address
+            self_clearing (integer): bits the core clears on its own
+        """
+        self.registers[address] = self_clearing
+        if address in self.values:
+            self.values[address] &= ~self_clearing
+
+    def is_non_volatile(self, address):
+        return address in self.registers
+
+    def lookup(self, address):
+        """
+        Get the cached value of a register, a non-volatile register counts as
+        a hit or a miss, a volatile one is counted on its own and does not
+        change the hit rate
+
+        Returns (integer or None):
+            cached value, None when the register has to be read from the bus
+        """
+        if address not in self.registers:
+            self.volatile += 1
+            return None
+        if address in self.values:
+            self.hits += 1
+            return self.values[address]
+        self.misses += 1
+        return None
+
+    def update(self, address, value):
+        """
+        Record a value that was written to or read from the bus, volatile
+        registers are ignored
+        """
+        if address in self.registers:
+            self.values[address] = value & ~self.registers[address]
+
+    def invalidate(self, address = None):
+        """
+        Forget a cached value, or every cached value if no address is given
+        (after the core is reset)
+        """
+        if address is None:
+            self.values = {}
+        elif address in self.values:
+            del self.values[address]
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.volatile = 0
+
+    def stats(self):
+        """
+        Returns (dictionary):
+            hits, misses, hit rate (0.0 - 1.0) of the non-volatile registers
+            and the number of volatile reads
+        """
+        total = self.hits + self.misses
+        rate = 0.0
+        if total > 0:
+            rate = float(self.hits) / total
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": rate,
+                "volatile": self.volatile}
+
+def modify_value(value, set_mask = 0, clear_mask = 0):
+    """
+    Returns (integer):
+        value with every bit in clear_mask cleared and every bit in set_mask set
+    """
+    return (value & ~clear_mask) | set_mask
+
+def field_mask(high_bit, low_bit):
+    """
+    Returns (integer):
+        mask of the bits from high_bit down to low_bit
+    """
+    return (1 << (high_bit + 1)) - (1 << low_bit)
@@ -0,0 +1,217 @@
+"""
+Wishbone bus masters shared by the wishbone slave testbenches
+
+WishboneClassicMaster sends a block of words as one cycle and records the
+latency of the first word of every block (wb_sdram benchmarks, wb_bram and
+wb_i2c register access), WishbonePipelinedMaster sends B4 pipelined bursts.
+"""
+
+import logging
+import cocotb
+from cocotb.triggers import RisingEdge
+from cocotb.triggers import ReadOnly
+from cocotb.drivers import BusDriver
+from cocotb.utils import get_sim_time
+from cocotb.result import ReturnValue
+
+from array import array as Array
+
+#Cycle type identifiers (CTI)
+CTI_CLASSIC             = 0x0
+CTI_CONSTANT            = 0x1
+CTI_INCREMENT           = 0x2
+CTI_END                 = 0x7
+
+#Burst type extension (BTE)
+BTE_LINEAR              = 0x0
+
+class WishboneClassicMaster(BusDriver):
+    """
+    Classic wishbone master, every word is a full strobe/ack round trip
+
+    The nysa slaves hold ack until the strobe drops so the strobe stays down
+    until the ack is gone before the next word goes out. A block of words is
+    one cycle (cyc stays high), slaves like wb_sdram only latch the address
+    at the start of a cycle.
+
+    'latencies' collects the time taken by the first word of every block,
+    strobe to the end of the ack (simulator steps)
+    """
+
+    _signals = ["we", "stb", "cyc", "sel", "adr", "dat_o", "dat_i", "ack"]
+
+    def __init__(self, entity, name, clock, debug = False):
+        BusDriver.__init__(self, entity, name, clock)
+        if debug:
+            self.log.setLevel(logging.DEBUG)
+        self.bus.we     <=  0
+        self.bus.stb    <=  0
+        self.bus.cyc    <=  0
+        self.bus.sel    <=  0
+        self.bus.adr    <=  0
+        self.bus.dat_o  <=  0
+        self.latencies  =   []
+
+    @cocotb.coroutine
+    def _transfer(self, address, we, data):
+        bus = self.bus
+        bus.adr         <=  address
+        bus.we          <=  we
+        bus.dat_o       <=  data
+        bus.sel         <=  0xF
+        bus.stb         <=  1
+
+        yield RisingEdge(self.clock)
+        yield ReadOnly()
+        while not bus.ack.value:
+            yield RisingEdge(self.clock)
+            yield ReadOnly()
+        value = int(bus.dat_i.value)
+
+        yield RisingEdge(self.clock)
+        bus.stb         <=  0
+        yield ReadOnly()
+        while bus.ack.value:
+            yield RisingEdge(self.clock)
+            yield ReadOnly()
+        yield RisingEdge(self.clock)
+        raise ReturnValue(value)
+
+    @cocotb.coroutine
+    def _block(self, address, length, we, words = None):
+        bus = self.bus
+        data = Array('I')
+        yield RisingEdge(self.clock)
+        bus.cyc         <=  1
+        for i in range(length):
+            start = get_sim_time()
+            value = yield self._transfer(address + i, we, words[i] if we else 0)
+            if i == 0:
+                self.latencies.append(get_sim_time() - start)
+            data.append(value)
+        bus.cyc         <=  0
+        bus.we          <=  0
+        raise ReturnValue(data)
+
+    @cocotb.coroutine
+    def write_words(self, address, words):
+        """
+        Write 32-bit words to consecutive word addresses in one cycle
+
+        Args:
+            address (integer): word address of the first word
+            words (Array('I') or list of integers): data to write
+        """
+        yield self._block(address, len(words), 1, words)
+
+    @cocotb.coroutine
+    def read_words(self, address, length):
+        """
+        Read 32-bit words from consecutive word addresses in one cycle
+
+        Returns (Array('I')):
+            words read
+        """
+        words = yield self._block(address, length, 0)
+        raise ReturnValue(words)
+
+class WishbonePipelinedMaster(BusDriver):
+    """
+    Wishbone B4 pipelined master
+
+    The whole transfer is one cycle (cyc stays high), a request goes out on
+    every clock the slave is not stalling and the acks are counted as they
+    come back. The words are sent as an incrementing burst (CTI = 3'b010)
+    that ends with CTI = 3'b111 on the last word.
+    """
+
+    _signals = ["we", "stb", "cyc", "sel", "adr", "dat_o", "dat_i", "ack"]
+    _optional_signals = ["stall", "cti", "bte"]
+
+    def __init__(self, entity, name, clock, debug = False):
+        BusDriver.__init__(self, entity, name, clock)
+        if debug:
+            self.log.setLevel(logging.DEBUG)
+        self.bus.we     <=  0
+        self.bus.stb    <=  0
+        self.bus.cyc    <=  0
+        self.bus.sel    <=  0
+        self.bus.adr    <=  0
+        self.bus.dat_o  <=  0
+        if hasattr(self.bus, "cti"):
+            self.bus.cti    <=  CTI_CLASSIC
+        if hasattr(self.bus, "bte"):
+            self.bus.bte    <=  BTE_LINEAR
+
+    def _drive_request(self, address, index, length, we, words):
+        bus = self.bus
+        if index < length:
+            bus.stb     <=  1
+            bus.adr     <=  address + index
+            if we:
+                bus.dat_o   <=  words[index]
+            if hasattr(bus, "cti"):
+                bus.cti     <=  CTI_INCREMENT if index < length - 1 else CTI_END
+            return True
+        bus.stb         <=  0
+        return False
+
+    @cocotb.coroutine
+    def _burst(self, address, length, we, words = None):
+        bus = self.bus
+        has_stall = hasattr(bus, "stall")
+        data = Array('I')
+        issued = 0
+        acked = 0
+
+        yield RisingEdge(self.clock)
+        bus.cyc         <=  1
+        bus.we          <=  we
+        bus.sel         <=  0xF
+        if hasattr(bus, "bte"):
+            bus.bte     <=  BTE_LINEAR
+        strobe = self._drive_request(address, issued, length, we, words)
+
+        while True:
+            #Values seen here are sampled by the slave on the next edge
+            yield ReadOnly()
+            if bus.ack.value:
+                acked += 1
+                if not we:
+                    data.append(int(bus.dat_i.value))
+            if strobe and not (has_stall and bus.stall.value):
+                issued += 1
+            if acked >= length:
+                break
+            yield RisingEdge(self.clock)
+            strobe = self._drive_request(address, issued, length, we, words)
+
+        yield RisingEdge(self.clock)
+        bus.stb         <=  0
+        bus.cyc         <=  0
+        bus.we          <=  0
+        if hasattr(bus, "cti"):
+            bus.cti     <=  CTI_CLASSIC
+        raise ReturnValue(data)
+
+    @cocotb.coroutine
+    def write_words(self, address, words):
+        """
+        Write 32-bit words to consecutive word addresses in one burst
+
+        Args:
+            address (integer): word address of the first word
+            words (Array('I') or list of integers): data to write
+        """
+        yield self._burst(address, len(words), 1, words)
+
+    @cocotb.coroutine
+    def read_words(self, address, length):
+        """
+        Read 32-bit words from consecutive word addresses in one burst
+
+        Returns (Array('I')):
+            words read
+        """
+        words = yield self._burst(address, length, 0)
+        raise ReturnValue(words)
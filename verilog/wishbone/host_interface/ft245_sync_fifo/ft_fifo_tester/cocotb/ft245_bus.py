@@ -8,6 +8,7 @@ from cocotb.triggers import Lock
 from cocotb.drivers import BusDriver
 from cocotb.binary import BinaryValue
 from cocotb.clock import Clock
+from cocotb.utils import get_sim_time
 from cocotb import log
 from nysa.host.driver.utils import list_to_hex_string
 
@@ -29,92 +30,241 @@ BUFFER_SIZE = 512
 
 CLK_PERIOD = 12
 
+#FT2232H USB side, used when USB timing is enabled
+FT2232H_BUFFER_SIZE         = 4096
+USB_PACKET_SIZE             = 512
+USB_MICROFRAME_NS           = 125000
+#10 x 512 byte packets every 125us is the ~40MB/s an FT2232H can sustain
+USB_PACKETS_PER_MICROFRAME  = 10
+FT2232H_MAX_RATE            = 40000000
+
 def setup_ft245_clk(dut):
     cocotb.fork(Clock(dut.ft245_clk, CLK_PERIOD).start())
 
 class FT245(BusDriver):
+    """
+    FT245 synchronous FIFO model
+
+    The host side of the chip is a RX buffer (host -> FPGA) and a TX buffer
+    (FPGA -> host) of 'buffer_size' bytes each.
+
+    Without 'microframe_ns' the host keeps up with the FPGA, a buffer is
+    refilled (or emptied) as soon as the FPGA has drained (or filled) it.
+
+    With 'microframe_ns' the USB side is paced, each microframe is split
+    into 'packets_per_microframe' packet slots and at most one packet of
+    'packet_size' bytes moves between the host and each buffer per slot.
+    Clocks where the FPGA can not transfer anything because it is waiting
+    on the USB side are skipped in one trigger instead of polled.
+    """
 
     _signals = ["data", "txe_n", "wr_n", "rd_n", "rde_n", "oe_n", "siwu"]
 
-    def __init__(self, entity, name, clock, buffer_size = BUFFER_SIZE, debug = False):
+    def __init__(self,
+                 entity,
+                 name,
+                 clock,
+                 buffer_size = BUFFER_SIZE,
+                 packet_size = None,
+                 microframe_ns = None,
+                 packets_per_microframe = USB_PACKETS_PER_MICROFRAME,
+                 period = CLK_PERIOD,
+                 debug = False):
         BusDriver.__init__(self, entity, name, clock)
         if debug:
             self.log.setLevel(logging.DEBUG)
         self.buffer_size = buffer_size
+        if packet_size is None:
+            packet_size = min(USB_PACKET_SIZE, buffer_size)
+        self.packet_size = packet_size
+        self.period = period
+        self.slot_cycles = 0
+        if microframe_ns is not None:
+            self.slot_cycles = max(1, int(microframe_ns / period / packets_per_microframe))
         self.bus.data.binstr = 'ZZZZZZZZ'
         self.bus.txe_n  <=  1
         self.bus.rde_n  <=  1
         self.data = Array('B')
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.bytes_written = 0
+        self.bytes_read = 0
+        self.write_cycles = 0
+        self.read_cycles = 0
+        self.skipped_cycles = 0
+
+    def _now(self):
+        return int(get_sim_time("ns") / self.period)
+
+    def _cycles_to_slot(self, cycle):
+        return self.slot_cycles - (cycle % self.slot_cycles)
+
+    def throughput(self):
+        """
+        Returns (float):
+            bytes per second moved in both directions while the model was
+            transferring data
+        """
+        cycles = self.write_cycles + self.read_cycles
+        if cycles == 0:
+            return 0.0
+        return (self.bytes_written + self.bytes_read) / (cycles * self.period * 1e-9)
 
     @cocotb.coroutine
     def write(self, data):
+        """
+        Send a byte array to the FPGA
+
+        Args:
+            data (Array('B'), string or list of bytes): data to send
+        """
+        if not isinstance(data, Array):
+            data = Array('B', data)
+        bus = self.bus
+        clock = self.clock
         length = len(data)
+        slot_cycles = self.slot_cycles
+        buffer_size = self.buffer_size
+        packet_size = self.packet_size
+        #'pos' is the next byte for the FPGA, 'queued' is the end of the
+        #data the host has put in the RX buffer
         data_pos = 0
-        #XXX: Need to simulate the buffer size behavior to exercise the delay behavior
-        buffer_pos = 0
-        #print "Sending: %s" % list_to_hex_string(data)
+        queued = 0
+        start = self._now()
+        cycle = start
+        slot = -1
+
+        if slot_cycles == 0:
+            queued = min(buffer_size, length)
 
-        self.bus.data   <= data[data_pos]
+        bus.data        <= data[data_pos]
         while data_pos < length:
-            if not self.bus.oe_n.value:
-                self.bus.data   <= data[data_pos]
+            if not bus.oe_n.value:
+                bus.data    <= data[data_pos]
             else:
-                #self.log.error("User requested data when OE is not low!!")
-                self.bus.data.binstr = 'ZZZZZZZZ'
+                bus.data.binstr = 'ZZZZZZZZ'
 
-            if not self.bus.rde_n.value and not self.bus.rd_n.value:
-                data_pos        += 1
-                buffer_pos      += 1
-                if self.bus.oe_n.value:
+            if not bus.rde_n.value and not bus.rd_n.value:
+                data_pos    += 1
+                if bus.oe_n.value:
                     self.log.error("User requested data when OE is not low!!")
                 if data_pos < length:
-                    self.bus.data   <= data[data_pos]
+                    bus.data    <= data[data_pos]
                 else:
                     break
 
-            if buffer_pos < self.buffer_size:
-                #Notify the FPGA that we have data available
-                self.bus.rde_n  <=  0
+            if slot_cycles == 0:
+                if queued == data_pos:
+                    #Buffer drained, the host refills it after one clock
+                    queued  = min(data_pos + buffer_size, length)
+                    bus.rde_n   <=  1
+                else:
+                    bus.rde_n   <=  0
+
             else:
-                #print "Buffer pos is too large..."
-                buffer_pos      =  0
-                self.bus.rde_n  <=  1
+                if (cycle // slot_cycles) != slot and queued < length:
+                    packet = min(packet_size, length - queued)
+                    if buffer_size - (queued - data_pos) >= packet:
+                        slot    = cycle // slot_cycles
+                        queued  += packet
 
-            yield RisingEdge(self.clock)
+                if queued > data_pos:
+                    bus.rde_n   <=  0
+                elif not bus.rde_n.value:
+                    #Let the FPGA see the buffer is empty before skipping
+                    bus.rde_n   <=  1
+                else:
+                    skip = self._cycles_to_slot(cycle)
+                    self.skipped_cycles += skip
+                    cycle   += skip
+                    yield ClockCycles(clock, skip)
+                    continue
 
+            yield RisingEdge(clock)
+            cycle           += 1
 
-        self.bus.data.binstr = 'ZZZZZZZZ'
-        self.bus.rde_n  <=  1
-        yield RisingEdge(self.clock)
+        bus.data.binstr = 'ZZZZZZZZ'
+        bus.rde_n       <=  1
+        yield RisingEdge(clock)
+        self.bytes_written += length
+        self.write_cycles += self._now() - start
 
     @cocotb.coroutine
     def read(self, byte_length):
+        """
+        Receive 'byte_length' bytes from the FPGA, use 'get_data' to
+        retrieve them
+
+        With USB timing enabled this only returns after the last byte has
+        been sent to the host
+        """
+        bus = self.bus
+        clock = self.clock
+        slot_cycles = self.slot_cycles
+        buffer_size = self.buffer_size
+        packet_size = self.packet_size
         data_pos = 0
+        #Bytes in the TX buffer that have not been sent to the host yet
+        level = 0
         self.data = Array('B')
-        buffer_pos = 0
-        self.bus.data.binstr = 'ZZZZZZZZ'
-        self.bus.txe_n  <= 1
+        append = self.data.append
+        start = self._now()
+        cycle = start
+        slot = -1
+        bus.data.binstr = 'ZZZZZZZZ'
+        bus.txe_n       <= 1
 
         while data_pos < byte_length:
 
-            if buffer_pos < self.buffer_size:
-                self.bus.txe_n  <= 0
+            if slot_cycles == 0:
+                if level < buffer_size:
+                    bus.txe_n   <= 0
+                else:
+                    bus.txe_n   <= 1
+                    level       = 0
+
             else:
-                self.bus.txe_n  <= 1
-                buffer_pos      = 0
+                if (cycle // slot_cycles) != slot and level > 0:
+                    slot        = cycle // slot_cycles
+                    level       -= min(packet_size, level)
+
+                if level < buffer_size:
+                    bus.txe_n   <= 0
+                elif not bus.txe_n.value:
+                    #Let the FPGA see the buffer is full before skipping
+                    bus.txe_n   <= 1
+                else:
+                    skip = self._cycles_to_slot(cycle)
+                    self.skipped_cycles += skip
+                    cycle       += skip
+                    yield ClockCycles(clock, skip)
+                    yield FallingEdge(clock)
+                    continue
 
             yield ReadOnly()
 
-            if not self.bus.wr_n.value:
-                self.data.append(self.bus.data.value)
+            if not bus.wr_n.value:
+                append(int(bus.data.value))
                 data_pos        += 1
-                buffer_pos      += 1
+                level           += 1
 
-            yield FallingEdge(self.clock)
+            yield FallingEdge(clock)
+            cycle               += 1
 
-        self.bus.txe_n  <=  1
-        yield RisingEdge(self.clock)
+        bus.txe_n       <=  1
+        yield RisingEdge(clock)
+
+        if slot_cycles > 0:
+            #Wait for the packets still in the TX buffer to reach the host
+            while level > 0:
+                skip = self._cycles_to_slot(self._now())
+                self.skipped_cycles += skip
+                yield ClockCycles(clock, skip)
+                level           -= min(packet_size, level)
+
+        self.bytes_read += byte_length
+        self.read_cycles += self._now() - start
 
     def get_data(self):
         return self.data
-
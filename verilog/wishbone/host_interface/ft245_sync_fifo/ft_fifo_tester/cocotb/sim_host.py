@@ -37,6 +37,8 @@ from collections import OrderedDict
 import cocotb.monitors
 from ft245_bus import FT245
 from ft245_bus import setup_ft245_clk
+from ft245_bus import FT2232H_BUFFER_SIZE
+from ft245_bus import USB_MICROFRAME_NS
 #from ppfifo_bus import PPFIFOIngress
 #from ppfifo_bus import PPFIFOEgress
 
@@ -90,7 +92,7 @@ class NysaSim (FauxNysa):
                     for c in self.callbacks[key]:
                         c()
 
-    def __init__(self, dut, sim_config, period = CLK_PERIOD, user_paths = []):
+    def __init__(self, dut, sim_config, period = CLK_PERIOD, user_paths = [], usb_timing = False):
         self.status = Status()
         self.status.set_level('verbose')
         self.user_paths = user_paths
@@ -104,7 +106,10 @@ class NysaSim (FauxNysa):
 
         self.dut.rst                          <= 0
         #self.ft245  =   FT245(dut, "ft245", dut.ft245_clk, buffer_size = 0x10)
-        self.ft245  =   FT245(dut, "ft245", dut.ft245_clk, buffer_size = 0x11)
+        if usb_timing:
+            self.ft245  =   FT245(dut, "ft245", dut.ft245_clk, buffer_size = FT2232H_BUFFER_SIZE, microframe_ns = USB_MICROFRAME_NS)
+        else:
+            self.ft245  =   FT245(dut, "ft245", dut.ft245_clk, buffer_size = 0x11)
         #self.ft245  =   FT245(dut, "ft245", dut.ft245_clk, buffer_size = 0x200)
         gd = GenSDB()
         self.callbacks = {}
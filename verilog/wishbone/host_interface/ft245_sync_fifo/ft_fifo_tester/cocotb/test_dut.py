@@ -14,6 +14,8 @@ from nysa.host.driver.utils import list_to_hex_string
 from cocotb.triggers import RisingEdge
 from cocotb.triggers import ReadOnly
 from cocotb.triggers import ClockCycles
+from cocotb.utils import get_sim_time
+from ft245_bus import FT2232H_MAX_RATE
 
 
 SIM_CONFIG = "sim_config.json"
@@ -295,11 +297,51 @@ def master_write_read(dut):
     dut.log.info("Writing flags: 0x%08X" % write_flags)
     yield cocotb.external(nysa.write_master_register)(0x00, 0x00)
 
+def log_rate(dut, name, byte_count, elapsed_ns):
+    rate = byte_count / (elapsed_ns * 1e-9)
+    dut.log.info("%s: %d bytes in %0.1f us, %0.2f MB/s (%0.1f%% of %0.0f MB/s)" %
+                 (name, byte_count, elapsed_ns / 1000.0, rate / 1e6,
+                  100.0 * rate / FT2232H_MAX_RATE, FT2232H_MAX_RATE / 1e6))
 
+@cocotb.test(skip = False)
+def usb_throughput_benchmark(dut):
+    """
+    Description:
+        Measure the throughput of the FT245 host interface with the FT245
+        model paced like an FT2232H (4KB buffers, 512 byte packets,
+        125us microframes)
 
+    Test ID: 5
 
+    Expected Results:
+        Data read back matches, the achieved MB/s for writes and reads is
+        reported against the FT2232H's 40MB/s
+    """
+
+    dut.test_id = 5
+    nysa = NysaSim(dut, SIM_CONFIG, CLK_PERIOD, user_paths = [MODULE_PATH], usb_timing = True)
+    setup_dut(dut)
+    yield(nysa.reset())
+    nysa.read_sdb()
+    yield (nysa.wait_clocks(10))
+    dut.log.info("Ready")
 
+    DWORD_SIZE = 0x800
+    write_data = Array('B')
+    for i in range (DWORD_SIZE * 4):
+        write_data.append(i % 256)
 
+    start = get_sim_time("ns")
+    yield cocotb.external(nysa.write_memory)(0x00, write_data)
+    log_rate(dut, "Write", len(write_data), get_sim_time("ns") - start)
 
+    start = get_sim_time("ns")
+    read_data = yield cocotb.external(nysa.read_memory)(0x00, DWORD_SIZE)
+    log_rate(dut, "Read", len(read_data), get_sim_time("ns") - start)
 
+    ft245 = nysa.ft245
+    dut.log.info("FT245 model: %0.2f MB/s while transferring, %d idle cycles skipped" %
+                 (ft245.throughput() / 1e6, ft245.skipped_cycles))
 
+    if read_data != write_data:
+        raise TestFailure("Read data does not match write data")
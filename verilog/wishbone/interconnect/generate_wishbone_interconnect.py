@@ -0,0 +1,816 @@
+#! /usr/bin/env python
+
+# Copyright (c) 2016 Dave McCoy (dave.mccoy@cospandesign.com)
+#
+# NAME is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# NAME is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with NAME; If not, see <http://www.gnu.org/licenses/>.
+
+
+import sys
+import os
+import argparse
+import json
+import hashlib
+from string import Template
+
+NAME = os.path.basename(os.path.realpath(__file__))
+
+WISHBONE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+INTERCONNECT_TEMPLATE = os.path.join(WISHBONE_DIR, "interconnect", "wishbone_interconnect.v")
+MEM_INTERCONNECT_TEMPLATE = os.path.join(WISHBONE_DIR, "interconnect", "wishbone_mem_interconnect.v")
+ARBITER_TEMPLATE = os.path.join(WISHBONE_DIR, "arbiter", "wishbone_arbiter.v")
+
+CACHE_DIR_NAME = ".wishbone_cache"
+
+DESCRIPTION = "\n" \
+              "\n" \
+              "Generate the wishbone interconnect, memory interconnect and arbiters\n" \
+              "for a bus description\n" \
+              "\n" \
+              "usage: %s [options]\n" % NAME
+
+EPILOG = "\n" \
+         "\n" \
+         "Examples:\n" \
+         "\tGenerate the bus described in example_bus.json in the build directory:\n" \
+         "\t\t%s -j example_bus.json -o build\n" \
+         "\n" \
+         "\tRegenerate everything, ignoring the cache:\n" \
+         "\t\t%s -j example_bus.json -o build --no-cache\n" \
+         "\n" % (NAME, NAME)
+
+#Decode styles
+#   combinational:  address decode and return mux in one cycle (original behavior)
+#   registered:     the slave select is registered, a new slave costs one clock
+#   pipelined:      registered select and registered data/ack back to the master
+DECODE_COMBINATIONAL = "combinational"
+DECODE_REGISTERED = "registered"
+DECODE_PIPELINED = "pipelined"
+DECODE_STYLES = [DECODE_COMBINATIONAL, DECODE_REGISTERED, DECODE_PIPELINED]
+
+#Bus types
+#   classic:        single cycle handshake, nysa slaves hold ack until the strobe drops
+#   b4:             wishbone B4 pipelined, adds cti, bte and stall, the master can
+#                   issue a request every clock and every request gets one ack,
+#                   the master waits for its acks before moving to another slave
+BUS_CLASSIC = "classic"
+BUS_B4 = "b4"
+BUS_TYPES = [BUS_CLASSIC, BUS_B4]
+
+ARBITER_PRIORITY = "priority"
+ARBITER_ROUND_ROBIN = "round_robin"
+ARBITER_SCHEMES = [ARBITER_PRIORITY, ARBITER_ROUND_ROBIN]
+
+#The peripheral interconnect always decoded the top 8 address bits
+MIN_SELECT_BITS = 8
+ADDRESS_WIDTH = 32
+INTERRUPT_WIDTH = 32
+
+#Lines of the peripheral interconnect template only the nysa builder uses
+#(it decodes the fixed 8 bit slave_select), the generated decode uses w_sel
+TEMPLATE_SELECT_LINES = ["parameter ADDR_FF = 8'hFF;",
+                         "//this should be parameterized",
+                         "wire [7:0]slave_select;",
+                         "assign slave_select =   i_m_adr[31:24];"]
+
+class WishboneGenError(Exception):
+    pass
+
+def parse_json(filepath):
+    f = open(filepath, 'r')
+    d = json.loads(f.read())
+    f.close()
+    return d
+
+def read_file(filepath):
+    f = open(filepath, 'r')
+    buf = f.read()
+    f.close()
+    return buf
+
+def generator_hash(filepath = __file__):
+    """
+    Hash of the generator source, rendered modules go stale when it changes
+
+    Args:
+        filepath (string): generator module, the source is read when it was
+            loaded from bytecode
+    """
+    if filepath.endswith(".pyc"):
+        filepath = filepath[:-1]
+    return hashlib.sha1(read_file(filepath)).hexdigest()
+
+def strip_lines(template, lines):
+    """
+    Remove the template lines that match one of 'lines' (ignoring whitespace
+    around them)
+    """
+    return "\n".join([l for l in template.split("\n") if l.strip() not in lines])
+
+def clog2(value):
+    """
+    Number of bits needed to count to 'value' - 1 (at least 1)
+    """
+    width = 1
+    while (1 << width) < value:
+        width += 1
+    return width
+
+def trailing_zeros(value, limit = ADDRESS_WIDTH):
+    count = 0
+    while count < limit and not (value >> count) & 1:
+        count += 1
+    return count
+
+def names(items, prefix):
+    """
+    Slave lists can be names or dictionaries with a "name"
+    """
+    result = []
+    for i, item in enumerate(items):
+        if isinstance(item, dict):
+            result.append(item.get("name", "%s%d" % (prefix, i)))
+        else:
+            result.append(str(item))
+    return result
+
+def slave_ports(count, comment, bus = BUS_CLASSIC):
+    ports = []
+    if bus == BUS_B4:
+        #The master B4 signals go in front of the slaves
+        ports.append("  input       [2:0]   i_m_cti,")
+        ports.append("  input       [1:0]   i_m_bte,")
+        ports.append("  output              o_m_stall,")
+        ports.append("")
+    for i in range(count):
+        ports.append("  //%s %d" % (comment, i))
+        ports.append("  output              o_s%d_we," % i)
+        ports.append("  output              o_s%d_cyc," % i)
+        ports.append("  output              o_s%d_stb," % i)
+        ports.append("  output      [3:0]   o_s%d_sel," % i)
+        ports.append("  input               i_s%d_ack," % i)
+        ports.append("  output      [31:0]  o_s%d_dat," % i)
+        ports.append("  input       [31:0]  i_s%d_dat," % i)
+        ports.append("  output      [31:0]  o_s%d_adr," % i)
+        ports.append("  input               i_s%d_int," % i)
+        if bus == BUS_B4:
+            ports.append("  output      [2:0]   o_s%d_cti," % i)
+            ports.append("  output      [1:0]   o_s%d_bte," % i)
+            ports.append("  input               i_s%d_stall," % i)
+        ports.append("")
+    while ports[-1] == "":
+        ports.pop()
+    ports[-1] = ports[-1][:-1]
+    return "\n".join(ports)
+
+def slave_buses(count, bus = BUS_CLASSIC):
+    """
+    Gather the slave data, ack and interrupt inputs into buses so the one
+    going back to the master is picked with an index or a reduction
+    """
+    dat = ", ".join(["i_s%d_dat" % i for i in reversed(range(count))])
+    ack = ", ".join(["i_s%d_ack" % i for i in reversed(range(count))])
+    ints = ", ".join(["i_s%d_int" % i for i in reversed(range(count))])
+    lines = []
+    lines.append("wire  [(%d * 32) - 1:0]  w_s_dat = {%s};" % (count, dat))
+    lines.append("wire  [%d:0]  w_s_ack = {%s};" % (count - 1, ack))
+    lines.append("wire  [%d:0]  w_s_int = {%s};" % (count - 1, ints))
+    if bus == BUS_B4:
+        stall = ", ".join(["i_s%d_stall" % i for i in reversed(range(count))])
+        lines.append("wire  [%d:0]  w_s_stall = {%s};" % (count - 1, stall))
+    return "\n".join(lines)
+
+def select_register(style, hit_expr_list, sel_source, sel_width, sel_reset, count, stable_source = None):
+    """
+    One hot slave select, either straight from the decode or registered
+
+    Args:
+        hit_expr_list (list of strings): decode expression of every slave
+        sel_source (string): the address bits the decode depends on
+        sel_width (int): width of sel_source
+        sel_reset (string): reset value of the registered select bits
+        stable_source (string): bits compared to decide the registered
+            decode still matches the address, defaults to sel_source
+    """
+    if stable_source is None:
+        stable_source = sel_source
+    lines = []
+    lines.append("wire  [%d:0]  w_hit;" % (count - 1))
+    if style == DECODE_COMBINATIONAL:
+        for i, e in enumerate(hit_expr_list):
+            lines.append("assign  w_hit[%d] = %s;" % (i, e))
+        return "\n".join(lines)
+
+    lines.append("reg   [%d:0]  r_hit;" % (count - 1))
+    lines.append("reg   [%d:0]  r_sel_adr;" % (sel_width - 1))
+    lines.append("wire          w_sel_stable;")
+    lines.append("")
+    lines.append("//The decode is registered, it is only used while the address still")
+    lines.append("//selects the same slave, a new slave costs one clock")
+    lines.append("always @ (posedge clk) begin")
+    lines.append("  if (rst) begin")
+    lines.append("    r_hit         <=  0;")
+    lines.append("    r_sel_adr     <=  %s;" % sel_reset)
+    lines.append("  end")
+    lines.append("  else begin")
+    lines.append("    r_sel_adr     <=  %s;" % stable_source)
+    for i, e in enumerate(hit_expr_list):
+        lines.append("    r_hit[%d]%s<=  %s;" % (i, " " * max(1, 14 - len("r_hit[%d]" % i)), e))
+    lines.append("  end")
+    lines.append("end")
+    lines.append("")
+    lines.append("assign  w_sel_stable  = (%s == r_sel_adr);" % stable_source)
+    lines.append("assign  w_hit         = w_sel_stable ? r_hit : %d'h0;" % count)
+    return "\n".join(lines)
+
+def return_path(style, count, dat_default, ack_default, sel_index, bus = BUS_CLASSIC):
+    """
+    Data and ack back to the master
+
+    Combinational and registered decodes pick the data with an index into
+    the slave data bus (a balanced mux) and the ack with an OR reduction of
+    the selected acks, the pipelined decode registers both
+
+    A classic ack is held until the strobe drops so the pipelined decode
+    passes on one clock of it, a B4 slave acks once per request so every
+    ack is passed on
+    """
+    lines = []
+    hit_any = "(w_hit != 0)"
+    if style == DECODE_PIPELINED:
+        if bus == BUS_B4:
+            lines.append("//data and ack are registered, one ack for every ack from the slave")
+        else:
+            lines.append("//data and ack are registered, the strobe to a slave is held off while")
+            lines.append("//its ack is on the way back to the master")
+        lines.append("always @ (posedge clk) begin")
+        lines.append("  if (rst) begin")
+        lines.append("    o_m_dat       <=  32'h0;")
+        lines.append("    o_m_ack       <=  1'h0;")
+        lines.append("  end")
+        lines.append("  else begin")
+        lines.append("    if (%s) begin" % hit_any)
+        lines.append("      o_m_dat     <=  w_s_dat[%s * 32 +: 32];" % sel_index)
+        lines.append("    end")
+        lines.append("    else begin")
+        lines.append("      o_m_dat     <=  %s;" % dat_default)
+        lines.append("    end")
+        if bus == BUS_B4:
+            lines.append("    if (%s) begin" % hit_any)
+        else:
+            lines.append("    if (o_m_ack) begin")
+            lines.append("      o_m_ack     <=  1'h0;")
+            lines.append("    end")
+            lines.append("    else if (%s) begin" % hit_any)
+        lines.append("      o_m_ack     <=  |(w_s_ack & w_hit);")
+        lines.append("    end")
+        lines.append("    else begin")
+        lines.append("      o_m_ack     <=  %s;" % ack_default)
+        lines.append("    end")
+        lines.append("  end")
+        lines.append("end")
+        return "\n".join(lines), ""
+
+    dat = []
+    dat.append("//data")
+    dat.append("always @ (*) begin")
+    dat.append("  if (%s) begin" % hit_any)
+    dat.append("    o_m_dat     = w_s_dat[%s * 32 +: 32];" % sel_index)
+    dat.append("  end")
+    dat.append("  else begin")
+    dat.append("    o_m_dat     = %s;" % dat_default)
+    dat.append("  end")
+    dat.append("end")
+
+    ack = []
+    ack.append("//ack")
+    ack.append("always @ (*) begin")
+    ack.append("  if (%s) begin" % hit_any)
+    ack.append("    o_m_ack     = |(w_s_ack & w_hit);")
+    ack.append("  end")
+    ack.append("  else begin")
+    ack.append("    o_m_ack     = %s;" % ack_default)
+    ack.append("  end")
+    ack.append("end")
+    return "\n".join(dat), "\n".join(ack)
+
+def slave_assigns(style, count, adr_expr, bus = BUS_CLASSIC):
+    lines = []
+    if bus == BUS_B4:
+        #A registered decode stalls the master while it catches up with a new address
+        stall = "|(w_s_stall & w_hit)"
+        if style != DECODE_COMBINATIONAL:
+            stall = "!w_sel_stable | %s" % stall
+        lines.append("assign o_m_stall   = %s;" % stall)
+        lines.append("")
+    for i in range(count):
+        stb = "i_m_stb"
+        if style == DECODE_PIPELINED and bus != BUS_B4:
+            stb = "(i_m_stb & !i_s%d_ack & !o_m_ack)" % i
+        lines.append("assign o_s%d_we    = w_hit[%d] ? i_m_we : 0;" % (i, i))
+        lines.append("assign o_s%d_stb   = w_hit[%d] ? %s : 0;" % (i, i, stb))
+        lines.append("assign o_s%d_sel   = w_hit[%d] ? i_m_sel : 0;" % (i, i))
+        lines.append("assign o_s%d_cyc   = w_hit[%d] ? i_m_cyc : 0;" % (i, i))
+        lines.append("assign o_s%d_adr   = w_hit[%d] ? %s : 0;" % (i, i, adr_expr))
+        lines.append("assign o_s%d_dat   = w_hit[%d] ? i_m_dat : 0;" % (i, i))
+        if bus == BUS_B4:
+            lines.append("assign o_s%d_cti   = w_hit[%d] ? i_m_cti : 0;" % (i, i))
+            lines.append("assign o_s%d_bte   = w_hit[%d] ? i_m_bte : 0;" % (i, i))
+        lines.append("")
+    return "\n".join(lines).rstrip()
+
+class WishboneInterconnect(object):
+    """
+    Peripheral interconnect, slave N is selected by the value N in the top
+    'select_bits' of the address, all ones reads the interrupt vector
+
+    The select field is 8 bits (the original layout) until there are more
+    than 255 slaves
+    """
+
+    def __init__(self, d):
+        object.__init__(self)
+        self.decode = d.get("decode", DECODE_COMBINATIONAL)
+        if self.decode not in DECODE_STYLES:
+            raise WishboneGenError("Unknown decode style: %s, must be one of %s" % (self.decode, ", ".join(DECODE_STYLES)))
+        self.bus = d.get("bus", BUS_CLASSIC)
+        if self.bus not in BUS_TYPES:
+            raise WishboneGenError("Unknown bus type: %s, must be one of %s" % (self.bus, ", ".join(BUS_TYPES)))
+        self.slaves = names(d.get("slaves", []), "slave")
+        self.count = len(self.slaves)
+        if self.count == 0:
+            raise WishboneGenError("No slaves on the peripheral bus")
+        self.select_bits = max(MIN_SELECT_BITS, clog2(self.count + 1))
+        self.select_lsb = ADDRESS_WIDTH - self.select_bits
+
+    def render(self, template):
+        sb = self.select_bits
+        lsb = self.select_lsb
+        addresses = []
+        for i, name in enumerate(self.slaves):
+            addresses.append("parameter ADDR_%d    =   %d'h%0*X;   //%s" % (i, sb, (sb + 3) // 4, i, name))
+        addresses.append("")
+        addresses.append("localparam SEL_INT  =   {%d{1'b1}};" % sb)
+        addresses.append("")
+        addresses.append("wire  [%d:0]  w_sel;" % (sb - 1))
+        addresses.append("assign  w_sel = i_m_adr[31:%d];" % lsb)
+        addresses.append("")
+        addresses.append(select_register(self.decode,
+                                         ["(w_sel == ADDR_%d)" % i for i in range(self.count)],
+                                         "w_sel",
+                                         sb,
+                                         "SEL_INT",
+                                         self.count))
+        addresses.append("")
+        addresses.append(slave_buses(self.count, self.bus))
+
+        sel_index = "w_sel"
+        data, ack = return_path(self.decode, self.count, "interrupts", "1'h0", sel_index, self.bus)
+
+        ints = []
+        ints.append("//int")
+        ints.append("//set up the interrupts flags")
+        for i in range(min(self.count, INTERRUPT_WIDTH)):
+            ints.append("assign interrupts[%d]  = i_s%d_int;" % (i, i))
+        if self.count > INTERRUPT_WIDTH:
+            ints.append("//the interrupt vector is 32 bits, the remaining slaves share the last bit")
+            ints.pop()
+            ints.append("assign interrupts[%d]  = |w_s_int[%d:%d];" % (INTERRUPT_WIDTH - 1, self.count - 1, INTERRUPT_WIDTH - 1))
+        elif self.count < INTERRUPT_WIDTH:
+            ints.append("//set all other interrupts to zero")
+            ints.append("assign interrupts[31:%d] = 0;" % self.count)
+
+        adr = "{%d'h0, i_m_adr[%d:0]}" % (sb, lsb - 1)
+        template = strip_lines(template, TEMPLATE_SELECT_LINES)
+        return Template(template).substitute(PORTS = slave_ports(self.count, "Slave", self.bus),
+                                             ADDRESSES = "\n".join(addresses),
+                                             DATA = data,
+                                             ACK = ack,
+                                             INT = "\n".join(ints),
+                                             ASSIGN = slave_assigns(self.decode, self.count, adr, self.bus))
+
+class WishboneMemInterconnect(object):
+    """
+    Memory interconnect, every memory has an offset and a size, memories
+    without an offset are placed after the previous one
+
+    Only the address bits above the common alignment of all the regions
+    take part in the decode so bursts inside an aligned block keep a
+    registered decode
+    """
+
+    def __init__(self, d):
+        object.__init__(self)
+        self.decode = d.get("decode", DECODE_COMBINATIONAL)
+        if self.decode not in DECODE_STYLES:
+            raise WishboneGenError("Unknown decode style: %s, must be one of %s" % (self.decode, ", ".join(DECODE_STYLES)))
+        self.bus = d.get("bus", BUS_CLASSIC)
+        if self.bus not in BUS_TYPES:
+            raise WishboneGenError("Unknown bus type: %s, must be one of %s" % (self.bus, ", ".join(BUS_TYPES)))
+        self.memories = []
+        pos = 0
+        for i, m in enumerate(d.get("memory", [])):
+            if not isinstance(m, dict):
+                raise WishboneGenError("Memory %d: must have a \"size\"" % i)
+            offset = m.get("offset", pos)
+            size = m["size"]
+            if isinstance(offset, basestring):
+                offset = int(offset, 0)
+            if isinstance(size, basestring):
+                size = int(size, 0)
+            if size <= 0:
+                raise WishboneGenError("Memory %d: size must be larger than 0" % i)
+            for name, o, s in self.memories:
+                if offset < o + s and o < offset + size:
+                    raise WishboneGenError("Memory %d: 0x%08X - 0x%08X overlaps %s" % (i, offset, offset + size, name))
+            self.memories.append((m.get("name", "mem%d" % i), offset, size))
+            pos = offset + size
+        self.count = len(self.memories)
+        self.align = ADDRESS_WIDTH
+        for name, offset, size in self.memories:
+            self.align = min(self.align, trailing_zeros(offset), trailing_zeros(size))
+
+    def render(self, template):
+        params = []
+        for i, (name, offset, size) in enumerate(self.memories):
+            params.append("localparam MEM_SEL_%d    = %d;" % (i, i))
+            params.append("localparam MEM_OFFSET_%d = %d;" % (i, offset))
+            params.append("localparam MEM_SIZE_%d   = %d;" % (i, size))
+            params.append("")
+        params.append(slave_buses(self.count, self.bus))
+
+        hits = []
+        for i in range(self.count):
+            hits.append("((i_m_adr >= MEM_OFFSET_%d) && (i_m_adr < (MEM_OFFSET_%d + MEM_SIZE_%d)))" % (i, i, i))
+        if self.align >= ADDRESS_WIDTH:
+            stable = "i_m_adr"
+            stable_width = ADDRESS_WIDTH
+        else:
+            stable = "i_m_adr[31:%d]" % self.align
+            stable_width = ADDRESS_WIDTH - self.align
+
+        select = []
+        select.append(select_register(self.decode, hits, stable, stable_width, "{%d{1'b1}}" % stable_width, self.count, stable))
+        select.append("")
+        select.append("reg   [%d:0]  mem_select;" % (clog2(self.count) - 1))
+        select.append("integer       i;")
+        select.append("")
+        select.append("//index of the selected memory for the data mux")
+        select.append("always @ (*) begin")
+        select.append("  mem_select = 0;")
+        select.append("  for (i = 0; i < %d; i = i + 1) begin" % self.count)
+        select.append("    if (w_hit[i]) begin")
+        select.append("      mem_select = i;")
+        select.append("    end")
+        select.append("  end")
+        select.append("end")
+
+        #Nothing answers an unmapped address, ack the active request so the
+        #master is not stuck, a registered decode only knows the address is
+        #unmapped once the select has settled
+        ack_default = "i_m_stb & i_m_cyc"
+        if self.decode != DECODE_COMBINATIONAL:
+            ack_default = "w_sel_stable & i_m_stb & i_m_cyc"
+        data, ack = return_path(self.decode, self.count, "32'h0000", ack_default, "mem_select", self.bus)
+
+        ints = []
+        ints.append("//int in from slave")
+        ints.append("always @ (*) begin")
+        ints.append("  o_m_int = |(w_s_int & w_hit);")
+        ints.append("end")
+
+        return Template(template).substitute(PORTS = slave_ports(self.count, "Memory", self.bus),
+                                             MEM_PARAMS = "\n".join(params),
+                                             MEM_SELECT = "\n".join(select),
+                                             DATA = data,
+                                             ACK = ack,
+                                             INT = "\n".join(ints),
+                                             ASSIGN = slave_assigns(self.decode, self.count, "i_m_adr", self.bus))
+
+class WishboneArbiter(object):
+    """
+    Arbiter between 'masters' wishbone masters and one slave
+
+    priority:       the lowest numbered master that wants the bus gets it
+                    and a higher priority master takes over between strobes
+    round_robin:    the bus goes to the next waiting master after the one
+                    that had it, a master holding the bus gives it up
+                    between strobes when another master is waiting
+    """
+
+    def __init__(self, d):
+        object.__init__(self)
+        self.count = d.get("masters", 2)
+        self.scheme = d.get("scheme", ARBITER_PRIORITY)
+        self.name = d.get("name", "arbiter_%d_masters" % self.count)
+        if self.scheme not in ARBITER_SCHEMES:
+            raise WishboneGenError("Unknown arbitration scheme: %s, must be one of %s" % (self.scheme, ", ".join(ARBITER_SCHEMES)))
+        if self.count < 2 or self.count > 255:
+            raise WishboneGenError("%s: an arbiter needs 2 to 255 masters" % self.name)
+
+    def gen_ports(self):
+        ports = []
+        for i in range(self.count):
+            ports.append("  input           i_m%d_we," % i)
+            ports.append("  input           i_m%d_cyc," % i)
+            ports.append("  input           i_m%d_stb," % i)
+            ports.append("  input   [3:0]   i_m%d_sel," % i)
+            ports.append("  output          o_m%d_ack," % i)
+            ports.append("  input   [31:0]  i_m%d_dat," % i)
+            ports.append("  output  [31:0]  o_m%d_dat," % i)
+            ports.append("  input   [31:0]  i_m%d_adr," % i)
+            ports.append("  output          o_m%d_int," % i)
+            ports.append("")
+        return "\n".join(ports)
+
+    def gen_master_select(self):
+        n = self.count
+        lines = []
+        lines.append("//master select block")
+        lines.append("localparam        MASTER_NO_SEL   = 8'hFF;")
+        for i in range(n):
+            lines.append("localparam        MASTER_%d     = %d;" % (i, i))
+        lines.append("")
+        if self.scheme == ARBITER_ROUND_ROBIN:
+            lines.append("reg [7:0]         last_master;")
+            lines.append("")
+        lines.append("")
+        lines.append("always @ (posedge clk) begin")
+        lines.append("  if (rst) begin")
+        lines.append("    master_select <= MASTER_NO_SEL;")
+        if self.scheme == ARBITER_ROUND_ROBIN:
+            lines.append("    last_master   <= MASTER_%d;" % (n - 1))
+        lines.append("  end")
+        lines.append("  else begin")
+        lines.append("    case (master_select)")
+        for i in range(n):
+            lines.append("      MASTER_%d: begin" % i)
+            lines.append("        if (!i_m%d_cyc && !i_s_ack) begin" % i)
+            lines.append("          master_select <= MASTER_NO_SEL;")
+            lines.append("        end")
+            lines.append("      end")
+        lines.append("      default: begin")
+        lines.append("        //nothing selected")
+        if self.scheme == ARBITER_PRIORITY:
+            for i in range(n):
+                lines.append("        %sif (i_m%d_cyc) begin" % ("" if i == 0 else "else ", i))
+                lines.append("          master_select <= MASTER_%d;" % i)
+                lines.append("        end")
+        else:
+            lines.append("        if (priority_select != MASTER_NO_SEL) begin")
+            lines.append("          master_select <= priority_select;")
+            lines.append("          last_master   <= priority_select;")
+            lines.append("        end")
+        lines.append("      end")
+        lines.append("    endcase")
+        if self.scheme == ARBITER_PRIORITY:
+            lines.append("    if ((master_select != MASTER_NO_SEL) && (priority_select < master_select) && (!o_s_stb && !i_s_ack))begin")
+        else:
+            lines.append("    //another master is waiting, give up the bus between strobes")
+            lines.append("    if ((master_select != MASTER_NO_SEL) && (priority_select != MASTER_NO_SEL) && (priority_select != master_select) && (!o_s_stb && !i_s_ack))begin")
+        lines.append("      master_select  <=  MASTER_NO_SEL;")
+        lines.append("    end")
+        lines.append("  end")
+        lines.append("end")
+        return "\n".join(lines)
+
+    def gen_priority_select(self):
+        n = self.count
+        lines = []
+        lines.append("")
+        lines.append("")
+        lines.append("")
+        lines.append("always @ (posedge clk) begin")
+        lines.append("  if (rst) begin")
+        lines.append("    priority_select <= MASTER_NO_SEL;")
+        lines.append("  end")
+        lines.append("  else begin")
+        if self.scheme == ARBITER_PRIORITY:
+            lines.append("    //find the highest priority")
+            for i in range(n):
+                lines.append("    %sif (i_m%d_cyc) begin" % ("" if i == 0 else "else ", i))
+                lines.append("      priority_select  <= MASTER_%d;" % i)
+                lines.append("    end")
+            lines.append("    else begin")
+            lines.append("      priority_select  <= MASTER_NO_SEL;")
+            lines.append("    end")
+        else:
+            lines.append("    //the next waiting master after the last one that had the bus")
+            lines.append("    case (last_master)")
+            for last in range(n):
+                lines.append("      MASTER_%d: begin" % last)
+                order = [(last + k) % n for k in range(1, n + 1)]
+                for j, m in enumerate(order):
+                    lines.append("        %sif (i_m%d_cyc) begin" % ("" if j == 0 else "else ", m))
+                    lines.append("          priority_select  <= MASTER_%d;" % m)
+                    lines.append("        end")
+                lines.append("        else begin")
+                lines.append("          priority_select  <= MASTER_NO_SEL;")
+                lines.append("        end")
+                lines.append("      end")
+            lines.append("      default: begin")
+            lines.append("        priority_select  <= MASTER_NO_SEL;")
+            lines.append("      end")
+            lines.append("    endcase")
+        lines.append("  end")
+        lines.append("end")
+        lines.append("")
+        return "\n".join(lines)
+
+    def gen_block(self, comment, signal):
+        lines = ["//%s" % comment]
+        for i in range(self.count):
+            lines.append("assign o_master_%s[MASTER_%d] = i_m%d_%s;" % (signal, i, i, signal))
+        lines.append("")
+        return "\n".join(lines)
+
+    def gen_assign(self):
+        lines = ["//assign block"]
+        for i in range(self.count):
+            lines.append("assign o_m%d_ack = (master_select == MASTER_%d) ? i_s_ack : 0;" % (i, i))
+            lines.append("assign o_m%d_dat = i_s_dat;" % i)
+            lines.append("assign o_m%d_int = (master_select == MASTER_%d) ? i_s_int : 0;" % (i, i))
+            lines.append("")
+        return "\n".join(lines)
+
+    def render(self, template):
+        return Template(template).substitute(ARBITER_NAME = self.name,
+                                             PORTS = self.gen_ports(),
+                                             NUM_MASTERS = self.count,
+                                             MASTER_SELECT = self.gen_master_select(),
+                                             PRIORITY_SELECT = self.gen_priority_select(),
+                                             WRITE = self.gen_block("write select block", "we"),
+                                             STROBE = self.gen_block("strobe select block", "stb"),
+                                             CYCLE = self.gen_block("cycle select block", "cyc"),
+                                             SELECT = self.gen_block("select select block", "sel"),
+                                             ADDRESS = self.gen_block("address seelct block", "adr"),
+                                             DATA = self.gen_block("data select block", "dat"),
+                                             ASSIGN = self.gen_assign())
+
+class RenderCache(object):
+    """
+    Rendered modules on disk, keyed by a hash of the generator source, the
+    template and the part of the description the module is generated from
+    """
+
+    def __init__(self, cache_dir):
+        object.__init__(self)
+        self.cache_dir = cache_dir
+        self.generator = generator_hash()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, template, description):
+        h = hashlib.sha1()
+        h.update(self.generator)
+        h.update(template)
+        h.update(json.dumps(description, sort_keys = True))
+        return h.hexdigest()
+
+    def render(self, generator, template, description):
+        """
+        Return the cached module or render and cache it
+
+        Args:
+            generator (class): WishboneInterconnect, WishboneMemInterconnect
+                or WishboneArbiter
+            template (string): template contents
+            description (dictionary): what the module is generated from
+        """
+        if self.cache_dir is None:
+            self.misses += 1
+            return generator(description).render(template)
+
+        path = os.path.join(self.cache_dir, "%s.v" % self.key(template, description))
+        if os.path.exists(path):
+            self.hits += 1
+            return read_file(path)
+
+        self.misses += 1
+        buf = generator(description).render(template)
+        if not os.path.exists(self.cache_dir):
+            os.makedirs(self.cache_dir)
+        temp_path = "%s.%d" % (path, os.getpid())
+        f = open(temp_path, 'w')
+        f.write(buf)
+        f.close()
+        os.rename(temp_path, path)
+        return buf
+
+def write_if_changed(filepath, buf):
+    """
+    Only touch the output when it changed so the build does not see a new
+    timestamp for the same module
+
+    Returns (boolean):
+        True if the file was written
+    """
+    if os.path.exists(filepath) and read_file(filepath) == buf:
+        return False
+    f = open(filepath, 'w')
+    f.write(buf)
+    f.close()
+    return True
+
+def generate_bus(d, output_dir, cache_dir = None, debug = False):
+    """
+    Generate every module in a bus description
+
+    Args:
+        d (dictionary): bus description
+            "decode": "combinational", "registered" or "pipelined"
+            "bus": "classic" or "b4"
+            "slaves": peripheral slave names
+            "memory": list of {"name", "size", optional "offset"}
+            "arbiters": list of {"name", "masters", "scheme"}
+        output_dir (string): where the modules are written
+        cache_dir (string): render cache, None to always render
+
+    Returns (list of strings):
+        paths of the generated modules
+    """
+    cache = RenderCache(cache_dir)
+    decode = d.get("decode", DECODE_COMBINATIONAL)
+    bus = d.get("bus", BUS_CLASSIC)
+    outputs = []
+
+    if len(d.get("slaves", [])) > 0:
+        desc = {"decode":decode, "bus":bus, "slaves":d["slaves"]}
+        buf = cache.render(WishboneInterconnect, read_file(INTERCONNECT_TEMPLATE), desc)
+        outputs.append((os.path.join(output_dir, "wishbone_interconnect.v"), buf))
+
+    if len(d.get("memory", [])) > 0:
+        desc = {"decode":decode, "bus":bus, "memory":d["memory"]}
+        buf = cache.render(WishboneMemInterconnect, read_file(MEM_INTERCONNECT_TEMPLATE), desc)
+        outputs.append((os.path.join(output_dir, "wishbone_mem_interconnect.v"), buf))
+
+    for a in d.get("arbiters", []):
+        arbiter = WishboneArbiter(a)
+        buf = cache.render(WishboneArbiter, read_file(ARBITER_TEMPLATE), a)
+        outputs.append((os.path.join(output_dir, "%s.v" % arbiter.name), buf))
+
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+    for filepath, buf in outputs:
+        written = write_if_changed(filepath, buf)
+        if debug:
+            print "%s: %s" % (filepath, "written" if written else "unchanged")
+    if debug:
+        print "Cache hits: %d, misses: %d" % (cache.hits, cache.misses)
+    return [filepath for filepath, buf in outputs]
+
+def main(argv):
+    #Parse out the commandline arguments
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        description=DESCRIPTION,
+        epilog=EPILOG
+    )
+
+    parser.add_argument("-j", "--json",
+                        nargs=1,
+                        required=True,
+                        help="Bus description")
+
+    parser.add_argument("-o", "--output",
+                        nargs=1,
+                        default=["."],
+                        help="Output directory (Default: current directory)")
+
+    parser.add_argument("--no-cache",
+                        action="store_true",
+                        help="Always render the templates")
+
+    parser.add_argument("-d", "--debug",
+                        action="store_true",
+                        help="Enable Debug Messages")
+
+    args = parser.parse_args()
+    print "Running Script: %s" % NAME
+
+    d = parse_json(args.json[0])
+    output_dir = args.output[0]
+    cache_dir = None
+    if not args.no_cache:
+        cache_dir = os.path.join(output_dir, CACHE_DIR_NAME)
+
+    try:
+        for filepath in generate_bus(d, output_dir, cache_dir, args.debug):
+            print "Generated: %s" % filepath
+    except WishboneGenError as ex:
+        print "Error: %s" % str(ex)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,72 @@
+#! /usr/bin/env python
+
+"""
+Render cache of the wishbone interconnect generator
+
+    python test_generate_wishbone_interconnect.py
+"""
+
+import os
+import imp
+import shutil
+import tempfile
+import unittest
+
+import generate_wishbone_interconnect as gen
+
+EXAMPLE_BUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "example_bus.json")
+
+class TestRenderCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.output_dir = os.path.join(self.directory, "build")
+        self.cache_dir = os.path.join(self.directory, "cache")
+        self.bus = gen.parse_json(EXAMPLE_BUS)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def generate(self, module):
+        """
+        Returns (list of strings):
+            generated module contents
+        """
+        paths = module.generate_bus(self.bus, self.output_dir, self.cache_dir)
+        return [gen.read_file(p) for p in paths]
+
+    def test_warm_cache(self):
+        """
+        A second run of the same generator is served from the cache
+        """
+        cold = self.generate(gen)
+        cached = os.listdir(self.cache_dir)
+        warm = self.generate(gen)
+        self.assertEqual(cold, warm)
+        self.assertEqual(cached, os.listdir(self.cache_dir))
+
+    def test_generator_change(self):
+        """
+        Modules rendered by an older generator are not reused
+        """
+        self.generate(gen)
+        cached = set(os.listdir(self.cache_dir))
+
+        source = gen.read_file(os.path.splitext(gen.__file__)[0] + ".py")
+        path = os.path.join(self.directory, "changed_generator.py")
+        f = open(path, 'w')
+        f.write(source + "\n#Changed\n")
+        f.close()
+        changed = imp.load_source("changed_generator", path)
+        #The templates are found relative to the generator
+        changed.INTERCONNECT_TEMPLATE = gen.INTERCONNECT_TEMPLATE
+        changed.MEM_INTERCONNECT_TEMPLATE = gen.MEM_INTERCONNECT_TEMPLATE
+        changed.ARBITER_TEMPLATE = gen.ARBITER_TEMPLATE
+
+        self.assertNotEqual(gen.generator_hash(), changed.generator_hash())
+        self.generate(changed)
+        rendered = set(os.listdir(self.cache_dir)) - cached
+        self.assertEqual(len(rendered), len(cached))
+
+if __name__ == "__main__":
+    unittest.main()
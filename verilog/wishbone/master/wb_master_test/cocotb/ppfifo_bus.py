@@ -1,3 +1,4 @@
+import sys
 import logging
 import cocotb
 from cocotb.triggers import RisingEdge
@@ -20,6 +21,41 @@ def create_byte_array_from_dword(dword):
     d.append((dword >>  0) & 0xFF)
     return d
 
+def bytes_to_words(data):
+    """
+    Pack a big endian byte array into 32-bit words in one pass
+
+    Trailing bytes that do not fill a word are dropped
+
+    Args:
+        data (Array('B'), string or list of bytes): data to pack
+
+    Returns (Array('I')):
+        packed words
+    """
+    if not isinstance(data, Array):
+        data = Array('B', data)
+    words = Array('I')
+    words.fromstring(data[:len(data) - (len(data) % 4)].tostring())
+    if sys.byteorder == "little":
+        words.byteswap()
+    return words
+
+def words_to_bytes(words):
+    """
+    Unpack 32-bit words into a big endian byte array in one pass
+
+    Args:
+        words (Array('I') or list of integers): words to unpack
+
+    Returns (Array('B')):
+        unpacked bytes, most significant byte of each word first
+    """
+    words = Array('I', words)
+    if sys.byteorder == "little":
+        words.byteswap()
+    return Array('B', words.tostring())
+
 class PPFIFOIngress(BusDriver):
 
     _signals = ["rdy", "act", "stb", "data", "size"]
@@ -34,35 +70,53 @@ class PPFIFOIngress(BusDriver):
 
     @cocotb.coroutine
     def write(self, data):
+        """
+        Write a byte array, the bytes are packed into words once up front
+
+        Args:
+            data (Array('B')): big endian data, length is a multiple of 4
+        """
+        yield self.write_words(bytes_to_words(data))
+
+    @cocotb.coroutine
+    def write_words(self, words):
+        """
+        Write 32-bit words, the words are put on the bus as they are
+
+        Args:
+            words (Array('I') or list of integers): data to write
+        """
+        bus = self.bus
+        clock = self.clock
         fifo_pos = 0
-        length = len(data) / 4
+        length = len(words)
         data_pos = 0
 
         while data_pos < length:
-            if (self.bus.rdy.value > 0) and (self.bus.act.value == 0):
+            if (bus.rdy.value > 0) and (bus.act.value == 0):
                 fifo_pos            =   0
-                v = int(self.bus.rdy.value)
+                v = int(bus.rdy.value)
                 #log.info("Ready Value: 0x%02X" % v)
                 if (v & 0x01) > 0:
-                    self.bus.act    <=  0x01
+                    bus.act         <=  0x01
                 else:
-                    self.bus.act    <=  0x02
+                    bus.act         <=  0x02
 
-            elif self.bus.act.value:
+            elif bus.act.value:
                 #log.info("Bus Pos: %d, data pos %d, Length: %d" % (fifo_pos, data_pos, length))
-                if fifo_pos   < self.bus.size.value:
-                    self.bus.data   <=  create_32bit_word(data, data_pos * 4)
-                    self.bus.stb    <=  1
+                if fifo_pos   < bus.size.value:
+                    bus.data        <=  words[data_pos]
+                    bus.stb         <=  1
                     fifo_pos        +=  1
                     data_pos        +=  1
                 else:
-                    self.bus.act    <=  0
+                    bus.act         <=  0
 
-            yield RisingEdge(self.clock)
-            self.bus.stb            <=  0
+            yield RisingEdge(clock)
+            bus.stb                 <=  0
 
-        yield RisingEdge(self.clock)
-        self.bus.act                <=  0
+        yield RisingEdge(clock)
+        bus.act                     <=  0
 
 class PPFIFOEgress(BusDriver):
     _signals = ["rdy", "act", "stb", "data", "size"]
@@ -74,35 +128,61 @@ class PPFIFOEgress(BusDriver):
         self.bus.act    <=  0
         self.bus.stb    <=  0
         self.data       =  Array('B')
+        self.words      =  Array('I')
 
     def get_data(self):
+        """
+        Returns (Array('B')):
+            the last read, unpacked into big endian bytes
+        """
+        if self.data is None:
+            self.data = words_to_bytes(self.words)
         return self.data
 
+    def get_words(self):
+        """
+        Returns (Array('I')):
+            the last read as 32-bit words
+        """
+        return self.words
+
     @cocotb.coroutine
     def read(self, byte_length):
+        """
+        Read 'byte_length' bytes, use 'get_data' to retrieve them
+        """
+        yield self.read_words(byte_length / 4)
+
+    @cocotb.coroutine
+    def read_words(self, length):
+        """
+        Read 'length' 32-bit words, use 'get_words' to retrieve them
+        """
+        bus = self.bus
+        clock = self.clock
         fifo_pos = 0
         data_pos = 0
-        length = byte_length / 4
-        self.data = Array('B')
+        self.words = Array('I')
+        self.data = None
+        append = self.words.append
 
         while data_pos < length:
-            self.bus.stb            <=  0
-            if self.bus.stb.value:
-                self.data.extend(create_byte_array_from_dword(self.bus.data.value))
+            bus.stb                 <=  0
+            if bus.stb.value:
+                append(int(bus.data.value))
                 fifo_pos        +=  1
                 data_pos        +=  1
 
-            if self.bus.rdy.value and not self.bus.act.value:
+            if bus.rdy.value and not bus.act.value:
                 fifo_pos            =  0
-                self.bus.act        <=  1
+                bus.act             <=  1
 
-            elif self.bus.act.value:
-                if fifo_pos < self.bus.size.value:
-                    self.bus.stb    <=  1
+            elif bus.act.value:
+                if fifo_pos < bus.size.value:
+                    bus.stb         <=  1
                 else:
-                    self.bus.act    <=  0
-
-            yield RisingEdge(self.clock)
+                    bus.act         <=  0
 
-        yield RisingEdge(self.clock)
+            yield RisingEdge(clock)
 
+        yield RisingEdge(clock)
@@ -17,6 +17,8 @@
 
 from array import array as Array
 
+import os
+import hashlib
 import cocotb
 import threading
 from cocotb.triggers import Timer
@@ -31,12 +33,15 @@ from cocotb.result import ReturnValue
 from cocotb.result import TestFailure
 from cocotb.binary import BinaryValue
 from cocotb.clock import Clock
+from cocotb.utils import get_sim_time
 from cocotb import bus
 import json
 from collections import OrderedDict
 import cocotb.monitors
 from ppfifo_bus import PPFIFOIngress
 from ppfifo_bus import PPFIFOEgress
+from ppfifo_bus import bytes_to_words
+from ppfifo_bus import words_to_bytes
 
 #from nysa.host.nysa import Nysa
 from sim.sim import FauxNysa
@@ -48,6 +53,14 @@ from nysa.common.status import Status
 CLK_PERIOD = 10
 RESET_PERIOD = 20
 
+SDB_CACHE_DIR = os.path.join("sim_build", "sdb_cache")
+
+INTERRUPT_WIDTH = 32
+
+COMMAND_WRITE = 0x00000001
+COMMAND_READ  = 0x00000002
+FLAG_MEM_BUS  = 0x00010000
+
 
 def create_byte_array_from_dword(dword):
     d = Array('B')
@@ -60,6 +73,62 @@ def create_byte_array_from_dword(dword):
 def create_32bit_word(data_array, index):
     return (data_array[index] << 24) | (data_array[index + 1] << 16) | (data_array[index + 2] << 8) | (data_array[index + 3])
 
+#ROMs generated (or loaded) by this process, keyed by sdb_rom_key
+_rom_cache = {}
+
+def sdb_rom_key(dev_dict, user_paths):
+    """
+    Hash of everything that goes into a generated SDB ROM
+    """
+    h = hashlib.sha1()
+    h.update(json.dumps(dev_dict))
+    h.update(json.dumps(list(user_paths)))
+    return h.hexdigest()
+
+def load_sdb_rom(dev_dict, user_paths, cache_dir):
+    """
+    Get the SDB ROM for a configuration, only generate it when neither this
+    process nor a previous run has built it
+
+    The ROM is stored in 'cache_dir' under the hash of the configuration
+    and the user paths, a changed configuration gets a new file
+
+    Args:
+        dev_dict (dictionary): the simulation configuration
+        user_paths (list of strings): paths searched for user cores
+        cache_dir (string): directory of the on disk cache, None to disable
+
+    Returns (Array('B')):
+        the SDB ROM
+    """
+    key = sdb_rom_key(dev_dict, user_paths)
+    if key in _rom_cache:
+        return _rom_cache[key]
+
+    rom = None
+    path = None
+    if cache_dir is not None:
+        path = os.path.join(cache_dir, "%s.rom" % key)
+        if os.path.exists(path):
+            rom = Array('B')
+            with open(path, "rb") as f:
+                rom.fromstring(f.read())
+
+    if rom is None:
+        gd = GenSDB()
+        rom = Array('B', gd.gen_rom(dev_dict, user_paths = user_paths, debug = False))
+        if path is not None:
+            if not os.path.exists(cache_dir):
+                os.makedirs(cache_dir)
+            #Write then rename so a parallel run never sees a partial file
+            temp_path = "%s.%d" % (path, os.getpid())
+            with open(temp_path, "wb") as f:
+                f.write(rom.tostring())
+            os.rename(temp_path, path)
+
+    _rom_cache[key] = rom
+    return rom
+
 def create_thread(function, name, dut, args):
     new_thread = threading.Thread(group=None,
                                   target=hal_read,
@@ -71,23 +140,152 @@ def create_thread(function, name, dut, args):
     dut.log.warning("Thread Started")
     return new_thread
 
+class QueuedCommand(object):
+    """
+    A burst built by the NysaSim command queue, consecutive accesses of the
+    same type are appended to it
+    """
+
+    def __init__(self, command, address, mem_device):
+        object.__init__(self)
+        self.command = command
+        self.address = address
+        self.mem_device = mem_device
+        self.length = 0
+        self.words = Array('I')
+        self.reads = []
+
+class QueuedRead(object):
+    """
+    Handle returned by NysaSim.queue_read, 'words' is filled in when the
+    queue is flushed
+    """
+
+    def __init__(self, length):
+        object.__init__(self)
+        self.length = length
+        self.words = None
+
+    @property
+    def value(self):
+        return self.words[0]
+
+class InterruptController(object):
+    """
+    Interrupt controller model for the simulated host
+
+    On every rising edge of the interrupt line the interrupt status vector
+    is read once and only the callbacks registered for the set bits are
+    called, the bit -> callbacks table is rebuilt when a callback is
+    registered, not on every interrupt
+
+    When 'coalesce' is non zero the controller waits that many clocks after
+    the edge before reading the status so interrupts from several devices
+    are handled by one dispatch
+
+    The status is sampled in the read only phase of a clock and the
+    callbacks are called on the following rising edge, where they are free
+    to write signals
+
+    Without a status vector (older test benches) every registered callback
+    is called, the same as before
+
+    Counters:
+        edges:      rising edges of the interrupt line
+        dispatches: callbacks called
+        spurious:   edges where no set bit had a callback
+        latencies:  clock cycles from the edge to the first callback
+    """
+
+    def __init__(self, clock, line, status = None, period = CLK_PERIOD, coalesce = 0):
+        object.__init__(self)
+        self.clock = clock
+        self.line = line
+        self.status = status
+        self.period = period
+        self.coalesce = coalesce
+        self.table = [()] * INTERRUPT_WIDTH
+        self.registered = 0
+        self.reset_counters()
+
+    def reset_counters(self):
+        self.edges = 0
+        self.dispatches = 0
+        self.spurious = 0
+        self.latencies = []
+
+    def rebuild(self, callbacks):
+        """
+        Rebuild the bit -> callbacks table
+
+        Args:
+            callbacks (dictionary): interrupt bit -> list of callbacks (or None)
+        """
+        table = [()] * INTERRUPT_WIDTH
+        registered = 0
+        for bit in callbacks:
+            if callbacks[bit]:
+                table[bit] = tuple(callbacks[bit])
+                registered |= 1 << bit
+        self.table = table
+        self.registered = registered
+
+    def latency_summary(self):
+        """
+        Returns (tuple of min, average, max):
+            interrupt latency in clock cycles, all 0 before the first dispatch
+        """
+        if len(self.latencies) == 0:
+            return (0, 0, 0)
+        return (min(self.latencies),
+                float(sum(self.latencies)) / len(self.latencies),
+                max(self.latencies))
+
+    @cocotb.coroutine
+    def run(self):
+        while True:
+            yield RisingEdge(self.line)
+            start = get_sim_time("ns")
+            self.edges += 1
+            for i in range(self.coalesce):
+                yield RisingEdge(self.clock)
+            yield ReadOnly()
+
+            if self.status is None:
+                pending = self.registered
+            else:
+                pending = int(self.status.value) & self.registered
+
+            if pending == 0:
+                self.spurious += 1
+                continue
+
+            #The status is sampled in the read only phase, callbacks can
+            #drive signals so they are called after the next edge
+            yield RisingEdge(self.clock)
+            self.latencies.append(int((get_sim_time("ns") - start) / self.period))
+            table = self.table
+            while pending:
+                low = pending & -pending
+                for c in table[low.bit_length() - 1]:
+                    self.dispatches += 1
+                    c()
+                pending ^= low
+
 class NysaSim (FauxNysa):
 
     @cocotb.coroutine
     def interrupt_interface(self):
-        while(1):
-            yield RisingEdge(self.dut.device_interrupt)
-            #print "got interrupt... looking for callback"
-            for key in self.callbacks:
-                if self.callbacks[key] is not None:
-                    #print "Found callback for: %s" % str(key)
-                    for c in self.callbacks[key]:
-                        c()
-
-    def __init__(self, dut, sim_config, period = CLK_PERIOD, user_paths = []):
+        yield self.interrupt_controller.run()
+
+    def __init__(self, dut, sim_config, period = CLK_PERIOD, user_paths = [], cache_dir = SDB_CACHE_DIR):
         self.status = Status()
         self.status.set_level('verbose')
         self.user_paths = user_paths
+        if cache_dir is not None:
+            cache_dir = os.path.join(os.path.dirname(os.path.abspath(sim_config)), cache_dir)
+        self.cache_dir = cache_dir
+        self.device_index = {}
         self.comm_lock = cocotb.triggers.Lock('comm')
         self.dut                              = dut
         dev_dict                              = json.load(open(sim_config), object_pairs_hook = OrderedDict)
@@ -95,13 +293,20 @@ class NysaSim (FauxNysa):
 
         self.timeout                          = 1000
         self.response                         = Array('B')
+        self.response_words                   = Array('I')
+        self.pending                          = []
+        self.queued_accesses                  = 0
+        self.issued_bursts                    = 0
 
         self.dut.rst                          <= 0
         self.ingress = PPFIFOIngress(dut, "ingress", dut.clk)
         self.egress  = PPFIFOEgress (dut, "egress",  dut.clk)
-        gd = GenSDB()
         self.callbacks = {}
-        self.rom = gd.gen_rom(self.dev_dict, user_paths = self.user_paths, debug = False)
+        status = None
+        if hasattr(dut, "device_interrupts"):
+            status = dut.device_interrupts
+        self.interrupt_controller = InterruptController(dut.clk, dut.device_interrupt, status, period)
+        self.rom = load_sdb_rom(self.dev_dict, self.user_paths, self.cache_dir)
 
         cocotb.fork(Clock(dut.clk, period).start())
         cocotb.fork(self.interrupt_interface())
@@ -126,90 +331,226 @@ class NysaSim (FauxNysa):
           Nothing
         """
         self.s.Verbose("entered")
-        gd = GenSDB()
-        self.rom = gd.gen_rom(self.dev_dict, user_paths = self.user_paths, debug = False)
+        self.rom = load_sdb_rom(self.dev_dict, self.user_paths, self.cache_dir)
+
+        sdb = self.nsm.read_sdb(self)
+        self._build_device_index()
+        return sdb
+
+    def _build_device_index(self):
+        self.device_index = {}
+        for urn in self.nsm.get_all_devices_as_urns():
+            abi_major = self.nsm.get_device_abi_major(urn)
+            if abi_major not in self.device_index:
+                self.device_index[abi_major] = []
+            self.device_index[abi_major].append(urn)
 
-        return self.nsm.read_sdb(self)
+    def find_device(self, driver, sub_type = None, unique_id = None):
+        """find_device
+
+        Find the URNs of the devices a driver can talk to
+
+        Lookups by driver alone use the device type index built when the SDB
+        was read, a sub type or unique id goes through the full search
+
+        Args:
+          driver (Driver class): driver of the device to find
+          sub_type (int): abi minor of the device
+          unique_id (int): unique id of the device
+
+        Returns (list of strings):
+          URNs of the matching devices
+        """
+        if sub_type is None and unique_id is None and len(self.device_index) > 0:
+            return list(self.device_index.get(driver.get_abi_major(), []))
+        return super(NysaSim, self).find_device(driver, sub_type, unique_id)
 
     def read(self, address, length = 1, disable_auto_inc = False):
         if (address * 4) + (length * 4) <= len(self.rom):
-            length *= 4
-            address *= 4
+            return self.rom[address * 4:(address + length) * 4]
+
+        address, mem_device = self._bus_address(address)
+        self._read(address, length, mem_device)
+        self.response = words_to_bytes(self.response_words)
+        return self.response
+
+    def read_words(self, address, length = 1):
+        """read_words
+
+        Read 32-bit words, the data stays in words from the egress FIFO to
+        the caller
+
+        Args:
+          address (int): word address
+          length (int): number of words to read
+
+        Returns (Array('I')):
+          the words read
+        """
+        if (address * 4) + (length * 4) <= len(self.rom):
+            return bytes_to_words(self.read(address, length))
 
-            ra = Array('B')
-            for count in range (0, length, 4):
-                ra.extend(self.rom[address + count :address + count + 4])
-            #print "ra: %s" % str(ra)
-            return ra
+        address, mem_device = self._bus_address(address)
+        self._read(address, length, mem_device)
+        return self.response_words
 
-        mem_device = False
+    def _bus_address(self, address):
         if self.mem_addr is None:
             self.mem_addr = self.nsm.get_address_of_memory_bus()
 
         if address >= self.mem_addr:
-            address = address - self.mem_addr
-            mem_device = True
+            return address - self.mem_addr, True
+        return address, False
 
-        self._read(address, length, mem_device)
-        return self.response
+    def _command_header(self, command, length, address, mem_device):
+        if mem_device:
+            command |= FLAG_MEM_BUS
+        return Array('I', [command, length, address])
+
+    @cocotb.coroutine
+    def _bus_read(self, address, length, mem_device):
+        yield(self.ingress.write_words(self._command_header(COMMAND_READ, length, address, mem_device)))
+        yield(self.egress.read_words(length))
+        raise ReturnValue(self.egress.get_words())
+
+    @cocotb.coroutine
+    def _bus_write(self, address, words, mem_device):
+        write_data = self._command_header(COMMAND_WRITE, len(words), address, mem_device)
+        write_data.extend(words)
+        yield(self.ingress.write_words(write_data))
 
     @cocotb.function
     def _read(self, address, length = 1, mem_device = False):
         yield(self.comm_lock.acquire())
-        print "Reading"
-
-        #print "_Read Acquire Lock"
-        data_index = 0
-        self.response = Array('B')
+        #print "Reading"
         yield( self.wait_clocks(10))
-
-        data = Array('B')
-
-        if mem_device:
-            data.extend(create_byte_array_from_dword(0x00010002))
-        else:
-            data.extend(create_byte_array_from_dword(0x00000002))
-
-        data.extend(create_byte_array_from_dword(length))
-        data.extend(create_byte_array_from_dword(address))
-        yield(self.ingress.write(data))
-        yield(self.egress.read(length * 4))
-        self.response = self.egress.get_data()
+        self.response_words = yield(self._bus_read(address, length, mem_device))
         self.comm_lock.release()
-        raise ReturnValue(self.response)
+        raise ReturnValue(self.response_words)
 
-    @cocotb.function
     def write(self, address, data = None, disable_auto_inc=False):
-        print "Writing"
-        mem_device = False
-        write_data = Array('B')
+        data = Array('B', data)
+        while (len(data) % 4) != 0:
+            data.append(0)
+        self.write_words(address, bytes_to_words(data))
 
-        if self.mem_addr is None:
-            self.mem_addr = self.nsm.get_address_of_memory_bus()
+    def write_words(self, address, words):
+        """write_words
 
-        if address >= self.mem_addr:
-            address = address - self.mem_addr
-            write_data.extend(create_byte_array_from_dword(0x00010001))
-        else:
-            write_data.extend(create_byte_array_from_dword(0x00000001))
+        Write 32-bit words, the words are put on the ingress FIFO as they are
 
-        while (len(data) % 4) != 0:
-            data.append(0)
+        Args:
+          address (int): word address
+          words (Array('I') or list of ints): data to write
+
+        Returns:
+          Nothing
+
+        Raises:
+          NysaCommError: nothing to write
+        """
+        if len(words) == 0:
+            raise NysaCommError("Length of data to write is 0!")
+        address, mem_device = self._bus_address(address)
+        self._write(address, words, mem_device)
+
+    @cocotb.function
+    def _write(self, address, words, mem_device = False):
+        yield(self.comm_lock.acquire())
+        #print "Writing"
+        yield(self._bus_write(address, words, mem_device))
+        self.comm_lock.release()
+
+    def queue_write(self, address, data):
+        """queue_write
 
-        data_count = len(data) / 4
+        Queue a write, a write to the address following the previous queued
+        write is merged into the same burst. Nothing is sent until
+        'flush_commands' is called
 
-        write_data.extend(create_byte_array_from_dword(data_count))
-        write_data.extend(create_byte_array_from_dword(address))
-        write_data.extend(data)
+        Args:
+          address (int): word address
+          data (int or list of ints): word or words to write
 
-        if data_count == 0:
+        Returns:
+          Nothing
+        """
+        if isinstance(data, (int, long)):
+            data = [data]
+        if len(data) == 0:
             raise NysaCommError("Length of data to write is 0!")
-        data_index          = 0
-        timeout_count       = 0
+        command = self._queue_command(COMMAND_WRITE, address, len(data))
+        command.words.extend(data)
+
+    def queue_read(self, address, length = 1):
+        """queue_read
+
+        Queue a read, a read from the address following the previous queued
+        read is merged into the same burst. The handle is filled in when
+        'flush_commands' is called
+
+        Args:
+          address (int): word address
+          length (int): number of words to read
+
+        Returns (QueuedRead):
+          handle, 'words' and 'value' are valid after the flush
+        """
+        handle = QueuedRead(length)
+        if (address * 4) + (length * 4) <= len(self.rom):
+            handle.words = self.read_words(address, length)
+            return handle
+
+        command = self._queue_command(COMMAND_READ, address, length)
+        command.reads.append((command.length - length, handle))
+        return handle
+
+    def _queue_command(self, command_type, address, length):
+        address, mem_device = self._bus_address(address)
+        self.queued_accesses += 1
+        if len(self.pending) > 0:
+            command = self.pending[-1]
+            if  command.command == command_type and \
+                command.mem_device == mem_device and \
+                command.address + command.length == address:
+                command.length += length
+                return command
+
+        command = QueuedCommand(command_type, address, mem_device)
+        command.length = length
+        self.pending.append(command)
+        return command
+
+    def flush_commands(self):
+        """flush_commands
+
+        Send every queued burst, in the order they were queued
+
+        Args:
+          Nothing
+
+        Returns (int):
+          number of bursts sent
+        """
+        commands = self.pending
+        self.pending = []
+        if len(commands) == 0:
+            return 0
+        self._flush_commands(commands)
+        self.issued_bursts += len(commands)
+        return len(commands)
 
+    @cocotb.function
+    def _flush_commands(self, commands):
         yield(self.comm_lock.acquire())
-        #while data_index < data_count:
-        yield(self.ingress.write(write_data))
+        for command in commands:
+            if command.command == COMMAND_WRITE:
+                yield(self._bus_write(command.address, command.words, command.mem_device))
+            else:
+                yield( self.wait_clocks(10))
+                words = yield(self._bus_read(command.address, command.length, command.mem_device))
+                for offset, handle in command.reads:
+                    handle.words = words[offset:offset + handle.length]
         self.comm_lock.release()
 
     def wait_for_interrupts(self, wait_time = 1):
@@ -291,6 +632,7 @@ class NysaSim (FauxNysa):
         if index not in self.callbacks:
             self.callbacks[index] = []
         self.callbacks[index].append(callback)
+        self.interrupt_controller.rebuild(self.callbacks)
 
     def unregister_interrupt_callback(self, index, callback = None):
         if callback is None:
@@ -298,6 +640,21 @@ class NysaSim (FauxNysa):
         elif index in self.callbacks:
             i = self.callbacks[index].index(callback)
             del self.callbacks[index][i]
+        self.interrupt_controller.rebuild(self.callbacks)
+
+    def set_interrupt_coalescing(self, cycles):
+        """set_interrupt_coalescing
+
+        Wait 'cycles' clocks after an interrupt before dispatching it so
+        interrupts that arrive together are handled together
+
+        Args:
+          cycles (int): 0 dispatches as soon as the interrupt is seen
+
+        Returns:
+          Nothing
+        """
+        self.interrupt_controller.coalesce = cycles
 
     def get_sdb_base_address(self):
         return 0x0
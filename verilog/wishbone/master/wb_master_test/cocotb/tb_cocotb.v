@@ -9,6 +9,7 @@ input               rst,
 
 input       [31:0]  test_id,
 output              device_interrupt,
+output      [31:0]  device_interrupts,
 
 output      [1:0]   ingress_rdy,
 input       [1:0]   ingress_act,
@@ -317,6 +318,8 @@ assign  w_wbs0_int              = 0;
 assign  w_wbs0_ack              = 0;
 assign  w_wbs0_dat_o            = 0;
 assign  device_interrupt        = w_wbp_int;
+//Interrupt status vector, one bit per slave on the peripheral bus
+assign  device_interrupts       = wi.interrupts;
 
 /*
   READ ME IF YOUR MODULE WILL INTERFACE WITH MEMORY
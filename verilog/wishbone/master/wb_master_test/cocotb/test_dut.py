@@ -15,6 +15,7 @@ from dut_driver import wb_master_testDriver
 from ppfifo_bus import PPFIFOIngress
 from ppfifo_bus import PPFIFOEgress
 from sim_host import NysaSim
+from sim_host import sdb_rom_key
 
 SIM_CONFIG = "sim_config.json"
 
@@ -172,8 +173,135 @@ def interrupt_test(dut):
     yield (nysa.wait_clocks(10))
     nysa.pretty_print_sdb()
     driver = wb_master_testDriver(nysa, nysa.find_device(wb_master_testDriver)[0])
+
+    handled = []
+    unused = []
+    driver.register_interrupt_callback(lambda: handled.append(1))
+    #Nothing drives the last interrupt bit, its callback must never be called
+    nysa.register_interrupt_callback(31, lambda: unused.append(1))
+
     yield cocotb.external(driver.set_control)(0x02)
 
     yield (nysa.wait_clocks(1000))
 
+    ic = nysa.interrupt_controller
+    dut.log.info("Interrupt edges: %d, callbacks: %d, spurious: %d" % (ic.edges, ic.dispatches, ic.spurious))
+    dut.log.info("Interrupt latency (cycles) min: %d avg: %0.1f max: %d" % ic.latency_summary())
+    if len(handled) == 0:
+        raise TestFailure("Interrupt was not dispatched to the driver")
+    if len(unused) > 0:
+        raise TestFailure("Interrupt was dispatched to a callback for an idle bit")
+
+
+
+def log_transfer_time(dut, name, elapsed, byte_count):
+    kb = byte_count / 1024.0
+    dut.log.info("%s: %0.3f s for %0.1f KB, %0.2f ms/KB" % (name, elapsed, kb, (elapsed * 1000.0) / kb))
+
+@cocotb.test(skip = False)
+def transport_benchmark_test(dut):
+    """
+    Description:
+        Measure the host side time spent moving data through the PPFIFO
+        host interface using the byte API, the word API, individual word
+        writes and queued (merged) word writes
+
+    Test ID: 4
+
+    Expected Results:
+        Data read back matches for every transport, the time per KB of
+        each transport is reported
+    """
+
+    dut.test_id <= 4
+
+    nysa = NysaSim(dut, SIM_CONFIG, CLK_PERIOD, user_paths = [MODULE_PATH])
+    setup_dut(dut)
+    yield(nysa.reset())
+    nysa.read_sdb()
+    yield (nysa.wait_clocks(10))
+    mem_base = nysa.nsm.get_address_of_memory_bus()
+    dut.log.info("Ready")
+
+    WORD_COUNT = 1024
+    REGISTER_COUNT = 256
+    WORDS = Array('I', [(i << 16) | (0xFFFF - i) for i in range(WORD_COUNT)])
+    DATA = Array('B')
+    for i in range (WORD_COUNT * 4):
+        DATA.append(i % 256)
+
+    #Byte API
+    start = time.time()
+    yield cocotb.external(nysa.write_memory)(0x00000, DATA)
+    data = yield cocotb.external(nysa.read_memory)(0x00000, WORD_COUNT)
+    log_transfer_time(dut, "Byte API", time.time() - start, len(DATA) * 2)
+    if data != DATA:
+        raise TestFailure("Byte API read back does not match")
+
+    #Word API
+    start = time.time()
+    yield cocotb.external(nysa.write_words)(mem_base, WORDS)
+    words = yield cocotb.external(nysa.read_words)(mem_base, WORD_COUNT)
+    log_transfer_time(dut, "Word API", time.time() - start, WORD_COUNT * 4 * 2)
+    if words != WORDS:
+        raise TestFailure("Word API read back does not match")
+
+    #Single word accesses, one command each
+    start = time.time()
+    for i in range(REGISTER_COUNT):
+        yield cocotb.external(nysa.write_words)(mem_base + i, [i])
+    log_transfer_time(dut, "Single word writes", time.time() - start, REGISTER_COUNT * 4)
+
+    #The same accesses through the command queue, merged into one burst
+    start = time.time()
+    for i in range(REGISTER_COUNT):
+        nysa.queue_write(mem_base + i, REGISTER_COUNT - i)
+    reads = [nysa.queue_read(mem_base + i) for i in range(REGISTER_COUNT)]
+    bursts = yield cocotb.external(nysa.flush_commands)()
+    log_transfer_time(dut, "Queued word accesses", time.time() - start, REGISTER_COUNT * 4 * 2)
+    dut.log.info("Queued %d accesses as %d bursts" % (nysa.queued_accesses, bursts))
+    if bursts != 2:
+        raise TestFailure("Consecutive accesses were not merged: %d bursts" % bursts)
+    for i in range(REGISTER_COUNT):
+        if reads[i].value != REGISTER_COUNT - i:
+            raise TestFailure("Queued read %d: 0x%08X != 0x%08X" % (i, reads[i].value, REGISTER_COUNT - i))
 
+@cocotb.test(skip = False)
+def sdb_cache_test(dut):
+    """
+    Description:
+        Read the SDB twice, the second read must come from the ROM cache,
+        and look up a device through the device type index
+
+    Test ID: 5
+
+    Expected Results:
+        Both reads return the same ROM, the indexed lookup matches the full
+        search
+    """
+
+    dut.test_id <= 5
+
+    nysa = NysaSim(dut, SIM_CONFIG, CLK_PERIOD, user_paths = [MODULE_PATH])
+    setup_dut(dut)
+    yield(nysa.reset())
+
+    start = time.time()
+    nysa.read_sdb()
+    first = time.time() - start
+    rom = nysa.rom
+
+    start = time.time()
+    nysa.read_sdb()
+    second = time.time() - start
+    dut.log.info("SDB read: first %0.3f s, second %0.3f s" % (first, second))
+
+    if nysa.rom is not rom:
+        raise TestFailure("SDB ROM was regenerated")
+    if not os.path.exists(os.path.join(nysa.cache_dir, "%s.rom" % sdb_rom_key(nysa.dev_dict, nysa.user_paths))):
+        raise TestFailure("SDB ROM was not written to the cache")
+
+    urns = nysa.find_device(wb_master_testDriver)
+    full = super(NysaSim, nysa).find_device(wb_master_testDriver)
+    if urns != full:
+        raise TestFailure("Indexed lookup %s != full search %s" % (str(urns), str(full)))
@@ -0,0 +1,100 @@
+`timescale 1ps / 1ps
+
+
+module tb_cocotb #(
+  parameter ADDR_WIDTH          = 14
+)(
+
+input                               clk,
+input                               rst,
+
+//Classic wishbone slave
+input                               CLASSIC_we,
+input                               CLASSIC_stb,
+input                               CLASSIC_cyc,
+input       [3:0]                   CLASSIC_sel,
+input       [31:0]                  CLASSIC_adr,
+input       [31:0]                  CLASSIC_dat_o,
+output      [31:0]                  CLASSIC_dat_i,
+output                              CLASSIC_ack,
+
+//Pipelined wishbone slave
+input                               PIPE_we,
+input                               PIPE_stb,
+input                               PIPE_cyc,
+input       [3:0]                   PIPE_sel,
+input       [31:0]                  PIPE_adr,
+input       [31:0]                  PIPE_dat_o,
+output      [31:0]                  PIPE_dat_i,
+output                              PIPE_ack,
+input       [2:0]                   PIPE_cti,
+input       [1:0]                   PIPE_bte,
+output                              PIPE_stall
+
+);
+
+
+//Parameters
+//Registers
+
+reg               r_rst;
+always @ (*)      r_rst           = rst;
+reg   [3:0]       test_id         = 0;
+
+wire              w_classic_int;
+wire              w_pipe_int;
+
+//submodules
+wb_bram #(
+  .ADDR_WIDTH       (ADDR_WIDTH     ),
+  .PIPELINED        (0              )
+) classic (
+  .clk              (clk            ),
+  .rst              (r_rst          ),
+
+  .i_wbs_we         (CLASSIC_we     ),
+  .i_wbs_stb        (CLASSIC_stb    ),
+  .i_wbs_cyc        (CLASSIC_cyc    ),
+  .i_wbs_sel        (CLASSIC_sel    ),
+  .i_wbs_adr        (CLASSIC_adr    ),
+  .i_wbs_dat        (CLASSIC_dat_o  ),
+  .o_wbs_dat        (CLASSIC_dat_i  ),
+  .o_wbs_ack        (CLASSIC_ack    ),
+  .o_wbs_int        (w_classic_int  ),
+
+  .i_wbs_cti        (3'b000         ),
+  .i_wbs_bte        (2'b00          ),
+  .o_wbs_stall      (               )
+);
+
+wb_bram #(
+  .ADDR_WIDTH       (ADDR_WIDTH     ),
+  .PIPELINED        (1              )
+) pipelined (
+  .clk              (clk            ),
+  .rst              (r_rst          ),
+
+  .i_wbs_we         (PIPE_we        ),
+  .i_wbs_stb        (PIPE_stb       ),
+  .i_wbs_cyc        (PIPE_cyc       ),
+  .i_wbs_sel        (PIPE_sel       ),
+  .i_wbs_adr        (PIPE_adr       ),
+  .i_wbs_dat        (PIPE_dat_o     ),
+  .o_wbs_dat        (PIPE_dat_i     ),
+  .o_wbs_ack        (PIPE_ack       ),
+  .o_wbs_int        (w_pipe_int     ),
+
+  .i_wbs_cti        (PIPE_cti       ),
+  .i_wbs_bte        (PIPE_bte       ),
+  .o_wbs_stall      (PIPE_stall     )
+);
+
+//asynchronus logic
+//synchronous logic
+
+initial begin
+  $dumpfile ("design.vcd");
+  $dumpvars(0, tb_cocotb);
+end
+
+endmodule
@@ -70,7 +70,10 @@ module wb_bram #(
   parameter DATA_WIDTH = 32,
   parameter ADDR_WIDTH = 12,
   parameter MEM_FILE  = "NOTHING",
-  parameter MEM_FILE_LENGTH = 0
+  parameter MEM_FILE_LENGTH = 0,
+  //0: classic cycles, ack is held until the strobe goes down
+  //1: B4 pipelined, a request is accepted every clock and acked in order
+  parameter PIPELINED = 0
 
 )(
   input               clk,
@@ -85,7 +88,12 @@ module wb_bram #(
   input       [31:0]  i_wbs_dat,
   output reg  [31:0]  o_wbs_dat,
   output reg          o_wbs_ack,
-  output reg          o_wbs_int
+  output reg          o_wbs_int,
+
+  //wishbone B4 signals, only used when PIPELINED = 1
+  input       [2:0]   i_wbs_cti,
+  input       [1:0]   i_wbs_bte,
+  output              o_wbs_stall
 );
 
 localparam            RAM_SIZE = ADDR_WIDTH - 1;
@@ -98,6 +106,22 @@ reg                 en_ram;
 
 reg   [3:0]         ram_sleep;
 
+//Pipelined mode: the request moves through the RAM address register, the
+//BRAM read address register and the BRAM output, one bit for each stage
+reg   [2:0]         r_pipe;
+reg                 r_we;
+wire                w_request;
+wire                w_ram_en;
+wire                w_ram_we;
+
+//The BRAM takes an address every clock so a pipelined request is never
+//stalled, incrementing bursts (CTI = 3'b010) stream at one word per clock
+//without the slave predicting the next address
+assign  o_wbs_stall = 1'b0;
+assign  w_request   = i_wbs_stb & i_wbs_cyc & !o_wbs_stall;
+assign  w_ram_en    = PIPELINED ? 1'b1 : en_ram;
+assign  w_ram_we    = PIPELINED ? (r_we & r_pipe[0]) : i_wbs_we;
+
 bram#(
   .DATA_WIDTH      (DATA_WIDTH      ),
   .ADDR_WIDTH      (ADDR_WIDTH      ),
@@ -106,8 +130,8 @@ bram#(
 )br(
   .clk             (clk             ),
   .rst             (rst             ),
-  .en              (en_ram          ),
-  .we              (i_wbs_we        ),
+  .en              (w_ram_en        ),
+  .we              (w_ram_we        ),
   .write_address   (ram_adr         ),
   .read_address    (ram_adr         ),
   .data_in         (write_data      ),
@@ -123,6 +147,19 @@ always @ (posedge clk) begin
     ram_sleep       <= SLEEP_COUNT;
     ram_adr         <= 0;
     en_ram          <= 0;
+    r_pipe          <= 0;
+    r_we            <= 0;
+  end
+  else if (PIPELINED) begin
+    //the data out of the BRAM lines up with the last stage of the pipe
+    r_pipe          <= {r_pipe[1:0], w_request};
+    o_wbs_ack       <= r_pipe[2];
+    o_wbs_dat       <= read_data;
+    if (w_request) begin
+      ram_adr       <= i_wbs_adr[RAM_SIZE:0];
+      write_data    <= i_wbs_dat;
+      r_we          <= i_wbs_we;
+    end
   end
   else begin
     //when the master acks our ack, then put our ack down
@@ -0,0 +1,669 @@
+#! /usr/bin/env python
+
+"""
+NES ROM uploader for the fpga_nes host communication interface (hci)
+
+The hci accepts debug packets over the serial port. Memory write packets
+never answer, so every CPU_MEM_WR / PPU_MEM_WR packet is followed by a short
+ECHO packet carrying a sequence number: the hci handles packets in order, the
+tag coming back means everything sent before it was consumed without losing
+a byte. Up to 'window' tags are in flight at a time so the line never idles
+while the host waits for an answer.
+
+    uploader = NESUploader(port = "/dev/ttyUSB0", baudrate = 115200)
+    uploader.upload_rom("roms/wild_gun_man.nes")
+
+The hci uart is built with the HCI_SYS_CLK_FREQ and HCI_BAUD_RATE parameters
+of wb_fpga_nes, --sys-clk and the baud rate have to match them. LoopbackHCI is a pseudo terminal stand-in for the hci that runs the same
+packet protocol at the rate of a real line, it is used by the benchmark:
+
+    nes_uploader.py --loopback
+"""
+
+import os
+import sys
+import time
+import errno
+import select
+import argparse
+import threading
+from collections import deque
+
+import serial
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             os.pardir, os.pardir, os.pardir, "sim"))
+from ines import load_ines
+from ines import write_test_rom
+
+NAME = os.path.basename(os.path.realpath(__file__))
+
+DESCRIPTION = "\n" \
+              "\n" \
+              "Upload an iNES ROM to the fpga_nes core over the debug serial port\n" \
+              "\n" \
+              "usage: %s [options] [rom]\n" % NAME
+
+EPILOG = "\n" \
+         "\n" \
+         "Examples:\n" \
+         "\tUpload a ROM to wb_fpga_nes built with HCI_BAUD_RATE = 115200:\n" \
+         "\t\t%s -p /dev/ttyUSB0 -b 115200 roms/wild_gun_man.nes\n" \
+         "\n" \
+         "\tBenchmark the uploader against the pseudo terminal stand-in:\n" \
+         "\t\t%s --loopback -b 115200\n" \
+         "\n" % (NAME, NAME)
+
+#Debug packet opcodes
+OP_ECHO                 = 0x00
+OP_CPU_MEM_RD           = 0x01
+OP_CPU_MEM_WR           = 0x02
+OP_DBG_BRK              = 0x03
+OP_DBG_RUN              = 0x04
+OP_CPU_REG_RD           = 0x05
+OP_CPU_REG_WR           = 0x06
+OP_QUERY_DBG_BRK        = 0x07
+OP_QUERY_ERR_CODE       = 0x08
+OP_PPU_MEM_RD           = 0x09
+OP_PPU_MEM_WR           = 0x0A
+OP_PPU_DISABLE          = 0x0B
+OP_CART_SET_CFG         = 0x0C
+
+#CPU registers
+CPU_REG_PCL             = 0x00
+CPU_REG_PCH             = 0x01
+CPU_REG_AC              = 0x02
+CPU_REG_X               = 0x03
+CPU_REG_Y               = 0x04
+CPU_REG_P               = 0x05
+CPU_REG_S               = 0x06
+
+#Error code bits
+ERR_UART_PARITY         = 0x01
+ERR_UNKNOWN_OPCODE      = 0x02
+
+PRG_ROM_ADDRESS         = 0x8000
+CHR_ROM_ADDRESS         = 0x0000
+
+#Packet counts are 16-bit
+MAX_PAYLOAD             = 0xFFFF
+#The echo stage of the hci doesn't check if the uart transmit fifo is full,
+#keep the tags shorter than the fifo
+ECHO_TAG_LENGTH         = 2
+DEFAULT_WINDOW          = 4
+
+#uart.v: SYS_CLK_FREQ / BAUD_RATE is divided into 16 oversample ticks,
+#defaults of the HCI_SYS_CLK_FREQ and HCI_BAUD_RATE parameters of wb_fpga_nes
+SYS_CLK_FREQ            = 100000000
+OVERSAMPLE_RATE         = 16
+#Start, 8 data bits, odd parity and stop
+BITS_PER_BYTE           = 11
+#Largest difference between the host and the uart baud rate that still
+#samples the stop bit inside the bit
+MAX_BAUDRATE_ERROR      = 0.02
+
+DEFAULT_BAUDRATE        = 38400
+DEFAULT_TIMEOUT         = 1.0
+
+class NESUploadError(Exception):
+    pass
+
+def uart_baudrate(baudrate, sys_clk_freq = SYS_CLK_FREQ):
+    """
+    Baud rate uart.v actually runs at when it is built with 'baudrate'
+
+    Args:
+        baudrate (integer): BAUD_RATE parameter of the uart
+        sys_clk_freq (integer): SYS_CLK_FREQ parameter of the uart
+
+    Returns (float):
+        baud rate of the oversample tick divider
+
+    Raises:
+        NESUploadError: the uart can't run that fast
+    """
+    ticks = (sys_clk_freq / baudrate) / OVERSAMPLE_RATE
+    if baudrate > (sys_clk_freq / OVERSAMPLE_RATE) or ticks < 1:
+        raise NESUploadError("%d baud is faster than the uart maximum of %d baud" %
+                             (baudrate, sys_clk_freq / OVERSAMPLE_RATE))
+    return float(sys_clk_freq) / (ticks * OVERSAMPLE_RATE)
+
+def check_baudrate(baudrate, sys_clk_freq = SYS_CLK_FREQ):
+    """
+    Raises:
+        NESUploadError: the uart can't run at 'baudrate' or the divider
+            rounds it too far off the rate the host sends at
+    """
+    actual = uart_baudrate(baudrate, sys_clk_freq)
+    error = abs(actual - baudrate) / baudrate
+    if error > MAX_BAUDRATE_ERROR:
+        raise NESUploadError("uart runs at %0.0f baud when built for %d (%0.1f%% error), "
+                             "%d / (%d * n) baud rates are exact" %
+                             (actual, baudrate, error * 100, sys_clk_freq, OVERSAMPLE_RATE))
+
+def mem_write_packet(opcode, address, data):
+    header = bytearray([opcode,
+                        address & 0xFF,
+                        (address >> 8) & 0xFF,
+                        len(data) & 0xFF,
+                        (len(data) >> 8) & 0xFF])
+    return str(header) + str(data)
+
+def mem_read_packet(opcode, address, count):
+    return str(bytearray([opcode,
+                          address & 0xFF,
+                          (address >> 8) & 0xFF,
+                          count & 0xFF,
+                          (count >> 8) & 0xFF]))
+
+def echo_packet(tag):
+    return str(bytearray([OP_ECHO, len(tag) & 0xFF, len(tag) >> 8])) + tag
+
+class NESUploader(object):
+    """
+    Talk to the hci over a serial port
+
+    Args:
+        port (string): serial port name
+        baudrate (integer): baud rate the hci uart was built with
+        window (integer): echo tags in flight before waiting for an answer
+        payload_size (integer): largest memory write packet
+        timeout (float): seconds to wait for an answer
+        ser (serial.Serial): already open port, 'port' and 'baudrate' are
+            ignored
+
+    Raises:
+        NESUploadError: invalid baud rate, window or payload size
+    """
+
+    def __init__(self,
+                 port = None,
+                 baudrate = DEFAULT_BAUDRATE,
+                 window = DEFAULT_WINDOW,
+                 payload_size = MAX_PAYLOAD,
+                 timeout = DEFAULT_TIMEOUT,
+                 ser = None):
+        object.__init__(self)
+        if window < 1:
+            raise NESUploadError("Window must hold at least one packet")
+        if payload_size < 1 or payload_size > MAX_PAYLOAD:
+            raise NESUploadError("Payload size must be between 1 and %d" % MAX_PAYLOAD)
+        self.window = window
+        self.payload_size = payload_size
+        self.timeout = timeout
+        if ser is None:
+            check_baudrate(baudrate)
+            ser = serial.Serial(port = port,
+                                baudrate = baudrate,
+                                bytesize = serial.EIGHTBITS,
+                                parity = serial.PARITY_ODD,
+                                stopbits = serial.STOPBITS_ONE,
+                                timeout = timeout)
+        self.ser = ser
+        self.byte_time = float(BITS_PER_BYTE) / ser.baudrate
+        self.sequence = 0
+        self.pending = deque()
+        self.stats = {"packets": 0, "bytes": 0, "echoes": 0}
+
+    def close(self):
+        self.ser.close()
+
+    def _read(self, length, line_bytes = 0):
+        """
+        Read an answer, the timeout grows with the bytes the hci still has
+        to receive or send before the answer is complete
+        """
+        deadline = time.time() + self.timeout + (line_bytes + length) * self.byte_time
+        data = self.ser.read(length)
+        while len(data) < length and time.time() < deadline:
+            data += self.ser.read(length - len(data))
+        if len(data) != length:
+            raise NESUploadError("Expected %d bytes from the hci, received %d" % (length, len(data)))
+        return data
+
+    def _send(self, data):
+        self.ser.write(data)
+        self.stats["bytes"] += len(data)
+
+    def _wait_echo(self):
+        tag, length = self.pending.popleft()
+        echo = self._read(len(tag), length)
+        if echo != tag:
+            raise NESUploadError("Echo 0x%s != 0x%s, the hci lost bytes of a packet" %
+                                 (echo.encode("hex"), tag.encode("hex")))
+        self.stats["echoes"] += 1
+
+    def flush(self):
+        """
+        Wait until every packet in flight is acknowledged
+
+        Raises:
+            NESUploadError: an echo didn't come back or didn't match
+        """
+        while len(self.pending) > 0:
+            self._wait_echo()
+
+    def send_packet(self, packet):
+        """
+        Send a packet followed by an echo tag, wait for the oldest tag when
+        the window is full
+
+        Raises:
+            NESUploadError: an echo didn't come back or didn't match
+        """
+        while len(self.pending) >= self.window:
+            self._wait_echo()
+        tag = str(bytearray([(self.sequence >> (8 * i)) & 0xFF for i in range(ECHO_TAG_LENGTH)]))
+        self.sequence += 1
+        packet += echo_packet(tag)
+        self._send(packet)
+        self.pending.append((tag, len(packet)))
+        self.stats["packets"] += 1
+
+    def write_memory(self, opcode, address, data):
+        """
+        Write a block of CPU or PPU memory in packets of up to payload_size
+        bytes, the packets are acknowledged by flush()
+
+        Args:
+            opcode (integer): OP_CPU_MEM_WR or OP_PPU_MEM_WR
+            address (integer): 16-bit start address
+            data (string): bytes to write
+        """
+        for offset in range(0, len(data), self.payload_size):
+            chunk = data[offset:offset + self.payload_size]
+            self.send_packet(mem_write_packet(opcode, address + offset, chunk))
+
+    def write_cpu_mem(self, address, data):
+        self.write_memory(OP_CPU_MEM_WR, address, data)
+
+    def write_ppu_mem(self, address, data):
+        self.write_memory(OP_PPU_MEM_WR, address, data)
+
+    def read_memory(self, opcode, address, length):
+        """
+        Read a block of CPU or PPU memory, packets in flight are flushed
+        first
+
+        Args:
+            opcode (integer): OP_CPU_MEM_RD or OP_PPU_MEM_RD
+            address (integer): 16-bit start address
+            length (integer): bytes to read
+
+        Returns (string):
+            bytes read
+        """
+        self.flush()
+        data = ""
+        for offset in range(0, length, MAX_PAYLOAD):
+            count = min(MAX_PAYLOAD, length - offset)
+            self._send(mem_read_packet(opcode, address + offset, count))
+            data += self._read(count)
+        return data
+
+    def read_cpu_mem(self, address, length):
+        return self.read_memory(OP_CPU_MEM_RD, address, length)
+
+    def read_ppu_mem(self, address, length):
+        return self.read_memory(OP_PPU_MEM_RD, address, length)
+
+    def write_cpu_reg(self, reg, value):
+        self._send(str(bytearray([OP_CPU_REG_WR, reg, value & 0xFF])))
+
+    def read_cpu_reg(self, reg):
+        self.flush()
+        self._send(str(bytearray([OP_CPU_REG_RD, reg])))
+        return ord(self._read(1))
+
+    def debug_break(self):
+        self._send(chr(OP_DBG_BRK))
+
+    def debug_run(self):
+        self._send(chr(OP_DBG_RUN))
+
+    def disable_ppu(self):
+        self._send(chr(OP_PPU_DISABLE))
+
+    def set_cart_config(self, config):
+        """
+        Args:
+            config (list of integers): iNES header bytes 4 - 8
+        """
+        self._send(chr(OP_CART_SET_CFG) + str(bytearray(config)))
+
+    def get_error_code(self):
+        self.flush()
+        self._send(chr(OP_QUERY_ERR_CODE))
+        return ord(self._read(1))
+
+    def upload_rom(self, path, verify = False):
+        """
+        Halt the CPU, configure the cartridge from the iNES header, write
+        the PRG and CHR ROM, point the PC at the reset vector and run
+
+        Args:
+            path (string): iNES file
+            verify (boolean): read the ROM back before running
+
+        Returns (float):
+            seconds the upload took
+
+        Raises:
+            NESUploadError: the hci lost bytes, reported an error or the
+                memory read back doesn't match
+        """
+        image = load_ines(path)
+        start = time.time()
+
+        self.debug_break()
+        self.disable_ppu()
+        self.set_cart_config(image.header.cart_config())
+        self.write_cpu_mem(PRG_ROM_ADDRESS, image.prg_rom)
+        self.write_ppu_mem(CHR_ROM_ADDRESS, image.chr_rom)
+        self.flush()
+
+        if verify:
+            if self.read_cpu_mem(PRG_ROM_ADDRESS, image.header.prg_rom_size) != image.prg_rom:
+                raise NESUploadError("PRG ROM read back doesn't match %s" % path)
+            if self.read_ppu_mem(CHR_ROM_ADDRESS, image.header.chr_rom_size) != image.chr_rom:
+                raise NESUploadError("CHR ROM read back doesn't match %s" % path)
+
+        error = self.get_error_code()
+        if error != 0:
+            raise NESUploadError("hci error code: 0x%02X" % error)
+
+        vector = image.reset_vector()
+        self.write_cpu_reg(CPU_REG_PCL, vector & 0xFF)
+        self.write_cpu_reg(CPU_REG_PCH, vector >> 8)
+        self.debug_run()
+        self.ser.flush()
+        return time.time() - start
+
+class LoopbackHCI(object):
+    """
+    Pseudo terminal stand-in for the hci
+
+    Bytes are consumed at the rate of a serial line running at 'baudrate'
+    and answers are delayed by 'latency' seconds, the round trip of a USB
+    serial adapter. CPU and PPU memory are flat 64KB arrays.
+
+    Args:
+        baudrate (integer): line rate to emulate
+        latency (float): seconds before an answer reaches the host
+
+    Usage:
+        hci = LoopbackHCI(115200)
+        hci.start()
+        uploader = NESUploader(port = hci.port, baudrate = 115200)
+    """
+
+    def __init__(self, baudrate = DEFAULT_BAUDRATE, latency = 0.001):
+        object.__init__(self)
+        self.byte_time = float(BITS_PER_BYTE) / baudrate
+        self.latency = latency
+        self.master, self.slave = os.openpty()
+        self.port = os.ttyname(self.slave)
+        self.cpu_mem = bytearray(0x10000)
+        self.ppu_mem = bytearray(0x10000)
+        self.cpu_regs = bytearray(8)
+        self.cart_config = None
+        self.halted = False
+        self.error_code = 0
+        self.line_time = 0
+        self.answers = deque()
+        self.answer_ready = threading.Condition()
+        self.running = False
+        self.threads = []
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.threads = [threading.Thread(target = self._run_rx),
+                        threading.Thread(target = self._run_tx)]
+        for t in self.threads:
+            t.daemon = True
+            t.start()
+
+    def stop(self):
+        self.running = False
+        with self.answer_ready:
+            self.answer_ready.notify()
+        for t in self.threads:
+            t.join()
+        os.close(self.master)
+        os.close(self.slave)
+
+    def _bytes(self):
+        """
+        Generator of the bytes received, paced at the line rate
+        """
+        self.line_time = time.time()
+        while self.running:
+            r, w, x = select.select([self.master], [], [], 0.05)
+            if not r:
+                continue
+            try:
+                data = os.read(self.master, 4096)
+            except OSError as e:
+                if e.errno == errno.EIO:
+                    continue
+                raise
+            self.line_time = max(self.line_time, time.time())
+            for c in data:
+                self.line_time += self.byte_time
+                yield ord(c)
+            delay = self.line_time - time.time()
+            if delay > 0:
+                time.sleep(delay)
+
+    def _answer(self, data):
+        with self.answer_ready:
+            #The answer leaves when the last byte of the request arrived
+            #on the emulated line, not when the chunk was read
+            self.answers.append((self.line_time + self.latency, str(bytearray(data))))
+            self.answer_ready.notify()
+
+    def _run_tx(self):
+        while self.running:
+            with self.answer_ready:
+                while self.running and len(self.answers) == 0:
+                    self.answer_ready.wait(0.05)
+                if not self.running:
+                    return
+                due, data = self.answers.popleft()
+            delay = due - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            os.write(self.master, data)
+            #The transmit line is busy for the whole answer
+            time.sleep(len(data) * self.byte_time)
+
+    def _run_rx(self):
+        rx = self._bytes()
+        take = lambda n: [rx.next() for i in range(n)]
+        try:
+            while True:
+                opcode = rx.next()
+                if opcode == OP_ECHO:
+                    count = take(2)
+                    self._answer(take(count[0] | (count[1] << 8)))
+                elif opcode in (OP_CPU_MEM_WR, OP_PPU_MEM_WR, OP_CPU_MEM_RD, OP_PPU_MEM_RD):
+                    a = take(4)
+                    address = a[0] | (a[1] << 8)
+                    count = a[2] | (a[3] << 8)
+                    mem = self.cpu_mem if opcode in (OP_CPU_MEM_WR, OP_CPU_MEM_RD) else self.ppu_mem
+                    if opcode in (OP_CPU_MEM_WR, OP_PPU_MEM_WR):
+                        for i in range(count):
+                            mem[(address + i) & 0xFFFF] = rx.next()
+                    else:
+                        self._answer([mem[(address + i) & 0xFFFF] for i in range(count)])
+                elif opcode == OP_CPU_REG_WR:
+                    reg, value = take(2)
+                    self.cpu_regs[reg & 0x07] = value
+                elif opcode == OP_CPU_REG_RD:
+                    self._answer([self.cpu_regs[rx.next() & 0x07]])
+                elif opcode == OP_CART_SET_CFG:
+                    self.cart_config = take(5)
+                elif opcode == OP_QUERY_ERR_CODE:
+                    self._answer([self.error_code])
+                elif opcode == OP_QUERY_DBG_BRK:
+                    self._answer([1 if self.halted else 0])
+                elif opcode == OP_DBG_BRK:
+                    self.halted = True
+                elif opcode == OP_DBG_RUN:
+                    self.halted = False
+                elif opcode != OP_PPU_DISABLE:
+                    self.error_code |= ERR_UNKNOWN_OPCODE
+        except StopIteration:
+            pass
+
+def loopback_upload(path, baudrate, latency, window, payload_size, verify = False):
+    """
+    Upload a ROM to a new loopback stand-in and check what it received
+
+    Returns (tuple):
+        seconds the upload took, packets sent
+
+    Raises:
+        NESUploadError: the upload failed or the stand-in memory or
+            cartridge configuration doesn't match the image
+    """
+    hci = LoopbackHCI(baudrate, latency)
+    hci.start()
+    uploader = NESUploader(port = hci.port, baudrate = baudrate,
+                           window = window, payload_size = payload_size)
+    try:
+        elapsed = uploader.upload_rom(path, verify = verify)
+    finally:
+        uploader.close()
+        hci.stop()
+    image = load_ines(path)
+    if str(hci.cpu_mem[PRG_ROM_ADDRESS:PRG_ROM_ADDRESS + image.header.prg_rom_size]) != image.prg_rom or \
+       str(hci.ppu_mem[CHR_ROM_ADDRESS:CHR_ROM_ADDRESS + image.header.chr_rom_size]) != image.chr_rom:
+        raise NESUploadError("Loopback memory doesn't match %s" % path)
+    if hci.cart_config != image.header.cart_config():
+        raise NESUploadError("Loopback cartridge configuration doesn't match %s" % path)
+    return elapsed, uploader.stats["packets"]
+
+def benchmark(baudrate, latency, windows, payload_sizes, verify):
+    """
+    Upload NROM-128 and NROM-256 sized images to the loopback stand-in and
+    print the upload time of every window and payload size
+    """
+    import tempfile
+    roms = [("NROM-128 (16KB PRG, 8KB CHR)", 1, 1),
+            ("NROM-256 (32KB PRG, 8KB CHR)", 2, 1)]
+    directory = tempfile.mkdtemp()
+    line_rate = float(baudrate) / BITS_PER_BYTE
+    print "%d baud (%0.1f KB/s line rate), %0.1f ms answer latency%s" % \
+            (baudrate, line_rate / 1024, latency * 1000,
+             ", times include the read back" if verify else "")
+    try:
+        for name, prg_banks, chr_banks in roms:
+            path = os.path.join(directory, "test_%d_%d.nes" % (prg_banks, chr_banks))
+            write_test_rom(path, prg_banks, chr_banks)
+            size = prg_banks * 0x4000 + chr_banks * 0x2000
+            print "%s: %d bytes, %0.2f s at the line rate" % (name, size, size / line_rate)
+            for payload_size in payload_sizes:
+                for window in windows:
+                    elapsed, packets = loopback_upload(path, baudrate, latency, window,
+                                                       payload_size, verify)
+                    print "\tPayload 0x%04X, window %d: %d packets, %0.2f s, %0.1f KB/s (%0.0f%% of the line)" % \
+                            (payload_size, window, packets, elapsed,
+                             size / elapsed / 1024, (size / elapsed) / line_rate * 100)
+    finally:
+        for f in os.listdir(directory):
+            os.remove(os.path.join(directory, f))
+        os.rmdir(directory)
+
+def main(argv):
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        description=DESCRIPTION,
+        epilog=EPILOG
+    )
+
+    parser.add_argument("rom",
+                        nargs="?",
+                        help="iNES ROM to upload")
+
+    parser.add_argument("-p", "--port",
+                        help="Serial port of the hci")
+
+    parser.add_argument("-b", "--baudrate",
+                        type=int,
+                        default=DEFAULT_BAUDRATE,
+                        help="Baud rate the hci uart was built with (HCI_BAUD_RATE), up to "
+                             "sys clk / %d (Default: %d)" % (OVERSAMPLE_RATE, DEFAULT_BAUDRATE))
+
+    parser.add_argument("--sys-clk",
+                        type=int,
+                        default=SYS_CLK_FREQ,
+                        help="Clock the hci uart was built for (HCI_SYS_CLK_FREQ) in Hz (Default: %d)" %
+                             SYS_CLK_FREQ)
+
+    parser.add_argument("-w", "--window",
+                        type=int,
+                        default=DEFAULT_WINDOW,
+                        help="Packets in flight before waiting for an echo (Default: %d)" % DEFAULT_WINDOW)
+
+    parser.add_argument("-s", "--payload",
+                        type=lambda x: int(x, 0),
+                        default=MAX_PAYLOAD,
+                        help="Largest memory write payload (Default: 0x%04X)" % MAX_PAYLOAD)
+
+    parser.add_argument("--verify",
+                        action="store_true",
+                        help="Read the ROM back before running it")
+
+    parser.add_argument("--loopback",
+                        action="store_true",
+                        help="Benchmark the uploader against a pseudo terminal stand-in of the hci")
+
+    parser.add_argument("--latency",
+                        type=float,
+                        default=1.0,
+                        help="Loopback answer latency in ms (Default: 1.0)")
+
+    args = parser.parse_args()
+
+    try:
+        check_baudrate(args.baudrate, args.sys_clk)
+        if args.loopback:
+            benchmark(args.baudrate, args.latency / 1000.0,
+                      windows = sorted(set([1, args.window])),
+                      payload_sizes = sorted(set([0x400, args.payload])),
+                      verify = args.verify)
+            return
+
+        if args.rom is None or args.port is None:
+            parser.error("A ROM and a serial port are required")
+
+        image = load_ines(args.rom)
+        print "%s: %s" % (args.rom, str(image.header))
+        if image.header.mapper != 0:
+            print "Only mapper 0 is supported."
+            sys.exit(1)
+        if image.header.four_screen:
+            print "Only horizontal and vertical mirroring are supported."
+            sys.exit(1)
+
+        uploader = NESUploader(port = args.port,
+                               baudrate = args.baudrate,
+                               window = args.window,
+                               payload_size = args.payload)
+        try:
+            elapsed = uploader.upload_rom(args.rom, verify = args.verify)
+        finally:
+            uploader.close()
+        print "Uploaded %d bytes in %0.2f s (%0.1f KB/s)" % \
+                (image.header.prg_rom_size + image.header.chr_rom_size, elapsed,
+                 (image.header.prg_rom_size + image.header.chr_rom_size) / elapsed / 1024)
+    except NESUploadError as e:
+        print "Error: %s" % str(e)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(sys.argv)
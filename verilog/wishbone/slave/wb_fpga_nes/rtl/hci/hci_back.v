@@ -26,7 +26,10 @@
 *  of the hw system as specified, and returns the specified data.
 ***************************************************************************************************/
 
-module hci
+module hci #(
+  parameter SYS_CLK_FREQ = 100000000,  // clk frequency in Hz
+  parameter BAUD_RATE    = 38400       // uart baud rate, nes_uploader.py -b has to match it
+)
 (
   input  wire        clk,              // 100MHz system clock signal
   input  wire        rst,              // reset signal
@@ -143,8 +146,8 @@ always @(posedge clk)
   end
 
 // Instantiate the serial controller block.
-uart #(.SYS_CLK_FREQ(100000000),
-       .BAUD_RATE(38400),
+uart #(.SYS_CLK_FREQ(SYS_CLK_FREQ),
+       .BAUD_RATE(BAUD_RATE),
        .DATA_BITS(8),
        .STOP_BITS(1),
        .PARITY_MODE(1)) uart_blk
@@ -26,7 +26,10 @@
 ***************************************************************************************************/
 `timescale 1 ns/1 ps
 
-module nes_top (
+module nes_top #(
+  parameter HCI_SYS_CLK_FREQ  = 100000000,  // clk frequency in Hz, used by the serial hci
+  parameter HCI_BAUD_RATE     = 38400       // baud rate of the serial hci uart
+)(
   input               clk,                  // 100MHz system clock signal
   input               rst,                  // reset push button
   input               i_console_reset,      // console reset
@@ -313,7 +316,10 @@ jp jp_blk(
 
 
 /*
-hci hci_blk(
+hci #(
+  .SYS_CLK_FREQ   (HCI_SYS_CLK_FREQ   ),
+  .BAUD_RATE      (HCI_BAUD_RATE      )
+) hci_blk(
   .clk            (clk         ),
   .rst            (rst                ),
   .rx             (RXD                ),
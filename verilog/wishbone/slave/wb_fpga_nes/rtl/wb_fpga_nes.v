@@ -65,7 +65,12 @@ SOFTWARE.
   SDB_SIZE:15
 */
 
-module wb_fpga_nes (
+module wb_fpga_nes #(
+  //clk frequency and baud rate of the serial hci (rtl/hci/hci_back.v),
+  //nes_uploader.py is run with the same --sys-clk and -b
+  parameter HCI_SYS_CLK_FREQ  = 100000000,
+  parameter HCI_BAUD_RATE     = 38400
+)(
   input               clk,
   input               rst,
 
@@ -294,7 +299,10 @@ nes_clkgen clkgen (
 );
 */
 
-nes_top nes(
+nes_top #(
+  .HCI_SYS_CLK_FREQ     (HCI_SYS_CLK_FREQ    ),
+  .HCI_BAUD_RATE        (HCI_BAUD_RATE       )
+) nes(
 //  .clk          (nes_clk             ),
   .clk                  (clk                 ),
   .rst                  (rst                 ),
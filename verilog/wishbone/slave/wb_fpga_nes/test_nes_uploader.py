@@ -0,0 +1,75 @@
+#! /usr/bin/env python
+
+"""
+Upload test ROMs to the loopback stand-in of the hci
+
+    python test_nes_uploader.py
+"""
+
+import os
+import re
+import shutil
+import tempfile
+import unittest
+
+from nes_uploader import EPILOG
+from nes_uploader import NESUploadError
+from nes_uploader import check_baudrate
+from nes_uploader import loopback_upload
+from nes_uploader import write_test_rom
+
+#Fastest rate the 100MHz uart divides exactly, keeps the uploads short
+BAUDRATE                = 1041666
+LATENCY                 = 0.001
+
+class TestNESUploader(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def rom(self, prg_banks, chr_banks):
+        path = os.path.join(self.directory, "test_%d_%d.nes" % (prg_banks, chr_banks))
+        write_test_rom(path, prg_banks, chr_banks)
+        return path
+
+    def test_upload(self):
+        """
+        An NROM-256 image lands in the stand-in memory
+        """
+        elapsed, packets = loopback_upload(self.rom(2, 1), BAUDRATE, LATENCY,
+                                           window = 4, payload_size = 0x400)
+        self.assertTrue(packets > 0)
+
+    def test_upload_verify(self):
+        """
+        The read back of an NROM-128 image matches, one tag in flight
+        """
+        loopback_upload(self.rom(1, 1), BAUDRATE, LATENCY,
+                        window = 1, payload_size = 0x1000, verify = True)
+
+    def test_baudrate(self):
+        """
+        The uart divider rejects rates it rounds too far off
+        """
+        check_baudrate(115200)
+        check_baudrate(BAUDRATE)
+        self.assertRaises(NESUploadError, check_baudrate, 921600)
+        self.assertRaises(NESUploadError, check_baudrate, 12500000)
+        #hci built with HCI_SYS_CLK_FREQ = 50MHz
+        check_baudrate(3125000, 50000000)
+        self.assertRaises(NESUploadError, check_baudrate, 6250000, 50000000)
+
+    def test_epilog_baudrate(self):
+        """
+        The rates in the usage examples are accepted
+        """
+        rates = [int(b) for b in re.findall(r"-b (\d+)", EPILOG)]
+        self.assertTrue(len(rates) > 0)
+        for baudrate in rates:
+            check_baudrate(baudrate)
+
+if __name__ == "__main__":
+    unittest.main()
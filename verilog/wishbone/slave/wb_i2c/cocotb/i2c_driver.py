@@ -0,0 +1,78 @@
+"""
+wb_i2c register driver for the cocotb testbench
+
+Registers are accessed through a classic wishbone master, the transfers are
+sequenced by the I2CController shared with the axi_lite_i2c driver.
+"""
+
+import cocotb
+from cocotb.result import ReturnValue
+
+from wb_bus import WishboneClassicMaster
+from i2c_controller import I2CController
+from i2c_controller import TRANSFER_TIMEOUT
+
+#Registers and their fields are generated from i2c_regs.json by
+#verilog/sim/register_map.py
+import i2c_regs
+from i2c_regs import I2CRegisters
+from i2c_regs import CLOCK_RATE
+from i2c_regs import CLOCK_DIVIDER
+
+class WishboneI2C(I2CRegisters):
+
+    def __init__(self, dut, name = "WB"):
+        object.__init__(self)
+        self.dut = dut
+        self.clock = dut.clk
+        self.bus = WishboneClassicMaster(dut, name, dut.clk)
+        self.controller = I2CController(i2c_regs, self.read_register, self.write_registers, dut.clk)
+
+    @cocotb.coroutine
+    def read_register(self, address):
+        data = yield self.bus.read_words(address, 1)
+        raise ReturnValue(data[0])
+
+    @cocotb.coroutine
+    def write_register(self, address, value):
+        yield self.bus.write_words(address, [value])
+
+    @cocotb.coroutine
+    def write_registers(self, addr_value_pairs):
+        for address, value in addr_value_pairs:
+            yield self.write_register(address, value)
+
+    @cocotb.coroutine
+    def modify(self, address, set_mask = 0, clear_mask = 0):
+        value = yield self.read_register(address)
+        yield self.write_register(address, (value & ~clear_mask) | set_mask)
+
+    @cocotb.coroutine
+    def enable_i2c(self, enable):
+        yield self.update_control(en = enable)
+
+    @cocotb.coroutine
+    def get_clock_rate(self):
+        data = yield self.read_register(CLOCK_RATE)
+        raise ReturnValue(data)
+
+    @cocotb.coroutine
+    def set_clock_divider(self, clock_divider):
+        yield self.write_register(CLOCK_DIVIDER, clock_divider)
+
+    @cocotb.coroutine
+    def write_to_i2c(self, i2c_id, i2c_data, timeout = TRANSFER_TIMEOUT):
+        """write_to_i2c
+
+        Write to an I2C device, see I2CController.write_to_i2c
+        """
+        yield self.controller.write_to_i2c(i2c_id, i2c_data, timeout)
+
+    @cocotb.coroutine
+    def read_from_i2c(self, i2c_id, read_length, timeout = TRANSFER_TIMEOUT):
+        """read_from_i2c
+
+        Read from an I2C device, see I2CController.read_from_i2c
+        """
+        read_data = yield self.controller.read_from_i2c(i2c_id, read_length, timeout)
+        raise ReturnValue(read_data)
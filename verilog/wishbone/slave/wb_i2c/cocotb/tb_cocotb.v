@@ -0,0 +1,73 @@
+`timescale 1ps / 1ps
+
+
+module tb_cocotb (
+
+input                               clk,
+input                               rst,
+
+//Classic wishbone slave
+input                               WB_we,
+input                               WB_stb,
+input                               WB_cyc,
+input       [3:0]                   WB_sel,
+input       [31:0]                  WB_adr,
+input       [31:0]                  WB_dat_o,
+output      [31:0]                  WB_dat_i,
+output                              WB_ack,
+output                              WB_int
+
+);
+
+
+//Parameters
+//Registers
+
+reg               r_rst;
+always @ (*)      r_rst           = rst;
+reg   [3:0]       test_id         = 0;
+
+//Behavioral I2C targets (verilog/sim/i2c_target.py) pull the lines low
+//through these registers
+reg               eeprom_scl_low  = 0;
+reg               eeprom_sda_low  = 0;
+reg               sensor_scl_low  = 0;
+reg               sensor_sda_low  = 0;
+
+wire              i2c_scl;
+wire              i2c_sda;
+
+pullup            (i2c_scl);
+pullup            (i2c_sda);
+
+assign i2c_scl  = (eeprom_scl_low | sensor_scl_low) ? 1'b0 : 1'bz;
+assign i2c_sda  = (eeprom_sda_low | sensor_sda_low) ? 1'b0 : 1'bz;
+
+//submodules
+wb_i2c dut (
+  .clk              (clk            ),
+  .rst              (r_rst          ),
+
+  .i_wbs_we         (WB_we          ),
+  .i_wbs_stb        (WB_stb         ),
+  .i_wbs_cyc        (WB_cyc         ),
+  .i_wbs_sel        (WB_sel         ),
+  .i_wbs_adr        (WB_adr         ),
+  .i_wbs_dat        (WB_dat_o       ),
+  .o_wbs_dat        (WB_dat_i       ),
+  .o_wbs_ack        (WB_ack         ),
+  .o_wbs_int        (WB_int         ),
+
+  .scl              (i2c_scl        ),
+  .sda              (i2c_sda        )
+);
+
+//asynchronus logic
+//synchronous logic
+
+initial begin
+  $dumpfile ("design.vcd");
+  $dumpvars(0, tb_cocotb);
+end
+
+endmodule
@@ -0,0 +1,164 @@
+import os
+import sys
+import cocotb
+import logging
+from cocotb.result import TestFailure
+from cocotb.result import ReturnValue
+from cocotb.clock import Clock
+from cocotb.triggers import RisingEdge
+from cocotb.utils import get_sim_time
+from array import array as Array
+
+from i2c_driver import WishboneI2C
+from i2c_controller import I2CError
+from i2c_target import start_targets
+from i2c_target import eeprom_write
+from i2c_target import eeprom_read
+from i2c_target import log_utilization
+from i2c_target import I2CMonitor
+from i2c_target import EEPROM_ADDRESS
+from i2c_target import SENSOR_ADDRESS
+from i2c_target import EEPROM_PAGE_SIZE
+from i2c_target import EEPROM_WRITE_CYCLES
+from i2c_target import SENSOR_READ_ONLY
+
+CLK_PERIOD = 10
+
+MODULE_PATH = os.path.join(os.path.dirname(__file__), os.pardir, "rtl")
+MODULE_PATH = os.path.abspath(MODULE_PATH)
+
+#SCL period is 5 * (divider + 1) clocks
+CLOCK_DIVIDER_VALUE = 4
+
+#Bytes moved by the SCL utilization benchmark in each direction
+UTILIZATION_LENGTH = 256
+
+@cocotb.coroutine
+def setup_targets(dut, test_id, write_cycles = EEPROM_WRITE_CYCLES, stretch = 0):
+    """
+    Reset the core, connect an EEPROM and a register file sensor to the bus
+    and run the bus with CLOCK_DIVIDER_VALUE
+    """
+    cocotb.fork(Clock(dut.clk, CLK_PERIOD).start())
+    dut.rst <= 1
+    dut.test_id <= test_id
+    i2c = WishboneI2C(dut)
+    eeprom, sensor = start_targets(dut, write_cycles, stretch)
+    for i in range(10):
+        yield RisingEdge(dut.clk)
+    dut.rst <= 0
+    for i in range(10):
+        yield RisingEdge(dut.clk)
+
+    yield i2c.enable_i2c(True)
+    yield i2c.set_clock_divider(CLOCK_DIVIDER_VALUE)
+    raise ReturnValue((i2c, eeprom, sensor))
+
+@cocotb.test(skip = False)
+def eeprom_test(dut):
+    """
+    Description:
+        Write two pages to the EEPROM model, ACK poll while it programs them
+        and read them back with a single sequential read
+
+    Test ID: 0
+
+    Expected Results:
+        The data read back matches the data written and the EEPROM memory
+        The EEPROM NACKs its address while it programs a page
+    """
+    i2c, eeprom, sensor = yield setup_targets(dut, 0)
+    address = 0x0100
+    data = [(i * 7 + 3) & 0xFF for i in range(EEPROM_PAGE_SIZE * 2)]
+
+    polls = 0
+    for page in range(0, len(data), EEPROM_PAGE_SIZE):
+        p = yield eeprom_write(i2c, address + page, data[page:page + EEPROM_PAGE_SIZE])
+        polls += p
+    dut.log.info("%d page writes, %d NACKed polls" % (eeprom.page_writes, polls))
+    if eeprom.page_writes != 2:
+        raise TestFailure("Expected 2 page writes, EEPROM programmed %d" % eeprom.page_writes)
+    if polls == 0:
+        raise TestFailure("The EEPROM never NACKed while it was programming")
+    if list(eeprom.dump(address, len(data))) != data:
+        raise TestFailure("EEPROM memory doesn't match the data written")
+
+    read_data = yield eeprom_read(i2c, address, len(data))
+    if list(read_data) != data:
+        for i in range(min(len(read_data), len(data))):
+            if read_data[i] != data[i]:
+                raise TestFailure("Byte %d: 0x%02X != 0x%02X" % (i, read_data[i], data[i]))
+        raise TestFailure("Read %d bytes, expected %d" % (len(read_data), len(data)))
+
+@cocotb.test(skip = False)
+def sensor_test(dut):
+    """
+    Description:
+        Write and read back the registers of the register file sensor while
+        it stretches the clock, then write to a read-only register
+
+    Test ID: 1
+
+    Expected Results:
+        The registers read back match, SCL was stretched
+        The write to the read-only register is NACKed and raises an I2CError
+    """
+    i2c, eeprom, sensor = yield setup_targets(dut, 1, stretch = 20)
+    sensor.set_register(0, 0xA5)
+    sensor.set_register(1, 0x5A)
+
+    values = [0x11, 0x22, 0x33, 0x44]
+    yield i2c.write_to_i2c(SENSOR_ADDRESS, [4] + values)
+    yield i2c.write_to_i2c(SENSOR_ADDRESS, [0])
+    registers = yield i2c.read_from_i2c(SENSOR_ADDRESS, 8)
+    expected = [0xA5, 0x5A, 0x00, 0x00] + values
+    dut.log.info("Registers: %s, %d clocks stretched" %
+                 (" ".join(["%02X" % r for r in registers]), sensor.stretch_cycles))
+    if list(registers) != expected:
+        raise TestFailure("Registers %s != %s" % (list(registers), expected))
+    if sensor.stretch_cycles == 0:
+        raise TestFailure("The sensor never stretched the clock")
+
+    try:
+        yield i2c.write_to_i2c(SENSOR_ADDRESS, [SENSOR_READ_ONLY[0], 0xFF])
+    except I2CError as e:
+        dut.log.info("Read-only register: %s" % str(e))
+    else:
+        raise TestFailure("Write to a read-only register was not NACKed")
+    if sensor.get_register(SENSOR_READ_ONLY[0]) != 0xA5:
+        raise TestFailure("Read-only register was modified")
+
+@cocotb.test(skip = False)
+def scl_utilization_benchmark(dut):
+    """
+    Description:
+        Long sequential EEPROM writes (back to back page writes) and a long
+        sequential read, measure how much of the time SCL was clocking at
+        the rate of the clock divider
+
+    Test ID: 2
+
+    Expected Results:
+        SCL utilization and bytes per millisecond are reported for both
+        directions
+    """
+    i2c, eeprom, sensor = yield setup_targets(dut, 2, write_cycles = 0)
+    clock_rate = yield i2c.get_clock_rate()
+    monitor = I2CMonitor(dut.clk, dut.i2c_scl, dut.i2c_sda)
+    data = [(i * 13) & 0xFF for i in range(UTILIZATION_LENGTH)]
+
+    monitor.start()
+    start = get_sim_time()
+    for page in range(0, len(data), EEPROM_PAGE_SIZE):
+        yield i2c.write_to_i2c(EEPROM_ADDRESS, [page >> 8, page & 0xFF] + data[page:page + EEPROM_PAGE_SIZE])
+    log_utilization(dut.log, "Write", UTILIZATION_LENGTH, monitor, (get_sim_time() - start) / CLK_PERIOD, clock_rate)
+
+    yield i2c.write_to_i2c(EEPROM_ADDRESS, [0, 0])
+    monitor.start()
+    start = get_sim_time()
+    read_data = yield i2c.read_from_i2c(EEPROM_ADDRESS, len(data))
+    log_utilization(dut.log, "Read", UTILIZATION_LENGTH, monitor, (get_sim_time() - start) / CLK_PERIOD, clock_rate)
+    monitor.stop()
+
+    if list(read_data) != data:
+        raise TestFailure("Data read back doesn't match the data written")
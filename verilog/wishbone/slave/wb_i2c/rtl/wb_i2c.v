@@ -113,13 +113,8 @@ module wb_i2c (
   inout               sda
 );
 
-localparam           ADDR_CONTROL        = 32'h00000000;
-localparam           ADDR_STATUS         = 32'h00000001;
-localparam           ADDR_CLOCK_RATE     = 32'h00000002;
-localparam           ADDR_CLOCK_DIVIDER  = 32'h00000003;
-localparam           ADDR_COMMAND        = 32'h00000004;
-localparam           ADDR_TRANSMIT       = 32'h00000005;
-localparam           ADDR_RECEIVE        = 32'h00000006;
+//Address Map, generated from cocotb/i2c_regs.json
+`include "wb_i2c_regs.vh"
 
 
 //Registers/Wires
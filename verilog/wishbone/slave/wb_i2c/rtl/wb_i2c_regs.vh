@@ -0,0 +1,11 @@
+//Generated by register_map.py from i2c_regs.json, do not edit
+//DESCRIPTION_SHA1: e945b702b35ef1d07062e5a54f77a0fb83ad6a53
+
+//Registers
+localparam          ADDR_CONTROL            = 32'h00000000;
+localparam          ADDR_STATUS             = 32'h00000001;
+localparam          ADDR_CLOCK_RATE         = 32'h00000002;
+localparam          ADDR_CLOCK_DIVIDER      = 32'h00000003;
+localparam          ADDR_COMMAND            = 32'h00000004;
+localparam          ADDR_TRANSMIT           = 32'h00000005;
+localparam          ADDR_RECEIVE            = 32'h00000006;
@@ -0,0 +1,229 @@
+import numpy as np
+
+from vcd_writer import VCDWriter
+
+
+CAPTURE_WIDTH           = 32
+HEX_CHARS_PER_WORD      = 8
+
+#Shift applied to each nibble of a word, the most significant nibble is sent first
+NIBBLE_SHIFTS           = np.arange((HEX_CHARS_PER_WORD - 1) * 4, -1, -4, dtype = np.uint32)
+
+INVALID_NIBBLE          = 0xFF
+
+def _build_hex_table():
+    table = np.full(256, INVALID_NIBBLE, dtype = np.uint8)
+    for i, c in enumerate("0123456789ABCDEF"):
+        table[ord(c)] = i
+        table[ord(c.lower())] = i
+    return table
+
+HEX_TABLE               = _build_hex_table()
+
+def hex_to_words(raw):
+    """
+    Convert ASCII hex (8 characters per word, MSB first) to 32-bit words
+
+    Anything that is not a hex character (carriage returns, line feeds) is
+    dropped
+
+    Args:
+        raw (string, bytes or Array('B')): data read from the UART
+
+    Returns (numpy uint32 array):
+        decoded words
+
+    Raises:
+        ValueError: the number of hex characters is not a multiple of 8
+    """
+    nibbles = HEX_TABLE[np.frombuffer(raw, dtype = np.uint8)]
+    nibbles = nibbles[nibbles != INVALID_NIBBLE]
+    if len(nibbles) % HEX_CHARS_PER_WORD:
+        raise ValueError("Capture length is not a multiple of %d hex characters: %d" %
+                         (HEX_CHARS_PER_WORD, len(nibbles)))
+    nibbles = nibbles.reshape(-1, HEX_CHARS_PER_WORD).astype(np.uint32)
+    #Nibbles never overlap so the sum is the same as or'ing them together
+    return (nibbles << NIBBLE_SHIFTS).sum(axis = 1, dtype = np.uint32)
+
+def decode_capture(raw, width = CAPTURE_WIDTH):
+    """
+    Decode the data packet sent by the logic analyzer UART interface
+
+    The packet is the start position followed by every word in the capture
+    buffer, all in ASCII hex
+
+    Args:
+        raw (string, bytes or Array('B')): data read from the UART
+        width (integer): number of channels in a sample
+
+    Returns (LogicAnalyzerCapture):
+        decoded capture
+    """
+    words = hex_to_words(raw)
+    if len(words) == 0:
+        raise ValueError("Capture does not contain a start position")
+    return LogicAnalyzerCapture(words[1:], int(words[0]), width)
+
+def bit_planes(words, width = CAPTURE_WIDTH, out = None):
+    """
+    Split packed samples into one boolean row per channel
+
+    Args:
+        words (numpy uint32 array): packed samples
+        width (integer): number of channels
+        out (numpy bool array): optional (width x len(words)) destination
+
+    Returns (numpy bool array):
+        width x len(words) array, row N is channel N
+    """
+    shifts = np.arange(width, dtype = np.uint32)[:, np.newaxis]
+    planes = (words[np.newaxis, :] >> shifts) & 1
+    if out is None:
+        return planes.astype(np.bool_)
+    out[...] = planes
+    return out
+
+class LogicAnalyzerCapture(object):
+    """
+    A capture read back from the logic analyzer
+
+    The capture buffer is a ring, 'start_pos' is the address of the first
+    sample in time. The buffer is never rotated in place, 'segments' returns
+    the two views (from 'start_pos' to the end then from the beginning up to
+    'start_pos') and everything else is computed from those.
+    """
+
+    def __init__(self, buf, start_pos = 0, width = CAPTURE_WIDTH):
+        object.__init__(self)
+        self.buf = np.asarray(buf, dtype = np.uint32)
+        self.width = width
+        if len(self.buf) > 0:
+            start_pos = start_pos % len(self.buf)
+        self.start_pos = start_pos
+        self._samples = None
+        self._planes = None
+
+    def __len__(self):
+        return len(self.buf)
+
+    def segments(self):
+        """
+        Returns (tuple of two numpy views):
+            the capture in time order without copying the buffer
+        """
+        return (self.buf[self.start_pos:], self.buf[:self.start_pos])
+
+    @property
+    def samples(self):
+        """
+        Samples in time order (uint32), built once on first use
+        """
+        if self._samples is None:
+            if self.start_pos == 0:
+                self._samples = self.buf
+            else:
+                self._samples = np.concatenate(self.segments())
+        return self._samples
+
+    @property
+    def planes(self):
+        """
+        Channel bit planes (width x samples boolean array), row N is channel N
+        """
+        if self._planes is None:
+            self._planes = np.empty((self.width, len(self.buf)), dtype = np.bool_)
+            tail, head = self.segments()
+            bit_planes(tail, self.width, self._planes[:, :len(tail)])
+            bit_planes(head, self.width, self._planes[:, len(tail):])
+        return self._planes
+
+    def channel(self, index):
+        return self.planes[index]
+
+    def change_mask(self):
+        """
+        Returns (numpy uint32 array):
+            the bits that changed between sample N - 1 and N, N >= 1
+        """
+        s = self.samples
+        return s[1:] ^ s[:-1]
+
+    def edge_counts(self):
+        """
+        Returns (numpy integer array):
+            number of transitions on every channel
+        """
+        return bit_planes(self.change_mask(), self.width).sum(axis = 1)
+
+    def rising_edges(self, index):
+        """
+        Returns (numpy integer array):
+            sample numbers where the channel goes from 0 to 1
+        """
+        p = self.planes[index]
+        return np.flatnonzero(p[1:] & ~p[:-1]) + 1
+
+    def falling_edges(self, index):
+        """
+        Returns (numpy integer array):
+            sample numbers where the channel goes from 1 to 0
+        """
+        p = self.planes[index]
+        return np.flatnonzero(~p[1:] & p[:-1]) + 1
+
+    def find_trigger(self, trigger, trigger_mask, trigger_edge = 0, both_edges = 0):
+        """
+        Find the samples that match the trigger settings, the same way the
+        logic_analyzer core evaluates them
+
+        A channel that is not in 'trigger_mask' always matches, an edge
+        channel matches on the edge selected by 'trigger' (1 = rising,
+        0 = falling) or on either edge when it is set in 'both_edges', a
+        level channel matches when it is equal to 'trigger'
+
+        Returns (numpy integer array):
+            sample numbers that satisfy every channel
+        """
+        full = np.uint32(0xFFFFFFFF)
+        trigger = np.uint32(trigger)
+        mask = np.uint32(trigger_mask)
+        edge = np.uint32(trigger_edge)
+        both = np.uint32(both_edges)
+
+        s = self.samples
+        cur = s[1:]
+        prev = s[:-1]
+        pos = cur & ~prev
+        neg = ~cur & prev
+        edge_hit = (both & (pos | neg)) | (trigger & pos) | (~trigger & neg)
+        level_hit = (trigger & cur) | (~trigger & ~cur)
+        hit = ~mask | (edge & edge_hit) | (~edge & level_hit)
+        return np.flatnonzero(hit == full) + 1
+
+    def write_vcd(self, sink, signal_dict = None, clock_rate = 100000000, add_clock = True, debug = False):
+        """
+        Stream the capture to a file like object as a VCD
+
+        Only the samples that differ from the one before are handed to the
+        writer
+
+        Args:
+            sink (file like object): destination, only 'write' is used
+            signal_dict (OrderedDict): signal name -> bit width
+            clock_rate (integer): sample clock rate in Hz
+            add_clock (boolean): add a 'clk' signal to the output
+
+        Returns:
+            Nothing
+        """
+        vcd = VCDWriter(sink,
+                        signal_dict = signal_dict,
+                        count = self.width,
+                        clock_rate = clock_rate,
+                        add_clock = add_clock,
+                        debug = debug)
+        s = self.samples
+        if len(s) > 0:
+            indices = np.concatenate(([0], np.flatnonzero(s[1:] != s[:-1]) + 1))
+            vcd.write_samples(s[indices].tolist(), indices.tolist())
+        vcd.close(len(s))
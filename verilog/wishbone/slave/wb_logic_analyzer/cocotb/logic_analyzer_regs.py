@@ -0,0 +1,110 @@
+#Generated by register_map.py from logic_analyzer_regs.json, do not edit
+
+"""
+wb_logic_analyzer registers
+
+encode_<register>(**fields) and decode_<register>(value) convert between
+register values and fields (lower case field names), single bit fields
+decode to booleans
+"""
+
+DESCRIPTION_SHA1 = "5c8fa5d6002d0b4a93f2b692c10b67e431ddd3f1"
+
+#Registers
+CONTROL                  = 0x000
+STATUS                   = 0x001
+TRIGGER                  = 0x002
+TRIGGER_MASK             = 0x003
+TRIGGER_AFTER            = 0x004
+TRIGGER_EDGE             = 0x005
+BOTH_EDGES               = 0x006
+REPEAT_COUNT             = 0x007
+DATA_COUNT               = 0x008
+START_POS                = 0x009
+CLOCK_RATE               = 0x00A
+READ_DATA                = 0x00B
+
+#CONTROL
+CONTROL_RESET            = 0
+CONTROL_ENABLE_INTERRUPT = 1
+CONTROL_ENABLE_LA        = 2
+CONTROL_RESTART_LA       = 3
+CONTROL_FORCE_STB        = 4
+CONTROL_ENABLE_UART      = 5
+
+#STATUS
+STATUS_FINISHED          = 0
+
+#Registers only the host changes: address -> self clearing bits
+NON_VOLATILE = {
+    CONTROL: 0x10,
+    TRIGGER: 0x0,
+    TRIGGER_MASK: 0x0,
+    TRIGGER_AFTER: 0x0,
+    TRIGGER_EDGE: 0x0,
+    BOTH_EDGES: 0x0,
+    REPEAT_COUNT: 0x0,
+    CLOCK_RATE: 0x0,
+}
+
+#field -> (mask, shift)
+_CONTROL_FIELDS = {
+    "reset": (0x1, 0),
+    "enable_interrupt": (0x2, 1),
+    "enable_la": (0x4, 2),
+    "restart_la": (0x8, 3),
+    "force_stb": (0x10, 4),
+    "enable_uart": (0x20, 5),
+}
+_STATUS_FIELDS = {
+    "finished": (0x1, 0),
+}
+
+def _masks(table, fields):
+    """
+    Returns (tuple):
+        (bits to set, bits to clear) to write 'fields' into a register
+    """
+    set_mask = 0
+    clear_mask = 0
+    for name, value in fields.items():
+        if name not in table:
+            raise KeyError("Unknown field: %s" % name)
+        mask, shift = table[name]
+        value = int(value) << shift
+        if value & ~mask:
+            raise ValueError("%s: 0x%X does not fit in mask 0x%X" % (name, value >> shift, mask))
+        clear_mask |= mask
+        set_mask |= value
+    return set_mask, clear_mask
+
+def _encode(table, fields):
+    return _masks(table, fields)[0]
+
+def declare_shadow(shadow):
+    """
+    Declare the registers only the host changes in a RegisterShadow
+    """
+    for address, self_clearing in NON_VOLATILE.items():
+        shadow.declare(address, self_clearing)
+
+def encode_control(**fields):
+    return _encode(_CONTROL_FIELDS, fields)
+
+def decode_control(value):
+    return {
+        "reset": (value & 0x1) != 0,
+        "enable_interrupt": (value & 0x2) != 0,
+        "enable_la": (value & 0x4) != 0,
+        "restart_la": (value & 0x8) != 0,
+        "force_stb": (value & 0x10) != 0,
+        "enable_uart": (value & 0x20) != 0,
+    }
+
+def encode_status(**fields):
+    return _encode(_STATUS_FIELDS, fields)
+
+def decode_status(value):
+    return {
+        "finished": (value & 0x1) != 0,
+    }
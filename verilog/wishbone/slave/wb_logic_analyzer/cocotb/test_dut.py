@@ -12,6 +12,7 @@ from cocotb_uart_if import UARTCommReader
 from cocotb_uart_if import UART
 from uart_logic_analyzer import UARTLogicAnalyzer
 from cocotb.clock import Clock
+from cocotb.triggers import RisingEdge
 import time
 from uart_logic_analyzer import UARTLogicAnalyzer
 from array import array as Array
@@ -29,6 +30,22 @@ MODULE_PATH = os.path.abspath(MODULE_PATH)
 def setup_dut(dut):
     cocotb.fork(Clock(dut.clk, CLK_PERIOD).start())
 
+class ClockCounter(object):
+    """
+    Count rising edges of a clock so tests can report elapsed cycles
+    """
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.count = 0
+        cocotb.fork(self._count())
+
+    @cocotb.coroutine
+    def _count(self):
+        while True:
+            yield RisingEdge(self.clock)
+            self.count += 1
+
 @cocotb.test(skip = True)
 def simple_capture(dut):
     """
@@ -273,13 +290,60 @@ def test_uart_simple(dut):
     yield ula.set_repeat_count(0x00000000)
     yield (nysa.wait_clocks)(100)
     yield ula.enable(True)
-    data = yield ula.read_data()
-    dut.log.info("Data: %s" % str(data))
-
+    capture = yield ula.read_data()
+    for i in range(len(capture)):
+        dut.log.info("\t[%04X] 0x%08X" % (i, capture.samples[i]))
+    dut.log.info("Trigger Positions: %s" % str(capture.find_trigger(0x00000001, 0x00000001, 0x00000001)))
+    dut.log.info("Edge Counts: %s" % str(capture.edge_counts()))
 
 
+@cocotb.test(skip = False)
+def test_uart_configure_benchmark(dut):
+    """
+    Description:
+        Compare the sequential setters with a batched configure
 
+    Test ID: 4
 
+    Expected Results:
+        Both methods are acknowledged, report the clock cycles saved by
+        sending the commands back to back
+    """
+    dut.test_id = 4
+    nysa = NysaSim(dut, SIM_CONFIG, CLK_PERIOD, user_paths = [MODULE_PATH])
+    setup_dut(dut)
+    uart = UART(dut, "uart", dut.clk)
+    ula = UARTLogicAnalyzer(uart, sim = True, log = logging.getLogger("cocotb"), debug = True)
+    counter = ClockCounter(dut.clk)
 
+    yield(nysa.reset())
+    nysa.read_sdb()
+    yield (nysa.wait_clocks(10))
+    driver = yield cocotb.external(LogicAnalyzer)(nysa, nysa.find_device(LogicAnalyzer)[0])
+    yield cocotb.external(driver.enable_uart_control)(True)
+    yield (nysa.wait_clocks)(100)
 
+    start = counter.count
+    yield ula.set_trigger(0x00000001)
+    yield ula.set_trigger_mask(0x00000001)
+    yield ula.set_trigger_after(0x00000000)
+    yield ula.set_trigger_edge(0x00000001)
+    yield ula.set_both_edge(0x00000000)
+    yield ula.set_repeat_count(0x00000000)
+    sequential_cycles = counter.count - start
+    yield (nysa.wait_clocks)(100)
 
+    start = counter.count
+    success = yield ula.configure(trigger        = 0x00000001,
+                                  trigger_mask   = 0x00000001,
+                                  trigger_after  = 0x00000000,
+                                  trigger_edge   = 0x00000001,
+                                  both_edges     = 0x00000000,
+                                  repeat_count   = 0x00000000)
+    batched_cycles = counter.count - start
+
+    dut.log.info("Sequential Setters: %d cycles" % sequential_cycles)
+    dut.log.info("Batched Configure:  %d cycles" % batched_cycles)
+    dut.log.info("Saved:              %d cycles" % (sequential_cycles - batched_cycles))
+    if not success:
+        raise TestFailure("Batched configure was not acknowledged")
@@ -8,24 +8,28 @@ from cocotb.triggers import ReadOnly
 import cocotb
 from cocotb.result import ReturnValue
 from nysa.host.driver.utils import *
+from capture_decoder import decode_capture
 
 
 DEVICE_TYPE                     = "Logic Analyzer"
 
 
-#Addresses
-CONTROL         = 0x00
-STATUS          = 0x01
-TRIGGER         = 0x02
-TRIGGER_MASK    = 0x03
-TRIGGER_AFTER   = 0x04
-TRIGGER_EDGE    = 0x05
-BOTH_EDGES      = 0x06
-REPEAT_COUNT    = 0x07
-DATA_COUNT      = 0x08
-START_POS       = 0x09
-CLOCK_RATE      = 0x0A
-READ_DATA       = 0x0B
+#Addresses, generated from logic_analyzer_regs.json by
+#verilog/sim/register_map.py
+from logic_analyzer_regs import *
+
+#UART command character of each configuration register
+SETTING_COMMANDS = OrderedDict([
+    ("trigger",         "4"),
+    ("trigger_mask",    "5"),
+    ("trigger_after",   "6"),
+    ("trigger_edge",    "7"),
+    ("both_edges",      "8"),
+    ("repeat_count",    "9")
+])
+
+#'R', Status, '\r', '\n'
+RESPONSE_LENGTH = 4
 
 class UARTLogicAnalyzer(object):
     """ wb_logic_analyser
@@ -44,6 +48,7 @@ class UARTLogicAnalyzer(object):
         self.path = uart_path
         self.path = "sim"
         self.start_pos = 0
+        self.pending = []
         if sim:
             self.uart = uart_path
 
@@ -213,6 +218,88 @@ class UARTLogicAnalyzer(object):
         else:
             self.log.info("Fail")
 
+    def queue_setting(self, name, value):
+        """
+        Queue a configuration register write, nothing is sent until 'commit'
+
+        Args:
+            name (string): one of the keys in SETTING_COMMANDS
+            value (integer): 32-bit register value
+        """
+        if name not in SETTING_COMMANDS:
+            raise ValueError("Unknown setting: %s, valid settings: %s" %
+                             (name, ", ".join(SETTING_COMMANDS.keys())))
+        self.pending.append("W%s%08X\n" % (SETTING_COMMANDS[name], value))
+
+    def queue_enable(self, enable):
+        """
+        Queue an enable/disable command, nothing is sent until 'commit'
+        """
+        self.pending.append("W1%d\n" % enable)
+
+    @cocotb.coroutine
+    def commit(self):
+        """
+        Send all the queued commands back to back and then parse the
+        acknowledgements
+
+        The reader is started before the first byte goes out so responses
+        that arrive while the rest of the commands are still being sent are
+        not lost
+
+        Returns (list of booleans):
+            True for every command that was acknowledged with 'S'
+        """
+        commands = self.pending
+        self.pending = []
+        if len(commands) == 0:
+            raise ReturnValue([])
+
+        reader = cocotb.fork(self.uart.read(RESPONSE_LENGTH * len(commands)))
+        yield self.uart.write(Array('B', "".join(commands)))
+        yield reader.join()
+        yield ReadOnly()
+        self.data = self.uart.get_data()
+        responses = self.data.tostring()
+
+        results = []
+        for i in range(len(commands)):
+            response = responses[i * RESPONSE_LENGTH: (i + 1) * RESPONSE_LENGTH]
+            success = (len(response) > 1) and (response[1] == "S")
+            if not success:
+                self.log.info("Fail: %s" % commands[i].strip())
+            results.append(success)
+        raise ReturnValue(results)
+
+    @cocotb.coroutine
+    def configure(self, **settings):
+        """
+        Write several configuration registers in one batch
+
+        Args:
+            trigger, trigger_mask, trigger_after, trigger_edge, both_edges,
+            repeat_count (integer): register values, only the ones given are
+                written
+            enable (boolean): enable or disable the logic analyzer after the
+                registers are written
+
+        Returns (boolean):
+            True if every command was acknowledged
+        """
+        enable = settings.pop("enable", None)
+        for name in SETTING_COMMANDS:
+            if name in settings:
+                self.queue_setting(name, settings.pop(name))
+        if len(settings) > 0:
+            self.pending = []
+            raise ValueError("Unknown settings: %s" % ", ".join(settings.keys()))
+        if enable is not None:
+            self.queue_enable(enable)
+
+        results = yield self.commit()
+        self.log.info("Configured %d registers" % len(results))
+        raise ReturnValue(all(results))
+
     @cocotb.coroutine
     def get_data_count(self):
         wr_data = "W3\n"
@@ -261,37 +348,19 @@ class UARTLogicAnalyzer(object):
         return self.read(READ_DATA, self.data_count, disable_auto_inc = True)
 
     @cocotb.coroutine
-    def read_data(self):
-        #start_pos = self.read_register(START_POS)
-        #raw_data = self.read(READ_DATA, self.data_count, disable_auto_inc = True)
-        yield self.uart.read(8 + 8 * 8)
-        data = Array('B', self.uart.get_data().tostring().decode("hex"))
-        #data = Array('B')
-        #print "Data: %s" % str(data)
-        '''
-        for i in range(0, len(d), 2):
-            v = (int(d[i], 0) << 4) | int(d[i + 1], 0)
-            data.append(v)
-
-        #Need to reorder the data so it makes sense for the user
-        temp = Array('L')
-        for i in range (0, len(raw_data), 4):
-            temp.append(array_to_dword(data[i: i + 4]))
-
-        #for i in range (0, len(temp), 1):
-        #    print "\t[%04X] 0x%08X" % (i, temp[i])
-
-        print "Start Pos: 0x%04X" % start_pos
-
-        #Change data to 32-bit array
-        data = Array('L')
-        if start_pos  == 0:
-            data = temp
-
-        data.extend(temp[start_pos:])
-        data.extend(temp[0:start_pos])
-        '''
-        raise ReturnValue(data)
+    def read_data(self, capture_size = 8):
+        """
+        Read the capture the core sends when it finishes
+
+        The packet is the start position followed by 'capture_size' words,
+        all in ASCII hex, it is decoded into a LogicAnalyzerCapture with the
+        samples in time order
+        """
+        yield self.uart.read(8 + 8 * capture_size)
+        capture = decode_capture(self.uart.get_data())
+        self.start_pos = capture.start_pos
+        self.log.info("Start Pos: 0x%04X" % self.start_pos)
+        raise ReturnValue(capture)
 
     def get_clock_rate(self):
         return self.read_register(CLOCK_RATE)
@@ -0,0 +1,116 @@
+#! /usr/bin/env python
+
+import sys
+import os
+import time
+import random
+import argparse
+import tempfile
+from array import array as Array
+
+from uart_logic_analyzer import create_vcd_buffer
+from vcd_writer import write_vcd
+
+NAME = os.path.basename(os.path.realpath(__file__))
+
+DESCRIPTION = "\n" \
+              "\n" \
+              "Compare the string based VCD generator with the streaming writer\n" \
+              "\n" \
+              "usage: %s [options]\n" % NAME
+
+EPILOG = "\n" \
+         "\n" \
+         "Examples:\n" \
+         "\tBenchmark a 1M sample capture:\n" \
+         "\t\t%s\n" \
+         "\n" \
+         "\tBenchmark only the streaming writer with 200 channels:\n" \
+         "\t\t%s -c 200 --skip-legacy\n" \
+         "\n" % (NAME, NAME)
+
+def generate_capture(samples, toggle_rate, seed):
+    """
+    Create a capture where the low bits behave like a counter and the rest
+    of the channels toggle at random with a probability of 'toggle_rate'
+    """
+    r = random.Random(seed)
+    data = Array('L')
+    value = 0
+    for i in range(samples):
+        value = (value & ~0xF) | (i & 0xF)
+        if r.random() < toggle_rate:
+            value ^= 1 << r.randint(4, 31)
+        data.append(value)
+    return data
+
+def benchmark_legacy(data, count, clock_rate):
+    start = time.time()
+    buf = create_vcd_buffer(data, count = count, clock_count = clock_rate, add_clock = True)
+    f = tempfile.TemporaryFile()
+    f.write(buf)
+    f.close()
+    return time.time() - start, len(buf)
+
+def benchmark_stream(data, count, clock_rate):
+    start = time.time()
+    f = tempfile.TemporaryFile()
+    write_vcd(f, data, count = count, clock_count = clock_rate, add_clock = True)
+    size = f.tell()
+    f.close()
+    return time.time() - start, size
+
+def main(argv):
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        description=DESCRIPTION,
+        epilog=EPILOG
+    )
+
+    parser.add_argument("-s", "--samples",
+                        type=int,
+                        default=1000000,
+                        help="Number of samples in the capture (Default: 1000000)")
+
+    parser.add_argument("-c", "--count",
+                        type=int,
+                        default=32,
+                        help="Number of channels (Default: 32)")
+
+    parser.add_argument("-t", "--toggle",
+                        type=float,
+                        default=0.1,
+                        help="Probability of an upper channel toggling per sample (Default: 0.1)")
+
+    parser.add_argument("--skip-legacy",
+                        action="store_true",
+                        help="Only run the streaming writer")
+
+    args = parser.parse_args()
+    clock_rate = 100000000
+
+    print "Generating %d samples..." % args.samples
+    data = generate_capture(args.samples, args.toggle, 0)
+
+    print "Streaming writer:"
+    stream_time, stream_size = benchmark_stream(data, args.count, clock_rate)
+    print "\tTime: %0.3f s (%0.1f ksamples/s)" % (stream_time, args.samples / stream_time / 1000.0)
+    print "\tSize: %d bytes" % stream_size
+
+    if args.skip_legacy:
+        return
+
+    if args.count > 93:
+        print "Legacy generator only supports 93 channels with a clock, skipping"
+        return
+
+    print "Legacy create_vcd_buffer:"
+    legacy_time, legacy_size = benchmark_legacy(data, args.count, clock_rate)
+    print "\tTime: %0.3f s (%0.1f ksamples/s)" % (legacy_time, args.samples / legacy_time / 1000.0)
+    print "\tSize: %d bytes" % legacy_size
+
+    print "Speedup: %0.2fx" % (legacy_time / stream_time)
+
+
+if __name__ == "__main__":
+    main(sys.argv)
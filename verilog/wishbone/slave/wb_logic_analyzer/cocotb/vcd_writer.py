@@ -0,0 +1,309 @@
+import time
+from collections import OrderedDict
+
+
+#Printable characters allowed in a VCD identifier code
+ID_FIRST        = 33
+ID_LAST         = 126
+ID_RANGE        = ID_LAST - ID_FIRST + 1
+
+GHERTZ_FREQ     = 1000000000
+DEFAULT_CLOCK   = 100000000
+
+#Number of output lines to collect before handing them to the sink
+FLUSH_LINES     = 8192
+
+def vcd_identifier(index):
+    """
+    Generate the VCD identifier code for a signal index
+
+    The first 94 signals get a single character, after that the identifiers
+    grow by one character every time the previous length is exhausted
+    ('!', '"', ... '~', '!!', '"!', ...)
+
+    Args:
+        index (integer): signal index
+
+    Returns (string):
+        identifier code
+    """
+    ident = ""
+    while True:
+        ident += chr(ID_FIRST + (index % ID_RANGE))
+        index = index // ID_RANGE
+        if index == 0:
+            break
+        index -= 1
+    return ident
+
+class VCDWriter(object):
+    """
+    Streaming VCD writer for logic analyzer captures
+
+    Samples are packed integers, each signal occupies 'width' bits starting at
+    bit 0 for the first signal in the signal dictionary. Only the bits that
+    changed between samples are visited so a quiet capture costs very little
+    regardless of the number of channels.
+
+    Nothing is accumulated beyond FLUSH_LINES lines, the output is handed to
+    the sink (anything with a 'write' method) as it is generated.
+
+    Usage:
+        f = open("capture.vcd", "w")
+        vcd = VCDWriter(f, count = 32, clock_rate = clock_rate)
+        vcd.write_samples(data)
+        vcd.close()
+    """
+
+    def __init__(self,
+                 sink,
+                 signal_dict = None,
+                 count = 32,
+                 clock_rate = DEFAULT_CLOCK,
+                 add_clock = True,
+                 module = "logic_analyzer",
+                 debug = False):
+        object.__init__(self)
+        self.sink = sink
+        self.add_clock = add_clock
+        self.module = module
+        self.debug = debug
+
+        if signal_dict is None:
+            signal_dict = OrderedDict()
+        if len(signal_dict) == 0:
+            for i in range(count):
+                signal_dict["signal%d" % i] = 1
+        self.signal_dict = signal_dict
+
+        if clock_rate == 0:
+            clock_rate = DEFAULT_CLOCK
+        self.cycles_per_clock = int(GHERTZ_FREQ / clock_rate)
+        self.half_clock = self.cycles_per_clock // 2
+
+        self.clock_id = None
+        index = 0
+        if add_clock:
+            self.clock_id = vcd_identifier(index)
+            index += 1
+
+        #Lay the signals out from bit 0 upwards
+        self.signals = []
+        self.bit_owner = []
+        lsb = 0
+        for name in signal_dict:
+            width = signal_dict[name]
+            mask = ((1 << width) - 1) << lsb
+            self.signals.append((name, width, lsb, mask, vcd_identifier(index)))
+            self.bit_owner.extend([len(self.signals) - 1] * width)
+            index += 1
+            lsb += width
+
+        self.sample_mask = (1 << lsb) - 1
+
+        #Pre-render the scalar value changes so the sample loop only indexes
+        self.scalar_lines = []
+        for name, width, lsb, mask, ident in self.signals:
+            if width == 1:
+                lines = ("0%s\n" % ident, "1%s\n" % ident)
+            else:
+                lines = None
+            self.scalar_lines.extend([lines] * width)
+
+        self.lines = []
+        self.sample_index = 0
+        self.prev = None
+        self.header_written = False
+        self.closed = False
+
+    def _flush(self):
+        if len(self.lines) > 0:
+            self.sink.write("".join(self.lines))
+            del self.lines[:]
+
+    def _value_line(self, signal, value):
+        name, width, lsb, mask, ident = signal
+        value = (value & mask) >> lsb
+        if width == 1:
+            return "%d%s\n" % (value, ident)
+        return "b%s %s\n" % (bin(value)[2:], ident)
+
+    def write_header(self):
+        """
+        Write the date, version, timescale and signal definitions
+
+        Called automatically by the first call to write_samples
+        """
+        w = self.lines.append
+        w("$date\n")
+        w(time.strftime("%b %d, %Y %H:%M:%S") + "\n")
+        w("$end\n\n")
+        w("$version\n")
+        w("\tNysa Logic Analyzer V0.1\n")
+        w("$end\n\n")
+        w("$timescale\n")
+        w("\t1 ns\n")
+        w("$end\n\n")
+
+        w("$scope module %s $end\n" % self.module)
+        if self.add_clock:
+            w("$var wire 1 %s clk $end\n" % self.clock_id)
+        for name, width, lsb, mask, ident in self.signals:
+            w("$var wire %d %s %s $end\n" % (width, ident, name))
+        w("$upscope $end\n")
+        w("$enddefinitions $end\n")
+        self.header_written = True
+        self._flush()
+
+    def _write_clock_gap(self, first, last):
+        #Clock edges for samples that were skipped because nothing changed
+        w = self.lines.append
+        clk_rise = "1%s\n" % self.clock_id
+        clk_fall = "0%s\n" % self.clock_id
+        for index in range(first, last):
+            t = index * self.cycles_per_clock
+            w("#%d\n" % t)
+            w(clk_rise)
+            w("#%d\n" % (t + self.half_clock))
+            w(clk_fall)
+            if len(self.lines) >= FLUSH_LINES:
+                self._flush()
+
+    def write_samples(self, data, indices = None):
+        """
+        Append samples to the VCD
+
+        Can be called repeatedly with consecutive chunks of a capture
+
+        Args:
+            data (iterable of integers): packed samples
+            indices (iterable of integers): optional sample number of each
+                value in data, used to hand over only the samples that
+                changed, must be increasing
+
+        Returns:
+            Nothing
+        """
+        if not self.header_written:
+            self.write_header()
+
+        lines = self.lines
+        w = lines.append
+        cpc = self.cycles_per_clock
+        half = self.half_clock
+        sample_mask = self.sample_mask
+        scalar_lines = self.scalar_lines
+        bit_owner = self.bit_owner
+        signals = self.signals
+        add_clock = self.add_clock
+        clk_rise = None
+        clk_fall = None
+        if add_clock:
+            clk_rise = "1%s\n" % self.clock_id
+            clk_fall = "0%s\n" % self.clock_id
+
+        if indices is None:
+            samples = enumerate(data, self.sample_index)
+        else:
+            samples = zip(indices, data)
+
+        last = self.sample_index - 1
+        prev = self.prev
+        for index, value in samples:
+            index = int(index)
+            value = int(value) & sample_mask
+            t = index * cpc
+            if prev is None:
+                #Initial values
+                w("#%d\n" % t)
+                w("$dumpvars\n")
+                if add_clock:
+                    w(clk_rise)
+                for signal in signals:
+                    w(self._value_line(signal, value))
+                w("$end\n")
+                if add_clock:
+                    w("#%d\n" % (t + half))
+                    w(clk_fall)
+
+            else:
+                if add_clock and (index > last + 1):
+                    self._write_clock_gap(last + 1, index)
+
+                change = value ^ prev
+                if add_clock:
+                    w("#%d\n" % t)
+                    w(clk_rise)
+                elif change:
+                    w("#%d\n" % t)
+
+                while change:
+                    low = change & -change
+                    bit = low.bit_length() - 1
+                    line = scalar_lines[bit]
+                    if line is not None:
+                        w(line[(value >> bit) & 1])
+                        change ^= low
+                    else:
+                        signal = signals[bit_owner[bit]]
+                        w(self._value_line(signal, value))
+                        change &= ~signal[3]
+
+                if add_clock:
+                    w("#%d\n" % (t + half))
+                    w(clk_fall)
+
+            prev = value
+            last = index
+            if len(lines) >= FLUSH_LINES:
+                self._flush()
+
+        self.sample_index = last + 1
+        self.prev = prev
+        self._flush()
+        if self.debug: print "VCD Samples Written: %d" % self.sample_index
+
+    def close(self, sample_count = None):
+        """
+        Write the final timestamp, the sink is not closed
+
+        Args:
+            sample_count (integer): total number of samples in the capture,
+                only needed when the trailing samples were not handed to
+                write_samples because they did not change
+        """
+        if self.closed:
+            return
+        if not self.header_written:
+            self.write_header()
+        if sample_count is not None and sample_count > self.sample_index:
+            if self.add_clock and self.prev is not None:
+                self._write_clock_gap(self.sample_index, sample_count)
+            self.sample_index = sample_count
+        self.lines.append("#%d\n" % (self.sample_index * self.cycles_per_clock))
+        self._flush()
+        self.closed = True
+
+def write_vcd(sink, data, signal_dict = None, count = 32, clock_count = DEFAULT_CLOCK, add_clock = True, debug = False):
+    """
+    Stream a complete capture to a file like object
+
+    Args:
+        sink (file like object): destination, only 'write' is used
+        data (iterable of integers): packed samples
+        signal_dict (OrderedDict): signal name -> bit width
+        count (integer): number of 1-bit signals to generate if signal_dict is empty
+        clock_count (integer): sample clock rate in Hz
+        add_clock (boolean): add a 'clk' signal to the output
+
+    Returns:
+        Nothing
+    """
+    vcd = VCDWriter(sink,
+                    signal_dict = signal_dict,
+                    count = count,
+                    clock_rate = clock_count,
+                    add_clock = add_clock,
+                    debug = debug)
+    vcd.write_samples(data)
+    vcd.close()
@@ -96,6 +96,12 @@ reg                         r_wr_fin;
 reg   [7:0]                 r_cmd_rsps;
 reg   [7:0]                 r_rsp_sts;
 
+//Response latched by the write state machine so the next command can be
+//parsed while the response is being sent
+reg   [7:0]                 r_wr_command;
+reg   [7:0]                 r_wr_cmd_rsps;
+reg   [7:0]                 r_wr_rsp_sts;
+
 
 wire  [3:0]                 nibble;
 wire  [7:0]                 hex_value;
@@ -285,6 +291,7 @@ always @ (posedge clk) begin
         end
       end
       SEND_RESPONSE: begin
+        //Wait for the write state machine to latch the response
         r_wr_en                       <= 1;
         if (r_wr_fin) begin
           r_wr_en                     <= 0;
@@ -327,6 +334,9 @@ always @ (posedge clk) begin
     o_la_rd_addr                  <= 0;
     r_wr_pos                      <= 0;
     r_lcl_rst                     <= 0;
+    r_wr_command                  <= 0;
+    r_wr_cmd_rsps                 <= 0;
+    r_wr_rsp_sts                  <= 0;
   end
   else begin
     case (wr_state)
@@ -335,6 +345,10 @@ always @ (posedge clk) begin
         r_wr_pos                  <= 0;
         o_la_rd_addr              <= 0;
         if (r_wr_en) begin
+          r_wr_command            <= r_command;
+          r_wr_cmd_rsps           <= r_cmd_rsps;
+          r_wr_rsp_sts            <= r_rsp_sts;
+          r_wr_fin                <= 1;
           wr_state                <= RESPONSE_WRITE_ID;
         end
 
@@ -353,16 +367,16 @@ always @ (posedge clk) begin
       end
       RESPONSE_WRITE_STATUS: begin
         if (!w_uart_wr_busy && !r_uart_wr_stb) begin
-          r_uart_wr_data          <= r_cmd_rsps;
+          r_uart_wr_data          <= r_wr_cmd_rsps;
           r_uart_wr_stb           <= 1;
-          if (r_command       == `LA_GET_ENABLE) begin
+          if (r_wr_command  == `LA_GET_ENABLE) begin
             wr_state              <= RESPONSE_WRITE_ARG;
           end
-          else if (r_command  == `LA_GET_SIZE) begin
+          else if (r_wr_command  == `LA_GET_SIZE) begin
             wr_state              <= RESPONSE_WRITE_VALUE;
             r_value               <= i_la_rd_size;
           end
-          else if (r_command  == `LA_GET_START_POS) begin
+          else if (r_wr_command  == `LA_GET_START_POS) begin
             wr_state              <= RESPONSE_WRITE_VALUE;
             r_value               <= i_start_pos;
           end
@@ -373,7 +387,7 @@ always @ (posedge clk) begin
       end
       RESPONSE_WRITE_ARG: begin
         if (!w_uart_wr_busy && !r_uart_wr_stb) begin
-          r_uart_wr_data          <= r_rsp_sts;
+          r_uart_wr_data          <= r_wr_rsp_sts;
           r_uart_wr_stb           <= 1;
           wr_state                <= SEND_CARRIAGE_RETURN;
         end
@@ -435,15 +449,10 @@ always @ (posedge clk) begin
           r_uart_wr_stb           <= 1;
           r_uart_wr_data          <= `LINE_FEED;
           wr_state                <= FINISHED;
-          r_wr_fin                <= 1;
         end
       end
       FINISHED: begin
-        r_wr_fin                  <= 1;
-        if (!r_wr_en) begin
-          r_wr_fin                <= 0;
-          wr_state                <= IDLE;
-        end
+        wr_state                  <= IDLE;
       end
       default begin
         wr_state                  <= IDLE;
@@ -0,0 +1,16 @@
+//Generated by register_map.py from logic_analyzer_regs.json, do not edit
+//DESCRIPTION_SHA1: 5c8fa5d6002d0b4a93f2b692c10b67e431ddd3f1
+
+//Registers
+localparam          CONTROL                  = 32'h00000000;
+localparam          STATUS                   = 32'h00000001;
+localparam          TRIGGER                  = 32'h00000002;
+localparam          TRIGGER_MASK             = 32'h00000003;
+localparam          TRIGGER_AFTER            = 32'h00000004;
+localparam          TRIGGER_EDGE             = 32'h00000005;
+localparam          BOTH_EDGES               = 32'h00000006;
+localparam          REPEAT_COUNT             = 32'h00000007;
+localparam          DATA_COUNT               = 32'h00000008;
+localparam          START_POS                = 32'h00000009;
+localparam          CLOCK_RATE               = 32'h0000000A;
+localparam          READ_DATA                = 32'h0000000B;
@@ -12,8 +12,14 @@ from array import array as Array
 
 sys.path.append(os.path.join(os.path.dirname(__file__),
                              os.pardir))
+sys.path.append(os.path.join(os.path.dirname(__file__),
+                             os.pardir, os.pardir, os.pardir, os.pardir, "sim"))
 
 from nysa.host.driver import driver
+from register_shadow import RegisterShadow
+from register_shadow import modify_value
+from register_shadow import field_mask
+from sd_host_regs import *
 
 #Sub Module ID
 #Use 'nysa devices' to get a list of different available devices
@@ -22,125 +28,10 @@ SDB_ABI_VERSION_MINOR           = 1
 SDB_VENDOR_ID                   = 0x800000000000C594
 
 #Register Constants
+#The registers, their fields and the response formats are generated from
+#sd_host_regs.json by verilog/sim/register_map.py
 ZERO_BIT                        = 0
 
-
-
-CONTROL                         = 0x000
-STATUS                          = 0x001
-REG_MEM_0_BASE                  = 0x002
-REG_MEM_0_SIZE                  = 0x003
-REG_MEM_1_BASE                  = 0x004
-REG_MEM_1_SIZE                  = 0x005
-SD_ARGUMENT                     = 0x006
-SD_COMMAND                      = 0x007
-SD_CONFIGURE                    = 0x008
-SD_RESPONSE0                    = 0x009
-SD_RESPONSE1                    = 0x00A
-SD_RESPONSE2                    = 0x00B
-SD_RESPONSE3                    = 0x00C
-SD_DATA_BYTE_COUNT              = 0x00D
-SD_F0_BLOCK_SIZE                = 0x010
-SD_F1_BLOCK_SIZE                = 0x011
-SD_F2_BLOCK_SIZE                = 0x012
-SD_F3_BLOCK_SIZE                = 0x013
-SD_F4_BLOCK_SIZE                = 0x014
-SD_F5_BLOCK_SIZE                = 0x015
-SD_F6_BLOCK_SIZE                = 0x016
-SD_F7_BLOCK_SIZE                = 0x017
-SD_MEM_BLOCK_SIZE               = 0x018
-
-SD_BLOCK_SIZE_OFFSET            = 0x010
-
-CONTROL_ENABLE_SD               = 0
-CONTROL_ENABLE_INTERRUPT        = 1
-CONTROL_ENABLE_DMA_WR           = 2
-CONTROL_ENABLE_DMA_RD           = 3
-CONTROL_ENABLE_SD_FIN_INT       = 4
-CONTROL_DATA_WRITE_FLAG         = 5
-CONTROL_DATA_BIT_ACTIVATE       = 6
-CONTROL_DATA_BLOCK_MODE         = 7
-CONTROL_FUNCTION_ADDRESS_LOW    = 8
-CONTROL_FUNCTION_ADDRESS_HIGH   = 10
-
-COMMAND_BIT_GO                  = 16
-COMMAND_BIT_RSP_LONG_FLG        = 17
-
-CONFIGURE_EN_CRC                = 4
-CONFIGURE_READ_WAIT_SPRT_ADDR   = 8
-CONFIGURE_READ_WAIT_SPRT_BIT    = 2
-
-CMD_PHY_MODE                    = 0
-CMD_SEND_RELATIVE_ADDR          = 3
-CMD_OP_COND                     = 5
-CMD_SEL_DESEL_CARD              = 7
-CMD_GO_INACTIVE                 = 15
-CMD_SINGLE_DATA_RW              = 52
-CMD_DATA_RW                     = 53
-
-DATA_RW_WRITE                   = 1
-DATA_RW_READ                    = 0
-DATA_WRITE_FLAG                 = 31
-DATA_FUNC_INDEX                 = 28
-DATA_FUNC_BITMASK               = 7
-DATA_ADDR                       = 9
-DATA_ADDR_BITMASK               = 0x1FFFF
-DATA_MASK                       = 0xFF
-
-DATA_RW_BLOCK_MODE              = 27
-DATA_RW_OP_CODE                 = 26
-DATA_RW_COUNT_BITMODE           = 0x1FF
-
-
-OP_COND_BIT_EN_1P8V             = 24
-OP_COND_BIT_OCR_LOW             = 0
-
-STATUS_MEMORY_0_FINISHED        = 0
-STATUS_MEMORY_1_FINISHED        = 1
-STATUS_MEMORY_0_EMPTY           = 2
-STATUS_MEMORY_1_EMPTY           = 3
-STATUS_ENABLE                   = 4
-STATUS_SD_BUSY                  = 5
-STATUS_SD_DATA_BUSY             = 6
-STATUS_ERROR_BIT_TOP            = 31
-STATUS_ERROR_BIT_BOT            = 24
-
-
-R1_OUT_OF_RANGE                 = 39
-R1_COM_CRC_ERROR                = 38
-R1_ILLEGAL_COMMAND              = 37
-R1_ERROR                        = 19
-R1_CURRENT_STATE                = 9
-R1_CURRENT_STATE_BITMASK        = 0xF
-
-R4_READY                        = 31
-R4_NUM_FUNCS                    = 28
-R4_NUM_FUNCS_BITMASK            = 0x7
-R4_MEM_PRESENT                  = 27
-R4_UHSII_AVAILABLE              = 26
-R4_S18A                         = 24
-R4_IO_OCR                       = 0
-R4_IO_OCR_BITMASK               = 0xFFF
-
-R5_COM_CRC_ERROR                = 15
-R5_ILLEGAL_COMMAND              = 14
-R5_CURRENT_STATE                = 12
-R5_CURRENT_STATE_BITMASK        = 3
-R5_ERROR                        = 3
-R5_ERROR_FUNC                   = 1
-R5_ERROR_OUT_OF_RANGE           = 0
-
-R6_REL_ADDR_BITMASK             = 0xFF
-R6_REL_ADDR                     = 16
-R6_STS_CRC_COMM_ERR             = 15
-R6_STS_ILLEGAL_CMD              = 13
-R6_STS_ERROR                    = 12
-
-
-IO_FUNC_ENABLE_ADDR             = 0x02
-INT_ENABLE_ADDR                 = 0x04
-INT_PENDING_ADDR                = 0x05
-
 RESPONSE_DICT = {CMD_PHY_MODE           : 1,
                  CMD_SEND_RELATIVE_ADDR : 6,
                  CMD_OP_COND            : 4,
@@ -152,7 +43,7 @@ RESPONSE_DICT = {CMD_PHY_MODE           : 1,
 class SDHostException(Exception):
     pass
 
-class wb_sd_hostDriver(driver.Driver):
+class wb_sd_hostDriver(driver.Driver, SDHostRegisters):
 
     """ wb_sd_host
 
@@ -177,6 +68,9 @@ class wb_sd_hostDriver(driver.Driver):
 
     def __init__(self, nysa, urn, debug = False):
         super(wb_sd_hostDriver, self).__init__(nysa, urn, debug)
+        #Registers only the host changes are served from the shadow cache
+        self.shadow = RegisterShadow()
+        declare_shadow(self.shadow)
         self.async_read_callback= None
         self.interrupt_callback = None
         self.async_read_mode = False
@@ -268,6 +162,58 @@ class wb_sd_hostDriver(driver.Driver):
         self.inactive = False
         self.register_interrupt_callback(self._callback)
 
+#Register Shadow
+    def read_register(self, address):
+        value = self.shadow.lookup(address)
+        if value is None:
+            value = super(wb_sd_hostDriver, self).read_register(address)
+            self.shadow.update(address, value)
+        return value
+
+    def write_register(self, address, value):
+        super(wb_sd_hostDriver, self).write_register(address, value)
+        self.shadow.update(address, value)
+
+    def modify(self, address, set_mask = 0, clear_mask = 0):
+        """
+        Read-modify-write a register, a single write when the register is in
+        the shadow cache
+
+        Returns (integer):
+            value written
+        """
+        value = modify_value(self.read_register(address), set_mask, clear_mask)
+        self.write_register(address, value)
+        return value
+
+    def set_register_bit(self, address, bit):
+        self.modify(address, set_mask = 1 << bit)
+
+    def clear_register_bit(self, address, bit):
+        self.modify(address, clear_mask = 1 << bit)
+
+    def enable_register_bit(self, address, bit, enable):
+        if enable:
+            self.set_register_bit(address, bit)
+        else:
+            self.clear_register_bit(address, bit)
+
+    def write_register_bit(self, address, bit, value):
+        self.enable_register_bit(address, bit, value)
+
+    def is_register_bit_set(self, address, bit):
+        return (self.read_register(address) & (1 << bit)) > 0
+
+    def write_register_bit_range(self, address, high_bit, low_bit, value):
+        mask = field_mask(high_bit, low_bit)
+        self.modify(address, set_mask = (value << low_bit) & mask, clear_mask = mask)
+
+    def read_register_bit_range(self, address, high_bit, low_bit):
+        return (self.read_register(address) & field_mask(high_bit, low_bit)) >> low_bit
+
+    def cache_stats(self):
+        return self.shadow.stats()
+
 #Low Level Functions
     def set_control(self, control):
         self.write_register(CONTROL, control)
@@ -295,13 +241,7 @@ class wb_sd_hostDriver(driver.Driver):
 
     def send_command(self, cmd, cmd_arg = 0x00, long_rsp = False, timeout = 0.2):
         #Generate a command bit command
-        cmd_reg = 0
-
-        if (long_rsp):
-            cmd_reg |= (1 << COMMAND_BIT_RSP_LONG_FLG)
-
-        cmd_reg |= (1 << COMMAND_BIT_GO)
-        cmd_reg |= cmd
+        cmd_reg = encode_sd_command(cmd = cmd, go = True, rsp_long_flg = long_rsp)
         #print "cmd reg: 0x%08X" % cmd_reg
 
         self.write_register(SD_ARGUMENT, cmd_arg)
@@ -362,11 +302,12 @@ class wb_sd_hostDriver(driver.Driver):
             self.parse_r7_resp(response)
 
     def parse_r1_resp(self, response):
-        self.error_crc          =   ((response[3] & 1 << R1_COM_CRC_ERROR) > 0     )
-        self.error_out_of_range =   ((response[3] & 1 << R1_OUT_OF_RANGE) > 0      )
-        self.error_illegal_cmd  =   ((response[3] & 1 << R1_ILLEGAL_COMMAND) > 0   )
-        self.error_unknown      =   ((response[3] & 1 << R1_ERROR) > 0             )
-        self.current_state      =   ((response[3] >> R1_CURRENT_STATE) & R1_CURRENT_STATE_BITMASK)
+        r1 = decode_r1(response[3])
+        self.error_crc          =   r1["com_crc_error"]
+        self.error_out_of_range =   r1["out_of_range"]
+        self.error_illegal_cmd  =   r1["illegal_command"]
+        self.error_unknown      =   r1["error"]
+        self.current_state      =   r1["current_state"]
         if self.debug: print "CRC Error: %s" % str(self.error_crc)
         if self.debug: print "Out of range Error: %s" % str(self.error_out_of_range)
         if self.debug: print "Illegal Command: %s" % str(self.error_illegal_cmd)
@@ -374,10 +315,11 @@ class wb_sd_hostDriver(driver.Driver):
         if self.debug: print "Current State: %d" % self.current_state
 
     def parse_r4_resp(self, response):
-        self.card_ready         =   ((response[3] & (1 << (R4_READY))) > 0)
-        self.num_funcs          =   ((response[3] >>(R4_NUM_FUNCS)) & R4_NUM_FUNCS_BITMASK)
-        self.v1p8_mode          =   ((response[3] & (1 << (R4_S18A) )) > 0)
-        self.memory_present     =   ((response[3] & (1 << (R4_MEM_PRESENT))) > 0)
+        r4 = decode_r4(response[3])
+        self.card_ready         =   r4["ready"]
+        self.num_funcs          =   r4["num_funcs"]
+        self.v1p8_mode          =   r4["s18a"]
+        self.memory_present     =   r4["mem_present"]
         vmin = 20
         vmax = 35
         pos = 8
@@ -394,19 +336,21 @@ class wb_sd_hostDriver(driver.Driver):
         #    print "\t%d: %s" % (i, self.card_voltage_range[i])
 
     def parse_r5_resp(self, response):
-        self.error_crc          =   ((response[3] & 1 << R5_COM_CRC_ERROR) > 0)
-        self.error_illegal_cmd  =   ((response[3] & 1 << R5_ILLEGAL_COMMAND) > 0)
-        self.current_state      =   ((response[3] >> R5_CURRENT_STATE) & R5_CURRENT_STATE_BITMASK)
-        self.error_unknown      =   ((response[3] & 1 << R5_ERROR) > 0)
-        self.error_function     =   ((response[3] & 1 << R5_ERROR_FUNC) > 0)
-        self.error_out_of_range =   ((response[3] & 1 << R5_ERROR_OUT_OF_RANGE) > 0)
+        r5 = decode_r5(response[3])
+        self.error_crc          =   r5["com_crc_error"]
+        self.error_illegal_cmd  =   r5["illegal_command"]
+        self.current_state      =   r5["current_state"]
+        self.error_unknown      =   r5["error"]
+        self.error_function     =   r5["error_func"]
+        self.error_out_of_range =   r5["error_out_of_range"]
         self.read_data_byte     =   (response[3] & DATA_MASK)
 
     def parse_r6_resp(self, response):
-        self.relative_card_address = ((response[3] >> R6_REL_ADDR) & R6_REL_ADDR_BITMASK)
-        self.error_crc = (response[3] & (1 << R6_STS_CRC_COMM_ERR) > 0)
-        self.error_illegal_cmd = (response[3] & (1 << R6_STS_ILLEGAL_CMD) > 0)
-        self.error_unknown = (response[3] & (1 << R6_STS_ERROR) > 0)
+        r6 = decode_r6(response[3])
+        self.relative_card_address = r6["rel_addr"]
+        self.error_crc = r6["sts_crc_comm_err"]
+        self.error_illegal_cmd = r6["sts_illegal_cmd"]
+        self.error_unknown = r6["sts_error"]
         #print "Relative Address: 0x%04X" % self.relative_card_address
         #print "CRC Error: %s" % str(self.error_crc)
         #print "Illegal Command: %s" % str(self.error_illegal_cmd)
@@ -696,12 +640,9 @@ class wb_sd_hostDriver(driver.Driver):
             self.set_register_bit(CONTROL, CONTROL_DATA_WRITE_FLAG)
             self.send_command(CMD_DATA_RW, command_arg)
             if self.debug: print "Initiate Data Transfer (Outbound)"
-            #XXX: All these transactions with the control register can be consolodated to one function call
             self.set_register_bit(CONTROL, CONTROL_ENABLE_DMA_WR)
             self.write_register(SD_DATA_BYTE_COUNT, (len(data) / self.block_size))
-            self.set_register_bit(CONTROL, CONTROL_DATA_BLOCK_MODE)
-            self.set_register_bit(CONTROL, CONTROL_ENABLE_INTERRUPT)
-            self.select_sd_function(function_id)
+            self._setup_block_transfer(function_id)
             self.set_register_bit(CONTROL, CONTROL_DATA_BIT_ACTIVATE)
 
             self.dma_writer.write(data)
@@ -712,10 +653,7 @@ class wb_sd_hostDriver(driver.Driver):
                 print "This should change to an asynchrounous Wait"
                 time.sleep(0.01)
 
-            self.clear_register_bit(CONTROL, CONTROL_ENABLE_INTERRUPT)
-            self.clear_register_bit(CONTROL, CONTROL_DATA_BIT_ACTIVATE)
-            self.clear_register_bit(CONTROL, CONTROL_DATA_BLOCK_MODE)
-            self.clear_register_bit(CONTROL, CONTROL_ENABLE_DMA_WR)
+            self._finish_block_transfer("enable_dma_wr")
 
         else:
             command_arg |= (byte_count / self.block_size) & DATA_RW_COUNT_BITMODE
@@ -723,9 +661,7 @@ class wb_sd_hostDriver(driver.Driver):
             self.dma_reader.set_size(self.block_size / 4)
             self.set_register_bit(CONTROL, CONTROL_ENABLE_DMA_RD)
             self.write_register(SD_DATA_BYTE_COUNT, byte_count / self.block_size)
-            self.set_register_bit(CONTROL, CONTROL_DATA_BLOCK_MODE)
-            self.set_register_bit(CONTROL, CONTROL_ENABLE_INTERRUPT)
-            self.select_sd_function(function_id)
+            self._setup_block_transfer(function_id)
             self.set_register_bit(CONTROL, CONTROL_DATA_BIT_ACTIVATE)
 
             if self.debug: print "Sending Command..."
@@ -756,12 +692,22 @@ class wb_sd_hostDriver(driver.Driver):
                 if self.debug: print "Length Read Data: %d" % len(self.read_data)
                 self.dma_reader.debug = False
 
-                self.clear_register_bit(CONTROL, CONTROL_ENABLE_INTERRUPT)
-                self.clear_register_bit(CONTROL, CONTROL_DATA_BIT_ACTIVATE)
-                self.clear_register_bit(CONTROL, CONTROL_DATA_BLOCK_MODE)
-                self.clear_register_bit(CONTROL, CONTROL_ENABLE_DMA_RD)
+                self._finish_block_transfer("enable_dma_rd")
                 return self.read_data
 
+    def _setup_block_transfer(self, function_id):
+        #Block mode, interrupt and the function number in one control write
+        self.update_control(data_block_mode = True,
+                            enable_interrupt = True,
+                            function_address = function_id)
+
+    def _finish_block_transfer(self, dma_field):
+        fields = {"enable_interrupt": False,
+                  "data_bit_activate": False,
+                  "data_block_mode": False,
+                  dma_field: False}
+        self.update_control(**fields)
+
     def send_single_byte(self, function_id, address, data, read_after_write):
         command_arg = 0
         write_flag = DATA_WRITE_FLAG
@@ -797,10 +743,7 @@ class wb_sd_hostDriver(driver.Driver):
             #print "DONE!"
             self.dma_reader.disable_asynchronous_read()
             self.async_read_callback(self.read_data)
-            self.clear_register_bit(CONTROL, CONTROL_ENABLE_INTERRUPT)
-            self.clear_register_bit(CONTROL, CONTROL_DATA_BIT_ACTIVATE)
-            self.clear_register_bit(CONTROL, CONTROL_DATA_BLOCK_MODE)
-            self.clear_register_bit(CONTROL, CONTROL_ENABLE_DMA_RD)
+            self._finish_block_transfer("enable_dma_rd")
             self.read_register(STATUS)
 
     def read_async_data(self):
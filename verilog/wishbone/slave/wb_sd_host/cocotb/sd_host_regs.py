@@ -0,0 +1,408 @@
+#Generated by register_map.py from sd_host_regs.json, do not edit
+
+"""
+wb_sd_host registers
+
+encode_<register>(**fields) and decode_<register>(value) convert between
+register values and fields (lower case field names), single bit fields
+decode to booleans
+"""
+
+DESCRIPTION_SHA1 = "434971cb470cd55bd3bc27d6a1a72878ee5cf78c"
+
+#Registers
+CONTROL                          = 0x000
+STATUS                           = 0x001
+REG_MEM_0_BASE                   = 0x002
+REG_MEM_0_SIZE                   = 0x003
+REG_MEM_1_BASE                   = 0x004
+REG_MEM_1_SIZE                   = 0x005
+SD_ARGUMENT                      = 0x006
+SD_COMMAND                       = 0x007
+SD_CONFIGURE                     = 0x008
+SD_RESPONSE0                     = 0x009
+SD_RESPONSE1                     = 0x00A
+SD_RESPONSE2                     = 0x00B
+SD_RESPONSE3                     = 0x00C
+SD_DATA_BYTE_COUNT               = 0x00D
+SD_BLOCK_SLEEP                   = 0x00E
+SD_F0_BLOCK_SIZE                 = 0x010
+SD_F1_BLOCK_SIZE                 = 0x011
+SD_F2_BLOCK_SIZE                 = 0x012
+SD_F3_BLOCK_SIZE                 = 0x013
+SD_F4_BLOCK_SIZE                 = 0x014
+SD_F5_BLOCK_SIZE                 = 0x015
+SD_F6_BLOCK_SIZE                 = 0x016
+SD_F7_BLOCK_SIZE                 = 0x017
+SD_MEM_BLOCK_SIZE                = 0x018
+SD_PHY_STATE                     = 0x020
+SD_PHY_DATA_STATE                = 0x021
+SD_DELAY_VALUE                   = 0x022
+SD_DBG_CRC_GEN                   = 0x023
+SD_DBG_CRC_RMT                   = 0x024
+SD_DBG_CRC_DATA_GEN              = 0x028
+SD_DBG_CRC_DATA_RMT              = 0x02C
+
+#CONTROL
+CONTROL_ENABLE_SD                = 0
+CONTROL_ENABLE_INTERRUPT         = 1
+CONTROL_ENABLE_DMA_WR            = 2
+CONTROL_ENABLE_DMA_RD            = 3
+CONTROL_ENABLE_SD_FIN_INT        = 4
+CONTROL_DATA_WRITE_FLAG          = 5
+CONTROL_DATA_BIT_ACTIVATE        = 6
+CONTROL_DATA_BLOCK_MODE          = 7
+CONTROL_FUNCTION_ADDRESS         = 8
+CONTROL_FUNCTION_ADDRESS_HIGH    = 10
+CONTROL_FUNCTION_ADDRESS_LOW     = 8
+CONTROL_FUNCTION_ADDRESS_BITMASK = 0x7
+
+#STATUS
+STATUS_MEMORY_0_FINISHED         = 0
+STATUS_MEMORY_1_FINISHED         = 1
+STATUS_MEMORY_0_EMPTY            = 2
+STATUS_MEMORY_1_EMPTY            = 3
+STATUS_ENABLE                    = 4
+STATUS_SD_BUSY                   = 5
+STATUS_SD_DATA_BUSY              = 6
+STATUS_SD_READY                  = 7
+STATUS_ERROR_BIT                 = 24
+STATUS_ERROR_BIT_TOP             = 31
+STATUS_ERROR_BIT_BOT             = 24
+STATUS_ERROR_BIT_BITMASK         = 0xFF
+
+#SD_COMMAND
+COMMAND_BIT_CMD                  = 0
+COMMAND_BIT_CMD_TOP              = 6
+COMMAND_BIT_CMD_BOT              = 0
+COMMAND_BIT_CMD_BITMASK          = 0x7F
+COMMAND_BIT_GO                   = 16
+COMMAND_BIT_RSP_LONG_FLG         = 17
+
+#SD_CONFIGURE
+CONFIGURE_EN_CRC                 = 4
+
+#R1
+R1_OUT_OF_RANGE                  = 39
+R1_COM_CRC_ERROR                 = 38
+R1_ILLEGAL_COMMAND               = 37
+R1_ERROR                         = 19
+R1_CURRENT_STATE                 = 9
+R1_CURRENT_STATE_HIGH            = 12
+R1_CURRENT_STATE_LOW             = 9
+R1_CURRENT_STATE_BITMASK         = 0xF
+
+#R4
+R4_READY                         = 31
+R4_NUM_FUNCS                     = 28
+R4_NUM_FUNCS_HIGH                = 30
+R4_NUM_FUNCS_LOW                 = 28
+R4_NUM_FUNCS_BITMASK             = 0x7
+R4_MEM_PRESENT                   = 27
+R4_UHSII_AVAILABLE               = 26
+R4_S18A                          = 24
+R4_IO_OCR                        = 0
+R4_IO_OCR_HIGH                   = 11
+R4_IO_OCR_LOW                    = 0
+R4_IO_OCR_BITMASK                = 0xFFF
+
+#R5
+R5_COM_CRC_ERROR                 = 15
+R5_ILLEGAL_COMMAND               = 14
+R5_CURRENT_STATE                 = 12
+R5_CURRENT_STATE_HIGH            = 13
+R5_CURRENT_STATE_LOW             = 12
+R5_CURRENT_STATE_BITMASK         = 0x3
+R5_ERROR                         = 3
+R5_ERROR_FUNC                    = 1
+R5_ERROR_OUT_OF_RANGE            = 0
+
+#R6
+R6_REL_ADDR                      = 16
+R6_REL_ADDR_HIGH                 = 23
+R6_REL_ADDR_LOW                  = 16
+R6_REL_ADDR_BITMASK              = 0xFF
+R6_STS_CRC_COMM_ERR              = 15
+R6_STS_ILLEGAL_CMD               = 13
+R6_STS_ERROR                     = 12
+
+#Constants
+SD_BLOCK_SIZE_OFFSET             = 0x010
+CONFIGURE_READ_WAIT_SPRT_ADDR    = 8
+CONFIGURE_READ_WAIT_SPRT_BIT     = 2
+CMD_PHY_MODE                     = 0
+CMD_SEND_RELATIVE_ADDR           = 3
+CMD_OP_COND                      = 5
+CMD_SEL_DESEL_CARD               = 7
+CMD_GO_INACTIVE                  = 15
+CMD_SINGLE_DATA_RW               = 52
+CMD_DATA_RW                      = 53
+DATA_RW_WRITE                    = 1
+DATA_RW_READ                     = 0
+DATA_WRITE_FLAG                  = 31
+DATA_FUNC_INDEX                  = 28
+DATA_FUNC_BITMASK                = 7
+DATA_ADDR                        = 9
+DATA_ADDR_BITMASK                = 0x1FFFF
+DATA_MASK                        = 0xFF
+DATA_RW_BLOCK_MODE               = 27
+DATA_RW_OP_CODE                  = 26
+DATA_RW_COUNT_BITMODE            = 0x1FF
+OP_COND_BIT_EN_1P8V              = 24
+OP_COND_BIT_OCR_LOW              = 0
+IO_FUNC_ENABLE_ADDR              = 0x02
+INT_ENABLE_ADDR                  = 0x04
+INT_PENDING_ADDR                 = 0x05
+
+#Registers only the host changes: address -> self clearing bits
+NON_VOLATILE = {
+    CONTROL: 0x40,
+    SD_CONFIGURE: 0x0,
+    SD_DATA_BYTE_COUNT: 0x0,
+    SD_BLOCK_SLEEP: 0x0,
+    SD_F0_BLOCK_SIZE: 0x0,
+    SD_F1_BLOCK_SIZE: 0x0,
+    SD_F2_BLOCK_SIZE: 0x0,
+    SD_F3_BLOCK_SIZE: 0x0,
+    SD_F4_BLOCK_SIZE: 0x0,
+    SD_F5_BLOCK_SIZE: 0x0,
+    SD_F6_BLOCK_SIZE: 0x0,
+    SD_F7_BLOCK_SIZE: 0x0,
+    SD_MEM_BLOCK_SIZE: 0x0,
+}
+
+#field -> (mask, shift)
+_CONTROL_FIELDS = {
+    "enable_sd": (0x1, 0),
+    "enable_interrupt": (0x2, 1),
+    "enable_dma_wr": (0x4, 2),
+    "enable_dma_rd": (0x8, 3),
+    "enable_sd_fin_int": (0x10, 4),
+    "data_write_flag": (0x20, 5),
+    "data_bit_activate": (0x40, 6),
+    "data_block_mode": (0x80, 7),
+    "function_address": (0x700, 8),
+}
+_STATUS_FIELDS = {
+    "memory_0_finished": (0x1, 0),
+    "memory_1_finished": (0x2, 1),
+    "memory_0_empty": (0x4, 2),
+    "memory_1_empty": (0x8, 3),
+    "enable": (0x10, 4),
+    "sd_busy": (0x20, 5),
+    "sd_data_busy": (0x40, 6),
+    "sd_ready": (0x80, 7),
+    "error_bit": (0xFF000000, 24),
+}
+_SD_COMMAND_FIELDS = {
+    "cmd": (0x7F, 0),
+    "go": (0x10000, 16),
+    "rsp_long_flg": (0x20000, 17),
+}
+_SD_CONFIGURE_FIELDS = {
+    "en_crc": (0x10, 4),
+}
+_R1_FIELDS = {
+    "out_of_range": (0x8000000000, 39),
+    "com_crc_error": (0x4000000000, 38),
+    "illegal_command": (0x2000000000, 37),
+    "error": (0x80000, 19),
+    "current_state": (0x1E00, 9),
+}
+_R4_FIELDS = {
+    "ready": (0x80000000, 31),
+    "num_funcs": (0x70000000, 28),
+    "mem_present": (0x8000000, 27),
+    "uhsii_available": (0x4000000, 26),
+    "s18a": (0x1000000, 24),
+    "io_ocr": (0xFFF, 0),
+}
+_R5_FIELDS = {
+    "com_crc_error": (0x8000, 15),
+    "illegal_command": (0x4000, 14),
+    "current_state": (0x3000, 12),
+    "error": (0x8, 3),
+    "error_func": (0x2, 1),
+    "error_out_of_range": (0x1, 0),
+}
+_R6_FIELDS = {
+    "rel_addr": (0xFF0000, 16),
+    "sts_crc_comm_err": (0x8000, 15),
+    "sts_illegal_cmd": (0x2000, 13),
+    "sts_error": (0x1000, 12),
+}
+
+def _masks(table, fields):
+    """
+    Returns (tuple):
+        (bits to set, bits to clear) to write 'fields' into a register
+    """
+    set_mask = 0
+    clear_mask = 0
+    for name, value in fields.items():
+        if name not in table:
+            raise KeyError("Unknown field: %s" % name)
+        mask, shift = table[name]
+        value = int(value) << shift
+        if value & ~mask:
+            raise ValueError("%s: 0x%X does not fit in mask 0x%X" % (name, value >> shift, mask))
+        clear_mask |= mask
+        set_mask |= value
+    return set_mask, clear_mask
+
+def _encode(table, fields):
+    return _masks(table, fields)[0]
+
+def declare_shadow(shadow):
+    """
+    Declare the registers only the host changes in a RegisterShadow
+    """
+    for address, self_clearing in NON_VOLATILE.items():
+        shadow.declare(address, self_clearing)
+
+def encode_control(**fields):
+    return _encode(_CONTROL_FIELDS, fields)
+
+def decode_control(value):
+    return {
+        "enable_sd": (value & 0x1) != 0,
+        "enable_interrupt": (value & 0x2) != 0,
+        "enable_dma_wr": (value & 0x4) != 0,
+        "enable_dma_rd": (value & 0x8) != 0,
+        "enable_sd_fin_int": (value & 0x10) != 0,
+        "data_write_flag": (value & 0x20) != 0,
+        "data_bit_activate": (value & 0x40) != 0,
+        "data_block_mode": (value & 0x80) != 0,
+        "function_address": (value >> 8) & 0x7,
+    }
+
+def encode_status(**fields):
+    return _encode(_STATUS_FIELDS, fields)
+
+def decode_status(value):
+    return {
+        "memory_0_finished": (value & 0x1) != 0,
+        "memory_1_finished": (value & 0x2) != 0,
+        "memory_0_empty": (value & 0x4) != 0,
+        "memory_1_empty": (value & 0x8) != 0,
+        "enable": (value & 0x10) != 0,
+        "sd_busy": (value & 0x20) != 0,
+        "sd_data_busy": (value & 0x40) != 0,
+        "sd_ready": (value & 0x80) != 0,
+        "error_bit": (value >> 24) & 0xFF,
+    }
+
+def encode_sd_command(**fields):
+    return _encode(_SD_COMMAND_FIELDS, fields)
+
+def decode_sd_command(value):
+    return {
+        "cmd": value & 0x7F,
+        "go": (value & 0x10000) != 0,
+        "rsp_long_flg": (value & 0x20000) != 0,
+    }
+
+def encode_sd_configure(**fields):
+    return _encode(_SD_CONFIGURE_FIELDS, fields)
+
+def decode_sd_configure(value):
+    return {
+        "en_crc": (value & 0x10) != 0,
+    }
+
+def encode_r1(**fields):
+    return _encode(_R1_FIELDS, fields)
+
+def decode_r1(value):
+    return {
+        "out_of_range": (value & 0x8000000000) != 0,
+        "com_crc_error": (value & 0x4000000000) != 0,
+        "illegal_command": (value & 0x2000000000) != 0,
+        "error": (value & 0x80000) != 0,
+        "current_state": (value >> 9) & 0xF,
+    }
+
+def encode_r4(**fields):
+    return _encode(_R4_FIELDS, fields)
+
+def decode_r4(value):
+    return {
+        "ready": (value & 0x80000000) != 0,
+        "num_funcs": (value >> 28) & 0x7,
+        "mem_present": (value & 0x8000000) != 0,
+        "uhsii_available": (value & 0x4000000) != 0,
+        "s18a": (value & 0x1000000) != 0,
+        "io_ocr": value & 0xFFF,
+    }
+
+def encode_r5(**fields):
+    return _encode(_R5_FIELDS, fields)
+
+def decode_r5(value):
+    return {
+        "com_crc_error": (value & 0x8000) != 0,
+        "illegal_command": (value & 0x4000) != 0,
+        "current_state": (value >> 12) & 0x3,
+        "error": (value & 0x8) != 0,
+        "error_func": (value & 0x2) != 0,
+        "error_out_of_range": (value & 0x1) != 0,
+    }
+
+def encode_r6(**fields):
+    return _encode(_R6_FIELDS, fields)
+
+def decode_r6(value):
+    return {
+        "rel_addr": (value >> 16) & 0xFF,
+        "sts_crc_comm_err": (value & 0x8000) != 0,
+        "sts_illegal_cmd": (value & 0x2000) != 0,
+        "sts_error": (value & 0x1000) != 0,
+    }
+
+class SDHostRegisters(object):
+    """
+    Field access for a driver with read_register, write_register and
+    modify(address, set_mask, clear_mask), whatever the driver returns is
+    returned (a coroutine for the cocotb drivers)
+    """
+
+    def update_control(self, **fields):
+        """
+        Change some fields with one register write: enable_sd,
+        enable_interrupt, enable_dma_wr, enable_dma_rd, enable_sd_fin_int,
+        data_write_flag, data_bit_activate, data_block_mode, function_address
+        """
+        set_mask, clear_mask = _masks(_CONTROL_FIELDS, fields)
+        return self.modify(CONTROL, set_mask, clear_mask)
+
+    def write_control(self, **fields):
+        """
+        Write the register, fields not given are 0
+        """
+        return self.write_register(CONTROL, _encode(_CONTROL_FIELDS, fields))
+
+    def update_sd_command(self, **fields):
+        """
+        Change some fields with one register write: cmd, go, rsp_long_flg
+        """
+        set_mask, clear_mask = _masks(_SD_COMMAND_FIELDS, fields)
+        return self.modify(SD_COMMAND, set_mask, clear_mask)
+
+    def write_sd_command(self, **fields):
+        """
+        Write the register, fields not given are 0
+        """
+        return self.write_register(SD_COMMAND, _encode(_SD_COMMAND_FIELDS, fields))
+
+    def update_sd_configure(self, **fields):
+        """
+        Change some fields with one register write: en_crc
+        """
+        set_mask, clear_mask = _masks(_SD_CONFIGURE_FIELDS, fields)
+        return self.modify(SD_CONFIGURE, set_mask, clear_mask)
+
+    def write_sd_configure(self, **fields):
+        """
+        Write the register, fields not given are 0
+        """
+        return self.write_register(SD_CONFIGURE, _encode(_SD_CONFIGURE_FIELDS, fields))
@@ -0,0 +1,35 @@
+//Generated by register_map.py from sd_host_regs.json, do not edit
+//DESCRIPTION_SHA1: 434971cb470cd55bd3bc27d6a1a72878ee5cf78c
+
+//Registers
+localparam          CONTROL                          = 32'h00000000;
+localparam          STATUS                           = 32'h00000001;
+localparam          REG_MEM_0_BASE                   = 32'h00000002;
+localparam          REG_MEM_0_SIZE                   = 32'h00000003;
+localparam          REG_MEM_1_BASE                   = 32'h00000004;
+localparam          REG_MEM_1_SIZE                   = 32'h00000005;
+localparam          SD_ARGUMENT                      = 32'h00000006;
+localparam          SD_COMMAND                       = 32'h00000007;
+localparam          SD_CONFIGURE                     = 32'h00000008;
+localparam          SD_RESPONSE0                     = 32'h00000009;
+localparam          SD_RESPONSE1                     = 32'h0000000A;
+localparam          SD_RESPONSE2                     = 32'h0000000B;
+localparam          SD_RESPONSE3                     = 32'h0000000C;
+localparam          SD_DATA_BYTE_COUNT               = 32'h0000000D;
+localparam          SD_BLOCK_SLEEP                   = 32'h0000000E;
+localparam          SD_F0_BLOCK_SIZE                 = 32'h00000010;
+localparam          SD_F1_BLOCK_SIZE                 = 32'h00000011;
+localparam          SD_F2_BLOCK_SIZE                 = 32'h00000012;
+localparam          SD_F3_BLOCK_SIZE                 = 32'h00000013;
+localparam          SD_F4_BLOCK_SIZE                 = 32'h00000014;
+localparam          SD_F5_BLOCK_SIZE                 = 32'h00000015;
+localparam          SD_F6_BLOCK_SIZE                 = 32'h00000016;
+localparam          SD_F7_BLOCK_SIZE                 = 32'h00000017;
+localparam          SD_MEM_BLOCK_SIZE                = 32'h00000018;
+localparam          SD_PHY_STATE                     = 32'h00000020;
+localparam          SD_PHY_DATA_STATE                = 32'h00000021;
+localparam          SD_DELAY_VALUE                   = 32'h00000022;
+localparam          SD_DBG_CRC_GEN                   = 32'h00000023;
+localparam          SD_DBG_CRC_RMT                   = 32'h00000024;
+localparam          SD_DBG_CRC_DATA_GEN              = 32'h00000028;
+localparam          SD_DBG_CRC_DATA_RMT              = 32'h0000002C;
@@ -0,0 +1,345 @@
+`timescale 1ps / 1ps
+
+
+module tb_cocotb (
+
+input                               clk,
+input                               rst,
+
+//Closed page, linear wishbone slave
+input                               CLOSED_we,
+input                               CLOSED_stb,
+input                               CLOSED_cyc,
+input       [3:0]                   CLOSED_sel,
+input       [31:0]                  CLOSED_adr,
+input       [31:0]                  CLOSED_dat_o,
+output      [31:0]                  CLOSED_dat_i,
+output                              CLOSED_ack,
+output                              CLOSED_ready,
+
+//Open page, bank interleaved wishbone slave
+input                               OPEN_we,
+input                               OPEN_stb,
+input                               OPEN_cyc,
+input       [3:0]                   OPEN_sel,
+input       [31:0]                  OPEN_adr,
+input       [31:0]                  OPEN_dat_o,
+output      [31:0]                  OPEN_dat_i,
+output                              OPEN_ack,
+output                              OPEN_ready,
+
+//Open page, bank interleaved B4 pipelined wishbone slave
+input                               PIPE_we,
+input                               PIPE_stb,
+input                               PIPE_cyc,
+input       [3:0]                   PIPE_sel,
+input       [31:0]                  PIPE_adr,
+input       [31:0]                  PIPE_dat_o,
+output      [31:0]                  PIPE_dat_i,
+output                              PIPE_ack,
+output                              PIPE_stall,
+input       [2:0]                   PIPE_cti,
+input       [1:0]                   PIPE_bte,
+output                              PIPE_ready
+
+);
+
+
+//Parameters
+//Registers
+
+reg               r_rst;
+always @ (*)      r_rst           = rst;
+reg   [3:0]       test_id         = 0;
+
+//closed page SDRAM
+wire           w_closed_clk;
+wire           w_closed_cke;
+wire           w_closed_cs_n;
+wire           w_closed_ras;
+wire           w_closed_cas;
+wire           w_closed_we;
+wire  [11:0]   w_closed_addr;
+wire  [1:0]    w_closed_bank;
+wire  [15:0]   w_closed_data;
+wire  [1:0]    w_closed_data_mask;
+wire           w_closed_int;
+
+//open page SDRAM
+wire           w_open_clk;
+wire           w_open_cke;
+wire           w_open_cs_n;
+wire           w_open_ras;
+wire           w_open_cas;
+wire           w_open_we;
+wire  [11:0]   w_open_addr;
+wire  [1:0]    w_open_bank;
+wire  [15:0]   w_open_data;
+wire  [1:0]    w_open_data_mask;
+wire           w_open_int;
+
+//pipelined open page SDRAM
+wire           w_pipe_clk;
+wire           w_pipe_cke;
+wire           w_pipe_cs_n;
+wire           w_pipe_ras;
+wire           w_pipe_cas;
+wire           w_pipe_we;
+wire  [11:0]   w_pipe_addr;
+wire  [1:0]    w_pipe_bank;
+wire  [15:0]   w_pipe_data;
+wire  [1:0]    w_pipe_data_mask;
+wire           w_pipe_int;
+
+//submodules
+
+//Original controller, every burst activates and precharges its row
+wb_sdram #(
+  .OPEN_PAGE            (0                   ),
+  .BANK_INTERLEAVE      (0                   ),
+  .BURST_LENGTH         (0                   )
+) closed (
+  .clk                  (clk                 ),
+  .rst                  (r_rst               ),
+
+  .i_wbs_we             (CLOSED_we           ),
+  .i_wbs_cyc            (CLOSED_cyc          ),
+  .i_wbs_sel            (CLOSED_sel          ),
+  .i_wbs_dat            (CLOSED_dat_o        ),
+  .i_wbs_stb            (CLOSED_stb          ),
+  .o_wbs_ack            (CLOSED_ack          ),
+  .o_wbs_dat            (CLOSED_dat_i        ),
+  .i_wbs_adr            (CLOSED_adr          ),
+  .o_wbs_int            (w_closed_int        ),
+
+  .o_sdram_clk          (w_closed_clk        ),
+  .o_sdram_cke          (w_closed_cke        ),
+  .o_sdram_cs_n         (w_closed_cs_n       ),
+  .o_sdram_ras          (w_closed_ras        ),
+  .o_sdram_cas          (w_closed_cas        ),
+  .o_sdram_we           (w_closed_we         ),
+
+  .o_sdram_addr         (w_closed_addr       ),
+  .o_sdram_bank         (w_closed_bank       ),
+  .io_sdram_data        (w_closed_data       ),
+  .o_sdram_data_mask    (w_closed_data_mask  ),
+  .o_sdram_ready        (CLOSED_ready        ),
+
+  .o_ext_sdram_clk      (                    ),
+  .debug                (                    )
+);
+
+mt48lc4m16 closed_ram (
+  .A11                (w_closed_addr[11]      ),
+  .A10                (w_closed_addr[10]      ),
+  .A9                 (w_closed_addr[9]       ),
+  .A8                 (w_closed_addr[8]       ),
+  .A7                 (w_closed_addr[7]       ),
+  .A6                 (w_closed_addr[6]       ),
+  .A5                 (w_closed_addr[5]       ),
+  .A4                 (w_closed_addr[4]       ),
+  .A3                 (w_closed_addr[3]       ),
+  .A2                 (w_closed_addr[2]       ),
+  .A1                 (w_closed_addr[1]       ),
+  .A0                 (w_closed_addr[0]       ),
+
+  .DQ15               (w_closed_data[15]      ),
+  .DQ14               (w_closed_data[14]      ),
+  .DQ13               (w_closed_data[13]      ),
+  .DQ12               (w_closed_data[12]      ),
+  .DQ11               (w_closed_data[11]      ),
+  .DQ10               (w_closed_data[10]      ),
+  .DQ9                (w_closed_data[9]       ),
+  .DQ8                (w_closed_data[8]       ),
+  .DQ7                (w_closed_data[7]       ),
+  .DQ6                (w_closed_data[6]       ),
+  .DQ5                (w_closed_data[5]       ),
+  .DQ4                (w_closed_data[4]       ),
+  .DQ3                (w_closed_data[3]       ),
+  .DQ2                (w_closed_data[2]       ),
+  .DQ1                (w_closed_data[1]       ),
+  .DQ0                (w_closed_data[0]       ),
+
+  .BA0                 (w_closed_bank[0]    ),
+  .BA1                 (w_closed_bank[1]    ),
+  .DQMH                (w_closed_data_mask[1]),
+  .DQML                (w_closed_data_mask[0]),
+  .CLK                 (w_closed_clk        ),
+  .CKE                 (w_closed_cke        ),
+  .WENeg               (w_closed_we         ),
+  .RASNeg              (w_closed_ras        ),
+  .CSNeg               (w_closed_cs_n       ),
+  .CASNeg              (w_closed_cas        )
+);
+
+//Open page controller with bank interleaving and look ahead activation
+wb_sdram #(
+  .OPEN_PAGE            (1                   ),
+  .BANK_INTERLEAVE      (1                   ),
+  .BURST_LENGTH         (0                   )
+) open_page (
+  .clk                  (clk                 ),
+  .rst                  (r_rst               ),
+
+  .i_wbs_we             (OPEN_we             ),
+  .i_wbs_cyc            (OPEN_cyc            ),
+  .i_wbs_sel            (OPEN_sel            ),
+  .i_wbs_dat            (OPEN_dat_o          ),
+  .i_wbs_stb            (OPEN_stb            ),
+  .o_wbs_ack            (OPEN_ack            ),
+  .o_wbs_dat            (OPEN_dat_i          ),
+  .i_wbs_adr            (OPEN_adr            ),
+  .o_wbs_int            (w_open_int          ),
+
+  .o_sdram_clk          (w_open_clk          ),
+  .o_sdram_cke          (w_open_cke          ),
+  .o_sdram_cs_n         (w_open_cs_n         ),
+  .o_sdram_ras          (w_open_ras          ),
+  .o_sdram_cas          (w_open_cas          ),
+  .o_sdram_we           (w_open_we           ),
+
+  .o_sdram_addr         (w_open_addr         ),
+  .o_sdram_bank         (w_open_bank         ),
+  .io_sdram_data        (w_open_data         ),
+  .o_sdram_data_mask    (w_open_data_mask    ),
+  .o_sdram_ready        (OPEN_ready          ),
+
+  .o_ext_sdram_clk      (                    ),
+  .debug                (                    )
+);
+
+mt48lc4m16 open_ram (
+  .A11                (w_open_addr[11]      ),
+  .A10                (w_open_addr[10]      ),
+  .A9                 (w_open_addr[9]       ),
+  .A8                 (w_open_addr[8]       ),
+  .A7                 (w_open_addr[7]       ),
+  .A6                 (w_open_addr[6]       ),
+  .A5                 (w_open_addr[5]       ),
+  .A4                 (w_open_addr[4]       ),
+  .A3                 (w_open_addr[3]       ),
+  .A2                 (w_open_addr[2]       ),
+  .A1                 (w_open_addr[1]       ),
+  .A0                 (w_open_addr[0]       ),
+
+  .DQ15               (w_open_data[15]      ),
+  .DQ14               (w_open_data[14]      ),
+  .DQ13               (w_open_data[13]      ),
+  .DQ12               (w_open_data[12]      ),
+  .DQ11               (w_open_data[11]      ),
+  .DQ10               (w_open_data[10]      ),
+  .DQ9                (w_open_data[9]       ),
+  .DQ8                (w_open_data[8]       ),
+  .DQ7                (w_open_data[7]       ),
+  .DQ6                (w_open_data[6]       ),
+  .DQ5                (w_open_data[5]       ),
+  .DQ4                (w_open_data[4]       ),
+  .DQ3                (w_open_data[3]       ),
+  .DQ2                (w_open_data[2]       ),
+  .DQ1                (w_open_data[1]       ),
+  .DQ0                (w_open_data[0]       ),
+
+  .BA0                 (w_open_bank[0]      ),
+  .BA1                 (w_open_bank[1]      ),
+  .DQMH                (w_open_data_mask[1] ),
+  .DQML                (w_open_data_mask[0] ),
+  .CLK                 (w_open_clk          ),
+  .CKE                 (w_open_cke          ),
+  .WENeg               (w_open_we           ),
+  .RASNeg              (w_open_ras          ),
+  .CSNeg               (w_open_cs_n         ),
+  .CASNeg              (w_open_cas          )
+);
+
+//Open page controller on a B4 pipelined bus
+wb_sdram #(
+  .OPEN_PAGE            (1                   ),
+  .BANK_INTERLEAVE      (1                   ),
+  .BURST_LENGTH         (0                   ),
+  .PIPELINED            (1                   )
+) pipelined (
+  .clk                  (clk                 ),
+  .rst                  (r_rst               ),
+
+  .i_wbs_we             (PIPE_we             ),
+  .i_wbs_cyc            (PIPE_cyc            ),
+  .i_wbs_sel            (PIPE_sel            ),
+  .i_wbs_dat            (PIPE_dat_o          ),
+  .i_wbs_stb            (PIPE_stb            ),
+  .o_wbs_ack            (PIPE_ack            ),
+  .o_wbs_dat            (PIPE_dat_i          ),
+  .i_wbs_adr            (PIPE_adr            ),
+  .o_wbs_int            (w_pipe_int          ),
+  .i_wbs_cti            (PIPE_cti            ),
+  .i_wbs_bte            (PIPE_bte            ),
+  .o_wbs_stall          (PIPE_stall          ),
+
+  .o_sdram_clk          (w_pipe_clk          ),
+  .o_sdram_cke          (w_pipe_cke          ),
+  .o_sdram_cs_n         (w_pipe_cs_n         ),
+  .o_sdram_ras          (w_pipe_ras          ),
+  .o_sdram_cas          (w_pipe_cas          ),
+  .o_sdram_we           (w_pipe_we           ),
+
+  .o_sdram_addr         (w_pipe_addr         ),
+  .o_sdram_bank         (w_pipe_bank         ),
+  .io_sdram_data        (w_pipe_data         ),
+  .o_sdram_data_mask    (w_pipe_data_mask    ),
+  .o_sdram_ready        (PIPE_ready          ),
+
+  .o_ext_sdram_clk      (                    ),
+  .debug                (                    )
+);
+
+mt48lc4m16 pipe_ram (
+  .A11                (w_pipe_addr[11]      ),
+  .A10                (w_pipe_addr[10]      ),
+  .A9                 (w_pipe_addr[9]       ),
+  .A8                 (w_pipe_addr[8]       ),
+  .A7                 (w_pipe_addr[7]       ),
+  .A6                 (w_pipe_addr[6]       ),
+  .A5                 (w_pipe_addr[5]       ),
+  .A4                 (w_pipe_addr[4]       ),
+  .A3                 (w_pipe_addr[3]       ),
+  .A2                 (w_pipe_addr[2]       ),
+  .A1                 (w_pipe_addr[1]       ),
+  .A0                 (w_pipe_addr[0]       ),
+
+  .DQ15               (w_pipe_data[15]      ),
+  .DQ14               (w_pipe_data[14]      ),
+  .DQ13               (w_pipe_data[13]      ),
+  .DQ12               (w_pipe_data[12]      ),
+  .DQ11               (w_pipe_data[11]      ),
+  .DQ10               (w_pipe_data[10]      ),
+  .DQ9                (w_pipe_data[9]       ),
+  .DQ8                (w_pipe_data[8]       ),
+  .DQ7                (w_pipe_data[7]       ),
+  .DQ6                (w_pipe_data[6]       ),
+  .DQ5                (w_pipe_data[5]       ),
+  .DQ4                (w_pipe_data[4]       ),
+  .DQ3                (w_pipe_data[3]       ),
+  .DQ2                (w_pipe_data[2]       ),
+  .DQ1                (w_pipe_data[1]       ),
+  .DQ0                (w_pipe_data[0]       ),
+
+  .BA0                 (w_pipe_bank[0]      ),
+  .BA1                 (w_pipe_bank[1]      ),
+  .DQMH                (w_pipe_data_mask[1] ),
+  .DQML                (w_pipe_data_mask[0] ),
+  .CLK                 (w_pipe_clk          ),
+  .CKE                 (w_pipe_cke          ),
+  .WENeg               (w_pipe_we           ),
+  .RASNeg              (w_pipe_ras          ),
+  .CSNeg               (w_pipe_cs_n         ),
+  .CASNeg              (w_pipe_cas          )
+);
+
+//asynchronus logic
+//synchronous logic
+
+initial begin
+  $dumpfile ("design.vcd");
+  $dumpvars(0, tb_cocotb);
+end
+
+endmodule
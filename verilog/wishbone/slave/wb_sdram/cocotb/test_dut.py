@@ -0,0 +1,253 @@
+import os
+import sys
+import random
+import cocotb
+import logging
+from cocotb.result import TestFailure
+from cocotb.result import ReturnValue
+from cocotb.clock import Clock
+from cocotb.triggers import RisingEdge
+from cocotb.triggers import ReadOnly
+from cocotb.utils import get_sim_time
+from array import array as Array
+
+from wb_bus import WishboneClassicMaster
+from wb_bus import WishbonePipelinedMaster
+
+#The SDRAM PLL expects a 50MHz clock, the simulator precision is 1ps
+CLK_PERIOD = 20000
+
+#32-bit words in the SDRAM (4 banks x 4096 rows x 256 columns x 16-bits)
+SDRAM_WORDS = 4 * 4096 * 256 / 2
+
+MODULE_PATH = os.path.join(os.path.dirname(__file__), os.pardir, "rtl")
+MODULE_PATH = os.path.abspath(MODULE_PATH)
+
+#Benchmark patterns: (name, list of (word address, block length))
+def sequential_pattern(r):
+    return [(0, 1024)]
+
+def strided_pattern(r):
+    #16 word blocks 320 words apart, every block lands in a new row
+    return [(0x10000 + i * 320, 16) for i in range(32)]
+
+def random_pattern(r):
+    #8 word blocks anywhere in the memory
+    return [(r.randrange(0, SDRAM_WORDS, 8), 8) for i in range(32)]
+
+PATTERNS = [("Sequential", sequential_pattern),
+            ("Strided",    strided_pattern),
+            ("Random",     random_pattern)]
+
+#A row holds 128 words (256 16-bit columns). With BANK_INTERLEAVE the bank is
+#word address bits [8:7] so every 128 words moves to the next bank and every
+#512 words to the next row of bank 0, without it the bank is bits [20:19]
+ROW_WORDS = 128
+BANK_WORDS = 4096 * ROW_WORDS
+
+#Crossing regions: (name, word address, length)
+CROSSING_REGIONS = [("Interleaved rows", 0x20000, 4 * 4 * ROW_WORDS),
+                    ("Bank boundary", BANK_WORDS - 4 * ROW_WORDS, 8 * ROW_WORDS)]
+
+@cocotb.coroutine
+def reset_dut(dut):
+    cocotb.fork(Clock(dut.clk, CLK_PERIOD).start())
+    dut.rst <= 1
+    for i in range(10):
+        yield RisingEdge(dut.clk)
+    dut.rst <= 0
+    yield RisingEdge(dut.clk)
+
+@cocotb.coroutine
+def wait_ready(dut, signal):
+    """
+    The controller waits for the PLL and initializes the SDRAM before it
+    sets ready
+    """
+    yield ReadOnly()
+    while not signal.value:
+        yield RisingEdge(dut.clk)
+        yield ReadOnly()
+    yield RisingEdge(dut.clk)
+
+def log_bandwidth(dut, name, word_count, elapsed_ns, latencies):
+    """
+    Report the sustained bandwidth of a transfer and the average time for
+    the first word of every block
+
+    Returns (tuple of floats):
+        bandwidth (MB/s), average latency (ns)
+    """
+    rate = 0.0
+    if elapsed_ns > 0:
+        rate = (word_count * 4.0) / elapsed_ns * 1000.0
+    latency = 0.0
+    if len(latencies) > 0:
+        latency = float(sum(latencies)) / len(latencies) / 1000.0
+    dut.log.info("%s: %d words in %d ns: %0.2f MB/s, average latency: %0.1f ns" %
+                 (name, word_count, elapsed_ns, rate, latency))
+    return rate, latency
+
+@cocotb.coroutine
+def run_pattern(dut, master, name, blocks, r):
+    """
+    Write every block then read every block back
+
+    Returns (tuple of tuples):
+        (write bandwidth, write latency), (read bandwidth, read latency)
+    """
+    data = []
+    for address, length in blocks:
+        data.append(Array('I', [r.randint(0, 0xFFFFFFFF) for i in range(length)]))
+    word_count = sum([length for address, length in blocks])
+
+    master.latencies = []
+    start = get_sim_time("ns")
+    for i in range(len(blocks)):
+        yield master.write_words(blocks[i][0], data[i])
+    write = log_bandwidth(dut, "%s Write" % name, word_count, get_sim_time("ns") - start, master.latencies)
+
+    master.latencies = []
+    start = get_sim_time("ns")
+    for i in range(len(blocks)):
+        read_data = yield master.read_words(blocks[i][0], blocks[i][1])
+        if read_data != data[i]:
+            raise TestFailure("%s: block at 0x%08X does not match" % (name, blocks[i][0]))
+    read = log_bandwidth(dut, "%s Read" % name, word_count, get_sim_time("ns") - start, master.latencies)
+    raise ReturnValue((write, read))
+
+@cocotb.coroutine
+def check_region(dut, master, name, address, length, r):
+    """
+    Write a region in blocks that straddle the row boundaries, then read it
+    back with a different block size and as one block
+
+    Every row crossing of a block goes through the open row check and, for
+    a block that bursts through the lookahead column, the activation of the
+    next bank
+    """
+    data = Array('I', [r.randint(0, 0xFFFFFFFF) for i in range(length)])
+    for pos in range(0, length, 37):
+        yield master.write_words(address + pos, data[pos:pos + 37])
+
+    reads = [(pos, min(50, length - pos)) for pos in range(0, length, 50)]
+    reads.append((0, length))
+    for pos, size in reads:
+        read_data = yield master.read_words(address + pos, size)
+        for i in range(size):
+            if read_data[i] != data[pos + i]:
+                raise TestFailure("%s: word 0x%08X read 0x%08X, expected 0x%08X" %
+                                  (name, address + pos + i, read_data[i], data[pos + i]))
+
+    #Alternate between two rows of the same bank so every block has to
+    #close the row the previous block left open
+    blocks = []
+    for i in range(8):
+        blocks.append((address + (i % 2) * 4 * ROW_WORDS + i * 8, 8))
+    for block_address, size in reversed(blocks):
+        read_data = yield master.read_words(block_address, size)
+        offset = block_address - address
+        if read_data != data[offset:offset + size]:
+            raise TestFailure("%s: row conflict read at 0x%08X does not match" % (name, block_address))
+
+@cocotb.test(skip = False)
+def sdram_bandwidth_test(dut):
+    """
+    Description:
+        Compare the original closed page controller with the open page, bank
+        interleaved controller on sequential, strided and random traffic
+
+    Test ID: 0
+
+    Expected Results:
+        Data read back matches on both controllers
+        Sequential bandwidth of the open page controller is at least as high
+        as the closed page controller
+    """
+    dut.test_id = 0
+    yield reset_dut(dut)
+    yield wait_ready(dut, dut.CLOSED_ready)
+    yield wait_ready(dut, dut.OPEN_ready)
+
+    closed = WishboneClassicMaster(dut, "CLOSED", dut.clk)
+    open_page = WishboneClassicMaster(dut, "OPEN", dut.clk)
+
+    results = {}
+    for name, pattern in PATTERNS:
+        blocks = pattern(random.Random(0))
+        closed_result = yield run_pattern(dut, closed, "Closed page %s" % name, blocks, random.Random(1))
+        open_result = yield run_pattern(dut, open_page, "Open page %s" % name, blocks, random.Random(1))
+        results[name] = (closed_result, open_result)
+
+    for name, pattern in PATTERNS:
+        closed_result, open_result = results[name]
+        dut.log.info("%s: write %0.2f -> %0.2f MB/s, read %0.2f -> %0.2f MB/s" %
+                     (name, closed_result[0][0], open_result[0][0], closed_result[1][0], open_result[1][0]))
+
+    closed_result, open_result = results["Sequential"]
+    if open_result[1][0] < closed_result[1][0]:
+        raise TestFailure("Open page sequential reads are slower than closed page reads")
+
+@cocotb.test(skip = False)
+def sdram_pipelined_test(dut):
+    """
+    Description:
+        Run the same traffic through the classic and the B4 pipelined open
+        page controller
+
+    Test ID: 1
+
+    Expected Results:
+        Data read back matches on both controllers
+        Sequential bandwidth of the pipelined controller is at least as high
+        as the classic controller
+    """
+    dut.test_id = 1
+    yield reset_dut(dut)
+    yield wait_ready(dut, dut.OPEN_ready)
+    yield wait_ready(dut, dut.PIPE_ready)
+
+    classic = WishboneClassicMaster(dut, "OPEN", dut.clk)
+    pipelined = WishbonePipelinedMaster(dut, "PIPE", dut.clk)
+
+    results = {}
+    for name, pattern in PATTERNS:
+        blocks = pattern(random.Random(0))
+        classic_result = yield run_pattern(dut, classic, "Classic %s" % name, blocks, random.Random(1))
+        pipelined_result = yield run_pattern(dut, pipelined, "Pipelined %s" % name, blocks, random.Random(1))
+        results[name] = (classic_result, pipelined_result)
+
+    for name, pattern in PATTERNS:
+        classic_result, pipelined_result = results[name]
+        dut.log.info("%s: write %0.2f -> %0.2f MB/s, read %0.2f -> %0.2f MB/s" %
+                     (name, classic_result[0][0], pipelined_result[0][0], classic_result[1][0], pipelined_result[1][0]))
+
+    classic_result, pipelined_result = results["Sequential"]
+    if pipelined_result[1][0] < classic_result[1][0]:
+        raise TestFailure("Pipelined sequential reads are slower than classic reads")
+
+@cocotb.test(skip = False)
+def sdram_crossing_test(dut):
+    """
+    Description:
+        Write and read blocks across row and bank boundaries on all three
+        controllers
+
+    Test ID: 2
+
+    Expected Results:
+        Data read back across every row and bank crossing matches
+    """
+    dut.test_id = 2
+    yield reset_dut(dut)
+    yield wait_ready(dut, dut.CLOSED_ready)
+    yield wait_ready(dut, dut.OPEN_ready)
+    yield wait_ready(dut, dut.PIPE_ready)
+
+    masters = [("Closed page", WishboneClassicMaster(dut, "CLOSED", dut.clk)),
+               ("Open page", WishboneClassicMaster(dut, "OPEN", dut.clk)),
+               ("Pipelined", WishbonePipelinedMaster(dut, "PIPE", dut.clk))]
+
+    for master_name, master in masters:
+        for name, address, length in CROSSING_REGIONS:
+            yield check_region(dut, master, "%s %s" % (master_name, name), address, length, random.Random(2))
@@ -25,7 +25,11 @@ SOFTWARE.
 `include "sdram_include.v"
 
 
-module sdram (
+module sdram #(
+  parameter OPEN_PAGE       = 1,
+  parameter BANK_INTERLEAVE = 1,
+  parameter BURST_LENGTH    = 0
+)(
 
 input               clk,
 input               rst,
@@ -154,7 +158,11 @@ ppfifo #(
 );
 
 
-sdram_write write_path (
+sdram_write #(
+  .OPEN_PAGE                 (OPEN_PAGE                      ),
+  .BANK_INTERLEAVE           (BANK_INTERLEAVE                ),
+  .BURST_LENGTH              (BURST_LENGTH                   )
+) write_path (
   .rst                       (rst || ~sdram_ready            ),
   .clk                       (sdram_clk                      ),
   .debug                     (debug                          ),
@@ -239,7 +247,11 @@ ppfifo #(
 );
 
 //Read Path
-sdram_read read_path (
+sdram_read #(
+  .OPEN_PAGE                (OPEN_PAGE           ),
+  .BANK_INTERLEAVE          (BANK_INTERLEAVE     ),
+  .BURST_LENGTH             (BURST_LENGTH        )
+) read_path (
   .rst                      (rst || ~sdram_ready ),
   .clk                      (sdram_clk           ),
   //.debug                    (debug               ),
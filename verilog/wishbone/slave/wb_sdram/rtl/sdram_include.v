@@ -53,6 +53,10 @@
 `define T_MRD	2     //MODE Register Set
 `define T_WR  2     //Writing to memory
 
+//Open page: when the next row is in another bank (BANK_INTERLEAVE) it is
+//activated while the current row is still bursting, starting at this column
+`define LOOKAHEAD_COLUMN  8'hF0
+
 //Auto Refresh Timeout
 `ifndef SIMULATION
   `define T_AR_TIMEOUT	1500
@@ -29,7 +29,16 @@ SOFTWARE.
 `define MAX_DWORD 512
 `define THRESHOLD 4
 
-module sdram_read (
+module sdram_read #(
+  //leave rows open between bursts, a burst to an open row skips the activate
+  parameter OPEN_PAGE       = 1,
+  //consecutive rows go to consecutive banks so the next row can be opened
+  //while the current one is read
+  parameter BANK_INTERLEAVE = 1,
+  //32-bit words in a burst before the burst is ended to let refresh and the
+  //write path in, 0: read until the end of the row
+  parameter BURST_LENGTH    = 0
+)(
 
 input               rst,
 input               clk,
@@ -70,6 +79,7 @@ localparam           READ_BOTTOM     = 4'h4;
 localparam           BURST_TERMINATE = 4'h5;
 localparam           PRECHARGE       = 4'h6;
 localparam           WAIT            = 4'h7;
+localparam           BURST_END       = 4'h8;
 
 reg         [3:0]   state = IDLE;
 reg         [15:0]  delay;
@@ -79,9 +89,29 @@ reg                 read_top;
 reg                 read_bottom;
 reg         [23:0]  fifo_count;
 
+wire        [1:0]   bank_sel;
 wire        [11:0]  row;
 wire        [7:0]   column;
 
+//open row tracking
+reg         [3:0]   open_bank;
+reg         [11:0]  open_row  [0:3];
+reg         [23:0]  burst_count;
+wire                row_hit;
+wire                burst_done;
+
+//look ahead activation of the row after this one
+localparam          LA_CHECK        = 2'h0;
+localparam          LA_PRECHARGED   = 2'h1;
+localparam          LA_ACTIVATE     = 2'h2;
+localparam          LA_DONE         = 2'h3;
+
+reg         [1:0]   la_state;
+wire        [21:0]  next_address;
+wire        [1:0]   next_bank;
+wire        [11:0]  next_row;
+wire                lookahead;
+
 wire                read_threshold;
 
 
@@ -89,10 +119,20 @@ wire                read_threshold;
 wire                neg_edge_enable;
 reg                 prev_enable;
 
-//assign      bank    = read_address[21:20];
-assign              row         = read_address[19:8];
+assign              bank_sel    = BANK_INTERLEAVE ? read_address[9:8]   : read_address[21:20];
+assign              row         = BANK_INTERLEAVE ? read_address[21:10] : read_address[19:8];
 assign              column      = read_address[7:0];
 
+assign              next_address= {read_address[21:8] + 14'h1, 8'h00};
+assign              next_bank   = BANK_INTERLEAVE ? next_address[9:8]   : next_address[21:20];
+assign              next_row    = BANK_INTERLEAVE ? next_address[21:10] : next_address[19:8];
+
+assign              row_hit     = open_bank[bank_sel] && (open_row[bank_sel] == row);
+assign              burst_done  = (BURST_LENGTH > 0) && (burst_count >= (BURST_LENGTH - 1));
+assign              lookahead   = OPEN_PAGE && BANK_INTERLEAVE &&
+                                  (la_state != LA_DONE) &&
+                                  (column >= `LOOKAHEAD_COLUMN);
+
 assign              debug[2:0]  = state[2:0];
 assign              debug[3]    = read_top;
 assign              debug[4]    = read_bottom;
@@ -103,8 +143,8 @@ assign              debug[15]   = fifo_write;
 assign              debug[31:16]= fifo_data[23:8];
 
 
-//assign idle
-assign              idle            = ((delay == 0) && ((state == IDLE) || (state == WAIT)));
+//assign idle, the write path and refresh can only take over when every bank is closed
+assign              idle            = ((delay == 0) && ((state == IDLE) || ((state == WAIT) && (open_bank == 0))));
 assign              neg_edge_enable = !enable & prev_enable;
 
 assign              read_threshold  = ((fifo_count + `THRESHOLD) <= fifo_size);
@@ -128,6 +168,9 @@ always @ (posedge clk) begin
     fifo_reset          <=  0;
     wait_for_refresh    <=  0;
     fifo_count          <=  0;
+    open_bank           <=  0;
+    burst_count         <=  0;
+    la_state            <=  LA_CHECK;
 
   end
   else begin
@@ -188,11 +231,22 @@ always @ (posedge clk) begin
         end
         WAIT: begin
           if (auto_refresh) begin
-            wait_for_refresh    <=  1;
+            if (open_bank != 0) begin
+              //close the rows before the refresh
+              state             <=  PRECHARGE;
+            end
+            else begin
+              wait_for_refresh  <=  1;
+            end
           end
           else if (~enable) begin
-            state               <=  IDLE;
             fifo_activate       <=  0;
+            if (open_bank != 0) begin
+              state             <=  PRECHARGE;
+            end
+            else begin
+              state             <=  IDLE;
+            end
           end
           else begin
             if (fifo_activate == 0) begin
@@ -232,11 +286,25 @@ always @ (posedge clk) begin
           if (auto_refresh) begin
             state         <=  WAIT;
           end
+          else if (row_hit) begin
+            //the row is still open from an earlier burst or the look ahead
+            state         <=  READ_COMMAND;
+          end
+          else if (open_bank[bank_sel]) begin
+            //another row is open in this bank, close it first
+            command       <=  `SDRAM_CMD_PRE;
+            address       <=  12'h000;
+            bank          <=  bank_sel;
+            open_bank[bank_sel] <=  0;
+            delay         <=  `T_RP;
+          end
           else begin
             command       <=  `SDRAM_CMD_ACT;
             state         <=  READ_COMMAND;
             address       <=  row;
-            bank          <=  read_address[21:20];
+            bank          <=  bank_sel;
+            open_bank[bank_sel] <=  1;
+            open_row[bank_sel]  <=  row;
             delay         <=  `T_RCD;
           end
         end
@@ -245,7 +313,10 @@ always @ (posedge clk) begin
           command       <=  `SDRAM_CMD_READ;
           state         <=  READ_TOP;
           address       <=  {4'b0000, column};
+          bank          <=  bank_sel;
           delay         <=  `T_CAS - 1;
+          burst_count   <=  0;
+          la_state      <=  LA_CHECK;
         end
         READ_TOP: begin
           //$display ("SDRAM_READ: Reading top word");
@@ -253,14 +324,49 @@ always @ (posedge clk) begin
           read_top      <=  1;
           state         <=  READ_BOTTOM;
           read_address  <=  read_address + 2;
+          //the command bus is free during the burst, open the next row in
+          //the next bank so the next burst does not wait for it
+          if (lookahead) begin
+            case (la_state)
+              LA_CHECK: begin
+                if (open_bank[next_bank] && (open_row[next_bank] == next_row)) begin
+                  la_state      <=  LA_DONE;
+                end
+                else if (open_bank[next_bank]) begin
+                  command       <=  `SDRAM_CMD_PRE;
+                  address       <=  12'h000;
+                  bank          <=  next_bank;
+                  open_bank[next_bank]  <=  0;
+                  la_state      <=  LA_PRECHARGED;
+                end
+                else begin
+                  la_state      <=  LA_ACTIVATE;
+                end
+              end
+              LA_PRECHARGED: begin
+                //wait out the precharge time
+                la_state        <=  LA_ACTIVATE;
+              end
+              LA_ACTIVATE: begin
+                command         <=  `SDRAM_CMD_ACT;
+                address         <=  next_row;
+                bank            <=  next_bank;
+                open_bank[next_bank]  <=  1;
+                open_row[next_bank]   <=  next_row;
+                la_state        <=  LA_DONE;
+              end
+            endcase
+          end
         end
         READ_BOTTOM: begin
           //$display ("SDRAM_READ: Reading bottom word");
           command       <=  `SDRAM_CMD_NOP;
           read_bottom   <=  1;
+          burst_count   <=  burst_count + 1;
           if ((fifo_count == 1) ||
               !enable           ||
               (column == 8'h00) ||
+              burst_done        ||
               auto_refresh      ||
               (starved && read_threshold)) begin
 
@@ -273,10 +379,22 @@ always @ (posedge clk) begin
         BURST_TERMINATE: begin
           command       <=  `SDRAM_CMD_TERM;
           delay         <=  `T_WR;
-          state         <=  PRECHARGE;
+          state         <=  BURST_END;
+        end
+        BURST_END: begin
+          //open page: leave the rows open and go straight back for more
+          if (OPEN_PAGE && enable && !auto_refresh) begin
+            state       <=  WAIT;
+          end
+          else begin
+            state       <=  PRECHARGE;
+          end
         end
         PRECHARGE: begin
+          //close every bank
           command       <=  `SDRAM_CMD_PRE;
+          address       <=  12'h400;
+          open_bank     <=  0;
           delay         <=  `T_RP;
           if (!enable) begin
             state       <=  IDLE;
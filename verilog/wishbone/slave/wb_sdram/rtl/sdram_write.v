@@ -25,7 +25,16 @@ SOFTWARE.
 `timescale 1 ns/1 ps
 `include "sdram_include.v"
 
-module sdram_write (
+module sdram_write #(
+  //leave rows open between bursts, a burst to an open row skips the activate
+  parameter OPEN_PAGE       = 1,
+  //consecutive rows go to consecutive banks so the next row can be opened
+  //while the current one is written
+  parameter BANK_INTERLEAVE = 1,
+  //32-bit words in a burst before the burst is ended to let refresh in,
+  //0: write until the end of the row or the FIFO
+  parameter BURST_LENGTH    = 0
+)(
 input               rst,
 input               clk,
 output      [31:0]  debug,
@@ -63,6 +72,7 @@ localparam           WRITE_TOP       = 4'h4;
 localparam           WRITE_BOTTOM    = 4'h5;
 localparam           BURST_TERMINATE = 4'h6;
 localparam           PRECHARGE       = 4'h7;
+localparam           BURST_END       = 4'h8;
 
 reg                 empty;
 
@@ -72,8 +82,28 @@ reg     [15:0]      delay;
 //this address gets latched in when the user initiates a write
 reg		  [21:0]			write_address;
 
+wire    [1:0]       bank_sel;
 wire    [11:0]      row;
 wire    [7:0]       column;
+
+//open row tracking
+reg     [3:0]       open_bank;
+reg     [11:0]      open_row  [0:3];
+reg     [23:0]      burst_count;
+wire                row_hit;
+wire                burst_done;
+
+//look ahead activation of the row after this one
+localparam          LA_CHECK        = 2'h0;
+localparam          LA_PRECHARGED   = 2'h1;
+localparam          LA_ACTIVATE     = 2'h2;
+localparam          LA_DONE         = 2'h3;
+
+reg     [1:0]       la_state;
+wire    [21:0]      next_address;
+wire    [1:0]       next_bank;
+wire    [11:0]      next_row;
+wire                lookahead;
 wire                continue_writing;
 reg     [23:0]      fifo_count;
 reg     [15:0]      top_data;
@@ -81,10 +111,20 @@ reg     [1:0]       top_mask;
 reg     [15:0]      bottom_data;
 reg     [1:0]       bottom_mask;
 
-//assign  bank          =   write_address[21:20];
-assign  row           =   write_address[19:8];
+assign  bank_sel      =   BANK_INTERLEAVE ? write_address[9:8]   : write_address[21:20];
+assign  row           =   BANK_INTERLEAVE ? write_address[21:10] : write_address[19:8];
 assign  column        =   write_address[7:0]; //4 Byte Boundary
 
+assign  next_address  =   {write_address[21:8] + 14'h1, 8'h00};
+assign  next_bank     =   BANK_INTERLEAVE ? next_address[9:8]   : next_address[21:20];
+assign  next_row      =   BANK_INTERLEAVE ? next_address[21:10] : next_address[19:8];
+
+assign  row_hit       =   open_bank[bank_sel] && (open_row[bank_sel] == row);
+assign  burst_done    =   (BURST_LENGTH > 0) && (burst_count >= (BURST_LENGTH - 1));
+assign  lookahead     =   OPEN_PAGE && BANK_INTERLEAVE &&
+                          (la_state != LA_DONE) &&
+                          (column >= `LOOKAHEAD_COLUMN);
+
 assign  debug[15:0]   =   fifo_data[15:0];
 assign  debug[18:16]  =   state[2:0];
 assign  debug[19]     =   fifo_read;
@@ -95,8 +135,8 @@ assign  debug[26]     =   fifo_inactive;
 assign  debug[28]     =   fifo_activate;
 
 
-//assign idle
-assign  idle          =   ((delay == 0) && ((state == IDLE) || (state == WAIT)));
+//assign idle, the read path and refresh can only take over when every bank is closed
+assign  idle          =   ((delay == 0) && ((state == IDLE) || ((state == WAIT) && (open_bank == 0))));
 
 
 always @(posedge clk) begin
@@ -120,6 +160,9 @@ always @(posedge clk) begin
     top_mask          <=  0;
     bottom_data       <=  0;
     bottom_mask       <=  0;
+    open_bank         <=  0;
+    burst_count       <=  0;
+    la_state          <=  LA_CHECK;
 
   end
   else begin
@@ -141,7 +184,13 @@ always @(posedge clk) begin
         end
         WAIT: begin
           if (auto_refresh) begin
-            wait_for_refresh  <=  1;
+            if (open_bank != 0) begin
+              //close the rows before the refresh
+              state           <=  PRECHARGE;
+            end
+            else begin
+              wait_for_refresh  <=  1;
+            end
           end
           else begin
             if (!fifo_activate) begin
@@ -153,7 +202,12 @@ always @(posedge clk) begin
               end
               else if (fifo_inactive && !enable) begin
                 //DONE!
-                state         <=  IDLE;
+                if (open_bank != 0) begin
+                  state       <=  PRECHARGE;
+                end
+                else begin
+                  state       <=  IDLE;
+                end
               end
             end
             else begin
@@ -178,20 +232,39 @@ always @(posedge clk) begin
         end
         ACTIVATE: begin
           //$display ("SDRAM_WRITE: ACTIVATE ROW %h", row);
-          command       <=  `SDRAM_CMD_ACT;
-          delay         <=  `T_RCD;
-          bank          <=  write_address[21:20];
-          address       <=  row;
-          state         <=  WRITE_COMMAND;
+          if (row_hit) begin
+            //the row is still open from an earlier burst or the look ahead
+            state       <=  WRITE_COMMAND;
+          end
+          else if (open_bank[bank_sel]) begin
+            //another row is open in this bank, close it first
+            command     <=  `SDRAM_CMD_PRE;
+            address     <=  12'h000;
+            bank        <=  bank_sel;
+            open_bank[bank_sel] <=  0;
+            delay       <=  `T_RP;
+          end
+          else begin
+            command     <=  `SDRAM_CMD_ACT;
+            delay       <=  `T_RCD;
+            bank        <=  bank_sel;
+            address     <=  row;
+            open_bank[bank_sel] <=  1;
+            open_row[bank_sel]  <=  row;
+            state       <=  WRITE_COMMAND;
+          end
         end
         WRITE_COMMAND: begin
           //$display ("SDRAM_WRITE: Issue the write command");
           empty         <=  0;
           command       <=  `SDRAM_CMD_WRITE;
           address       <=  {4'b0000, column};
+          bank          <=  bank_sel;
           data_out      <=  top_data;
           data_mask     <=  top_mask;
           state         <=  WRITE_BOTTOM;
+          burst_count   <=  0;
+          la_state      <=  LA_CHECK;
         end
         WRITE_TOP: begin
           empty         <=  0;
@@ -200,15 +273,49 @@ always @(posedge clk) begin
           data_mask     <=  top_mask;
           state         <=  WRITE_BOTTOM;
           //fifo_count    <=  fifo_count + 1;
+          //the command bus is free during the burst, open the next row in
+          //the next bank so the next burst does not wait for it
+          if (lookahead) begin
+            case (la_state)
+              LA_CHECK: begin
+                if (open_bank[next_bank] && (open_row[next_bank] == next_row)) begin
+                  la_state    <=  LA_DONE;
+                end
+                else if (open_bank[next_bank]) begin
+                  command     <=  `SDRAM_CMD_PRE;
+                  address     <=  12'h000;
+                  bank        <=  next_bank;
+                  open_bank[next_bank]  <=  0;
+                  la_state    <=  LA_PRECHARGED;
+                end
+                else begin
+                  la_state    <=  LA_ACTIVATE;
+                end
+              end
+              LA_PRECHARGED: begin
+                //wait out the precharge time
+                la_state      <=  LA_ACTIVATE;
+              end
+              LA_ACTIVATE: begin
+                command       <=  `SDRAM_CMD_ACT;
+                address       <=  next_row;
+                bank          <=  next_bank;
+                open_bank[next_bank]  <=  1;
+                open_row[next_bank]   <=  next_row;
+                la_state      <=  LA_DONE;
+              end
+            endcase
+          end
         end
         WRITE_BOTTOM: begin
           command       <=  `SDRAM_CMD_NOP;
           write_address <=  write_address + 2;
           data_out      <=  bottom_data;
           data_mask     <=  bottom_mask;
+          burst_count   <=  burst_count + 1;
           //if there is more data to write then continue on with the write
           //and issue a command to the AFIFO to grab more data
-          if ((column == 8'hFE) || auto_refresh) begin
+          if ((column == 8'hFE) || burst_done || auto_refresh) begin
             //we could have reached the end of a row here
             state       <=  BURST_TERMINATE;
             write_address[7:0]  <=  write_address + 2;
@@ -232,10 +339,22 @@ always @(posedge clk) begin
         BURST_TERMINATE: begin
           command       <=  `SDRAM_CMD_TERM;
           delay         <=  `T_WR;
-          state         <=  PRECHARGE;
+          state         <=  BURST_END;
+        end
+        BURST_END: begin
+          //open page: leave the rows open and go back for more data
+          if (OPEN_PAGE && !auto_refresh) begin
+            state       <=  WAIT;
+          end
+          else begin
+            state       <=  PRECHARGE;
+          end
         end
         PRECHARGE: begin
+          //close every bank
           command       <=  `SDRAM_CMD_PRE;
+          address       <=  12'h400;
+          open_bank     <=  0;
           delay         <=  `T_RP;
           state         <=  WAIT;
         end
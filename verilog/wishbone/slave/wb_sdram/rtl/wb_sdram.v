@@ -68,7 +68,20 @@ SOFTWARE.
 
 `timescale 1 ns/1 ps
 
-module wb_sdram (
+module wb_sdram #(
+  //leave SDRAM rows open between bursts
+  parameter OPEN_PAGE       = 1,
+  //consecutive rows in consecutive banks, the next row is opened while the
+  //current one is bursting
+  parameter BANK_INTERLEAVE = 1,
+  //longest SDRAM burst in 32-bit words, match it to the wishbone burst
+  //length of the masters, 0: bursts run to the end of the row
+  parameter BURST_LENGTH    = 0,
+  //0: classic cycles, ack is held until the strobe goes down
+  //1: B4 pipelined, a request is accepted on every clock the slave is not
+  //   stalling and acked in order
+  parameter PIPELINED       = 0
+)(
   input               clk,
   input               rst,
 
@@ -86,6 +99,11 @@ module wb_sdram (
 
   output  reg         o_wbs_int,
 
+  //wishbone B4 signals, only used when PIPELINED = 1
+  input       [2:0]   i_wbs_cti,
+  input       [1:0]   i_wbs_bte,
+  output              o_wbs_stall,
+
   //SDRAM signals
   output              o_sdram_clk,
   output              o_sdram_cke,
@@ -136,16 +154,27 @@ reg               first_exchange;
 
 wire              of_wb_reset;
 
+//Pipelined mode: the FIFOs are strobed on the clock a request is accepted
+wire              w_write_space;
+wire              w_read_valid;
+wire              w_accept;
+wire              w_if_write_strobe;
+wire              w_of_read_strobe;
+
 
 //Submoduels
 
-sdram ram (
+sdram #(
+  .OPEN_PAGE          (OPEN_PAGE          ),
+  .BANK_INTERLEAVE    (BANK_INTERLEAVE    ),
+  .BURST_LENGTH       (BURST_LENGTH       )
+) ram (
   .clk                (clk                ),
   .rst                (rst                ),
   //.debug              (debug              ),
 
   //write path
-  .if_write_strobe    (if_write_strobe    ),
+  .if_write_strobe    (w_if_write_strobe  ),
   .if_write_data      (i_wbs_dat          ),
   .if_write_mask      (4'b0000            ),
   .if_write_ready     (if_write_ready     ),
@@ -154,7 +183,7 @@ sdram ram (
   .if_starved         (if_starved         ),
 
   //read path
-  .of_read_strobe     (of_read_strobe     ),
+  .of_read_strobe     (w_of_read_strobe   ),
   .of_read_data       (of_read_data       ),
   .of_read_ready      (of_read_ready      ),
   .of_read_activate   (of_read_activate   ),
@@ -203,6 +232,18 @@ assign  debug[27]   = if_starved;
 
 assign  of_wb_reset = (~i_wbs_cyc || i_wbs_we);
 
+//A cycle is one SDRAM burst from the address of its first request, like the
+//classic cycles. The first request is stalled while the address is latched,
+//after that the FIFOs set the pace: writes stall while no write FIFO has
+//room, reads stall until the read FIFO holds data. Incrementing bursts
+//(CTI = 3'b010) stream at one word per clock.
+assign  w_write_space     = (if_write_activate > 0) && (if_count < (if_write_fifo_size - 1));
+assign  w_read_valid      = of_read_activate && (of_count > 0) && !writing;
+assign  o_wbs_stall       = PIPELINED ? (first_exchange || (i_wbs_we ? !w_write_space : !w_read_valid)) : 1'b0;
+assign  w_accept          = PIPELINED & i_wbs_stb & i_wbs_cyc & !o_wbs_stall;
+assign  w_if_write_strobe = PIPELINED ? (w_accept & i_wbs_we)  : if_write_strobe;
+assign  w_of_read_strobe  = PIPELINED ? (w_accept & !i_wbs_we) : of_read_strobe;
+
 //blocks
 always @ (posedge clk) begin
   if (rst) begin
@@ -221,6 +262,71 @@ always @ (posedge clk) begin
     first_exchange                    <= 0;
     o_wbs_dat                         <= 0;
   end
+  else if (PIPELINED) begin
+    //every accepted request is acked on the next clock, in order
+    o_wbs_ack                         <= w_accept;
+    if (w_accept && !i_wbs_we) begin
+      o_wbs_dat                       <= of_read_data;
+    end
+
+    if (~i_wbs_cyc) begin
+      writing                         <= 0;
+      reading                         <= 0;
+      of_read_activate                <= 0;
+      first_exchange                  <= 1;
+    end
+    else if (i_wbs_stb) begin
+      if (first_exchange) begin
+        app_address                   <=  {8'b0, i_wbs_adr[22:0], 1'b0};
+        first_exchange                <=  0;
+      end
+      if (i_wbs_we) begin
+        writing                       <=  1;
+      end
+      else if (~writing) begin
+        reading                       <=  1;
+      end
+    end
+
+    //Writing
+    if (w_accept && i_wbs_we) begin
+      if_count                        <= if_count + 1;
+    end
+    else if (if_write_activate > 0) begin
+      //hand the FIFO to the SDRAM when it is full, the cycle is over or
+      //the SDRAM is waiting for data
+      if ((if_count >= (if_write_fifo_size - 1)) ||
+          ((if_count > 0) && (~i_wbs_cyc || if_starved))) begin
+        if_count                      <= 0;
+        if_write_activate             <= 0;
+      end
+    end
+    else if (i_wbs_cyc && i_wbs_stb && i_wbs_we && (if_write_ready > 0)) begin
+      //try and get a FIFO
+      if_count                        <= 0;
+      if (if_write_ready[0]) begin
+        if_write_activate[0]          <=  1;
+      end
+      else begin
+        if_write_activate[1]          <=  1;
+      end
+    end
+
+    //Reading
+    if (of_read_activate) begin
+      if (w_accept && !i_wbs_we) begin
+        of_count                      <=  of_count - 1;
+      end
+      else if (of_count == 0) begin
+        //release the FIFO
+        of_read_activate              <=  0;
+      end
+    end
+    else if (i_wbs_cyc && i_wbs_stb && !i_wbs_we && !writing && of_read_ready) begin
+      of_count                        <=  of_read_count;
+      of_read_activate                <=  1;
+    end
+  end
   else begin
     //Strobe
     if_write_strobe                   <= 0;